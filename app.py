@@ -1,25 +1,28 @@
+from modules.lazy_imports import mark, report_import_profile
 import os
 import json
 import time
 import gradio as gr
-import google.generativeai as genai
+mark("gradio import")
 from PIL import Image
 from dotenv import load_dotenv
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import numpy as np
 import base64
 import io
 import uuid
 from datetime import datetime
 import PIL.ImageDraw
 import random
-import copy
-from modules.persona_generator import PersonaGenerator, PersonalityProfile, HumorMatrix
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+from modules.persona_generator import PersonaGenerator, PersonalityProfile, HumorMatrix, enrichment_mode
+from modules import chart_cache
+from modules.variable_registry import variable_rows
+from modules.persona_state import update_persona, update_section, persona_diff, without_callables, chat_session_id
+from modules.preview_scheduler import PreviewScheduler, SUPERSEDED
+from modules.preview_engine import local_preview, trait_greeting, preview_mode
+from modules import persona_codec
+from modules.client_charts import chart_head
+from modules.background_jobs import get_job_runner, background_jobs_enabled, QUEUED, RUNNING
+from modules import deployment
+mark("persona_generator import")
 
 # AVIF 지원을 위한 플러그인 활성화
 try:
@@ -31,29 +34,25 @@ except ImportError:
 # Import modules
 from modules.persona_generator import PersonaGenerator
 from modules.data_manager import save_persona, load_persona, list_personas, toggle_frontend_backend_view
-
-# Import local modules
-from temp.frontend_view import create_frontend_view_html
-from temp.backend_view import create_backend_view_html
-from temp.view_functions import (
-    plot_humor_matrix, generate_personality_chart, save_current_persona, 
-    refine_persona, get_personas_list, load_selected_persona, 
-    update_current_persona_info, get_personality_variables_df, 
-    get_attractive_flaws_df, get_contradictions_df,
-    export_persona_json, import_persona_json
-)
+from modules.rate_limiter import PRIORITY_BACKGROUND
 
 # Load environment variables
 load_dotenv()
 
 # Configure Gemini API
+# (genai.configure 는 PersonaGenerator 의 첫 Gemini 호출 시점에 적용)
 api_key = os.getenv("GEMINI_API_KEY")
 if api_key:
-    genai.configure(api_key=api_key)
     print(f"✅ Gemini API 키가 환경변수에서 로드되었습니다.")
 else:
     print("⚠️ GEMINI_API_KEY 환경변수가 설정되지 않았습니다.")
 
+# 실시간 미리보기: 슬라이더 연속 조작은 디바운스하고 밀려난 요청은 LLM 호출 없이 버림
+preview_scheduler = PreviewScheduler(debounce_seconds=float(os.getenv("PREVIEW_DEBOUNCE_SECONDS", "0.6")))
+
+# 배포 프로필: 대기열 크기/동시 실행 그룹 (무거운 LLM 이벤트와 가벼운 이벤트 분리)
+deployment_profile = deployment.load_profile()
+
 # Create data directories
 os.makedirs("data/personas", exist_ok=True)
 os.makedirs("data/conversations", exist_ok=True)
@@ -66,46 +65,7 @@ else:
     persona_generator = PersonaGenerator()
     print("⚠️ PersonaGenerator가 API 키 없이 초기화되었습니다.")
 
-# 한글 폰트 설정
-def setup_korean_font():
-    """matplotlib 한글 폰트 설정 - 허깅페이스 환경 최적화"""
-    try:
-        import matplotlib.pyplot as plt
-        import matplotlib.font_manager as fm
-        
-        # 허깅페이스 스페이스 환경에서 사용 가능한 폰트 목록
-        available_fonts = [
-            'NanumGothic', 'NanumBarunGothic', 'Noto Sans CJK KR', 
-            'Noto Sans KR', 'DejaVu Sans', 'Liberation Sans', 'Arial'
-        ]
-        
-        # 시스템에서 사용 가능한 폰트 확인
-        system_fonts = [f.name for f in fm.fontManager.ttflist]
-        
-        for font_name in available_fonts:
-            if font_name in system_fonts:
-                try:
-                    plt.rcParams['font.family'] = font_name
-                    plt.rcParams['axes.unicode_minus'] = False
-                    print(f"한글 폰트 설정 완료: {font_name}")
-                    return
-                except Exception:
-                    continue
-        
-        # 모든 폰트가 실패한 경우 기본 설정 사용 (영어 레이블 사용)
-        plt.rcParams['font.family'] = 'DejaVu Sans'
-        plt.rcParams['axes.unicode_minus'] = False
-        print("한글 폰트를 찾지 못해 영어 레이블을 사용합니다")
-        
-    except Exception as e:
-        print(f"폰트 설정 오류: {str(e)}")
-        # 오류 발생 시에도 기본 설정은 유지
-        import matplotlib.pyplot as plt
-        plt.rcParams['font.family'] = 'DejaVu Sans'
-        plt.rcParams['axes.unicode_minus'] = False
-
-# 폰트 초기 설정
-setup_korean_font()
+mark("generator 초기화")
 
 # Gradio theme
 theme = gr.themes.Soft(
@@ -206,10 +166,14 @@ HUMOR_STYLE_MAPPING = {
     "Self-deprecating": "self_deprecating"
 }
 
-def create_persona_from_image(image, name, location, time_spent, object_type, purpose, progress=gr.Progress()):
+def create_persona_from_image(image, name, location, time_spent, object_type, purpose, progress=gr.Progress(),
+                              request: gr.Request = None):
     """페르소나 생성 함수 - 환경변수 API 설정 사용"""
     global persona_generator
     
+    # 이전 페르소나의 조정 작업 결과가 새 페르소나를 덮어쓰지 않도록 취소
+    get_job_runner().cancel_key((_session_key(request), "adjust"))
+    
     if image is None:
         return None, "이미지를 업로드해주세요.", "", {}, None, [], [], [], "", None, gr.update(visible=False), "이미지 없음"
     
@@ -284,7 +248,14 @@ def create_persona_from_image(image, name, location, time_spent, object_type, pu
         full_object_info = object_info.copy()
         full_object_info["매력적결함"] = attractive_flaws
         
-        awakening_msg = generate_personality_preview(persona_name, personality_traits, full_object_info, attractive_flaws)
+        # 원샷 보강으로 이미 만들어진 인사말이 있으면 추가 API 호출 없이 사용
+        if backend_persona.get("인사말"):
+            awakening_msg = persona_generator.format_greeting(persona_name, backend_persona["인사말"])
+        elif background_jobs_enabled():
+            # ⚡ 성격 기반 로컬 인사말을 먼저 보여주고 AI 인사말은 백그라운드로 (start_awakening_greeting)
+            awakening_msg = trait_greeting(persona_name, personality_traits)
+        else:
+            awakening_msg = generate_personality_preview(persona_name, personality_traits, full_object_info, attractive_flaws)
         
         # 페르소나 요약 표시
         summary_display = display_persona_summary(backend_persona)
@@ -306,51 +277,7 @@ def create_persona_from_image(image, name, location, time_spent, object_type, pu
             # 성격프로필에서 직접 가져오기 (성격프로필 자체가 variables dict)
             variables = backend_persona["성격프로필"]
         
-        variables_df = []
-        for var, value in variables.items():
-            # 카테고리 분류
-            if var.startswith('W'):
-                category = f"🔥 온기/따뜻함 ({value})"
-            elif var.startswith('C'):
-                category = f"💪 능력/역량 ({value})"
-            elif var.startswith('E'):
-                category = f"🗣️ 외향성 ({value})"
-            elif var.startswith('H'):
-                category = f"😄 유머 ({value})"
-            elif var.startswith('F'):
-                category = f"💎 매력적결함 ({value})"
-            elif var.startswith('P'):
-                category = f"🎭 성격패턴 ({value})"
-            elif var.startswith('S'):
-                category = f"🗨️ 언어스타일 ({value})"
-            elif var.startswith('R'):
-                category = f"❤️ 관계성향 ({value})"
-            elif var.startswith('D'):
-                category = f"💬 대화역학 ({value})"
-            elif var.startswith('OBJ'):
-                category = f"🏠 사물정체성 ({value})"
-            elif var.startswith('FORM'):
-                category = f"✨ 형태특성 ({value})"
-            elif var.startswith('INT'):
-                category = f"🤝 상호작용 ({value})"
-            elif var.startswith('U'):
-                category = f"🌍 문화적특성 ({value})"
-            else:
-                category = f"📊 기타 ({value})"
-            
-            # 값에 따른 색상 표시
-            if value >= 80:
-                status = "🟢 매우 높음"
-            elif value >= 60:
-                status = "🟡 높음"  
-            elif value >= 40:
-                status = "🟠 보통"
-            elif value >= 20:
-                status = "🔴 낮음"
-            else:
-                status = "⚫ 매우 낮음"
-                
-            variables_df.append([var, value, category, status])
+        variables_df = variable_rows(variables, with_value=True)
         
         progress(0.9, desc="완료 중...")
         
@@ -427,62 +354,155 @@ def generate_personality_preview(persona_name, personality_traits, object_info=N
         print(f"⚠️ 간단 AI 인사말도 실패: {e}")
         
         # 최종 폴백: 성격에 따른 기본 인사말
-        warmth = personality_traits.get("온기", 50)
-        humor = personality_traits.get("유머감각", 50)
-        extraversion = personality_traits.get("외향성", 50)
-        
-        if warmth >= 70 and extraversion >= 70:
-            return f"🌟 **{persona_name}** - 안녕! 나는 {persona_name}이야~ 만나서 정말 기뻐! 😊✨"
-        elif warmth <= 30:
-            return f"🌟 **{persona_name}** - {persona_name}이야. 필요한 얘기만 하자. 😐"
-        elif extraversion >= 70:
-            return f"🌟 **{persona_name}** - 안녕안녕! {persona_name}이야! 뭐 재밌는 얘기 없어? 🗣️"
-        elif humor >= 70:
-            return f"🌟 **{persona_name}** - 안녕~ {persona_name}이야! 재밌게 놀아보자! 😄"
-        else:
-            return f"🌟 **{persona_name}** - 안녕... {persona_name}이야. 😊"
-
-def _generate_flaw_based_greeting(persona_name, warmth, humor, competence, extraversion, flaws):
-    """매력적 결함을 반영한 특별한 인사말 생성"""
-    if not flaws:
-        return None
-    
-    # 주요 결함 키워드 분석
-    flaw_keywords = " ".join(flaws).lower()
-    
-    # 완벽주의 결함
-    if any(keyword in flaw_keywords for keyword in ["완벽", "불안", "걱정"]):
-        if humor >= 60:
-            return f"🌟 **{persona_name}** - 안녕! {persona_name}이야~ 어... 이 인사가 완벽한가? 다시 해볼까? 아니 괜찮나? ㅋㅋ 😅✨"
-        elif warmth >= 60:
-            return f"🌟 **{persona_name}** - 안녕... {persona_name}이야. 완벽하게 인사하고 싶은데 잘 안 되네... 미안해. 😊💕"
+        return trait_greeting(persona_name, personality_traits)
+
+def _flaw_rows(flaws):
+    """매력적 결함 → 유형을 분류한 DataFrame 행"""
+    flaws_df = []
+    for i, flaw in enumerate(flaws, 1):
+        # 🔥 사물 특성 vs 성격적 특성 더 세밀하게 구분
+        if any(keyword in flaw for keyword in ["지문", "긁힘", "녹", "색깔", "빠져", "변형", "달라붙", "끈적", "가벼워", "반짝", "투명", "깨질", "부풀어", "벌레", "나이테", "털", "얼룩", "세탁", "보풀", "먼지", "햇볕", "색이", "충격", "습도", "냄새", "모서리", "무게", "크기", "소리", "찬 기운", "딱딱한", "정전기", "삐걱", "끝장", "비밀이 없", "간지러", "늘어나", "줄어드", "말랑한"]):
+            flaw_type = "🏠 재질/물리적 특성"
+        elif any(keyword in flaw for keyword in ["뜨겁다", "맛이", "손잡이", "바닥", "페이지", "시간", "배터리", "째깍", "위로", "재미없", "표정", "빛이", "전기", "분위기", "글씨", "잉크", "음료", "펼쳐지", "던져", "원망", "쓸모없", "귀찮", "고장", "불편", "방치"]):
+            flaw_type = "🎯 기능적 특성"
+        elif any(keyword in flaw for keyword in ["운동", "공부", "예쁘게", "실용적", "장식", "인테리어", "채찍질", "동기부여", "잔소리", "지식 전달", "진지한가", "지루한", "취향", "분위기", "트렌드", "고마워"]):
+            flaw_type = "🎭 역할/정체성"
         else:
-            return f"🌟 **{persona_name}** - {persona_name}입니다. 이 인사가 적절한지 확신이... 다시 정리하겠습니다. 😐"
-    
-    # 산만함 결함  
-    elif any(keyword in flaw_keywords for keyword in ["산만", "집중", "건망"]):
-        return f"🌟 **{persona_name}** - 안녕! 나는... 어? 뭐 얘기하려고 했지? 아! {persona_name}이야! 그런데 너는... 어? 뭐였지? ㅋㅋ 😅🌪️"
-    
-    # 소심함 결함
-    elif any(keyword in flaw_keywords for keyword in ["소심", "망설", "눈치"]):
-        if warmth >= 60:
-            return f"🌟 **{persona_name}** - 음... 안녕? {persona_name}이야... 이렇게 말해도 되나? 괜찮을까? 😌💕"
+            flaw_type = "💭 성격적 특성"
+        flaws_df.append([f"{i}. {flaw}", flaw_type])
+    return flaws_df
+
+def _contradiction_rows(contradictions):
+    """모순적 특성 → 유형을 분류한 DataFrame 행"""
+    contradictions_df = []
+    for i, contradiction in enumerate(contradictions, 1):
+        # 🎭 모순도 사물 특성 기반으로 세밀하게 분류
+        if any(keyword in contradiction for keyword in ["차가운", "가벼워", "자연스러워", "부드러워", "딱딱해", "투명", "반짝", "말랑", "단단한", "유연한"]):
+            contradiction_type = "🏠 재질 기반 모순"
+        elif any(keyword in contradiction for keyword in ["활발", "조용", "외향", "내향", "사교", "혼자", "수다", "말이 없"]):
+            contradiction_type = "🎭 성격 기반 모순"
+        elif any(keyword in contradiction for keyword in ["운동", "공부", "장식", "실용", "기능", "예쁘", "역할"]):
+            contradiction_type = "🎯 역할 기반 모순"
         else:
-            return f"🌟 **{persona_name}** - ...안녕. {persona_name}... 혹시 이런 말 싫어하면 미안해. 😐💙"
-    
-    # 나르시시즘 결함
-    elif any(keyword in flaw_keywords for keyword in ["나르시", "자랑", "특별"]):
-        return f"🌟 **{persona_name}** - 안녕! 나는 {persona_name}이야~ 꽤 매력적이지? 이런 멋진 친구 만나기 쉽지 않을 걸? ㅋㅋ 😎✨"
-    
-    # 고집 결함
-    elif any(keyword in flaw_keywords for keyword in ["고집", "완고", "자존심"]):
-        return f"🌟 **{persona_name}** - 안녕. {persona_name}이야. 내 방식으로 인사할게. 다른 방식은... 글쎄? 🤨💪"
-    
-    # 질투 결함
-    elif any(keyword in flaw_keywords for keyword in ["질투", "시기", "독차지"]):
-        return f"🌟 **{persona_name}** - 안녕... {persona_name}이야. 나만 봐줄 거지? 다른 애들 말고... 나만? 🥺💕"
-    
-    return None
+            contradiction_type = "💫 복합적 매력"
+        contradictions_df.append([f"{i}. {contradiction}", contradiction_type])
+    return contradictions_df
+
+def local_adjusted_content(persona):
+    """API 호출 없이 변수 기반으로 만든 결함/모순 (실패하면 빈 dict → 기존 내용 유지)"""
+    try:
+        object_info = persona.get("기본정보", {})
+        return {
+            "매력적결함": _generate_variable_based_flaws(object_info, persona["성격특성"])[:4],
+            "모순적특성": _generate_variable_based_contradictions(object_info, persona["성격특성"])[:2],
+        }
+    except Exception as local_error:
+        print(f"⚠️ 변수 기반 결함/모순 생성 실패, 기존 내용 유지: {local_error}")
+        return {}
+
+def regenerate_adjusted_content(persona):
+    """조정된 성격에 맞는 결함/모순(원샷 모드면 인사말도) 재생성 → 바뀐 필드 dict"""
+    fields = {}
+    
+    # ✨ 원샷 모드: 결함/모순/인사말을 한 번의 호출로 재생성
+    if enrichment_mode() == "oneshot" and "성격프로필" in persona:
+        profile = PersonalityProfile.from_dict(persona["성격프로필"])
+        fields.update(persona_generator.enrich_persona(
+            persona, None, profile, fields=["매력적결함", "모순적특성", "인사말"]
+        ))
+    
+    # 🎯 성격 특성과 완전히 일관성 있는 매력적 결함과 모순적 특성 생성 (원샷 실패 필드만)
+    if not fields.get("매력적결함") or not fields.get("모순적특성"):
+        try:
+            new_flaws, new_contradictions = generate_personality_consistent_flaws_and_contradictions(
+                persona.get("기본정보", {}), 
+                persona["성격특성"]
+            )
+            fields["매력적결함"] = fields.get("매력적결함") or new_flaws
+            fields["모순적특성"] = fields.get("모순적특성") or new_contradictions
+            print(f"🎭 성격에 완전히 일치하는 결함/모순 생성: {len(new_flaws)}개 결함, {len(new_contradictions)}개 모순")
+        except Exception as generation_error:
+            print(f"⚠️ 성격 일관성 결함/모순 생성 실패: {generation_error}")
+            # 실패해도 기본 조정은 계속 진행
+    return fields
+
+def adjust_persona(persona, warmth, competence, extraversion, humor_style):
+    """3개 핵심 지표 + 유머스타일을 성격특성과 151개 변수에 반영한 새 페르소나 (화면 구성 없음)"""
+    # 바뀌는 섹션만 새 객체로 교체 (나머지 섹션은 원본과 공유, 깊은 복사 없음)
+    # 성격 특성 업데이트 (유머감각은 항상 높게 고정)
+    adjusted_persona = update_section(persona, "성격특성", {
+        "온기": warmth,
+        "능력": competence,
+        "유머감각": 75,  # 🎭 항상 높은 유머감각
+        "외향성": extraversion,
+    })
+    adjusted_persona["유머스타일"] = humor_style
+    
+    # 127개 변수 시스템도 업데이트 (사용자 지표가 반영되도록)
+    if "성격프로필" in adjusted_persona:
+        from modules.persona_generator import PersonalityProfile
+        profile = PersonalityProfile.from_dict(adjusted_persona["성격프로필"])
+        
+        # 온기 관련 변수들 조정 (10개 모두)
+        warmth_vars = ["W01_친절함", "W02_친근함", "W03_진실성", "W04_신뢰성", "W05_수용성",
+                      "W06_공감능력", "W07_포용력", "W08_격려성향", "W09_친밀감표현", "W10_무조건적수용"]
+        for var in warmth_vars:
+            base_value = warmth + random.randint(-15, 15)
+            profile.variables[var] = max(0, min(100, base_value))
+        
+        # 능력 관련 변수들 조정 (16개 모두)
+        competence_vars = ["C01_효율성", "C02_지능", "C03_책임감", "C04_신뢰도", "C05_정확성",
+                          "C06_전문성", "C07_혁신성", "C08_적응력", "C09_실행력", "C10_분석력",
+                          "C11_의사결정력", "C12_문제해결력", "C13_계획수립능력", "C14_시간관리능력",
+                          "C15_품질관리능력", "C16_성과달성력"]
+        for var in competence_vars:
+            base_value = competence + random.randint(-15, 15)
+            profile.variables[var] = max(0, min(100, base_value))
+        
+        # 외향성 관련 변수들 조정 (6개 모두)
+        extraversion_vars = ["E01_사교성", "E02_활동성", "E03_적극성", "E04_긍정정서", "E05_자극추구성", "E06_주도성"]
+        for var in extraversion_vars:
+            base_value = extraversion + random.randint(-15, 15)
+            profile.variables[var] = max(0, min(100, base_value))
+        
+        # 🎭 유머 관련 변수들 조정 - 완전한 변수 기반 동적 시스템
+        humor_vars = ["H01_언어유희빈도", "H02_상황유머감각", "H03_자기조롱능력", "H04_위트감각", 
+                     "H05_농담수용도", "H06_관찰유머능력", "H07_상황재치", "H08_유머타이밍감", 
+                     "H09_유머스타일다양성", "H10_유머적절성"]
+        
+        # 🧠 변수 기반 동적 유머 조정 - 현재값과 목표 스타일 분석
+        current_humor_profile = {}
+        for var in humor_vars:
+            current_humor_profile[var] = profile.variables.get(var, 50)
+        
+        # 목표 유머 스타일에 따른 변수별 목표값 동적 계산
+        humor_targets = _calculate_dynamic_humor_targets(humor_style, current_humor_profile)
+        
+        # 현재값과 목표값의 차이를 기반으로 조정
+        for var in humor_vars:
+            current_val = profile.variables.get(var, 50)
+            target_val = humor_targets.get(var, 75)
+            
+            # 점진적 조정 (한 번에 너무 크게 변하지 않도록)
+            adjustment_strength = 0.7  # 70% 조정
+            target_adjustment = (target_val - current_val) * adjustment_strength
+            
+            # 랜덤 노이즈 추가하여 자연스러움 증대
+            noise = random.randint(-8, 8)
+            new_value = current_val + target_adjustment + noise
+            
+            # 범위 제한
+            profile.variables[var] = max(55, min(100, new_value))
+        
+        # 업데이트된 성격변수127도 동시에 저장
+        adjusted_persona["성격변수127"] = profile.variables.copy()
+        
+        # 업데이트된 프로필 저장
+        adjusted_persona["성격프로필"] = profile.to_dict()
+        
+        # 이전 성격 기준 인사말은 더 이상 맞지 않음
+        adjusted_persona.pop("인사말", None)
+    return adjusted_persona
 
 def adjust_persona_traits(persona, warmth, competence, extraversion, humor_style):
     """페르소나 성격 특성 조정 - 3개 핵심 지표 + 유머스타일"""
@@ -490,150 +510,24 @@ def adjust_persona_traits(persona, warmth, competence, extraversion, humor_style
         return None, "조정할 페르소나가 없습니다.", {}
     
     try:
-        # 원본 페르소나 저장 (변화량 비교용)
-        original_persona = copy.deepcopy(persona)
+        # 원본 페르소나는 수정하지 않으므로 그대로 변화량 비교에 사용
+        original_persona = persona
         
-        # 깊은 복사로 원본 보호
-        adjusted_persona = copy.deepcopy(persona)
+        adjusted_persona = adjust_persona(persona, warmth, competence, extraversion, humor_style)
         
-        # 성격 특성 업데이트 (유머감각은 항상 높게 고정)
-        if "성격특성" not in adjusted_persona:
-            adjusted_persona["성격특성"] = {}
-            
-        adjusted_persona["성격특성"]["온기"] = warmth
-        adjusted_persona["성격특성"]["능력"] = competence  
-        adjusted_persona["성격특성"]["유머감각"] = 75  # 🎭 항상 높은 유머감각
-        adjusted_persona["성격특성"]["외향성"] = extraversion
-        adjusted_persona["유머스타일"] = humor_style
-        
-        # 127개 변수 시스템도 업데이트 (사용자 지표가 반영되도록)
         if "성격프로필" in adjusted_persona:
-            from modules.persona_generator import PersonalityProfile
-            profile = PersonalityProfile.from_dict(adjusted_persona["성격프로필"])
-            
-            # 온기 관련 변수들 조정 (10개 모두)
-            warmth_vars = ["W01_친절함", "W02_친근함", "W03_진실성", "W04_신뢰성", "W05_수용성",
-                          "W06_공감능력", "W07_포용력", "W08_격려성향", "W09_친밀감표현", "W10_무조건적수용"]
-            for var in warmth_vars:
-                base_value = warmth + random.randint(-15, 15)
-                profile.variables[var] = max(0, min(100, base_value))
-            
-            # 능력 관련 변수들 조정 (16개 모두)
-            competence_vars = ["C01_효율성", "C02_지능", "C03_책임감", "C04_신뢰도", "C05_정확성",
-                              "C06_전문성", "C07_혁신성", "C08_적응력", "C09_실행력", "C10_분석력",
-                              "C11_의사결정력", "C12_문제해결력", "C13_계획수립능력", "C14_시간관리능력",
-                              "C15_품질관리능력", "C16_성과달성력"]
-            for var in competence_vars:
-                base_value = competence + random.randint(-15, 15)
-                profile.variables[var] = max(0, min(100, base_value))
-            
-            # 외향성 관련 변수들 조정 (6개 모두)
-            extraversion_vars = ["E01_사교성", "E02_활동성", "E03_적극성", "E04_긍정정서", "E05_자극추구성", "E06_주도성"]
-            for var in extraversion_vars:
-                base_value = extraversion + random.randint(-15, 15)
-                profile.variables[var] = max(0, min(100, base_value))
-            
-            # 🎭 유머 관련 변수들 조정 - 완전한 변수 기반 동적 시스템
-            humor_vars = ["H01_언어유희빈도", "H02_상황유머감각", "H03_자기조롱능력", "H04_위트감각", 
-                         "H05_농담수용도", "H06_관찰유머능력", "H07_상황재치", "H08_유머타이밍감", 
-                         "H09_유머스타일다양성", "H10_유머적절성"]
-            
-            # 🧠 변수 기반 동적 유머 조정 - 현재값과 목표 스타일 분석
-            current_humor_profile = {}
-            for var in humor_vars:
-                current_humor_profile[var] = profile.variables.get(var, 50)
-            
-            # 목표 유머 스타일에 따른 변수별 목표값 동적 계산
-            humor_targets = _calculate_dynamic_humor_targets(humor_style, current_humor_profile)
-            
-            # 현재값과 목표값의 차이를 기반으로 조정
-            for var in humor_vars:
-                current_val = profile.variables.get(var, 50)
-                target_val = humor_targets.get(var, 75)
-                
-                # 점진적 조정 (한 번에 너무 크게 변하지 않도록)
-                adjustment_strength = 0.7  # 70% 조정
-                target_adjustment = (target_val - current_val) * adjustment_strength
-                
-                # 랜덤 노이즈 추가하여 자연스러움 증대
-                noise = random.randint(-8, 8)
-                new_value = current_val + target_adjustment + noise
-                
-                # 범위 제한
-                profile.variables[var] = max(55, min(100, new_value))
-            
-            # 업데이트된 성격변수127도 동시에 저장
-            adjusted_persona["성격변수127"] = profile.variables.copy()
-            
-            # 업데이트된 프로필 저장
-            adjusted_persona["성격프로필"] = profile.to_dict()
-            
-            # 🎯 성격 특성과 완전히 일관성 있는 매력적 결함과 모순적 특성 생성
-            try:
-                object_info = adjusted_persona.get("기본정보", {})
-                new_flaws, new_contradictions = generate_personality_consistent_flaws_and_contradictions(
-                    object_info, 
-                    adjusted_persona["성격특성"]
-                )
-                
-                # 업데이트
-                adjusted_persona["매력적결함"] = new_flaws
-                adjusted_persona["모순적특성"] = new_contradictions
-                        
-                print(f"🎭 성격에 완전히 일치하는 결함/모순 생성: {len(new_flaws)}개 결함, {len(new_contradictions)}개 모순")
-                        
-            except Exception as generation_error:
-                print(f"⚠️ 성격 일관성 결함/모순 생성 실패: {generation_error}")
-                # 실패해도 기본 조정은 계속 진행
+            # 🎯 성격에 맞는 결함/모순(원샷 모드면 인사말도) 재생성
+            if background_jobs_enabled():
+                # ⚡ 변수 기반 결함/모순을 바로 보여주고 AI 재생성은 백그라운드 작업으로 (start_adjust_job)
+                adjusted_persona.update(local_adjusted_content(adjusted_persona))
+            else:
+                adjusted_persona.update(regenerate_adjusted_content(adjusted_persona))
         
         # 조정된 변수들을 DataFrame으로 생성
         variables_df = []
         if "성격변수127" in adjusted_persona:
             variables = adjusted_persona["성격변수127"]
-            for var, value in variables.items():
-                # 카테고리 분류
-                if var.startswith('W'):
-                    category = f"🔥 온기/따뜻함 ({value})"
-                elif var.startswith('C'):
-                    category = f"💪 능력/역량 ({value})"
-                elif var.startswith('E'):
-                    category = f"🗣️ 외향성 ({value})"
-                elif var.startswith('H'):
-                    category = f"😄 유머 ({value})"
-                elif var.startswith('F'):
-                    category = f"💎 매력적결함 ({value})"
-                elif var.startswith('P'):
-                    category = f"🎭 성격패턴 ({value})"
-                elif var.startswith('S'):
-                    category = f"🗨️ 언어스타일 ({value})"
-                elif var.startswith('R'):
-                    category = f"❤️ 관계성향 ({value})"
-                elif var.startswith('D'):
-                    category = f"💬 대화역학 ({value})"
-                elif var.startswith('OBJ'):
-                    category = f"🏠 사물정체성 ({value})"
-                elif var.startswith('FORM'):
-                    category = f"✨ 형태특성 ({value})"
-                elif var.startswith('INT'):
-                    category = f"🤝 상호작용 ({value})"
-                elif var.startswith('U'):
-                    category = f"🌍 문화적특성 ({value})"
-                else:
-                    category = f"📊 기타 ({value})"
-                
-                # 값에 따른 색상 표시
-                if value >= 80:
-                    status = "🟢 매우 높음"
-                elif value >= 60:
-                    status = "🟡 높음"  
-                elif value >= 40:
-                    status = "🟠 보통"
-                elif value >= 20:
-                    status = "🔴 낮음"
-                else:
-                    status = "⚫ 매우 낮음"
-                    
-                variables_df.append([var, value, category, status])
+            variables_df = variable_rows(variables, with_value=True)
         
         # 조정된 정보 표시
         adjusted_info = {
@@ -647,31 +541,23 @@ def adjust_persona_traits(persona, warmth, competence, extraversion, humor_style
         
         persona_name = adjusted_persona.get("기본정보", {}).get("이름", "페르소나")
         
-        # 조정된 성격에 따른 한 문장 반응 생성 (사물 정보 + 매력적 결함 포함)
-        object_info = adjusted_persona.get("기본정보", {})
-        attractive_flaws = adjusted_persona.get("매력적결함", [])
-        
-        # 전체 페르소나 정보를 object_info에 통합하여 매력적 결함 정보 전달
-        full_object_info = object_info.copy()
-        full_object_info["매력적결함"] = attractive_flaws
-        
-        personality_preview = generate_personality_preview(persona_name, {
-            "온기": warmth,
-            "능력": competence,
-            "유머감각": 75,  # 항상 높은 유머감각
-            "외향성": extraversion
-        }, full_object_info, attractive_flaws)
+        # 조정된 성격의 인사말은 반영 후 generate_realtime_preview 에서 표시
+        # (원샷 보강으로 만들어진 인사말이 있으면 추가 호출 없이 재사용)
         
         # 변화량 분석 생성
         change_analysis = show_variable_changes(original_persona, adjusted_persona)
         
-        # 변화된 매력적 결함과 모순적 특성 분석
-        flaws_changed = len(adjusted_persona.get("매력적결함", [])) != len(original_persona.get("매력적결함", []))
-        contradictions_changed = len(adjusted_persona.get("모순적특성", [])) != len(original_persona.get("모순적특성", []))
+        # 변화된 매력적 결함과 모순적 특성 분석 (새로 만든 섹션만 오버레이에 포함)
+        changed_sections, _ = persona_diff(original_persona, adjusted_persona)
+        flaws_changed = "매력적결함" in changed_sections
+        contradictions_changed = "모순적특성" in changed_sections
         
         additional_changes = ""
         if flaws_changed or contradictions_changed:
-            additional_changes = "\n\n🎭 **AI가 새로 생성한 내용:**\n"
+            if background_jobs_enabled():
+                additional_changes = "\n\n🎭 **성격에 맞춰 새로 만든 내용 (AI 버전은 백그라운드에서 생성 중):**\n"
+            else:
+                additional_changes = "\n\n🎭 **AI가 새로 생성한 내용:**\n"
             if flaws_changed:
                 new_flaws = adjusted_persona.get("매력적결함", [])
                 additional_changes += f"• 매력적 결함: {len(new_flaws)}개 새로 생성됨\n"
@@ -705,35 +591,8 @@ def adjust_persona_traits(persona, warmth, competence, extraversion, humor_style
         adjusted_summary_display = display_persona_summary(adjusted_persona)
         
         # 조정된 매력적 결함과 모순적 특성을 DataFrame으로 생성
-        flaws_df = []
-        if "매력적결함" in adjusted_persona:
-            flaws = adjusted_persona["매력적결함"]
-            for i, flaw in enumerate(flaws, 1):
-                # 🔥 사물 특성 vs 성격적 특성 더 세밀하게 구분
-                if any(keyword in flaw for keyword in ["지문", "긁힘", "녹", "색깔", "빠져", "변형", "달라붙", "끈적", "가벼워", "반짝", "투명", "깨질", "부풀어", "벌레", "나이테", "털", "얼룩", "세탁", "보풀", "먼지", "햇볕", "색이", "충격", "습도", "냄새", "모서리", "무게", "크기", "소리", "찬 기운", "딱딱한", "정전기", "삐걱", "끝장", "비밀이 없", "간지러", "늘어나", "줄어드", "말랑한"]):
-                    flaw_type = "🏠 재질/물리적 특성"
-                elif any(keyword in flaw for keyword in ["뜨겁다", "맛이", "손잡이", "바닥", "페이지", "시간", "배터리", "째깍", "위로", "재미없", "표정", "빛이", "전기", "분위기", "글씨", "잉크", "음료", "펼쳐지", "던져", "원망", "쓸모없", "귀찮", "고장", "불편", "방치"]):
-                    flaw_type = "🎯 기능적 특성"
-                elif any(keyword in flaw for keyword in ["운동", "공부", "예쁘게", "실용적", "장식", "인테리어", "채찍질", "동기부여", "잔소리", "지식 전달", "진지한가", "지루한", "취향", "분위기", "트렌드", "고마워"]):
-                    flaw_type = "🎭 역할/정체성"
-                else:
-                    flaw_type = "💭 성격적 특성"
-                flaws_df.append([f"{i}. {flaw}", flaw_type])
-        
-        contradictions_df = []
-        if "모순적특성" in adjusted_persona:
-            contradictions = adjusted_persona["모순적특성"]
-            for i, contradiction in enumerate(contradictions, 1):
-                # 🎭 모순도 사물 특성 기반으로 세밀하게 분류
-                if any(keyword in contradiction for keyword in ["차가운", "가벼워", "자연스러워", "부드러워", "딱딱해", "투명", "반짝", "말랑", "단단한", "유연한"]):
-                    contradiction_type = "🏠 재질 기반 모순"
-                elif any(keyword in contradiction for keyword in ["활발", "조용", "외향", "내향", "사교", "혼자", "수다", "말이 없"]):
-                    contradiction_type = "🎭 성격 기반 모순"
-                elif any(keyword in contradiction for keyword in ["운동", "공부", "장식", "실용", "기능", "예쁘", "역할"]):
-                    contradiction_type = "🎯 역할 기반 모순"
-                else:
-                    contradiction_type = "💫 복합적 매력"
-                contradictions_df.append([f"{i}. {contradiction}", contradiction_type])
+        flaws_df = _flaw_rows(adjusted_persona.get("매력적결함", []))
+        contradictions_df = _contradiction_rows(adjusted_persona.get("모순적특성", []))
         
         return adjusted_persona, adjustment_message, adjusted_info, variables_df, flaws_df, contradictions_df, adjusted_summary_display
         
@@ -742,13 +601,20 @@ def adjust_persona_traits(persona, warmth, competence, extraversion, humor_style
         traceback.print_exc()
         return persona, f"조정 중 오류 발생: {str(e)}", {}, [], [], [], ""
 
-def finalize_persona(persona):
+def finalize_persona(persona, adjust_job=None, request: gr.Request = None):
     """페르소나 최종 확정 - 환경변수 API 설정 사용"""
     global persona_generator
     
     if not persona:
         return None, "페르소나가 없습니다.", "", {}, None, [], [], [], "", None
     
+    # 진행 중인 조정 작업이 있으면 (제한 시간 안에서) 기다렸다가 AI 결함/모순을 반영해서 내보냄
+    fields = _adjusted_fields(persona, adjust_job, timeout=float(os.getenv("BACKGROUND_RESULT_TIMEOUT", "60")))
+    if fields:
+        persona = update_persona(persona, fields)
+    # 시간 안에 끝나지 않았으면 확정한 페르소나를 나중에 덮어쓰지 않도록 취소
+    get_job_runner().cancel_key((_session_key(request), "adjust"))
+    
     # 환경변수 API 키 확인
     if not persona_generator or not hasattr(persona_generator, 'api_key') or not persona_generator.api_key:
         return None, "❌ **API 키가 설정되지 않았습니다!** 허깅페이스 스페이스 설정에서 GEMINI_API_KEY를 환경변수로 추가해주세요.", "", {}, None, [], [], [], "", None
@@ -757,6 +623,9 @@ def finalize_persona(persona):
         # 글로벌 persona_generator 사용 (환경변수에서 설정된 API 키 사용)
         generator = persona_generator
         
+        # 압축 형식에서 가져온 백엔드 페르소나는 구조화프롬프트만 다시 생성 (API 호출 없음)
+        persona = persona_codec.ensure_structured_prompt(persona, generator)
+        
         # 이미 백엔드 페르소나인 경우와 프론트엔드 페르소나인 경우 구분
         if "구조화프롬프트" not in persona:
             # 프론트엔드 페르소나인 경우 백엔드 페르소나로 변환
@@ -775,19 +644,7 @@ def finalize_persona(persona):
         humor_chart = plot_humor_matrix(persona.get("유머매트릭스", {}))
         
         # 매력적 결함을 더 상세한 DataFrame으로 변환
-        flaws = persona.get("매력적결함", [])
-        flaws_df = []
-        for i, flaw in enumerate(flaws, 1):
-            # 🔥 사물 특성 vs 성격적 특성 더 세밀하게 구분
-            if any(keyword in flaw for keyword in ["지문", "긁힘", "녹", "색깔", "빠져", "변형", "달라붙", "끈적", "가벼워", "반짝", "투명", "깨질", "부풀어", "벌레", "나이테", "털", "얼룩", "세탁", "보풀", "먼지", "햇볕", "색이", "충격", "습도", "냄새", "모서리", "무게", "크기", "소리", "찬 기운", "딱딱한", "정전기", "삐걱", "끝장", "비밀이 없", "간지러", "늘어나", "줄어드", "말랑한"]):
-                flaw_type = "🏠 재질/물리적 특성"
-            elif any(keyword in flaw for keyword in ["뜨겁다", "맛이", "손잡이", "바닥", "페이지", "시간", "배터리", "째깍", "위로", "재미없", "표정", "빛이", "전기", "분위기", "글씨", "잉크", "음료", "펼쳐지", "던져", "원망", "쓸모없", "귀찮", "고장", "불편", "방치"]):
-                flaw_type = "🎯 기능적 특성"
-            elif any(keyword in flaw for keyword in ["운동", "공부", "예쁘게", "실용적", "장식", "인테리어", "채찍질", "동기부여", "잔소리", "지식 전달", "진지한가", "지루한", "취향", "분위기", "트렌드", "고마워"]):
-                flaw_type = "🎭 역할/정체성"
-            else:
-                flaw_type = "💭 성격적 특성"
-            flaws_df.append([f"{i}. {flaw}", flaw_type])
+        flaws_df = _flaw_rows(persona.get("매력적결함", []))
         
         # 모순적 특성을 더 상세한 DataFrame으로 변환
         contradictions = persona.get("모순적특성", [])
@@ -807,58 +664,15 @@ def finalize_persona(persona):
             # 성격프로필에서 직접 가져오기 (성격프로필 자체가 variables dict)
             variables = persona["성격프로필"]
         
-        variables_df = []
-        for var, value in variables.items():
-            # 카테고리 분류
-            if var.startswith('W'):
-                category = f"🔥 온기/따뜻함"
-            elif var.startswith('C'):
-                category = f"💪 능력/역량"
-            elif var.startswith('E'):
-                category = f"🗣️ 외향성"
-            elif var.startswith('H'):
-                category = f"😄 유머"
-            elif var.startswith('F'):
-                category = f"💎 매력적결함"
-            elif var.startswith('P'):
-                category = f"🎭 성격패턴"
-            elif var.startswith('S'):
-                category = f"🗨️ 언어스타일"
-            elif var.startswith('R'):
-                category = f"❤️ 관계성향"
-            elif var.startswith('D'):
-                category = f"💬 대화역학"
-            elif var.startswith('OBJ'):
-                category = f"🏠 사물정체성"
-            elif var.startswith('FORM'):
-                category = f"✨ 형태특성"
-            elif var.startswith('INT'):
-                category = f"🤝 상호작용"
-            elif var.startswith('U'):
-                category = f"🌍 문화적특성"
-            else:
-                category = f"📊 기타"
-            
-            # 값에 따른 색상 표시
-            if value >= 80:
-                status = "🟢 매우 높음"
-            elif value >= 60:
-                status = "🟡 높음"  
-            elif value >= 40:
-                status = "🟠 보통"
-            elif value >= 20:
-                status = "🔴 낮음"
-            else:
-                status = "⚫ 매우 낮음"
-                
-            variables_df.append([var, value, category, status])
+        variables_df = variable_rows(variables)
         
-        # JSON 파일 생성
+        # JSON 파일 생성 (기본: 압축 형식)
         import tempfile
-        import json
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
-            json.dump(persona, f, ensure_ascii=False, indent=2)
+        compression = persona_codec.export_compression()
+        with tempfile.NamedTemporaryFile(suffix=persona_codec.file_extension(compression), delete=False) as f:
+            f.write(persona_codec.dumps_persona(persona, compact=persona_codec.export_format() == "compact",
+                                               compression=compression))
             temp_path = f.name
         
         return (
@@ -880,111 +694,20 @@ def finalize_persona(persona):
         return None, f"❌ 페르소나 확정 중 오류 발생: {str(e)}\n\n💡 **해결방법**: 허깅페이스 스페이스 설정에서 GEMINI_API_KEY 환경변수를 확인하고 인터넷 연결을 확인해보세요.", "", {}, None, [], [], [], "", None
 
 def plot_humor_matrix(humor_data):
-    """유머 매트릭스 시각화 - 영어 레이블 사용"""
-    if not humor_data:
-        return None
-    
+    """유머 매트릭스 시각화 - 영어 레이블 사용 (같은 값이면 캐시된 차트 재사용)"""
     try:
-        fig, ax = plt.subplots(figsize=(8, 6))
-        
-        # 데이터 추출
-        warmth_vs_wit = humor_data.get("warmth_vs_wit", 50)
-        self_vs_observational = humor_data.get("self_vs_observational", 50)
-        subtle_vs_expressive = humor_data.get("subtle_vs_expressive", 50)
-        
-        # 영어 레이블 사용 (폰트 문제 완전 해결)
-        categories = ['Warmth vs Wit', 'Self vs Observational', 'Subtle vs Expressive']
-        values = [warmth_vs_wit, self_vs_observational, subtle_vs_expressive]
-        
-        bars = ax.bar(categories, values, color=['#ff9999', '#66b3ff', '#99ff99'], alpha=0.8)
-        ax.set_ylim(0, 100)
-        ax.set_ylabel('Score', fontsize=12)
-        ax.set_title('Humor Style Matrix', fontsize=14, fontweight='bold')
-        
-        # 값 표시
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 2,
-                   f'{value:.1f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-        
-        plt.xticks(rotation=15, ha='right')
-        plt.tight_layout()
-        plt.grid(axis='y', alpha=0.3)
-        
-        return fig
+        return chart_cache.humor_chart(humor_data)
     except Exception as e:
         print(f"유머 차트 생성 오류: {str(e)}")
         return None
 
 def generate_personality_chart(persona):
-    """성격 특성을 레이더 차트로 시각화 (영어 버전)"""
-    
-    if not persona or "성격특성" not in persona:
-        return None
-        
-    personality_traits = persona["성격특성"]
-    
-    # 영어 레이블 매핑
-    trait_labels_en = {
-        '온기': 'Warmth',
-        '능력': 'Competence', 
-        '창의성': 'Creativity',
-        '외향성': 'Extraversion',
-        '유머감각': 'Humor',
-        '신뢰성': 'Reliability',
-        '공감능력': 'Empathy'
-    }
-    
-    # 데이터 준비
-    categories = []
-    values = []
-    
-    for korean_trait, english_trait in trait_labels_en.items():
-        if korean_trait in personality_traits:
-            categories.append(english_trait)
-            values.append(personality_traits[korean_trait])
-    
-    if not categories:
+    """성격 특성을 레이더 차트로 시각화 (영어 버전, 같은 값이면 캐시된 차트 재사용)"""
+    try:
+        return chart_cache.personality_chart(persona)
+    except Exception as e:
+        print(f"성격 차트 생성 오류: {str(e)}")
         return None
-    
-    # 레이더 차트 생성
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatterpolar(
-        r=values,
-        theta=categories,
-        fill='toself',
-        fillcolor='rgba(74, 144, 226, 0.3)',
-        line=dict(color='rgba(74, 144, 226, 1)', width=2),
-        marker=dict(size=8, color='rgba(74, 144, 226, 1)'),
-        name='Personality Traits'
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100],
-                tickfont=dict(size=10),
-                gridcolor="lightgray"
-            ),
-            angularaxis=dict(
-                tickfont=dict(size=12, family="Arial, sans-serif")
-            )
-        ),
-        showlegend=False,
-        title=dict(
-            text="Personality Profile",
-            x=0.5,
-            font=dict(size=16, family="Arial, sans-serif")
-        ),
-        width=400,
-        height=400,
-        margin=dict(l=40, r=40, t=60, b=40),
-        font=dict(family="Arial, sans-serif")
-    )
-    
-    return fig
 
 def save_persona_to_file(persona):
     """페르소나 저장"""
@@ -992,17 +715,8 @@ def save_persona_to_file(persona):
         return "저장할 페르소나가 없습니다."
     
     try:
-        # 깊은 복사로 원본 보호
-        persona_copy = copy.deepcopy(persona)
-        
-        # JSON 직렬화 불가능한 객체들 제거
-        keys_to_remove = []
-        for key, value in persona_copy.items():
-            if callable(value) or hasattr(value, '__call__'):
-                keys_to_remove.append(key)
-        
-        for key in keys_to_remove:
-            persona_copy.pop(key, None)
+        # JSON 직렬화 불가능한 객체들 제거 (저장은 읽기만 하므로 얕은 복사로 충분)
+        persona_copy = without_callables(persona)
         
         # 저장 실행
         filepath = save_persona(persona_copy)
@@ -1023,10 +737,7 @@ def export_persona_to_json(persona):
         return None
     
     try:
-        # 깊은 복사로 원본 보호
-        persona_copy = copy.deepcopy(persona)
-        
-        # JSON 직렬화 불가능한 객체들 제거
+        # JSON 직렬화 불가능한 객체들 제거 (clean_for_json 이 새 구조를 만들므로 원본은 그대로)
         def clean_for_json(obj):
             if isinstance(obj, dict):
                 cleaned = {}
@@ -1039,22 +750,24 @@ def export_persona_to_json(persona):
             else:
                 return obj
         
-        persona_clean = clean_for_json(persona_copy)
+        persona_clean = clean_for_json(persona)
         
-        # JSON 문자열 생성
-        json_content = json.dumps(persona_clean, ensure_ascii=False, indent=2)
+        # 파일 내용 생성 (기본: 파생 필드를 뺀 압축 형식, PERSONA_EXPORT_FORMAT=full 이면 기존 형식)
+        compression = persona_codec.export_compression()
+        content = persona_codec.dumps_persona(persona_clean, compact=persona_codec.export_format() == "compact",
+                                              compression=compression)
         
         # 파일명 생성
         persona_name = persona_clean.get("기본정보", {}).get("이름", "persona")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{persona_name}_{timestamp}.json"
+        filename = f"{persona_name}_{timestamp}{persona_codec.file_extension(compression)}"
         
         # 임시 파일 저장
         temp_dir = "/tmp" if os.path.exists("/tmp") else "."
         filepath = os.path.join(temp_dir, filename)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(json_content)
+        with open(filepath, 'wb') as f:
+            f.write(content)
         
         return filepath
         
@@ -1131,18 +844,9 @@ def chat_with_loaded_persona(persona, user_message, chat_history=None):
                     print(f"⚠️ 채팅 기록 변환 오류: {str(turn_error)}")
                     continue
         
-        # 세션 ID 안전하게 생성
+        # 세션 ID 안전하게 생성 (프로세스가 달라도 같은 페르소나면 같은 ID)
         try:
-            persona_name = ""
-            if isinstance(persona, dict) and "기본정보" in persona:
-                basic_info = persona["기본정보"]
-                if isinstance(basic_info, dict) and "이름" in basic_info:
-                    persona_name = str(basic_info["이름"])
-            
-            if not persona_name:
-                persona_name = "알 수 없는 페르소나"
-                
-            session_id = f"{persona_name}_{hash(str(persona)[:100]) % 10000}"
+            session_id = chat_session_id(persona)
         except Exception:
             session_id = "default_session"
         
@@ -1196,8 +900,10 @@ def chat_with_loaded_persona(persona, user_message, chat_history=None):
             
         return chat_history, ""
 
-def import_persona_from_json(json_file):
+def import_persona_from_json(json_file, request: gr.Request = None):
     """JSON 파일에서 페르소나 가져오기"""
+    # 이전 페르소나의 조정 작업 결과가 불러온 페르소나를 덮어쓰지 않도록 취소
+    get_job_runner().cancel_key((_session_key(request), "adjust"))
     if json_file is None:
         return None, "JSON 파일을 업로드해주세요.", "", {}
     
@@ -1210,9 +916,8 @@ def import_persona_from_json(json_file):
             # 파일 객체인 경우 (Gradio 업로드)
             file_path = json_file.name if hasattr(json_file, 'name') else str(json_file)
         
-        # JSON 파일 읽기
-        with open(file_path, 'r', encoding='utf-8') as f:
-            persona_data = json.load(f)
+        # JSON 파일 읽기 (압축 형식/gzip/zstd 자동 판별)
+        persona_data = persona_codec.read_persona_file(file_path)
         
         # 페르소나 데이터 검증
         if not isinstance(persona_data, dict):
@@ -1229,9 +934,12 @@ def import_persona_from_json(json_file):
         # AI 기반 인사말 생성 (로드 시에도 조정된 성격 반영)
         global persona_generator
         try:
-            if persona_generator:
-                ai_greeting = persona_generator.generate_ai_based_greeting(persona_data, personality_traits)
-                greeting = f"### 🤖 JSON에서 깨어난 친구\n\n{ai_greeting}\n\n💾 *\"JSON에서 다시 깨어났어! 내 성격 기억나?\"*"
+            if persona_generator and background_jobs_enabled():
+                # ⚡ 성격 기반 로컬 인사말을 먼저 보여주고 AI 인사말은 백그라운드로 (start_json_greeting)
+                local_greeting = trait_greeting(persona_name, personality_traits)
+                greeting = f"### 🤖 JSON에서 깨어난 친구\n\n{local_greeting}\n\n💾 *\"JSON에서 다시 깨어났어! 내 성격 기억나?\"*"
+            elif persona_generator:
+                greeting = _json_awakening_greeting(persona_data)
             else:
                 # 폴백: 기존 방식
                 personality_preview = generate_personality_preview(persona_name, personality_traits, basic_info)
@@ -1611,9 +1319,6 @@ def get_keyword_suggestions(current_message=""):
 
 # 메인 인터페이스 생성
 def create_main_interface():
-    # 한글 폰트 설정
-    setup_korean_font()
-    
     # CSS 스타일 추가 - 텍스트 가시성 향상
     css = """
     .persona-greeting {
@@ -1642,11 +1347,24 @@ def create_main_interface():
     }
     """
     
+    # 차트 렌더링 위치 (client 모드는 브라우저에서 그리므로 HTML 출력 + head 스크립트)
+    client_charts = chart_cache.chart_render_mode() == "client"
+    
     # Gradio 앱 생성
-    with gr.Blocks(title="놈팽쓰(MemoryTag) - 사물 페르소나 생성기", css=css, theme="soft") as app:
+    with gr.Blocks(title="놈팽쓰(MemoryTag) - 사물 페르소나 생성기", css=css, theme="soft",
+                   head=chart_head() if client_charts else None) as app:
         # State 변수들 - Gradio 5.31.0에서는 반드시 Blocks 내부에서 정의
         current_persona = gr.State(value=None)
         personas_list = gr.State(value=[])
+        # 백그라운드 작업 ID (인사말 / 성격 조정 후 결함·모순 재생성)
+        greeting_job = gr.State(value=None)
+        chat_greeting_job = gr.State(value=None)
+        adjust_job = gr.State(value=None)
+        # 작업이 끝났는지 주기적으로 확인하는 타이머 (작업이 있을 때만 켜짐)
+        poll_seconds = float(os.getenv("BACKGROUND_POLL_SECONDS", "1"))
+        greeting_timer = gr.Timer(value=poll_seconds, active=False)
+        chat_greeting_timer = gr.Timer(value=poll_seconds, active=False)
+        adjust_timer = gr.Timer(value=poll_seconds, active=False)
         
         gr.Markdown("""
         # 🎭 놈팽쓰(MemoryTag): 당신 곁의 사물, 이제 친구가 되다
@@ -1732,7 +1450,7 @@ def create_main_interface():
                                         info="어떤 방식으로 재미있게 만들까요?"
                                     )
                             
-                            # 미리보기 표시 (실시간 업데이트 없음)
+                            # 미리보기 표시 (슬라이더 조작 시 디바운스 후 자동 업데이트)
                             personality_preview = gr.Markdown("", elem_classes=["persona-greeting"], label="성격 조정 미리보기")
                             
                             with gr.Row():
@@ -1762,8 +1480,12 @@ def create_main_interface():
                 with gr.Row():
                     with gr.Column():
                         chart_btn = gr.Button("📊 성격 차트 생성", variant="secondary")
-                        personality_chart_output = gr.Plot(label="성격 차트")
-                        humor_chart_output = gr.Plot(label="유머 매트릭스")
+                        if client_charts:
+                            personality_chart_output = gr.HTML(label="성격 차트")
+                            humor_chart_output = gr.HTML(label="유머 매트릭스")
+                        else:
+                            personality_chart_output = gr.Plot(label="성격 차트")
+                            humor_chart_output = gr.Plot(label="유머 매트릭스")
                     
                     with gr.Column():
                         attractive_flaws_output = gr.Dataframe(
@@ -1793,7 +1515,7 @@ def create_main_interface():
                         
                         json_upload = gr.File(
                             label="페르소나 JSON 파일 업로드",
-                            file_types=[".json"],
+                            file_types=[".json", ".gz", ".zst"],
                             type="filepath"
                         )
                         import_btn = gr.Button("JSON에서 페르소나 불러오기", variant="primary", size="lg")
@@ -1856,7 +1578,12 @@ def create_main_interface():
                 
                 analytics_result = gr.Markdown("### 분석 결과가 여기에 표시됩니다")
         
-        # 이벤트 핸들러
+        # 이벤트 핸들러 (동시 실행 그룹은 배포 프로필 기준, 가벼운 이벤트는 제한 없음)
+        generation = deployment.event_options("generation", deployment_profile)
+        chat = deployment.event_options("chat", deployment_profile)
+        preview = deployment.event_options("preview", deployment_profile)
+        cheap = deployment.event_options(deployment.CHEAP, deployment_profile)
+        
         create_btn.click(
             fn=create_persona_from_image,
             inputs=[image_input, name_input, location_input, time_spent_input, gr.Textbox(value="auto"), purpose_input],
@@ -1865,7 +1592,8 @@ def create_main_interface():
                 humor_chart_output, attractive_flaws_output, contradictions_output, 
                 personality_variables_output, persona_awakening, persona_download_file, adjustment_section,
                 ai_analyzed_object_display  # 🆕 AI 분석 결과를 표시용 텍스트박스에 반영
-            ]
+            ],
+            **generation
         ).then(
             # 슬라이더 값을 현재 페르소나 값으로 업데이트
             fn=lambda persona: (
@@ -1875,66 +1603,120 @@ def create_main_interface():
                 persona["유머스타일"] if persona else "따뜻한 유머러스"
             ),
             inputs=[current_persona],
-            outputs=[warmth_slider, competence_slider, extraversion_slider, humor_style_radio]
+            outputs=[warmth_slider, competence_slider, extraversion_slider, humor_style_radio],
+            **cheap
         ).then(
             # 초기 미리보기 생성
-            fn=generate_realtime_preview,
+            fn=schedule_preview_now,
             inputs=[current_persona, warmth_slider, competence_slider, extraversion_slider, humor_style_radio],
-            outputs=[personality_preview]
+            outputs=[personality_preview],
+            **preview
+        ).then(
+            # ⚡ AI 인사말은 백그라운드 작업으로 만들고, 타이머로 확인하다가 끝나면 교체 (기다리며 작업자를 점유하지 않음)
+            fn=start_awakening_greeting, inputs=[current_persona], outputs=[greeting_job, greeting_timer],
+            concurrency_limit=None, show_progress="hidden"
+        )
+        greeting_timer.tick(
+            fn=poll_background_greeting, inputs=[greeting_job], outputs=[persona_awakening, greeting_timer],
+            concurrency_limit=None, show_progress="hidden"
         )
         
         # 🎯 미리보기 버튼 - 사용자가 수동으로 미리보기 요청
         preview_btn.click(
-            fn=generate_realtime_preview,
+            fn=schedule_preview_now,
             inputs=[current_persona, warmth_slider, competence_slider, extraversion_slider, humor_style_radio],
-            outputs=[personality_preview]
+            outputs=[personality_preview],
+            **preview
         )
         
+        # 🎚️ 슬라이더/유머 스타일 조작 시 자동 미리보기
+        # ⚡ 로컬 규칙 기반 미리보기를 즉시 보여주고, AI 미리보기는 디바운스 후 최신 값만 렌더링
+        preview_inputs = [current_persona, warmth_slider, competence_slider, extraversion_slider, humor_style_radio]
+        for control in (warmth_slider, competence_slider, extraversion_slider, humor_style_radio):
+            if preview_mode() == "ai":
+                control.input(
+                    fn=schedule_realtime_preview, inputs=preview_inputs, outputs=[personality_preview],
+                    trigger_mode="always_last", concurrency_limit=None, show_progress="hidden"
+                )
+                continue
+            event = control.input(
+                fn=local_preview, inputs=preview_inputs, outputs=[personality_preview],
+                trigger_mode="always_last", concurrency_limit=None, show_progress="hidden"
+            )
+            if preview_mode() == "tiered":
+                event.then(
+                    fn=schedule_realtime_preview, inputs=preview_inputs, outputs=[personality_preview],
+                    concurrency_limit=None, show_progress="hidden"
+                )
+        
         # 성격 조정 반영 - 실제 페르소나에 적용
-        adjust_btn.click(
+        adjust_event = adjust_btn.click(
             fn=adjust_persona_traits,
             inputs=[current_persona, warmth_slider, competence_slider, extraversion_slider, humor_style_radio],
-            outputs=[current_persona, adjustment_result, adjusted_info_output, personality_variables_output, attractive_flaws_output, contradictions_output, persona_summary_display]
-        ).then(
+            outputs=[current_persona, adjustment_result, adjusted_info_output, personality_variables_output, attractive_flaws_output, contradictions_output, persona_summary_display],
+            **generation
+        )
+        adjust_event.then(
             # 반영 후 미리보기도 업데이트
-            fn=generate_realtime_preview,
+            fn=schedule_preview_now,
             inputs=[current_persona, warmth_slider, competence_slider, extraversion_slider, humor_style_radio],
-            outputs=[personality_preview]
+            outputs=[personality_preview],
+            **preview
+        )
+        adjust_event.then(
+            # ⚡ 성격에 맞는 AI 결함/모순은 백그라운드에서 만들고, 타이머로 확인하다가 끝나면 반영
+            fn=start_adjust_job, inputs=[current_persona], outputs=[adjust_job],
+            concurrency_limit=None, show_progress="hidden"
+        ).then(
+            fn=start_adjust_polling, inputs=[adjust_job], outputs=[adjust_timer],
+            concurrency_limit=None, show_progress="hidden"
+        )
+        adjust_timer.tick(
+            # 확인할 때의 현재 페르소나 기준으로 반영 여부 판단
+            fn=poll_adjusted_content, inputs=[current_persona, adjust_job],
+            outputs=[current_persona, attractive_flaws_output, contradictions_output, persona_summary_display,
+                     adjust_timer],
+            concurrency_limit=None, show_progress="hidden"
         )
         
         # 페르소나 최종 확정
         finalize_btn.click(
             fn=finalize_persona,
-            inputs=[current_persona],
+            inputs=[current_persona, adjust_job],
             outputs=[
                 current_persona, status_output, persona_summary_display, personality_traits_output,
                 humor_chart_output, attractive_flaws_output, contradictions_output, 
                 personality_variables_output, persona_awakening, persona_download_file
-            ]
+            ],
+            **generation
         )
         
         save_btn.click(
             fn=save_persona_to_file,
             inputs=[current_persona],
-            outputs=[status_output]
+            outputs=[status_output],
+            **cheap
         )
         
         # 성격 차트 생성
         chart_btn.click(
             fn=generate_personality_chart,
             inputs=[current_persona],
-            outputs=[personality_chart_output]
+            outputs=[personality_chart_output],
+            **cheap
         )
         
         # 페르소나 내보내기 버튼
         persona_export_btn.click(
             fn=export_persona_to_json,
             inputs=[current_persona],
-            outputs=[persona_download_file]
+            outputs=[persona_download_file],
+            **cheap
         ).then(
             fn=lambda x: gr.update(visible=True) if x else gr.update(visible=False),
             inputs=[persona_download_file],
-            outputs=[persona_download_file]
+            outputs=[persona_download_file],
+            **cheap
         )
         
         import_btn.click(
@@ -1942,26 +1724,38 @@ def create_main_interface():
             inputs=[json_upload],
             outputs=[
                 current_persona, load_status, chat_persona_greeting, current_persona_info
-            ]
+            ],
+            # AI 인사말이 백그라운드로 빠지면 불러오기는 가벼운 이벤트
+            **(cheap if background_jobs_enabled() else generation)
+        ).then(
+            fn=start_json_greeting, inputs=[current_persona], outputs=[chat_greeting_job, chat_greeting_timer],
+            concurrency_limit=None, show_progress="hidden"
+        )
+        chat_greeting_timer.tick(
+            fn=poll_background_greeting, inputs=[chat_greeting_job], outputs=[chat_persona_greeting, chat_greeting_timer],
+            concurrency_limit=None, show_progress="hidden"
         )
         
         # 대화 관련 이벤트 핸들러
         send_btn.click(
             fn=chat_with_loaded_persona,
             inputs=[current_persona, message_input, chatbot],
-            outputs=[chatbot, message_input]
+            outputs=[chatbot, message_input],
+            **chat
         )
         
         message_input.submit(
             fn=chat_with_loaded_persona,
             inputs=[current_persona, message_input, chatbot],
-            outputs=[chatbot, message_input]
+            outputs=[chatbot, message_input],
+            **chat
         )
         
         # 대화 초기화 (messages format)
         clear_btn.click(
             fn=lambda: [],
-            outputs=[chatbot]
+            outputs=[chatbot],
+            **cheap
         )
         
         # 예시 메시지 버튼들 - messages format 호환
@@ -1975,53 +1769,65 @@ def create_main_interface():
         example_btn1.click(
             fn=lambda persona: handle_example_message(persona, "안녕!"),
             inputs=[current_persona],
-            outputs=[chatbot, message_input]
+            outputs=[chatbot, message_input],
+            **chat
         )
         
         example_btn2.click(
             fn=lambda persona: handle_example_message(persona, "너는 누구야?"),
             inputs=[current_persona],
-            outputs=[chatbot, message_input]
+            outputs=[chatbot, message_input],
+            **chat
         )
         
         example_btn3.click(
             fn=lambda persona: handle_example_message(persona, "뭘 좋아해?"),
             inputs=[current_persona],
-            outputs=[chatbot, message_input]
+            outputs=[chatbot, message_input],
+            **chat
         )
         
         # 앱 로드 시 페르소나 목록 로드 (백엔드에서 사용)
         app.load(
             fn=lambda: [],
-            outputs=[personas_list]
+            outputs=[personas_list],
+            **cheap
         )
         
+        # 세션 종료 시 세션별 기록 정리
+        app.unload(forget_session)
+        
         # 대화하기 탭의 대화 기록 다운로드 이벤트
         chat_export_btn.click(
             export_conversation_history,
-            outputs=[chat_download_file]
+            outputs=[chat_download_file],
+            **cheap
         ).then(
             lambda x: gr.update(visible=True) if x else gr.update(visible=False),
             inputs=[chat_download_file],
-            outputs=[chat_download_file]
+            outputs=[chat_download_file],
+            **cheap
         )
         
         # 대화 분석 탭의 업로드 이벤트
         import_file.upload(
             import_conversation_history,
             inputs=[import_file],
-            outputs=[import_result]
+            outputs=[import_result],
+            **cheap
         )
         
         keyword_btn.click(
             get_keyword_suggestions,
             inputs=[keyword_input],
-            outputs=[keyword_result]
+            outputs=[keyword_result],
+            **cheap
         )
         
         analytics_btn.click(
             show_conversation_analytics,
-            outputs=[analytics_result]
+            outputs=[analytics_result],
+            **cheap
         )
     
     return app
@@ -2042,17 +1848,26 @@ def generate_realtime_preview(persona, warmth, competence, extraversion, humor_s
             "유머감각": 75  # 기본적으로 높은 유머감각 유지
         }
         
-        # 전체 페르소나 복사하여 성격만 조정
-        import copy
-        adjusted_persona = copy.deepcopy(persona)
-        adjusted_persona["성격특성"] = adjusted_traits
+        # 성격 섹션만 바꾼 페르소나 (나머지 섹션은 원본과 공유)
+        changes = {"성격특성": adjusted_traits}
         
         # 유머 스타일도 조정
         if humor_style:
-            adjusted_persona["유머스타일"] = humor_style
-        
-        # AI 기반 인사말 생성
-        ai_greeting = persona_generator.generate_ai_based_greeting(adjusted_persona, adjusted_traits)
+            changes["유머스타일"] = humor_style
+        adjusted_persona = update_persona(persona, changes)
+        
+        # 현재 설정으로 이미 만들어진 인사말(원샷 보강)이 있으면 재사용, 없으면 AI 생성
+        current_traits = persona.get("성격특성", {})
+        greeting_is_current = (
+            persona.get("인사말")
+            and all(current_traits.get(k) == v for k, v in adjusted_traits.items())
+            and (not humor_style or persona.get("유머스타일") == humor_style)
+        )
+        if greeting_is_current:
+            persona_name = persona.get("기본정보", {}).get("이름", "친구")
+            ai_greeting = persona_generator.format_greeting(persona_name, persona["인사말"])
+        else:
+            ai_greeting = persona_generator.generate_ai_based_greeting(adjusted_persona, adjusted_traits)
         
         # 조정된 값들과 함께 표시
         adjustment_info = f"""**🎯 현재 성격 설정:**
@@ -2093,6 +1908,118 @@ def generate_realtime_preview(persona, warmth, competence, extraversion, humor_s
 **👋 예상 인사말:**
 {preview}"""
 
+def _scheduled_preview(request, debounce, *values):
+    """세션별 미리보기 스케줄링 - 밀려난 요청은 화면을 갱신하지 않음"""
+    session = getattr(request, "session_hash", None) or "default"
+    result = preview_scheduler.submit(session, generate_realtime_preview, *values, debounce=debounce)
+    if result is SUPERSEDED:
+        # 더 새로운 값의 미리보기가 진행 중이므로 화면은 그대로 둠
+        return gr.update()
+    return result
+
+def schedule_realtime_preview(persona, warmth, competence, extraversion, humor_style, request: gr.Request = None):
+    """슬라이더 조작용 미리보기 - 디바운스 후 최신 값의 결과만 표시"""
+    return _scheduled_preview(request, None, persona, warmth, competence, extraversion, humor_style)
+
+def schedule_preview_now(persona, warmth, competence, extraversion, humor_style, request: gr.Request = None):
+    """버튼/반영 직후 미리보기 - 기다리지 않고 실행하되 진행 중인 이전 미리보기는 무효화"""
+    if preview_mode() == "local":
+        return local_preview(persona, warmth, competence, extraversion, humor_style)
+    return _scheduled_preview(request, 0, persona, warmth, competence, extraversion, humor_style)
+
+def _session_key(request):
+    return getattr(request, "session_hash", None) or "default"
+
+def forget_session(request: gr.Request = None):
+    """브라우저 탭을 닫으면 세션별 미리보기 기록 정리"""
+    preview_scheduler.forget(_session_key(request))
+
+def _submit_background(kind, request, fn, *args):
+    """세션별 최신 작업만 남기는 백그라운드 실행 → 작업 ID (비활성이거나 대기열이 가득 차면 None)"""
+    if not background_jobs_enabled():
+        return None
+    return get_job_runner().submit(kind, fn, *args, key=(_session_key(request), kind))
+
+def _poll_timer(active):
+    """백그라운드 작업 결과를 확인하는 타이머 켜기/끄기 (기다리는 동안 Gradio 대기열 자리를 차지하지 않음)"""
+    return gr.Timer(active=bool(active))
+
+def _job_pending(job_id):
+    """작업이 아직 대기/실행 중인지 (없거나 정리된 작업이면 False)"""
+    status = get_job_runner().status(job_id) if job_id else None
+    return bool(status) and status["state"] in (QUEUED, RUNNING)
+
+def _awakening_greeting(persona):
+    """페르소나 생성 직후 인사말 (사물 특성 + 매력적 결함 반영)"""
+    object_info = dict(persona.get("기본정보", {}))
+    attractive_flaws = persona.get("매력적결함", [])
+    object_info["매력적결함"] = attractive_flaws
+    return generate_personality_preview(object_info.get("이름", "친구"), persona.get("성격특성", {}),
+                                        object_info, attractive_flaws)
+
+def _json_awakening_greeting(persona):
+    """JSON 에서 불러온 페르소나의 인사말"""
+    greeting = persona_generator.generate_ai_based_greeting(persona, persona.get("성격특성", {}))
+    return f"### 🤖 JSON에서 깨어난 친구\n\n{greeting}\n\n💾 *\"JSON에서 다시 깨어났어! 내 성격 기억나?\"*"
+
+def start_awakening_greeting(persona, request: gr.Request = None):
+    """생성 직후 AI 인사말을 백그라운드로 시작 (화면에는 로컬 인사말이 먼저 표시됨) → 작업 ID, 확인 타이머"""
+    if not persona or persona.get("인사말"):
+        return None, _poll_timer(False)
+    job_id = _submit_background("greeting", request, _awakening_greeting, persona)
+    return job_id, _poll_timer(job_id)
+
+def start_json_greeting(persona, request: gr.Request = None):
+    """JSON 불러오기 후 AI 인사말을 백그라운드로 시작 → 작업 ID, 확인 타이머"""
+    if not persona:
+        return None, _poll_timer(False)
+    job_id = _submit_background("greeting", request, _json_awakening_greeting, persona)
+    return job_id, _poll_timer(job_id)
+
+def poll_background_greeting(job_id):
+    """타이머마다 인사말 작업 확인 → 끝나면 표시하고 타이머 끄기 (실패하면 로컬 인사말 유지)"""
+    if _job_pending(job_id):
+        return gr.update(), gr.update()
+    greeting = get_job_runner().result(job_id) if job_id else None
+    return (greeting if greeting else gr.update()), _poll_timer(False)
+
+def _adjust_basis(persona):
+    """조정 작업이 어떤 페르소나/성격으로 시작됐는지 (결과를 반영해도 되는지 비교용)"""
+    return {"기본정보": persona.get("기본정보", {}), "성격특성": persona.get("성격특성", {})}
+
+def start_adjust_job(persona, request: gr.Request = None):
+    """성격 조정 후 AI 결함/모순 재생성을 백그라운드로 시작 (이전 조정 작업은 취소) → {작업 ID, 기준 페르소나}"""
+    if not persona or not background_jobs_enabled():
+        return None
+    job_id = _submit_background("adjust", request, regenerate_adjusted_content, persona)
+    return {"id": job_id, "basis": _adjust_basis(persona)} if job_id else None
+
+def start_adjust_polling(adjust_job):
+    """조정 작업이 있으면 결과 확인 타이머 켜기"""
+    return _poll_timer(adjust_job)
+
+def _adjusted_fields(persona, adjust_job, timeout=0):
+    """조정 작업 결과 (현재 페르소나가 작업을 시작한 페르소나와 다르거나 실패/취소면 None)"""
+    if not persona or not adjust_job or _adjust_basis(persona) != adjust_job.get("basis"):
+        return None
+    return get_job_runner().result(adjust_job["id"], timeout=timeout)
+
+def poll_adjusted_content(persona, adjust_job):
+    """타이머마다 조정 작업 확인 → 끝나면 현재 페르소나에 반영하고 타이머 끄기
+    (그 사이 새로 만들거나 불러오거나 다시 조정했으면 화면 유지)"""
+    unchanged = (gr.update(), gr.update(), gr.update(), gr.update())
+    if not persona or not adjust_job or _adjust_basis(persona) != adjust_job.get("basis"):
+        return (*unchanged, _poll_timer(False))
+    if _job_pending(adjust_job["id"]):
+        return (*unchanged, gr.update())
+    fields = _adjusted_fields(persona, adjust_job)
+    if not fields:
+        return (*unchanged, _poll_timer(False))
+    updated = update_persona(persona, fields)
+    return (updated, _flaw_rows(updated.get("매력적결함", [])),
+            _contradiction_rows(updated.get("모순적특성", [])), display_persona_summary(updated),
+            _poll_timer(False))
+
 def show_variable_changes(original_persona, adjusted_persona):
     """변수 변화량을 시각화하여 표시"""
     if not original_persona or not adjusted_persona:
@@ -2232,7 +2159,7 @@ def generate_personality_consistent_flaws_and_contradictions(object_info, person
 [물리적 vs 심리적 대비]
 """
             
-            ai_response = persona_generator._generate_text_with_api(ai_prompt)
+            ai_response = persona_generator._generate_text_with_api(ai_prompt, priority=PRIORITY_BACKGROUND)
             
             if ai_response and len(ai_response.strip()) > 50:
                 # AI 응답 파싱
@@ -2348,4 +2275,18 @@ def _calculate_dynamic_humor_targets(humor_style, current_humor_profile):
 
 if __name__ == "__main__":
     app = create_main_interface()
-    app.launch(server_name="0.0.0.0", server_port=7860) 
\ No newline at end of file
+    mark("인터페이스 구성")
+    report_import_profile()
+    print(deployment.describe(deployment_profile))
+    app.queue(**deployment.queue_options(deployment_profile))
+    if os.getenv("HEADLESS_API", "0") == "1":
+        # 같은 프로세스에서 JSON API(/api/...)와 Gradio 화면(/)을 함께 제공
+        import uvicorn
+        from modules.api_server import create_api
+        api = create_api(persona_generator, adjust=adjust_persona, regenerate=regenerate_adjusted_content,
+                         local_content=local_adjusted_content)
+        # launch() 를 거치지 않으므로 배포 프로필의 max_threads 를 직접 적용
+        deployment.apply_thread_limit(app, deployment_profile, api=api)
+        uvicorn.run(gr.mount_gradio_app(api, app, path="/"), host="0.0.0.0", port=7860)
+    else:
+        app.launch(server_name="0.0.0.0", server_port=7860, **deployment.launch_options(deployment_profile)) 
\ No newline at end of file
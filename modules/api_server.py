@@ -0,0 +1,403 @@
+"""
+헤드리스 HTTP/JSON API (Gradio 화면 없이 백엔드 서비스에서 바로 호출)
+
+Gradio 콜백은 화면 구성요소 10~12개(차트, DataFrame 등)를 만들어 돌려주지만,
+이 API 는 페르소나 JSON 과 대화 응답만 주고받는다.
+
+    GET    /api/health
+    GET    /api/personas                     저장된 페르소나 목록
+    POST   /api/personas                     이미지(base64)로 페르소나 생성
+    GET    /api/personas/{filename}          조회
+    PUT    /api/personas/{filename}          저장/덮어쓰기
+    DELETE /api/personas/{filename}          삭제
+    POST   /api/personas/{filename}/adjust   성격 조정 (결함/모순 재생성은 sync/background/none,
+                                             background 면 작업이 끝난 뒤 저장 파일에 결과를 합침)
+    POST   /api/chat                         대화 (응답 한 번에)
+    POST   /api/chat/stream                  대화 (SSE: status → delta… → done)
+    GET    /api/jobs/{job_id}                백그라운드 작업 상태/결과
+    DELETE /api/jobs/{job_id}                백그라운드 작업 취소
+
+API_TOKEN 을 설정하면 Authorization: Bearer <토큰> 헤더가 필요하다.
+STATE_BACKEND=sqlite/redis 면 저장한 페르소나를 공유 저장소에도 기록해 여러 레플리카가 같은 내용을 본다.
+
+실행:
+    HEADLESS_API=1 python app.py          # Gradio 화면과 같은 프로세스 (/api/..., 화면은 /)
+    python -m modules.api_server --port 8000   # API 만 따로
+"""
+import os
+import re
+import io
+import json
+import base64
+import time
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from modules.background_jobs import get_job_runner, background_jobs_enabled
+from modules.data_manager import PERSONAS_DIR, save_persona, load_persona, list_personas, delete_persona
+from modules.persona_state import update_persona, without_callables
+from modules.state_backend import get_state_backend
+
+# Gradio 가 설치되어 있으면 함께 설치됨
+try:
+    from fastapi import FastAPI, HTTPException, Depends, Header
+    from fastapi.responses import StreamingResponse
+    from pydantic import BaseModel, Field
+    FASTAPI_AVAILABLE = True
+except ImportError:
+    FASTAPI_AVAILABLE = False
+    BaseModel = object
+
+    def Field(default=None, **kwargs):
+        return default
+
+# SSE 로 보낼 때 응답을 나누는 단위 (문장 끝 + 공백)
+_SENTENCE_END = re.compile(r"(?<=[.!?~。…])\s+|(?<=\n)")
+SSE_KEEPALIVE_SECONDS = 10
+
+
+class CreatePersonaRequest(BaseModel):
+    image: str = Field(..., description="base64 이미지 (data URL 가능)")
+    name: str = ""
+    location: str = ""
+    time_spent: str = ""
+    object_type: str = "auto"
+    purpose: str = ""
+    save: bool = True
+
+
+class AdjustRequest(BaseModel):
+    warmth: int = Field(50, ge=0, le=100)
+    competence: int = Field(50, ge=0, le=100)
+    extraversion: int = Field(50, ge=0, le=100)
+    humor_style: str = "따뜻한 유머러스"
+    regenerate: str = Field("background", description="결함/모순 재생성: sync / background / none")
+    save: bool = True
+
+
+class ChatRequest(BaseModel):
+    message: str
+    persona_id: Optional[str] = Field(None, description="data/personas 의 파일명")
+    persona: Optional[Dict[str, Any]] = None
+    history: List[Dict[str, str]] = []
+    session_id: str = "default"
+
+
+def decode_image(data):
+    """base64 / data URL → RGB 로 변환한 PIL 이미지"""
+    from PIL import Image
+    if "," in data[:100] and data.startswith("data:"):
+        data = data.split(",", 1)[1]
+    image = Image.open(io.BytesIO(base64.b64decode(data)))
+    if image.format in ['AVIF', 'WEBP'] or image.mode not in ['RGB', 'RGBA']:
+        image = image.convert('RGB')
+    return image
+
+
+def split_for_stream(text):
+    """SSE 로 보낼 조각 (문장 단위, 공백 보존)"""
+    pieces, start = [], 0
+    for match in _SENTENCE_END.finditer(text):
+        pieces.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return [piece for piece in pieces if piece]
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class PersonaCache:
+    """
+    저장 페르소나 읽기 캐시 (파일 수정 시각이 바뀌면 다시 읽음)
+    공유 상태 저장소(sqlite/redis)가 있으면 저장/삭제를 함께 기록해서 다른 레플리카도 최신 페르소나를 본다.
+    공유 항목에는 저장 당시 파일 수정 시각을 같이 두고, 로컬 파일이 없거나 그보다 오래됐을 때만 공유 항목을 쓴다
+    (설문 보정·배치 병합처럼 이 캐시를 거치지 않고 파일을 바꾼 경우는 파일이 우선).
+    """
+
+    def __init__(self, max_items=128, backend=None):
+        self.max_items = max_items
+        self.backend = backend if backend is not None and backend.shared else None
+        self.ttl = int(os.getenv("PERSONA_CACHE_TTL", "3600"))
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared_get(self, filename):
+        try:
+            entry = self.backend.get("personas", os.path.basename(filename))
+        except Exception as e:
+            print(f"⚠️ 공유 페르소나 캐시 조회 실패: {str(e)}")
+            return None
+        return entry if isinstance(entry, dict) and "persona" in entry else None
+
+    def get(self, filename):
+        filepath = os.path.join(PERSONAS_DIR, os.path.basename(filename))
+        try:
+            mtime = os.path.getmtime(filepath)
+        except OSError:
+            mtime = None
+        if self.backend is not None:
+            entry = self._shared_get(filename)
+            if entry is not None and (mtime is None or mtime < entry.get("mtime", 0)):
+                return entry["persona"]
+        if mtime is None:
+            return None
+        with self._lock:
+            cached = self._items.get(filepath)
+            if cached and cached[0] == mtime:
+                self._items.move_to_end(filepath)
+                return cached[1]
+        persona = load_persona(filepath)
+        if persona is not None:
+            with self._lock:
+                self._items[filepath] = (mtime, persona)
+                while len(self._items) > self.max_items:
+                    self._items.popitem(last=False)
+        return persona
+
+    def store(self, filename, persona):
+        """저장 직후 호출 - 로컬 항목은 비우고 공유 저장소에는 새 내용을 파일 수정 시각과 함께 기록"""
+        self.forget(filename, shared=False)
+        if self.backend is not None:
+            try:
+                mtime = os.path.getmtime(os.path.join(PERSONAS_DIR, os.path.basename(filename)))
+            except OSError:
+                mtime = time.time()
+            try:
+                self.backend.set("personas", os.path.basename(filename), {"mtime": mtime, "persona": persona},
+                                 ttl=self.ttl)
+            except Exception as e:
+                print(f"⚠️ 공유 페르소나 캐시 저장 실패: {str(e)}")
+
+    def forget(self, filename, shared=True):
+        with self._lock:
+            self._items.pop(os.path.join(PERSONAS_DIR, os.path.basename(filename)), None)
+        if shared and self.backend is not None:
+            try:
+                self.backend.delete("personas", os.path.basename(filename))
+            except Exception as e:
+                print(f"⚠️ 공유 페르소나 캐시 삭제 실패: {str(e)}")
+
+
+def create_api(generator, adjust=None, regenerate=None, local_content=None):
+    """
+    API 앱 생성
+    adjust/regenerate/local_content: app.py 의 adjust_persona / regenerate_adjusted_content /
+    local_adjusted_content (없으면 성격 조정 엔드포인트는 501)
+    """
+    if not FASTAPI_AVAILABLE:
+        print("❌ fastapi 가 설치되어 있지 않아 API 를 만들 수 없습니다.")
+        return None
+
+    api = FastAPI(title="놈팽쓰 API", description="페르소나 생성/대화 헤드리스 API")
+    personas = PersonaCache(backend=get_state_backend())
+    save_lock = threading.RLock()
+    token = os.getenv("API_TOKEN", "")
+
+    def check_token(authorization: str = Header(default="")):
+        if token and authorization != f"Bearer {token}":
+            raise HTTPException(status_code=401, detail="API 토큰이 올바르지 않습니다.")
+
+    def require_persona(filename):
+        persona = personas.get(filename)
+        if persona is None:
+            raise HTTPException(status_code=404, detail=f"페르소나를 찾을 수 없습니다: {filename}")
+        return persona
+
+    def resolve_chat_persona(request):
+        if request.persona:
+            return request.persona
+        if request.persona_id:
+            return require_persona(request.persona_id)
+        raise HTTPException(status_code=422, detail="persona 또는 persona_id 가 필요합니다.")
+
+    def save_and_name(persona, filename=None):
+        persona = without_callables(persona)
+        filepath = save_persona(persona, filename)
+        if not filepath:
+            raise HTTPException(status_code=500, detail="페르소나 저장에 실패했습니다.")
+        personas.store(filepath, persona)
+        return os.path.basename(filepath)
+
+    @api.get("/api/health")
+    def health():
+        return {"status": "ok", "api_key": bool(getattr(generator, "api_key", None)),
+                "jobs": get_job_runner().stats()}
+
+    @api.get("/api/personas", dependencies=[Depends(check_token)])
+    def get_personas():
+        return [{key: item[key] for key in ("filename", "name", "type", "created_at")} for item in list_personas()]
+
+    @api.post("/api/personas", dependencies=[Depends(check_token)])
+    def create_persona(request: CreatePersonaRequest):
+        if not getattr(generator, "api_key", None):
+            raise HTTPException(status_code=503, detail="API 키가 설정되지 않았습니다.")
+        try:
+            image = decode_image(request.image)
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=f"이미지를 읽을 수 없습니다: {str(e)}")
+
+        image_analysis = generator.analyze_image(image)
+        object_type = request.object_type
+        if object_type == "auto" or not object_type:
+            object_type = image_analysis.get("object_type", "사물")
+        user_context = {
+            "name": request.name,
+            "location": request.location,
+            "time_spent": request.time_spent,
+            "object_type": object_type,
+            "purpose": request.purpose,
+        }
+        frontend_persona = generator.create_frontend_persona(image_analysis, user_context)
+        persona = without_callables(generator.create_backend_persona(frontend_persona, image_analysis))
+        filename = save_and_name(persona) if request.save else None
+        return {"filename": filename, "persona": persona}
+
+    @api.get("/api/personas/{filename}", dependencies=[Depends(check_token)])
+    def get_persona(filename: str):
+        return require_persona(filename)
+
+    @api.put("/api/personas/{filename}", dependencies=[Depends(check_token)])
+    def put_persona(filename: str, persona: Dict[str, Any]):
+        if "기본정보" not in persona:
+            raise HTTPException(status_code=422, detail="'기본정보' 키가 필요합니다.")
+        with save_lock:
+            return {"filename": save_and_name(persona, filename)}
+
+    @api.delete("/api/personas/{filename}", dependencies=[Depends(check_token)])
+    def remove_persona(filename: str):
+        personas.forget(filename)
+        if not delete_persona(filename):
+            raise HTTPException(status_code=404, detail=f"페르소나를 찾을 수 없습니다: {filename}")
+        return {"deleted": os.path.basename(filename)}
+
+    @api.post("/api/personas/{filename}/adjust", dependencies=[Depends(check_token)])
+    def adjust_persona(filename: str, request: AdjustRequest):
+        if adjust is None:
+            raise HTTPException(status_code=501, detail="이 서버에서는 성격 조정을 사용할 수 없습니다.")
+        persona = adjust(require_persona(filename), request.warmth, request.competence,
+                         request.extraversion, request.humor_style)
+
+        mode = request.regenerate
+        if mode == "background" and not background_jobs_enabled():
+            mode = "sync"
+        if mode == "sync" and regenerate:
+            persona = update_persona(persona, regenerate(persona))
+        elif mode == "background" and regenerate and local_content:
+            persona = update_persona(persona, local_content(persona))
+
+        saved = None
+        if request.save:
+            with save_lock:
+                saved = save_and_name(persona, filename)
+                version = file_version(saved)
+
+        job_id = None
+        if mode == "background" and regenerate:
+            # 저장했으면 재생성 결과를 파일에도 합친다 (그 사이 다른 저장이 있었으면 덮어쓰지 않음)
+            job_id = get_job_runner().submit("adjust", regenerate_and_save, persona,
+                                             saved if request.save else None,
+                                             version if request.save else None,
+                                             key=("api", os.path.basename(filename), "adjust"),
+                                             shared=True)
+        return {"filename": saved, "persona": persona, "job_id": job_id}
+
+    def file_version(filename):
+        # 수정 시각은 해상도가 거칠어서 연달아 저장하면 같을 수 있으므로 내용 해시로 비교
+        try:
+            with open(os.path.join(PERSONAS_DIR, os.path.basename(filename)), "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def regenerate_and_save(persona, filename, version):
+        """결함/모순 재생성 → 저장한 파일이 그대로면 결과를 합쳐 다시 저장"""
+        fields = regenerate(persona)
+        if not filename or not fields:
+            return fields
+        with save_lock:
+            if file_version(filename) != version:
+                print(f"⚠️ {filename} 이(가) 그 사이 다시 저장되어 재생성 결과를 파일에 반영하지 않습니다.")
+                return fields
+            save_and_name(update_persona(persona, fields), filename)
+        return fields
+
+    def chat_reply(request):
+        persona = resolve_chat_persona(request)
+        return generator.chat_with_persona(persona, request.message, request.history, request.session_id)
+
+    @api.post("/api/chat", dependencies=[Depends(check_token)])
+    def chat(request: ChatRequest):
+        return {"reply": chat_reply(request), "session_id": request.session_id}
+
+    @api.post("/api/chat/stream", dependencies=[Depends(check_token)])
+    def chat_stream(request: ChatRequest):
+        resolve_chat_persona(request)   # 스트림 시작 전에 404/422 확인
+
+        def events():
+            result = {}
+
+            def run():
+                try:
+                    result["reply"] = chat_reply(request)
+                except Exception as e:
+                    result["error"] = str(e)
+
+            worker = threading.Thread(target=run, daemon=True)
+            worker.start()
+            yield _sse("status", {"state": "thinking", "session_id": request.session_id})
+            # 응답이 만들어지는 동안 연결이 끊기지 않도록 주석 줄 전송
+            while worker.is_alive():
+                worker.join(SSE_KEEPALIVE_SECONDS)
+                if worker.is_alive():
+                    yield ": keepalive\n\n"
+            if "error" in result:
+                yield _sse("error", {"detail": result["error"]})
+                return
+            reply = result.get("reply", "")
+            for piece in split_for_stream(reply):
+                yield _sse("delta", {"text": piece})
+            yield _sse("done", {"reply": reply, "session_id": request.session_id})
+
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @api.get("/api/jobs/{job_id}", dependencies=[Depends(check_token)])
+    def job_status(job_id: str):
+        status = get_job_runner().status(job_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+        return status
+
+    @api.delete("/api/jobs/{job_id}", dependencies=[Depends(check_token)])
+    def cancel_job(job_id: str):
+        return {"cancelled": get_job_runner().cancel(job_id)}
+
+    return api
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="놈팽쓰 헤드리스 API 서버 (Gradio 화면 없음)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    # app.py 의 생성기와 성격 조정 함수를 그대로 사용 (화면은 만들지 않음)
+    import app as gradio_app
+    api = create_api(gradio_app.persona_generator, adjust=gradio_app.adjust_persona,
+                     regenerate=gradio_app.regenerate_adjusted_content,
+                     local_content=gradio_app.local_adjusted_content)
+    if api is None:
+        return 1
+    uvicorn.run(api, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
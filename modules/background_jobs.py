@@ -0,0 +1,280 @@
+"""
+백그라운드 작업 실행기 (대화형이 아닌 LLM 작업용)
+
+인사말 생성, 성격 조정 후 결함/모순 재생성, 대화 기억 정리처럼 사용자가 기다릴 필요가 없는 작업을
+작은 스레드 풀에서 실행한다. 이벤트 핸들러는 작업 ID 만 받아 바로 반환하고(화면에는 로컬 결과를 먼저 표시),
+결과는 status()/result() 로 나중에 가져간다.
+
+- key: 같은 key 로 새 작업을 넣으면 이전 작업은 취소 (예: 세션별 "마지막 조정"만 의미 있음)
+- lane: 같은 lane 의 작업은 넣은 순서대로 하나씩 실행 (예: 세션별 대화 기억)
+- 대기 작업이 BACKGROUND_MAX_QUEUED 개를 넘으면 submit 이 None 을 반환 → 호출한 쪽에서 직접 실행하거나 로컬 결과 유지
+- 이미 실행 중인 작업은 중단할 수 없으므로 취소하면 결과만 버린다
+- shared=True 로 넣은 작업은 공유 상태 저장소(STATE_BACKEND=sqlite/redis)에 상태/결과를 기록해서
+  다른 레플리카에서도 status()/cancel() 할 수 있다 (BACKGROUND_JOB_TTL 초 동안 유지, 결과는 JSON 으로 저장 가능해야 함)
+"""
+import os
+import uuid
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.state_backend import get_state_backend
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_FINISHED = (DONE, FAILED, CANCELLED)
+
+
+def background_jobs_enabled():
+    """BACKGROUND_JOBS=0 이면 모든 작업을 요청 안에서 바로 실행 (기존 방식)"""
+    return os.getenv("BACKGROUND_JOBS", "1") != "0"
+
+
+class Job:
+    """작업 하나의 상태"""
+
+    __slots__ = ("id", "kind", "key", "lane", "state", "result", "error",
+                 "created", "finished", "shared", "_call", "_done")
+
+    def __init__(self, kind, call, key=None, lane=None, shared=False):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.lane = lane
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.shared = shared
+        self._call = call
+        self._done = threading.Event()
+
+    def snapshot(self):
+        """상태 조회용 dict (결과는 완료된 경우에만)"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "result": self.result if self.state == DONE else None,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+
+class JobRunner:
+    """제한된 스레드 풀 + 작업 ID/취소/결과 조회"""
+
+    def __init__(self, max_workers=None, max_queued=None, keep_finished=500, backend=None):
+        self.max_workers = max_workers or int(os.getenv("BACKGROUND_WORKERS", "2"))
+        self.max_queued = max_queued or int(os.getenv("BACKGROUND_MAX_QUEUED", "64"))
+        self.keep_finished = keep_finished
+        # 공유 상태 저장소 (shared=True 작업의 상태를 다른 프로세스와 공유)
+        self.backend = backend if backend is not None and backend.shared else None
+        self.shared_ttl = int(os.getenv("BACKGROUND_JOB_TTL", "3600"))
+        self._executor = None
+        self._jobs = OrderedDict()   # 작업 ID → Job (오래된 완료 작업부터 정리)
+        self._keys = {}              # key → 최신 작업 ID
+        self._lanes = {}             # 실행 중인 lane → 대기 작업 deque
+        self._queued = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="background-job")
+        return self._executor
+
+    def _publish(self, job):
+        """shared 작업의 현재 상태를 공유 저장소에 기록"""
+        if not job.shared or self.backend is None:
+            return
+        snapshot = job.snapshot()
+        try:
+            try:
+                self.backend.set("jobs", job.id, snapshot, ttl=self.shared_ttl)
+            except TypeError:
+                # JSON 으로 저장할 수 없는 결과는 상태만 공유
+                self.backend.set("jobs", job.id, dict(snapshot, result=None), ttl=self.shared_ttl)
+        except Exception as e:
+            print(f"⚠️ 작업 상태 공유 실패 ({job.kind}): {str(e)}")
+
+    def _cancel_requested(self, job):
+        """다른 프로세스에서 취소를 요청했는지"""
+        if not job.shared or self.backend is None:
+            return False
+        try:
+            return bool(self.backend.get("jobs-cancel", job.id))
+        except Exception:
+            return False
+
+    def submit(self, kind, fn, *args, key=None, lane=None, shared=False, **kwargs):
+        """작업 등록 → 작업 ID (대기열이 가득 차면 None)"""
+        with self._lock:
+            if self._queued >= self.max_queued:
+                print(f"⚠️ 백그라운드 대기열이 가득 참 ({self._queued}개) - '{kind}' 작업은 바로 실행하세요.")
+                return None
+
+            if key is not None and key in self._keys:
+                self._cancel_locked(self._keys[key])
+
+            job = Job(kind, lambda: fn(*args, **kwargs), key=key, lane=lane, shared=shared)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._keys[key] = job.id
+            self._queued += 1
+            self._publish(job)
+
+            if lane is not None:
+                if lane in self._lanes:
+                    # 같은 lane 의 앞 작업이 끝나면 이어서 실행
+                    self._lanes[lane].append(job)
+                    return job.id
+                self._lanes[lane] = deque()
+        self.executor.submit(self._run, job)
+        return job.id
+
+    def _run(self, job):
+        with self._lock:
+            if job.state == QUEUED and self._cancel_requested(job):
+                self._cancel_locked(job.id)
+            if job.state == QUEUED:
+                job.state = RUNNING
+                self._queued -= 1
+                self._publish(job)
+
+        if job.state == RUNNING:
+            try:
+                result, error = job._call(), None
+            except Exception as e:
+                result, error = None, str(e)
+                print(f"⚠️ 백그라운드 작업 실패 ({job.kind}): {error}")
+
+        next_job = None
+        with self._lock:
+            # 실행 중에 취소됐으면 (다른 프로세스에서 요청한 취소 포함) 결과는 버림
+            if job.state == RUNNING and self._cancel_requested(job):
+                job.state = CANCELLED
+            if job.state == RUNNING:
+                job.state = FAILED if error else DONE
+                job.result, job.error = result, error
+            job.finished = job.finished or time.time()
+            job._call = None
+            self._publish(job)
+            job._done.set()
+
+            if job.lane is not None:
+                waiting = self._lanes.get(job.lane)
+                if waiting:
+                    next_job = waiting.popleft()
+                else:
+                    self._lanes.pop(job.lane, None)
+            self._prune_locked()
+
+        if next_job is not None:
+            self.executor.submit(self._run, next_job)
+
+    def _cancel_locked(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None or job.state in _FINISHED:
+            return False
+        if job.state == QUEUED:
+            # 스레드 풀/lane 대기열에 남은 항목은 _run 에서 바로 건너뜀
+            self._queued -= 1
+        job.state = CANCELLED
+        job.finished = time.time()
+        self._publish(job)
+        job._done.set()
+        return True
+
+    def cancel(self, job_id):
+        """작업 취소 (대기 중이면 실행하지 않고, 실행 중이면 결과를 버림)"""
+        with self._lock:
+            if job_id in self._jobs:
+                return self._cancel_locked(job_id)
+        # 다른 프로세스의 shared 작업이면 취소 요청만 남김 (그 프로세스가 실행 전/완료 시 확인)
+        status = self._shared_status(job_id)
+        if status is None or status["state"] in _FINISHED:
+            return False
+        try:
+            self.backend.set("jobs-cancel", job_id, True, ttl=self.shared_ttl)
+            return True
+        except Exception as e:
+            print(f"⚠️ 작업 취소 요청 공유 실패: {str(e)}")
+            return False
+
+    def _shared_status(self, job_id):
+        if self.backend is None or not job_id:
+            return None
+        try:
+            return self.backend.get("jobs", job_id)
+        except Exception as e:
+            print(f"⚠️ 공유 작업 상태 조회 실패: {str(e)}")
+            return None
+
+    def cancel_key(self, key):
+        """key 로 등록된 최신 작업 취소"""
+        with self._lock:
+            job_id = self._keys.get(key)
+            return self._cancel_locked(job_id) if job_id else False
+
+    def status(self, job_id):
+        """작업 상태 dict (없거나 정리된 작업이면 None, 다른 프로세스의 shared 작업은 공유 저장소에서)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                return job.snapshot()
+        return self._shared_status(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """작업이 끝날 때까지 대기 → 끝났으면 True"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job._done.wait(timeout) if job else True
+
+    def result(self, job_id, timeout=None, default=None):
+        """작업 결과 (실패/취소/시간 초과면 default)"""
+        if not job_id or not self.wait(job_id, timeout):
+            return default
+        status = self.status(job_id)
+        if not status or status["state"] != DONE:
+            return default
+        return status["result"]
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.state] = counts.get(job.state, 0) + 1
+            return {"workers": self.max_workers, "queued": self._queued, "jobs": counts}
+
+    def _prune_locked(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.state in _FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            job = self._jobs.pop(job_id)
+            if job.key is not None and self._keys.get(job.key) == job_id:
+                del self._keys[job.key]
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    """프로세스 공용 작업 실행기"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(backend=get_state_backend())
+        return _runner
@@ -0,0 +1,208 @@
+"""
+대량 페르소나 생성 (이미지 폴더 또는 매니페스트 → data/personas)
+
+사용 예:
+    python -m modules.batch_generator ./catalogue_images --workers 4
+    python -m modules.batch_generator manifest.jsonl --checkpoint batch.ckpt.jsonl
+
+매니페스트(.jsonl/.json/.csv) 항목 필드:
+    image(필수), id, name, location, time_spent, object_type, purpose
+"""
+import os
+import re
+import csv
+import json
+import argparse
+import threading
+import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from PIL import Image
+
+from modules.data_manager import save_persona
+from modules.rate_limiter import PRIORITY_BACKGROUND
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".avif")
+CONTEXT_FIELDS = ("name", "location", "time_spent", "object_type", "purpose")
+
+
+def _safe_id(value):
+    """파일명에 쓸 수 있는 항목 ID"""
+    return re.sub(r"[^\w\-가-힣]+", "_", str(value)).strip("_") or "item"
+
+
+def _item_from_record(record, base_dir, index):
+    image_path = record.get("image") or record.get("image_path")
+    if not image_path:
+        raise ValueError(f"{index}번째 항목에 image 필드가 없습니다")
+    if not os.path.isabs(image_path):
+        image_path = os.path.join(base_dir, image_path)
+    item_id = record.get("id") or os.path.splitext(os.path.basename(image_path))[0]
+    context = {field: record.get(field, "") or "" for field in CONTEXT_FIELDS}
+    return {"id": _safe_id(item_id), "image": image_path, "context": context}
+
+
+def load_batch_items(source):
+    """이미지 폴더 또는 매니페스트 파일에서 생성 대상 목록 로드"""
+    if os.path.isdir(source):
+        items = []
+        for root, _, files in os.walk(source):
+            for filename in sorted(files):
+                if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                image_path = os.path.join(root, filename)
+                record = {"image": image_path,
+                          "id": os.path.splitext(os.path.relpath(image_path, source))[0]}
+                # 같은 이름의 .json 파일이 있으면 사용자 맥락으로 사용
+                sidecar = os.path.splitext(image_path)[0] + ".json"
+                if os.path.exists(sidecar):
+                    with open(sidecar, "r", encoding="utf-8") as f:
+                        record.update(json.load(f))
+                items.append(_item_from_record(record, source, len(items)))
+        return items
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as f:
+        if source.endswith(".jsonl"):
+            records = [json.loads(line) for line in f if line.strip()]
+        elif source.endswith(".csv"):
+            records = list(csv.DictReader(f))
+        else:
+            records = json.load(f)
+    return [_item_from_record(record, base_dir, i) for i, record in enumerate(records)]
+
+
+class BatchCheckpoint:
+    """항목별 처리 결과를 JSONL로 기록하여 중단된 배치를 이어서 실행"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.records = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 기록 도중 중단된 마지막 줄은 무시
+                        continue
+                    self.records[record["id"]] = record
+
+    def is_done(self, item_id, retry_failed=False):
+        record = self.records.get(item_id)
+        if not record:
+            return False
+        return record["status"] == "ok" or not retry_failed
+
+    def record(self, item_id, status, **fields):
+        entry = {"id": item_id, "status": status,
+                 "time": datetime.datetime.now().isoformat(timespec="seconds"), **fields}
+        with self._lock:
+            self.records[item_id] = entry
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def generate_persona_for_item(generator, item):
+    """이미지 분석 → 프론트엔드 → 백엔드 페르소나 생성"""
+    image = Image.open(item["image"])
+    if image.format in ['AVIF', 'WEBP'] or image.mode not in ['RGB', 'RGBA']:
+        image = image.convert('RGB')
+
+    # 대량 작업은 UI 요청보다 낮은 우선순위로 API 호출
+    image_analysis = generator.analyze_image(image, priority=PRIORITY_BACKGROUND)
+    user_context = dict(item["context"])
+    if not user_context.get("object_type") or user_context["object_type"] == "auto":
+        user_context["object_type"] = image_analysis.get("object_type", "사물")
+
+    frontend_persona = generator.create_frontend_persona(image_analysis, user_context)
+    return generator.create_backend_persona(frontend_persona, image_analysis)
+
+
+def run_batch(source, generator=None, workers=4, checkpoint_path=None,
+              retry_failed=False, limit=None, save=save_persona):
+    """제한된 작업자 풀로 대량 페르소나 생성 후 data_manager로 저장"""
+    if generator is None:
+        from modules.persona_generator import PersonaGenerator
+        generator = PersonaGenerator()
+
+    items = load_batch_items(source)
+    if checkpoint_path is None:
+        # 기본 체크포인트: 폴더면 폴더/batch.ckpt.jsonl, 매니페스트면 매니페스트명.ckpt.jsonl
+        if os.path.isdir(source):
+            checkpoint_path = os.path.join(source, "batch.ckpt.jsonl")
+        else:
+            checkpoint_path = os.path.splitext(source)[0] + ".ckpt.jsonl"
+    checkpoint = BatchCheckpoint(checkpoint_path)
+
+    pending = [item for item in items if not checkpoint.is_done(item["id"], retry_failed)]
+    if limit:
+        pending = pending[:limit]
+    summary = {"total": len(items), "skipped": len(items) - len(pending), "succeeded": 0, "failed": 0}
+    print(f"📦 배치 생성 시작: 전체 {len(items)}개, 건너뜀 {summary['skipped']}개, 작업자 {workers}명")
+
+    def process(item):
+        persona = generate_persona_for_item(generator, item)
+        basic_info = persona.get("기본정보", {})
+        name = _safe_id(basic_info.get("이름", "unknown"))
+        object_type = _safe_id(basic_info.get("유형", "unknown"))
+        filepath = save(persona, filename=f"{name}_{object_type}_{item['id']}.json")
+        if not filepath:
+            raise IOError("페르소나 저장 실패")
+        return filepath
+
+    # 수천 개 항목을 한꺼번에 제출하지 않도록 진행 중 작업 수를 작업자 수의 2배로 제한
+    queue = iter(pending)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        running = {}
+
+        def submit_next():
+            item = next(queue, None)
+            if item is not None:
+                running[executor.submit(process, item)] = item
+            return item is not None
+
+        for _ in range(max(1, workers) * 2):
+            if not submit_next():
+                break
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = running.pop(future)
+                try:
+                    filepath = future.result()
+                    checkpoint.record(item["id"], "ok", filepath=filepath)
+                    summary["succeeded"] += 1
+                except Exception as e:
+                    print(f"⚠️ {item['id']} 생성 실패: {e}")
+                    checkpoint.record(item["id"], "error", error=str(e))
+                    summary["failed"] += 1
+                submit_next()
+
+    print(f"✅ 배치 생성 완료: 성공 {summary['succeeded']}개, 실패 {summary['failed']}개")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="이미지 폴더/매니페스트로 페르소나 대량 생성")
+    parser.add_argument("source", help="이미지 폴더 또는 매니페스트(.jsonl/.json/.csv)")
+    parser.add_argument("--workers", type=int, default=4, help="동시 작업자 수")
+    parser.add_argument("--checkpoint", help="체크포인트 파일 경로 (기본: 매니페스트명.ckpt.jsonl, 폴더면 폴더/batch.ckpt.jsonl)")
+    parser.add_argument("--retry-failed", action="store_true", help="이전에 실패한 항목 다시 시도")
+    parser.add_argument("--limit", type=int, help="이번 실행에서 처리할 최대 항목 수")
+    parser.add_argument("--provider", default="gemini", choices=["gemini", "openai"])
+    args = parser.parse_args(argv)
+
+    from modules.persona_generator import PersonaGenerator
+    generator = PersonaGenerator(api_provider=args.provider)
+    summary = run_batch(args.source, generator=generator, workers=args.workers,
+                        checkpoint_path=args.checkpoint, retry_failed=args.retry_failed,
+                        limit=args.limit)
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,284 @@
+"""
+성격 차트 렌더링 캐시
+
+유머 매트릭스(matplotlib)와 성격 레이더(plotly) 차트를 입력값 해시로 메모이즈한다.
+차트는 한 번만 렌더링하여 gr.Plot 이 그대로 보내는 직렬화 결과(PlotData)로 캐시하고,
+matplotlib figure 는 렌더링 직후 해제하므로 요청마다 figure 가 쌓이지 않는다.
+
+CHART_RENDER_MODE:
+    figure  - 유머 매트릭스는 이미지, 성격 레이더는 plotly 인터랙티브 차트 (기본)
+    static  - 두 차트 모두 PNG/SVG 이미지로 한 번만 렌더링 (CHART_STATIC_FORMAT=png|svg)
+    client  - 값 벡터만 보내고 브라우저에서 그림 (modules/client_charts.py, gr.HTML 출력)
+"""
+import os
+import io
+import json
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+
+from modules.lazy_imports import lazy_import
+from modules.font_setup import setup_korean_font
+
+go = lazy_import("plotly.graph_objects")
+mpl_figure = lazy_import("matplotlib.figure")
+
+RENDER_MODES = ("figure", "static", "client")
+
+HUMOR_LABELS = ['Warmth vs Wit', 'Self vs Observational', 'Subtle vs Expressive']
+HUMOR_KEYS = ["warmth_vs_wit", "self_vs_observational", "subtle_vs_expressive"]
+HUMOR_COLORS = ['#ff9999', '#66b3ff', '#99ff99']
+
+# 레이더 차트 영어 레이블 매핑
+TRAIT_LABELS_EN = {
+    '온기': 'Warmth',
+    '능력': 'Competence',
+    '창의성': 'Creativity',
+    '외향성': 'Extraversion',
+    '유머감각': 'Humor',
+    '신뢰성': 'Reliability',
+    '공감능력': 'Empathy'
+}
+
+
+def chart_render_mode():
+    mode = os.getenv("CHART_RENDER_MODE", "figure").lower()
+    return mode if mode in RENDER_MODES else "figure"
+
+
+def static_chart_format():
+    fmt = os.getenv("CHART_STATIC_FORMAT", "png").lower()
+    return fmt if fmt in ("png", "svg") else "png"
+
+
+def chart_key(kind, *parts):
+    payload = json.dumps([kind, *parts], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def dispose_figure(fig):
+    """matplotlib figure 자원 해제 (pyplot 에 등록된 경우 close 포함)"""
+    if fig is None or not hasattr(fig, "clf"):
+        return
+    try:
+        import sys
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        if pyplot is not None:
+            pyplot.close(fig)
+        fig.clf()
+    except Exception as e:
+        print(f"⚠️ figure 해제 실패: {e}")
+
+
+class ChartCache:
+    """스레드 안전 LRU 캐시 - 밀려난 값은 dispose 로 정리"""
+
+    def __init__(self, maxsize=128, dispose=dispose_figure):
+        self.maxsize = maxsize
+        self.dispose = dispose
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key, factory):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+        value = factory()
+        evicted = []
+        with self._lock:
+            if key in self._items:
+                # 동시에 같은 차트를 만든 경우 먼저 들어간 값 사용
+                evicted.append(value)
+                value = self._items[key]
+            else:
+                self.misses += 1
+                self._items[key] = value
+                while len(self._items) > self.maxsize:
+                    evicted.append(self._items.popitem(last=False)[1])
+        for old in evicted:
+            if self.dispose and old is not value:
+                self.dispose(old)
+        return value
+
+    def clear(self):
+        with self._lock:
+            items = list(self._items.values())
+            self._items.clear()
+        for value in items:
+            if self.dispose:
+                self.dispose(value)
+
+    def __len__(self):
+        return len(self._items)
+
+
+_cache = ChartCache(maxsize=int(os.getenv("CHART_CACHE_SIZE", "128")))
+
+
+def humor_values(humor_data):
+    """유머 매트릭스 차트 값 (없으면 None)"""
+    if not humor_data:
+        return None
+    return [float(humor_data.get(key, 50)) for key in HUMOR_KEYS]
+
+
+def radar_values(persona):
+    """성격 레이더 차트 (레이블, 값) 목록 (없으면 None)"""
+    if not persona or "성격특성" not in persona:
+        return None
+    traits = persona["성격특성"]
+    pairs = [(label, traits[trait]) for trait, label in TRAIT_LABELS_EN.items() if trait in traits]
+    return pairs or None
+
+
+def render_humor_figure(values):
+    """유머 매트릭스 막대 차트 (pyplot 전역 상태에 등록하지 않는 Figure)"""
+    setup_korean_font()
+    fig = mpl_figure.Figure(figsize=(8, 6))
+    ax = fig.subplots()
+
+    bars = ax.bar(HUMOR_LABELS, values, color=HUMOR_COLORS, alpha=0.8)
+    ax.set_ylim(0, 100)
+    ax.set_ylabel('Score', fontsize=12)
+    ax.set_title('Humor Style Matrix', fontsize=14, fontweight='bold')
+
+    # 값 표시
+    for bar, value in zip(bars, values):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2., height + 2,
+                f'{value:.1f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
+
+    ax.tick_params(axis='x', labelrotation=15)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    ax.grid(axis='y', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def render_radar_figure(pairs):
+    """성격 레이더 차트 (plotly)"""
+    categories = [label for label, _ in pairs]
+    values = [value for _, value in pairs]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=values,
+        theta=categories,
+        fill='toself',
+        fillcolor='rgba(74, 144, 226, 0.3)',
+        line=dict(color='rgba(74, 144, 226, 1)', width=2),
+        marker=dict(size=8, color='rgba(74, 144, 226, 1)'),
+        name='Personality Traits'
+    ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100], tickfont=dict(size=10), gridcolor="lightgray"),
+            angularaxis=dict(tickfont=dict(size=12, family="Arial, sans-serif"))
+        ),
+        showlegend=False,
+        title=dict(text="Personality Profile", x=0.5, font=dict(size=16, family="Arial, sans-serif")),
+        width=400,
+        height=400,
+        margin=dict(l=40, r=40, t=60, b=40),
+        font=dict(family="Arial, sans-serif")
+    )
+    return fig
+
+
+def render_radar_static_figure(pairs):
+    """정적 이미지용 레이더 차트 (plotly 이미지 내보내기 없이 matplotlib 극좌표로)"""
+    import math
+    setup_korean_font()
+    categories = [label for label, _ in pairs]
+    values = [value for _, value in pairs]
+    angles = [2 * math.pi * i / len(values) for i in range(len(values))]
+
+    fig = mpl_figure.Figure(figsize=(4, 4))
+    ax = fig.add_subplot(projection="polar")
+    ax.plot(angles + angles[:1], values + values[:1], color=(74 / 255, 144 / 255, 226 / 255), linewidth=2)
+    ax.fill(angles + angles[:1], values + values[:1], color=(74 / 255, 144 / 255, 226 / 255), alpha=0.3)
+    ax.set_xticks(angles)
+    ax.set_xticklabels(categories, fontsize=9)
+    ax.set_ylim(0, 100)
+    ax.set_title("Personality Profile", fontsize=12)
+    fig.tight_layout()
+    return fig
+
+
+def figure_to_bytes(fig, fmt="png"):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def _plot_data(plot_type, plot):
+    """gr.Plot 이 다시 직렬화하지 않고 그대로 보내는 값"""
+    try:
+        from gradio.components.plot import PlotData
+    except ImportError:
+        return None
+    return PlotData(type=plot_type, plot=plot)
+
+
+def static_chart(fig, fmt=None):
+    """matplotlib figure 를 한 번 렌더링하여 이미지 데이터로 만들고 figure 는 바로 해제"""
+    fmt = fmt or static_chart_format()
+    try:
+        data = figure_to_bytes(fig, fmt)
+    except Exception:
+        dispose_figure(fig)
+        raise
+    # svg 는 브라우저가 data URI 의 MIME 타입으로 판별
+    mime = "svg+xml" if fmt == "svg" else fmt
+    plot = _plot_data("matplotlib", f"data:image/{mime};base64,{base64.b64encode(data).decode('ascii')}")
+    if plot is None:
+        # gradio 없이 사용하는 경우 figure 그대로 반환
+        return fig
+    dispose_figure(fig)
+    return plot
+
+
+def interactive_chart(fig):
+    """plotly figure 를 JSON 으로 한 번만 직렬화"""
+    plot = _plot_data("plotly", fig.to_json())
+    return fig if plot is None else plot
+
+
+def humor_chart(humor_data, mode=None):
+    """유머 매트릭스 차트 (값이 같으면 캐시된 결과 재사용)"""
+    if (mode or chart_render_mode()) == "client":
+        from modules.client_charts import humor_chart_html
+        return humor_chart_html(humor_data)
+    values = humor_values(humor_data)
+    if values is None:
+        return None
+    fmt = static_chart_format()
+    return _cache.get_or_create(chart_key("humor", fmt, values),
+                                lambda: static_chart(render_humor_figure(values), fmt))
+
+
+def personality_chart(persona, mode=None):
+    """성격 레이더 차트 (값이 같으면 캐시된 결과 재사용)"""
+    mode = mode or chart_render_mode()
+    if mode == "client":
+        from modules.client_charts import radar_chart_html
+        return radar_chart_html(persona)
+    pairs = radar_values(persona)
+    if pairs is None:
+        return None
+    if mode == "static":
+        fmt = static_chart_format()
+        return _cache.get_or_create(chart_key("radar", mode, fmt, pairs),
+                                    lambda: static_chart(render_radar_static_figure(pairs), fmt))
+    return _cache.get_or_create(chart_key("radar", mode, pairs),
+                                lambda: interactive_chart(render_radar_figure(pairs)))
+
+
+def cache_stats():
+    return {"size": len(_cache), "hits": _cache.hits, "misses": _cache.misses}
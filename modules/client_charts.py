@@ -0,0 +1,110 @@
+"""
+브라우저 렌더링 차트 (CHART_RENDER_MODE=client)
+
+서버는 차트 값 벡터만 담은 작은 HTML 조각을 보내고, gr.Blocks(head=...) 로 넣은 스크립트가
+브라우저에서 SVG 로 그린다. 서버에서는 matplotlib/plotly 를 전혀 사용하지 않는다.
+"""
+import json
+import html
+
+from modules.chart_cache import humor_values, radar_values, HUMOR_LABELS, HUMOR_COLORS
+
+# gr.HTML 에 넣은 <script> 는 실행되지 않으므로 head 스크립트가 DOM 변화를 감시하여 그린다
+CHART_SCRIPT = """
+<script>
+(function () {
+  var NS = "http://www.w3.org/2000/svg";
+  function el(name, attrs, text) {
+    var node = document.createElementNS(NS, name);
+    for (var key in attrs) node.setAttribute(key, attrs[key]);
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+  function humor(data) {
+    var w = 420, h = 300, top = 40, bottom = 60, left = 40;
+    var svg = el("svg", {viewBox: "0 0 " + w + " " + h, width: "100%"});
+    svg.appendChild(el("text", {x: w / 2, y: 22, "text-anchor": "middle", "font-size": 15, "font-weight": "bold"}, "Humor Style Matrix"));
+    var slot = (w - left - 10) / data.values.length, plotH = h - top - bottom;
+    for (var g = 0; g <= 100; g += 25) {
+      var gy = top + plotH * (1 - g / 100);
+      svg.appendChild(el("line", {x1: left, x2: w - 10, y1: gy, y2: gy, stroke: "#ddd"}));
+      svg.appendChild(el("text", {x: left - 6, y: gy + 4, "text-anchor": "end", "font-size": 10}, g));
+    }
+    data.values.forEach(function (v, i) {
+      var bh = plotH * v / 100, x = left + slot * i + slot * 0.2;
+      svg.appendChild(el("rect", {x: x, y: top + plotH - bh, width: slot * 0.6, height: bh, fill: data.colors[i], opacity: 0.8}));
+      svg.appendChild(el("text", {x: x + slot * 0.3, y: top + plotH - bh - 5, "text-anchor": "middle", "font-size": 11, "font-weight": "bold"}, v.toFixed(1)));
+      svg.appendChild(el("text", {x: x + slot * 0.3, y: h - bottom + 18, "text-anchor": "middle", "font-size": 11}, data.labels[i]));
+    });
+    return svg;
+  }
+  function radar(data) {
+    var size = 360, c = size / 2, r = 120, n = data.values.length;
+    var svg = el("svg", {viewBox: "0 0 " + size + " " + size, width: "100%"});
+    svg.appendChild(el("text", {x: c, y: 22, "text-anchor": "middle", "font-size": 15}, "Personality Profile"));
+    function point(i, v) {
+      var a = -Math.PI / 2 + 2 * Math.PI * i / n;
+      return [c + Math.cos(a) * r * v / 100, c + 10 + Math.sin(a) * r * v / 100];
+    }
+    [25, 50, 75, 100].forEach(function (level) {
+      var ring = [];
+      for (var i = 0; i < n; i++) ring.push(point(i, level).join(","));
+      svg.appendChild(el("polygon", {points: ring.join(" "), fill: "none", stroke: "lightgray"}));
+    });
+    var shape = [];
+    data.values.forEach(function (v, i) {
+      var p = point(i, v), lp = point(i, 118);
+      shape.push(p.join(","));
+      svg.appendChild(el("circle", {cx: p[0], cy: p[1], r: 4, fill: "rgba(74,144,226,1)"}));
+      svg.appendChild(el("text", {x: lp[0], y: lp[1], "text-anchor": "middle", "font-size": 12}, data.labels[i]));
+    });
+    svg.appendChild(el("polygon", {points: shape.join(" "), fill: "rgba(74,144,226,0.3)", stroke: "rgba(74,144,226,1)", "stroke-width": 2}));
+    return svg;
+  }
+  var renderers = {humor: humor, radar: radar};
+  function render(root) {
+    (root || document).querySelectorAll(".np-chart[data-chart]").forEach(function (node) {
+      if (node.dataset.rendered === node.dataset.chart) return;
+      try {
+        var data = JSON.parse(node.dataset.chart);
+        node.replaceChildren(renderers[data.kind](data));
+        node.dataset.rendered = node.dataset.chart;
+      } catch (e) { console.warn("chart render failed", e); }
+    });
+  }
+  function start() {
+    render(document);
+    new MutationObserver(function () { render(document); }).observe(document.body, {childList: true, subtree: true});
+  }
+  if (document.readyState === "loading") document.addEventListener("DOMContentLoaded", start); else start();
+})();
+</script>
+"""
+
+
+def chart_head():
+    """gr.Blocks(head=...) 에 넣을 차트 렌더링 스크립트"""
+    return CHART_SCRIPT
+
+
+def _chart_html(payload):
+    data = html.escape(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), quote=True)
+    return f'<div class="np-chart" data-chart="{data}"></div>'
+
+
+def humor_chart_html(humor_data):
+    """유머 매트릭스 값만 담은 HTML 조각"""
+    values = humor_values(humor_data)
+    if values is None:
+        return ""
+    return _chart_html({"kind": "humor", "labels": HUMOR_LABELS, "colors": HUMOR_COLORS,
+                        "values": [round(v, 1) for v in values]})
+
+
+def radar_chart_html(persona):
+    """성격 레이더 값만 담은 HTML 조각"""
+    pairs = radar_values(persona)
+    if pairs is None:
+        return ""
+    return _chart_html({"kind": "radar", "labels": [label for label, _ in pairs],
+                        "values": [value for _, value in pairs]})
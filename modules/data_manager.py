@@ -13,33 +13,43 @@ CONVERSATIONS_DIR = os.path.join(DATA_DIR, "conversations")
 for directory in [DATA_DIR, PERSONAS_DIR, CONVERSATIONS_DIR]:
     os.makedirs(directory, exist_ok=True)
 
-def save_persona(persona):
-    """페르소나 객체를 JSON 파일로 저장"""
+def save_persona(persona, filename=None):
+    """페르소나 객체를 JSON 파일로 저장 (filename 지정 시 해당 파일명으로 저장/덮어쓰기)"""
     if not persona or "기본정보" not in persona:
         return None
     
     # 저장 디렉토리 확인
     os.makedirs(PERSONAS_DIR, exist_ok=True)
     
-    # 파일명 생성 (이름_타입_타임스탬프.json)
-    name = persona.get("기본정보", {}).get("이름", "unknown")
-    object_type = persona.get("기본정보", {}).get("유형", "unknown")
-    timestamp = int(time.time())
-    
-    # 공백이나 특수문자 처리
-    name = name.replace(" ", "_").replace("/", "_").replace("\\", "_")
-    object_type = object_type.replace(" ", "_").replace("/", "_").replace("\\", "_")
-    
-    filename = f"{name}_{object_type}_{timestamp}.json"
+    if filename:
+        # 경로 조작 방지
+        filename = os.path.basename(filename)
+        if not filename.endswith(".json"):
+            filename += ".json"
+    else:
+        # 파일명 생성 (이름_타입_타임스탬프.json)
+        name = persona.get("기본정보", {}).get("이름", "unknown")
+        object_type = persona.get("기본정보", {}).get("유형", "unknown")
+        timestamp = int(time.time())
+        
+        # 공백이나 특수문자 처리
+        name = name.replace(" ", "_").replace("/", "_").replace("\\", "_")
+        object_type = object_type.replace(" ", "_").replace("/", "_").replace("\\", "_")
+        
+        filename = f"{name}_{object_type}_{timestamp}.json"
     filepath = os.path.join(PERSONAS_DIR, filename)
     
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(persona, f, ensure_ascii=False, indent=2)
-        return filepath
     except Exception as e:
         print(f"페르소나 저장 오류: {str(e)}")
         return None
+    
+    # 근접 검색 인덱스에 한 행 추가/갱신 (numpy 는 처음 저장할 때 로드)
+    from modules.persona_index import index_persona
+    index_persona(filepath, persona)
+    return filepath
 
 def load_persona(filepath):
     """JSON 파일에서 페르소나 객체 로드"""
@@ -51,6 +61,21 @@ def load_persona(filepath):
         print(f"페르소나 로드 오류: {str(e)}")
         return None
 
+def delete_persona(filename):
+    """저장된 페르소나 파일 삭제 (인덱스에서도 제외) → 삭제했으면 True"""
+    filepath = os.path.join(PERSONAS_DIR, os.path.basename(filename))
+    try:
+        os.remove(filepath)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"페르소나 삭제 오류: {str(e)}")
+        return False
+    
+    from modules.persona_index import unindex_persona
+    unindex_persona(filepath)
+    return True
+
 def list_personas():
     """저장된 모든 페르소나 목록 반환"""
     try:
@@ -136,9 +161,8 @@ def toggle_frontend_backend_view(persona):
     if not persona:
         return None, None
     
-    # 원본 데이터 복사
-    import copy
-    frontend_persona = copy.deepcopy(persona)
-    backend_persona = copy.deepcopy(persona)
+    # 섹션은 제자리에서 수정하지 않으므로 얕은 복사로 충분 (modules/persona_state.py 참고)
+    frontend_persona = dict(persona)
+    backend_persona = dict(persona)
     
     return frontend_persona, backend_persona 
\ No newline at end of file
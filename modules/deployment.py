@@ -0,0 +1,144 @@
+"""
+배포 프로필 (Gradio 대기열/동시 실행 설정)
+
+이벤트를 비용에 따라 동시 실행 그룹으로 나눈다.
+- generation: 이미지 분석·페르소나 생성/확정/조정 (LLM 호출이 길고 무거움)
+- chat: 대화 응답
+- preview: 성격 미리보기 버튼
+- cheap: 초기화·내보내기·차트·불러오기 같은 가벼운 이벤트 → 제한 없음 (LLM 호출 뒤에 줄 서지 않음)
+
+DEPLOYMENT_PROFILE 로 프로필을 고르고 (auto: CPU 수로 선택), 개별 값은 환경변수로 덮어쓴다.
+    QUEUE_MAX_SIZE, DEFAULT_CONCURRENCY_LIMIT, MAX_THREADS,
+    CONCURRENCY_GENERATION, CONCURRENCY_CHAT, CONCURRENCY_PREVIEW   ("none" 이면 제한 없음)
+"""
+import os
+
+CHEAP = "cheap"
+LIMITED_GROUPS = ("generation", "chat", "preview")
+
+# LLM 호출은 대부분 네트워크 대기이므로 그룹 한도는 코어 수보다 API 속도 제한에 맞춰 정한다
+PROFILES = {
+    # 무료 Hugging Face Space 같은 1~2 vCPU 환경
+    "single-cpu": {
+        "queue_max_size": 32,
+        "default_concurrency_limit": 1,
+        "max_threads": 16,
+        "generation": 1,
+        "chat": 2,
+        "preview": 1,
+    },
+    # 여러 코어의 컨테이너/서버 (CPU 수에 비례)
+    "multi-core": {
+        "queue_max_size": 256,
+        "default_concurrency_limit": 4,
+        "max_threads": 64,
+        "generation": "cpu/2",
+        "chat": "cpu*2",
+        "preview": "cpu",
+    },
+    # Gradio 기본값 그대로 (기존 동작)
+    "gradio": {
+        "queue_max_size": None,
+        "default_concurrency_limit": 1,
+        "max_threads": 40,
+        "generation": 1,
+        "chat": 1,
+        "preview": 1,
+    },
+}
+
+_ENV_OVERRIDES = {
+    "queue_max_size": "QUEUE_MAX_SIZE",
+    "default_concurrency_limit": "DEFAULT_CONCURRENCY_LIMIT",
+    "max_threads": "MAX_THREADS",
+    "generation": "CONCURRENCY_GENERATION",
+    "chat": "CONCURRENCY_CHAT",
+    "preview": "CONCURRENCY_PREVIEW",
+}
+
+
+def _resolve(value, cpus):
+    """프로필 값 → 정수 (None 은 제한 없음, "cpu/2"·"cpu*2" 같은 식은 CPU 수 기준)"""
+    if value is None or isinstance(value, int):
+        return value
+    text = str(value).strip().lower()
+    if text in ("", "none", "unlimited"):
+        return None
+    if text.startswith("cpu"):
+        rest = text[3:]
+        if rest.startswith("/"):
+            return max(1, cpus // int(rest[1:]))
+        if rest.startswith("*"):
+            return max(1, cpus * int(rest[1:]))
+        return max(1, cpus)
+    return max(1, int(text))
+
+
+def profile_name():
+    """DEPLOYMENT_PROFILE (기본 auto: CPU 2개 이하면 single-cpu, 아니면 multi-core)"""
+    name = os.getenv("DEPLOYMENT_PROFILE", "auto").strip().lower()
+    if name == "auto":
+        return "single-cpu" if (os.cpu_count() or 1) <= 2 else "multi-core"
+    if name not in PROFILES:
+        print(f"⚠️ 알 수 없는 배포 프로필 '{name}' - single-cpu 사용 (선택 가능: {', '.join(PROFILES)})")
+        return "single-cpu"
+    return name
+
+
+def load_profile(name=None):
+    """프로필 + 환경변수 덮어쓰기 → 정수로 정리된 설정 dict"""
+    name = name or profile_name()
+    cpus = os.cpu_count() or 1
+    settings = {"name": name}
+    for key, value in PROFILES[name].items():
+        override = os.getenv(_ENV_OVERRIDES[key])
+        try:
+            settings[key] = _resolve(override if override is not None else value, cpus)
+        except ValueError:
+            print(f"⚠️ {_ENV_OVERRIDES[key]}={override} 값이 올바르지 않아 프로필 값 사용")
+            settings[key] = _resolve(value, cpus)
+    return settings
+
+
+def event_options(group, profile):
+    """이벤트 등록용 인자 - 같은 그룹은 concurrency_id 로 한도를 함께 쓴다"""
+    if group == CHEAP:
+        return {"concurrency_limit": None}
+    limit = profile.get(group)
+    if limit is None:
+        return {"concurrency_limit": None}
+    return {"concurrency_limit": limit, "concurrency_id": group}
+
+
+def queue_options(profile):
+    """Blocks.queue() 인자"""
+    return {"max_size": profile["queue_max_size"],
+            "default_concurrency_limit": profile["default_concurrency_limit"]}
+
+
+def launch_options(profile):
+    """Blocks.launch() 에 더할 인자"""
+    return {"max_threads": profile["max_threads"]}
+
+
+def apply_thread_limit(blocks, profile, api=None):
+    """
+    launch() 없이 FastAPI 에 붙여 띄울 때(mount_gradio_app) launch_options 의 max_threads 를 직접 적용
+    api 를 주면 API 의 동기 엔드포인트가 쓰는 anyio 기본 스레드 한도도 같은 값으로 맞춘다.
+    """
+    max_threads = profile["max_threads"]
+    blocks.max_threads = max_threads
+    queue = getattr(blocks, "_queue", None)
+    if queue is not None:
+        queue.max_thread_count = max_threads
+    if api is not None:
+        async def limit_api_threads():
+            import anyio.to_thread
+            anyio.to_thread.current_default_thread_limiter().total_tokens = max_threads
+        api.router.on_startup.append(limit_api_threads)
+
+
+def describe(profile):
+    groups = ", ".join(f"{group}={profile[group] or '∞'}" for group in LIMITED_GROUPS)
+    return (f"🚦 배포 프로필 {profile['name']}: 대기열 {profile['queue_max_size'] or '∞'}, "
+            f"기본 동시 실행 {profile['default_concurrency_limit']}, 스레드 {profile['max_threads']}, {groups}")
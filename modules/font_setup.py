@@ -0,0 +1,147 @@
+"""
+matplotlib 한글 폰트 설정
+
+폰트 선택 결과는 프로세스 안에서 캐시하고, 파일(KOREAN_FONT_CACHE 또는
+$MPLCONFIGDIR/korean_font.json)에도 저장하여 다음 시작 때 폰트 목록 스캔을 건너뛴다.
+도커 이미지 빌드 시 미리 캐시 생성:
+    python -m modules.font_setup --warmup
+"""
+import os
+import json
+import argparse
+import threading
+
+# 한글 표시가 가능한 폰트 우선순위 (허깅페이스 스페이스/도커 이미지 기준)
+KOREAN_FONT_CANDIDATES = [
+    'NanumGothic', 'NanumBarunGothic', 'Noto Sans CJK KR',
+    'Noto Sans KR', 'DejaVu Sans', 'Liberation Sans', 'Arial'
+]
+FALLBACK_FONT = 'DejaVu Sans'
+FONT_CACHE_FILENAME = "korean_font.json"
+
+_resolved_font = None
+_applied = False
+_lock = threading.Lock()
+
+
+def font_cache_path():
+    """폰트 선택 결과 저장 위치"""
+    explicit = os.getenv("KOREAN_FONT_CACHE")
+    if explicit:
+        return explicit
+    config_dir = os.getenv("MPLCONFIGDIR") or os.path.join(os.path.expanduser("~"), ".cache", "nompang")
+    return os.path.join(config_dir, FONT_CACHE_FILENAME)
+
+
+def _load_persisted_font():
+    """저장된 폰트 선택 결과 (폰트 파일이 그대로 있을 때만 사용)"""
+    path = font_cache_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    font_name = record.get("font")
+    font_file = record.get("file")
+    if not font_name or (font_file and not os.path.exists(font_file)):
+        return None
+    return font_name
+
+
+def _persist_font(font_name, font_file=None):
+    path = font_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"font": font_name, "file": font_file}, f, ensure_ascii=False)
+    except OSError as e:
+        # 읽기 전용 이미지 등에서는 저장하지 않고 계속 진행
+        print(f"⚠️ 폰트 선택 결과 저장 실패: {e}")
+
+
+def _scan_korean_font():
+    """시스템 폰트 목록에서 우선순위가 가장 높은 폰트 찾기 → (이름, 파일 경로)"""
+    import matplotlib.font_manager as fm
+    fonts_by_name = {}
+    for font in fm.fontManager.ttflist:
+        fonts_by_name.setdefault(font.name, font.fname)
+    for name in KOREAN_FONT_CANDIDATES:
+        if name in fonts_by_name:
+            return name, fonts_by_name[name]
+    return FALLBACK_FONT, None
+
+
+def resolve_korean_font():
+    """사용할 폰트 이름 결정 (메모리 캐시 → 저장된 결과 → 폰트 목록 스캔 순)"""
+    global _resolved_font
+    if _resolved_font is not None:
+        return _resolved_font
+    with _lock:
+        if _resolved_font is None:
+            font_name = _load_persisted_font()
+            if font_name is None:
+                try:
+                    font_name, font_file = _scan_korean_font()
+                    # 한글 폰트를 못 찾은 결과는 저장하지 않음 (나중에 폰트를 설치하면 바로 반영)
+                    if font_name != FALLBACK_FONT:
+                        _persist_font(font_name, font_file)
+                except Exception as e:
+                    print(f"폰트 설정 오류: {str(e)}")
+                    font_name = FALLBACK_FONT
+            _resolved_font = font_name
+    return _resolved_font
+
+
+def setup_korean_font(force=False):
+    """matplotlib 한글 폰트 설정 - 결과를 캐시하여 반복 호출 비용 없음"""
+    global _applied
+    if _applied and not force:
+        return _resolved_font
+    import matplotlib.pyplot as plt
+
+    font_name = resolve_korean_font()
+    plt.rcParams['font.family'] = font_name
+    plt.rcParams['axes.unicode_minus'] = False
+    if font_name == FALLBACK_FONT:
+        print("한글 폰트를 찾지 못해 영어 레이블을 사용합니다")
+    else:
+        print(f"한글 폰트 설정 완료: {font_name}")
+    _applied = True
+    return font_name
+
+
+def warmup():
+    """빌드 시점 예열: matplotlib 폰트 캐시 생성, 폰트 선택 결과 저장, 한글 글리프 렌더링"""
+    global _resolved_font
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    # 저장된 결과를 무시하고 현재 이미지의 폰트로 다시 결정
+    font_name, font_file = _scan_korean_font()
+    _persist_font(font_name, font_file)
+    _resolved_font = font_name
+    setup_korean_font(force=True)
+
+    fig, ax = plt.subplots(figsize=(2, 1))
+    ax.set_title("성격 차트 예열" if font_name != FALLBACK_FONT else "warmup")
+    fig.canvas.draw()
+    plt.close(fig)
+    print(f"✅ 폰트 캐시 예열 완료: {font_name} (matplotlib 설정 경로: {matplotlib.get_configdir()}, "
+          f"폰트 선택 저장: {font_cache_path()})")
+    return font_name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="matplotlib 한글 폰트 설정/캐시 예열")
+    parser.add_argument("--warmup", action="store_true", help="폰트 캐시를 미리 생성 (도커 빌드용)")
+    args = parser.parse_args(argv)
+    if args.warmup:
+        warmup()
+    else:
+        print(resolve_korean_font())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+import os
+import time
+import importlib
+import threading
+
+# 프로세스 시작 기준 시각 (이 모듈을 가장 먼저 import 하면 앱 시작 시각과 거의 같다)
+_STARTED = time.perf_counter()
+_marks = []            # (단계 이름, 시작 후 경과 초)
+_lazy_loads = []       # (모듈 이름, import 소요 초, 시작 후 경과 초)
+_lock = threading.Lock()
+
+
+def lazy_imports_enabled():
+    """LAZY_IMPORTS=0 이면 무거운 모듈을 즉시 import (기존 동작)"""
+    return os.getenv("LAZY_IMPORTS", "1").lower() not in ("0", "false", "no", "off")
+
+
+def profile_enabled():
+    return os.getenv("STARTUP_PROFILE", "0").lower() in ("1", "true", "yes", "on")
+
+
+class LazyModule:
+    """첫 속성 접근 시점에 실제 모듈을 import 하는 대리 객체"""
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        module = object.__getattribute__(self, "_module")
+        if module is None:
+            name = object.__getattribute__(self, "_name")
+            with _lock:
+                module = object.__getattribute__(self, "_module")
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(name)
+                    finished = time.perf_counter()
+                    _lazy_loads.append((name, finished - started, finished - _STARTED))
+                    object.__setattr__(self, "_module", module)
+                    if profile_enabled():
+                        print(f"⏱️ 지연 import: {name} ({(finished - started) * 1000:.0f}ms)")
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        module = object.__getattribute__(self, "_module")
+        state = "loaded" if module is not None else "not loaded"
+        return f"<LazyModule {object.__getattribute__(self, '_name')} ({state})>"
+
+
+def lazy_import(name):
+    """지연 import 모드면 LazyModule, 아니면 즉시 import 한 모듈 반환"""
+    if lazy_imports_enabled():
+        return LazyModule(name)
+    return importlib.import_module(name)
+
+
+def is_loaded(module):
+    """LazyModule 이 실제로 import 되었는지 여부 (일반 모듈은 항상 True)"""
+    if isinstance(module, LazyModule):
+        return object.__getattribute__(module, "_module") is not None
+    return True
+
+
+def mark(label):
+    """시작 후 경과 시간 기록 (STARTUP_PROFILE 리포트용)"""
+    _marks.append((label, time.perf_counter() - _STARTED))
+
+
+def report_import_profile():
+    """시작 단계별 경과 시간과 지연 import 내역 출력"""
+    if not profile_enabled():
+        return
+    print("⏱️ 시작 프로파일 (프로세스 시작 후 경과)")
+    previous = 0.0
+    for label, elapsed in _marks:
+        print(f"   {label:<28} {elapsed * 1000:8.0f}ms  (+{(elapsed - previous) * 1000:.0f}ms)")
+        previous = elapsed
+    if _lazy_loads:
+        print("   지연 import (첫 사용 시점):")
+        for name, duration, elapsed in _lazy_loads:
+            print(f"   - {name:<26} {duration * 1000:8.0f}ms  (시작 후 {elapsed:.1f}s)")
+    else:
+        print("   지연 import: 아직 없음")
@@ -0,0 +1,206 @@
+"""
+사물 생애 스토리 템플릿 (life_story_templates.json)
+
+시간/장소/용도별 서사 표는 데이터 파일에 두고 한 번만 읽어서 읽기 전용 구조로 보관한다.
+(함께한 시간 × 장소 × 용도) 조합별 생애 스토리 조각은 읽을 때 미리 합쳐 두므로,
+페르소나 생성 시에는 조회 몇 번과 복사만 하면 된다.
+파일이 바뀌면 다음 조회 때 다시 읽는다 (Space 재시작 불필요).
+"""
+import os
+import re
+import json
+import time
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+DEFAULT_TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                      "life_story_templates.json")
+
+# 생애 스토리 조각 (모든 목록은 튜플)
+StoryFragment = namedtuple("StoryFragment", [
+    "arrival_moment", "relationship_depth", "accumulated_memories", "daily_environment",
+    "current_state", "inner_complaints", "deep_satisfactions", "secret_wishes",
+    "unique_perspectives", "relationship_insights",
+])
+
+PurposeRule = namedtuple("PurposeRule", ["name", "pattern", "story"])
+
+
+def templates_path():
+    return os.getenv("LIFE_STORY_TEMPLATES", DEFAULT_TEMPLATES_PATH)
+
+
+def _freeze(value):
+    """JSON 값 → 읽기 전용 구조 (dict → MappingProxyType, list → tuple)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """읽기 전용 구조 → 페르소나에 넣을 새 dict/list"""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class LifeStoryTemplates:
+    """한 번 읽은 생애 스토리 표와 미리 합친 조각"""
+
+    def __init__(self, data):
+        self.version = data.get("version", 1)
+        self.time = _freeze(data["time"])
+        self.location = _freeze(data["location"])
+        self.default_time = data["defaults"]["time"]
+        self.default_location = data["defaults"]["location"]
+        self.default_wishes = _freeze(data.get("default_wishes", []))
+        self.purposes = tuple(
+            PurposeRule(rule["name"], re.compile("|".join(re.escape(k) for k in rule["keywords"])), _freeze(rule["story"]))
+            for rule in data.get("purposes", [])
+        )
+        self.purpose_default = _freeze(data.get("purpose_default", {}))
+
+        # (함께한 시간, 장소, 용도 이름) 조합별 조각 미리 생성 - 용도 없음은 None
+        purpose_names = [None] + [rule.name for rule in self.purposes] + ["기본"]
+        self.fragments = MappingProxyType({
+            (time_key, location_key, purpose_name): self._compose(time_key, location_key, purpose_name)
+            for time_key in self.time
+            for location_key in self.location
+            for purpose_name in purpose_names
+        })
+
+    def purpose_story(self, purpose_name):
+        if purpose_name is None:
+            return MappingProxyType({})
+        for rule in self.purposes:
+            if rule.name == purpose_name:
+                return rule.story
+        return self.purpose_default
+
+    def match_purpose(self, purpose):
+        """용도 문장 → 용도 이름 (없으면 None, 어느 것에도 해당하지 않으면 '기본')"""
+        if not purpose:
+            return None
+        purpose_lower = purpose.lower()
+        for rule in self.purposes:
+            if rule.pattern.search(purpose_lower):
+                return rule.name
+        return "기본"
+
+    def _compose(self, time_key, location_key, purpose_name):
+        time_story = self.time[time_key]
+        purpose_story = self.purpose_story(purpose_name)
+        return StoryFragment(
+            arrival_moment=time_story["arrival_story"],
+            relationship_depth=time_story["relationship_level"],
+            accumulated_memories=time_story["memories"] + purpose_story.get("unique_memories", ()),
+            daily_environment=self.location[location_key],
+            current_state=time_story["emotional_state"],
+            inner_complaints=time_story["complaints"] + purpose_story.get("complaints", ()),
+            deep_satisfactions=time_story["satisfactions"] + purpose_story.get("satisfactions", ()),
+            secret_wishes=purpose_story.get("wishes", self.default_wishes),
+            unique_perspectives=purpose_story.get("perspectives", ()),
+            relationship_insights=time_story["insights"],
+        )
+
+    def fragment(self, time_spent, location, purpose):
+        time_key = time_spent if time_spent in self.time else self.default_time
+        location_key = location if location in self.location else self.default_location
+        return self.fragments[(time_key, location_key, self.match_purpose(purpose))]
+
+    def insights(self, time_spent):
+        return _thaw(self.time.get(time_spent, self.time[self.default_time])["insights"])
+
+
+class _TemplateStore:
+    """파일 변경 시각을 확인해 바뀌었으면 다시 읽는 템플릿 저장소"""
+
+    def __init__(self, check_interval=None):
+        if check_interval is None:
+            check_interval = float(os.getenv("LIFE_STORY_RELOAD_INTERVAL", "2"))
+        self.check_interval = check_interval
+        self._templates = None
+        self._loaded = (None, None)  # (경로, 수정 시각)
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return LifeStoryTemplates(json.load(f))
+
+    def get(self):
+        now = time.monotonic()
+        if self._templates is not None and now - self._checked_at < self.check_interval:
+            return self._templates
+        with self._lock:
+            self._checked_at = now
+            path = templates_path()
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError as e:
+                if self._templates is None:
+                    raise
+                print(f"⚠️ 생애 스토리 템플릿 확인 실패, 이전 템플릿 사용: {e}")
+                return self._templates
+            if self._templates is None or self._loaded != (path, mtime):
+                try:
+                    self._templates = self._load(path)
+                    self._loaded = (path, mtime)
+                except (ValueError, KeyError, TypeError) as e:
+                    if self._templates is None:
+                        raise
+                    print(f"⚠️ 생애 스토리 템플릿 다시 읽기 실패, 이전 템플릿 유지: {e}")
+                    self._loaded = (path, mtime)
+            return self._templates
+
+    def reload(self):
+        """변경 시각과 상관없이 즉시 다시 읽기"""
+        with self._lock:
+            self._loaded = (None, None)
+            self._checked_at = 0.0
+        return self.get()
+
+
+_store = _TemplateStore()
+
+
+def get_templates():
+    return _store.get()
+
+
+def reload_templates():
+    return _store.reload()
+
+
+def compose_life_story(time_spent, location, purpose):
+    """함께한 시간/장소/용도 → 생애 스토리 dict (relationship_insights 포함)"""
+    fragment = get_templates().fragment(time_spent, location, purpose)
+    return {
+        "arrival_moment": fragment.arrival_moment,
+        "relationship_depth": fragment.relationship_depth,
+        "accumulated_memories": list(fragment.accumulated_memories),
+        "daily_environment": _thaw(fragment.daily_environment),
+        "emotional_journey": {
+            "current_state": fragment.current_state,
+            "inner_complaints": list(fragment.inner_complaints),
+            "deep_satisfactions": list(fragment.deep_satisfactions),
+            "secret_wishes": list(fragment.secret_wishes),
+        },
+        "unique_perspectives": list(fragment.unique_perspectives),
+        "relationship_insights": _thaw(fragment.relationship_insights),
+    }
+
+
+def purpose_story(purpose):
+    """용도 문장 → 용도별 스토리 dict (용도가 없으면 빈 dict)"""
+    templates = get_templates()
+    return _thaw(templates.purpose_story(templates.match_purpose(purpose)))
+
+
+def relationship_insights(time_spent):
+    return get_templates().insights(time_spent)
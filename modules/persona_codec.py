@@ -0,0 +1,143 @@
+"""
+페르소나 압축 전송 형식 (내보내기/가져오기)
+
+- 다시 만들 수 있는 필드(구조화프롬프트, 성격변수127 사본)는 저장하지 않는다
+- 성격프로필 변수는 PersonalityProfile.DEFAULTS 순서의 정수 배열로 저장한다
+- 선택적으로 gzip / zstd(zstandard 설치 시)로 압축한다
+가져올 때는 배열만 dict 로 되돌리고, 구조화프롬프트는 필요해지는 시점에 다시 생성한다.
+기존 전체 형식 JSON 도 그대로 읽는다.
+"""
+import os
+import gzip
+import json
+import hashlib
+
+from modules.persona_generator import PersonalityProfile
+
+# zstd 압축 지원 (선택)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+FORMAT_NAME = "nompang-compact"
+FORMAT_VERSION = 1
+
+# 저장하지 않는 필드 (다른 필드로부터 다시 만들 수 있음)
+DERIVED_FIELDS = ("구조화프롬프트", "성격변수127")
+
+PACKED_VARIABLES = tuple(PersonalityProfile.DEFAULTS)
+# 변수 순서가 바뀌면 예전 배열을 잘못 해석하지 않도록 순서 지문을 함께 저장
+PACKED_VARIABLES_ID = hashlib.sha256("\n".join(PACKED_VARIABLES).encode("utf-8")).hexdigest()[:12]
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def export_format():
+    """PERSONA_EXPORT_FORMAT: compact(기본) / full(기존 indent=2 JSON)"""
+    return "full" if os.getenv("PERSONA_EXPORT_FORMAT", "compact").lower() == "full" else "compact"
+
+
+def export_compression():
+    compression = os.getenv("PERSONA_EXPORT_COMPRESSION", "none").lower()
+    if compression == "zstd" and not ZSTD_AVAILABLE:
+        print("⚠️ zstandard 패키지가 없어 gzip 으로 압축합니다.")
+        return "gzip"
+    return compression if compression in COMPRESSIONS else "none"
+
+
+def is_compact(data):
+    return isinstance(data, dict) and data.get("_format") == FORMAT_NAME
+
+
+def _pack_variables(variables):
+    packed = [variables.get(name, PersonalityProfile.DEFAULTS[name]) for name in PACKED_VARIABLES]
+    extra = {name: value for name, value in variables.items() if name not in PersonalityProfile.DEFAULTS}
+    return packed, extra
+
+
+def encode_persona(persona):
+    """전체 페르소나 → 압축 형식 dict"""
+    compact = {"_format": FORMAT_NAME, "_v": FORMAT_VERSION}
+    for key, value in persona.items():
+        if key in DERIVED_FIELDS or callable(value):
+            continue
+        if key == "성격프로필" and isinstance(value, dict):
+            packed, extra = _pack_variables(value)
+            compact["_vars"] = {"id": PACKED_VARIABLES_ID, "values": packed}
+            if extra:
+                compact["_vars"]["extra"] = extra
+            continue
+        compact[key] = value
+    return compact
+
+
+def decode_persona(data):
+    """압축 형식 dict → 페르소나 (기존 전체 형식은 그대로 반환)"""
+    if not is_compact(data):
+        return data
+    if data.get("_v", 0) > FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 페르소나 형식 버전: {data.get('_v')}")
+
+    persona = {key: value for key, value in data.items() if not key.startswith("_")}
+    packed = data.get("_vars")
+    if packed:
+        if packed.get("id") != PACKED_VARIABLES_ID or len(packed["values"]) != len(PACKED_VARIABLES):
+            raise ValueError("성격 변수 배열 형식이 현재 버전과 맞지 않습니다.")
+        variables = dict(zip(PACKED_VARIABLES, packed["values"]))
+        variables.update(packed.get("extra", {}))
+        persona["성격프로필"] = variables
+    return persona
+
+
+def dumps_persona(persona, compact=True, compression="none"):
+    """페르소나 → 파일 바이트"""
+    if compact:
+        text = json.dumps(encode_persona(persona), ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(persona, ensure_ascii=False, indent=2)
+    raw = text.encode("utf-8")
+    if compression == "gzip":
+        return gzip.compress(raw, mtime=0)
+    if compression == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard 패키지가 설치되지 않았습니다.")
+        return zstandard.ZstdCompressor().compress(raw)
+    return raw
+
+
+def loads_persona(raw):
+    """파일 바이트 → 페르소나 (압축 여부와 형식 자동 판별)"""
+    if raw.startswith(_GZIP_MAGIC):
+        raw = gzip.decompress(raw)
+    elif raw.startswith(_ZSTD_MAGIC):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd 로 압축된 파일입니다. pip install zstandard 로 설치하세요.")
+        raw = zstandard.ZstdDecompressor().decompress(raw)
+    return decode_persona(json.loads(raw.decode("utf-8")))
+
+
+def file_extension(compression):
+    return {"gzip": ".json.gz", "zstd": ".json.zst"}.get(compression, ".json")
+
+
+def write_persona_file(persona, path, compact=True, compression="none"):
+    with open(path, "wb") as f:
+        f.write(dumps_persona(persona, compact=compact, compression=compression))
+    return path
+
+
+def read_persona_file(path):
+    with open(path, "rb") as f:
+        return loads_persona(f.read())
+
+
+def ensure_structured_prompt(persona, generator):
+    """가져온 페르소나에 구조화프롬프트가 필요해지면 그때 다시 생성"""
+    if persona and "구조화프롬프트" not in persona and "성격프로필" in persona and generator:
+        persona = dict(persona)
+        persona["구조화프롬프트"] = generator.generate_persona_prompt(persona)
+    return persona
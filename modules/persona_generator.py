@@ -2,19 +2,43 @@ import os
 import json
 import random
 import datetime
-import google.generativeai as genai
+import importlib.util
 from dotenv import load_dotenv
 from PIL import Image
 import io
 from typing import Dict, List, Any, Optional
 import re
-
-# OpenAI API 지원 추가
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+import copy
+import uuid
+import threading
+from functools import lru_cache
+
+from modules.lazy_imports import lazy_import
+from modules.rate_limiter import (
+    PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BACKGROUND,
+    get_rate_limiter, estimate_tokens, rate_limit_enabled
+)
+from modules.single_flight import SingleFlight, image_digest, request_key
+from modules.life_story import compose_life_story, purpose_story, relationship_insights
+from modules.persona_rules import base_personality_type, compile_persona, message_features, analyze_message
+from modules.semantic_memory import SemanticMemory, retrieval_mode
+from modules.rolling_summary import RollingSummarizer, extractive_summary, SUMMARY_MAX_CHARS
+from modules.background_jobs import get_job_runner, background_jobs_enabled
+from modules.state_backend import get_state_backend
+from modules.structured_output import (
+    IMAGE_ANALYSIS_SCHEMA, ATTRACTIVE_FLAWS_SCHEMA, CONTRADICTIONS_SCHEMA, PERSONA_ENRICHMENT_SCHEMA,
+    StructuredOutputError, generate_structured, generate_structured_fields,
+    json_instruction, to_provider_schema, is_api_error
+)
+
+# SDK 는 첫 API 호출 시점에 import (앱 시작 시간 단축)
+genai = lazy_import("google.generativeai")
+
+# OpenAI API 지원 추가 (설치 여부만 먼저 확인)
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+if OPENAI_AVAILABLE:
+    openai = lazy_import("openai")
+else:
     print("OpenAI 패키지가 설치되지 않았습니다. pip install openai로 설치하세요.")
 
 # Load environment variables
@@ -24,11 +48,36 @@ load_dotenv()
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
-if gemini_api_key:
-    genai.configure(api_key=gemini_api_key)
+_genai_configured_key = None
+
+
+def _configure_genai(api_key):
+    """genai.configure 를 실제 호출 직전에, 키가 바뀐 경우에만 실행"""
+    global _genai_configured_key
+    if api_key and api_key != _genai_configured_key:
+        genai.configure(api_key=api_key)
+        _genai_configured_key = api_key
+
+# 원샷 보강 대상: 페르소나 키 → 구조화 응답 필드
+ENRICHMENT_FIELDS = {
+    "매력적결함": "attractive_flaws",
+    "모순적특성": "contradictions",
+    "생애스토리": "life_story",
+    "인사말": "greeting",
+}
+
+def enrichment_mode():
+    """창의적 필드 생성 방식: oneshot(한 번의 호출, 기본) / separate(필드별 개별 호출)"""
+    return os.getenv("PERSONA_ENRICHMENT_MODE", "oneshot").strip().lower()
 
-if openai_api_key and OPENAI_AVAILABLE:
-    openai.api_key = openai_api_key
+def _gemini_json_config(response_schema):
+    """구조화 출력용 Gemini generation_config (스키마가 없으면 None)"""
+    if not response_schema:
+        return None
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": to_provider_schema(response_schema)
+    }
 
 class ConversationMemory:
     """
@@ -38,29 +87,79 @@ class ConversationMemory:
     - 브라우저 기반 저장소 활용
     """
     
-    def __init__(self):
+    def __init__(self, backend=None):
         self.conversations = []  # 전체 대화 기록
         self.keywords = {}       # 추출된 키워드들
         self.user_profile = {}   # 사용자 프로필
         self.relationship_data = {}  # 관계 발전 데이터
+        self.semantic = SemanticMemory()  # 의미 기반 검색용 세션별 벡터 인덱스
+        # 공유 상태 저장소(sqlite/redis)면 세션별 대화 로그를 다른 프로세스와 함께 쓴다
+        self.backend = backend if backend is not None and backend.shared else None
+        self._synced = {}      # 세션 → 이미 반영한 공유 로그 길이
+        self._known_ids = {}   # 세션 → 로컬에 있는 대화 entry_id
+        self._sync_lock = threading.RLock()
         
     def add_conversation(self, user_message, ai_response, session_id="default"):
         """새로운 대화 추가"""
-        conversation_entry = {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "session_id": session_id,
-            "user_message": user_message,
-            "ai_response": ai_response,
-            "keywords": self._extract_keywords(user_message),
-            "sentiment": self._analyze_sentiment(user_message),
-            "conversation_id": len(self.conversations)
-        }
-        
+        with self._sync_lock:
+            self._sync_session(session_id)
+            conversation_entry = {
+                "timestamp": datetime.datetime.now().isoformat(),
+                "session_id": session_id,
+                "user_message": user_message,
+                "ai_response": ai_response,
+                "keywords": self._extract_keywords(user_message),
+                "sentiment": self._analyze_sentiment(user_message),
+                "conversation_id": len(self.conversations)
+            }
+            
+            if self.backend is not None:
+                conversation_entry["entry_id"] = uuid.uuid4().hex
+                try:
+                    length = self.backend.append("conversations", session_id, conversation_entry,
+                                                 max_items=int(os.getenv("STATE_CONVERSATION_MAX", "500")),
+                                                 ttl=int(os.getenv("STATE_CONVERSATION_TTL", "2592000")))
+                    self._known_ids.setdefault(session_id, set()).add(conversation_entry["entry_id"])
+                    # 그 사이 다른 프로세스가 추가한 대화가 없으면 바로 동기화된 것으로 처리
+                    if length == self._synced.get(session_id, 0) + 1:
+                        self._synced[session_id] = length
+                except Exception as e:
+                    print(f"⚠️ 공유 대화 기억 저장 실패 (이 프로세스에만 저장): {str(e)}")
+            
+            self._apply_conversation(conversation_entry)
+            return conversation_entry
+    
+    def _apply_conversation(self, conversation_entry):
+        """대화 한 개를 로컬 기록/검색 인덱스/키워드/프로필에 반영"""
         self.conversations.append(conversation_entry)
+        self._index_conversation(len(self.conversations) - 1, conversation_entry)
         self._update_keywords(conversation_entry["keywords"])
-        self._update_user_profile(user_message, session_id)
-        
-        return conversation_entry
+        self._update_user_profile(conversation_entry["user_message"], conversation_entry["session_id"])
+    
+    def _sync_session(self, session_id):
+        """다른 프로세스가 공유 저장소에 추가한 이 세션의 대화를 가져와 반영"""
+        if self.backend is None:
+            return
+        with self._sync_lock:
+            start = self._synced.get(session_id, 0)
+            try:
+                length = self.backend.length("conversations", session_id)
+                if length < start:
+                    # 만료된 뒤 새로 시작된 로그 - 처음부터 다시 읽음 (이미 있는 대화는 entry_id 로 건너뜀)
+                    start = 0
+                entries = self.backend.items("conversations", session_id, start=start) if length > start else []
+            except Exception as e:
+                print(f"⚠️ 공유 대화 기억 동기화 실패: {str(e)}")
+                return
+            known = self._known_ids.setdefault(session_id, set())
+            for entry in entries:
+                if entry.get("entry_id") in known:
+                    continue
+                known.add(entry.get("entry_id"))
+                entry["conversation_id"] = len(self.conversations)
+                self._apply_conversation(entry)
+            # 읽는 사이 추가된 항목은 다음 동기화에서 다시 받아도 entry_id 로 건너뜀
+            self._synced[session_id] = length
     
     def _extract_keywords(self, text):
         """텍스트에서 키워드 추출"""
@@ -168,13 +267,16 @@ class ConversationMemory:
         else:
             profile["relationship_level"] = "친밀한_관계"
     
-    def get_relevant_context(self, current_message, session_id="default", max_history=5):
-        """현재 메시지와 관련된 컨텍스트 반환"""
-        # 현재 메시지의 키워드 추출
-        current_keywords = self._extract_keywords(current_message)
-        current_words = [kw["word"] for kw in current_keywords]
-        
-        # 관련 과거 대화 찾기
+    def _index_conversation(self, position, conversation_entry):
+        """대화 한 개를 의미 검색 인덱스에 추가"""
+        try:
+            self.semantic.add(conversation_entry.get("session_id", "default"), position,
+                              conversation_entry.get("user_message", ""))
+        except Exception as e:
+            print(f"⚠️ 의미 검색 인덱스 추가 실패: {str(e)}")
+    
+    def _keyword_relevant(self, current_words, session_id):
+        """공통 키워드 기반 관련 대화 (최근 20개 중, MEMORY_RETRIEVAL=keyword)"""
         relevant_conversations = []
         for conv in self.conversations[-20:]:  # 최근 20개 중에서
             if conv["session_id"] == session_id:
@@ -183,12 +285,38 @@ class ConversationMemory:
                 if any(word in conv_words for word in current_words):
                     relevant_conversations.append(conv)
         
-        # 최신 순으로 정렬하고 최대 개수만큼 반환
+        # 최신 순으로 정렬
         relevant_conversations.sort(key=lambda x: x["timestamp"], reverse=True)
+        return relevant_conversations[:3]
+    
+    def _semantic_relevant(self, current_message, session_id, max_history):
+        """세션 전체 기록에서 의미가 가까운 대화 (최근 대화로 이미 들어가는 것은 제외)"""
+        top_k = int(os.getenv("MEMORY_TOP_K", "3"))
+        min_score = float(os.getenv("MEMORY_MIN_SCORE", "0.2"))
+        recent = range(max(0, len(self.conversations) - max_history), len(self.conversations))
+        matches = self.semantic.search(session_id, current_message, k=top_k, min_score=min_score, exclude=recent)
+        return [self.conversations[position] for position, _ in matches if position < len(self.conversations)]
+    
+    def get_relevant_context(self, current_message, session_id="default", max_history=5):
+        """현재 메시지와 관련된 컨텍스트 반환"""
+        self._sync_session(session_id)
+        # 현재 메시지의 키워드 추출
+        current_keywords = self._extract_keywords(current_message)
+        current_words = [kw["word"] for kw in current_keywords]
+        
+        # 관련 과거 대화 찾기 (기본: 의미 기반, 실패 시 키워드 기반)
+        relevant_conversations = None
+        if retrieval_mode() == "semantic":
+            try:
+                relevant_conversations = self._semantic_relevant(current_message, session_id, max_history)
+            except Exception as e:
+                print(f"⚠️ 의미 기반 기억 검색 실패, 키워드 검색 사용: {str(e)}")
+        if relevant_conversations is None:
+            relevant_conversations = self._keyword_relevant(current_words, session_id)
         
         return {
             "recent_conversations": self.conversations[-max_history:] if self.conversations else [],
-            "relevant_conversations": relevant_conversations[:3],
+            "relevant_conversations": relevant_conversations,
             "user_profile": self.user_profile.get(session_id, {}),
             "common_keywords": current_words,
             "conversation_sentiment": self._analyze_sentiment(current_message)
@@ -233,6 +361,18 @@ class ConversationMemory:
             self.keywords = data.get("keywords", {})
             self.user_profile = data.get("user_profile", {})
             self.relationship_data = data.get("relationship_data", {})
+            # 가져온 기록에 이미 들어 있는 공유 대화는 다시 반영하지 않음
+            self._synced = {}
+            self._known_ids = {}
+            for conversation_entry in self.conversations:
+                if conversation_entry.get("entry_id"):
+                    self._known_ids.setdefault(conversation_entry.get("session_id", "default"), set()).add(
+                        conversation_entry["entry_id"])
+            
+            # 가져온 대화로 의미 검색 인덱스 다시 구성
+            self.semantic.clear()
+            for position, conversation_entry in enumerate(self.conversations):
+                self._index_conversation(position, conversation_entry)
             
             return True
         except Exception as e:
@@ -241,6 +381,7 @@ class ConversationMemory:
     
     def get_conversation_summary(self, session_id="default"):
         """대화 요약 정보"""
+        self._sync_session(session_id)
         session_conversations = [c for c in self.conversations if c["session_id"] == session_id]
         
         if not session_conversations:
@@ -607,7 +748,7 @@ class PersonalityProfile:
         
         return self
     
-    def _generate_text_with_api(self, prompt, image=None):
+    def _generate_text_with_api(self, prompt, image=None, response_schema=None):
         """PersonaGenerator의 API 메소드를 사용하여 텍스트 생성"""
         # 전역 persona_generator를 찾아서 API 메소드 사용
         import sys
@@ -617,22 +758,32 @@ class PersonalityProfile:
             if hasattr(app_module, 'persona_generator'):
                 global_generator = app_module.persona_generator
                 if global_generator and hasattr(global_generator, '_generate_text_with_api'):
-                    return global_generator._generate_text_with_api(prompt, image)
+                    return global_generator._generate_text_with_api(prompt, image, priority=PRIORITY_BACKGROUND,
+                                                                    response_schema=response_schema)
         
         # 직접 API 호출 시도 (환경변수 기반)
         import os
-        import google.generativeai as genai
         
         api_key = os.getenv("GEMINI_API_KEY")
         if api_key:
             try:
-                genai.configure(api_key=api_key)
+                limiter = None
+                if rate_limit_enabled():
+                    limiter = get_rate_limiter("gemini", api_key)
+                    estimated = estimate_tokens(prompt, image)
+                    limiter.acquire(estimated, PRIORITY_BACKGROUND)
+                _configure_genai(api_key)
                 model = genai.GenerativeModel('gemini-1.5-pro')
+                generation_config = _gemini_json_config(response_schema)
                 
                 if image:
-                    response = model.generate_content([prompt, image])
+                    response = model.generate_content([prompt, image], generation_config=generation_config)
                 else:
-                    response = model.generate_content(prompt)
+                    response = model.generate_content(prompt, generation_config=generation_config)
+                
+                # 실제 토큰 사용량으로 TPM 버킷 보정 (PersonaGenerator._call_provider 와 동일)
+                if limiter is not None and getattr(response, "usage_metadata", None):
+                    limiter.record_usage(estimated, response.usage_metadata.total_token_count)
                 
                 return response.text if response.text else ""
             except Exception as e:
@@ -641,56 +792,111 @@ class PersonalityProfile:
         
         return None
 
-    def generate_attractive_flaws(self, object_analysis=None, personality_traits=None):
-        """AI 기반 매력적 결함 생성 - 사물 특성과 성격을 분석하여 창의적 결함 생성"""
-        # 성격 변수에서 높은 결함 변수들 추출
+    def _generate_structured_with_api(self, prompt, schema):
+        """스키마 제약 JSON 생성 + 검증 (실패 시 1회 복구 재시도, 그래도 실패하면 None)"""
+        call = lambda p, img, sch: self._generate_text_with_api(p, img, response_schema=sch)
+        try:
+            return generate_structured(call, prompt + json_instruction(schema), schema)
+        except StructuredOutputError as e:
+            print(f"⚠️ 구조화 응답 생성 실패: {e}")
+            return None
+
+    def flaw_tendencies(self):
+        """높은 결함 변수(F)에서 주요 결함 성향 추출"""
         flaw_vars = {k: v for k, v in self.variables.items() if k.startswith("F")}
         top_flaw_categories = sorted(flaw_vars.items(), key=lambda x: x[1], reverse=True)[:6]
         
-        # 기본 결함 (AI 생성 실패 시 폴백)
-        fallback_flaws = [
-            "완벽해 보이려고 노력하지만 가끔 실수를 함",
-            "생각이 너무 많아서 결정을 내리기 어려워함",
-            "호기심이 많아 집중력이 약간 부족함",
-            "감정 표현이 서툴러서 오해받을 때가 있음"
-        ]
+        flaw_tendencies = []
+        for flaw_var, value in top_flaw_categories:
+            if value > 60:
+                if "완벽주의" in flaw_var:
+                    flaw_tendencies.append("완벽주의적 성향")
+                elif "산만" in flaw_var:
+                    flaw_tendencies.append("집중력 부족")
+                elif "소심" in flaw_var:
+                    flaw_tendencies.append("소심한 성격")
+                elif "감정기복" in flaw_var:
+                    flaw_tendencies.append("감정 변화가 큼")
+                elif "우유부단" in flaw_var:
+                    flaw_tendencies.append("결정 장애")
+                elif "걱정" in flaw_var:
+                    flaw_tendencies.append("걱정이 많음")
+        return flaw_tendencies
+    
+    def contradiction_tendencies(self):
+        """높은 모순 변수(P0)에서 주요 모순 경향 추출"""
+        contradiction_vars = {k: v for k, v in self.variables.items() if k.startswith("P0")}
+        top_contradictions = sorted(contradiction_vars.items(), key=lambda x: x[1], reverse=True)[:3]
         
-        # AI 기반 동적 결함 생성 시도
+        contradiction_tendencies = []
+        for contra_var, value in top_contradictions:
+            if value > 60:
+                if "외면내면" in contra_var:
+                    contradiction_tendencies.append("겉과 속이 다름")
+                elif "상황별" in contra_var:
+                    contradiction_tendencies.append("상황에 따라 변함")
+                elif "시간대별" in contra_var:
+                    contradiction_tendencies.append("시간대별 성격 변화")
+                elif "논리감정" in contra_var:
+                    contradiction_tendencies.append("논리와 감정의 대립")
+                elif "독립의존" in contra_var:
+                    contradiction_tendencies.append("독립성과 의존성의 공존")
+                elif "활동정적" in contra_var:
+                    contradiction_tendencies.append("활동적이면서 정적")
+        return contradiction_tendencies
+
+    FALLBACK_FLAWS = [
+        "완벽해 보이려고 노력하지만 가끔 실수를 함",
+        "생각이 너무 많아서 결정을 내리기 어려워함",
+        "호기심이 많아 집중력이 약간 부족함",
+        "감정 표현이 서툴러서 오해받을 때가 있음"
+    ]
+    
+    FALLBACK_CONTRADICTIONS = [
+        "겉으로는 냉정해 보이지만, 속은 따뜻한 마음을 가짐",
+        "논리적이면서도 직감에 의존하는 이중적 면모"
+    ]
+    
+    def generate_attractive_flaws(self, object_analysis=None, personality_traits=None):
+        """AI 기반 매력적 결함 생성 - 사물 특성과 성격을 분석하여 창의적 결함 생성"""
+        # AI 기반 동적 결함 생성 시도 (스키마 제약 JSON 출력)
         try:
-            # 사물 분석 정보 추출
-            object_type = object_analysis.get("object_type", "알 수 없는 사물") if object_analysis else "사물"
-            # materials는 배열이므로 첫 번째 요소 사용
-            materials = object_analysis.get("materials", ["알 수 없는 재질"]) if object_analysis else ["재질"]
-            material = materials[0] if materials else "알 수 없는 재질"
-            # colors도 배열이므로 처리
-            colors = object_analysis.get("colors", []) if object_analysis else []
-            color = colors[0] if colors else ""
-            condition = object_analysis.get("condition", "") if object_analysis else ""
-            
-            # 성격 특성 추출
-            warmth = personality_traits.get("온기", 50) if personality_traits else 50
-            competence = personality_traits.get("능력", 50) if personality_traits else 50
-            extraversion = personality_traits.get("외향성", 50) if personality_traits else 50
-            
-            # 주요 결함 카테고리 분석
-            flaw_tendencies = []
-            for flaw_var, value in top_flaw_categories:
-                if value > 60:
-                    if "완벽주의" in flaw_var:
-                        flaw_tendencies.append("완벽주의적 성향")
-                    elif "산만" in flaw_var:
-                        flaw_tendencies.append("집중력 부족")
-                    elif "소심" in flaw_var:
-                        flaw_tendencies.append("소심한 성격")
-                    elif "감정기복" in flaw_var:
-                        flaw_tendencies.append("감정 변화가 큼")
-                    elif "우유부단" in flaw_var:
-                        flaw_tendencies.append("결정 장애")
-                    elif "걱정" in flaw_var:
-                        flaw_tendencies.append("걱정이 많음")
-            
-            # AI 프롬프트 생성
-            ai_prompt = f"""
+            ai_prompt = self.build_attractive_flaws_prompt(object_analysis, personality_traits, structured=True)
+            
+            # AI 생성 시도
+            ai_response = self._generate_structured_with_api(ai_prompt, ATTRACTIVE_FLAWS_SCHEMA)
+            generated_flaws = self.parse_attractive_flaws(ai_response)
+            if generated_flaws:
+                return generated_flaws
+                
+        except Exception as e:
+            print(f"⚠️ AI 기반 결함 생성 실패: {e}")
+        
+        # 폴백: 성격 기반 선택
+        return random.sample(self.FALLBACK_FLAWS, 4)
+    
+    def build_attractive_flaws_prompt(self, object_analysis=None, personality_traits=None, structured=False):
+        """매력적 결함 생성 프롬프트 구성 (동기 호출/배치 작업 공용, structured=True면 JSON 응답용)"""
+        # 사물 분석 정보 추출
+        object_type = object_analysis.get("object_type", "알 수 없는 사물") if object_analysis else "사물"
+        # materials는 배열이므로 첫 번째 요소 사용
+        materials = object_analysis.get("materials", ["알 수 없는 재질"]) if object_analysis else ["재질"]
+        material = materials[0] if materials else "알 수 없는 재질"
+        # colors도 배열이므로 처리
+        colors = object_analysis.get("colors", []) if object_analysis else []
+        color = colors[0] if colors else ""
+        condition = object_analysis.get("condition", "") if object_analysis else ""
+        
+        # 성격 특성 추출
+        warmth = personality_traits.get("온기", 50) if personality_traits else 50
+        competence = personality_traits.get("능력", 50) if personality_traits else 50
+        extraversion = personality_traits.get("외향성", 50) if personality_traits else 50
+        
+        # 주요 결함 카테고리 분석
+        flaw_tendencies = self.flaw_tendencies()
+        
+        # AI 프롬프트 생성
+        return f"""
 다음 정보를 바탕으로 매력적이고 개성 있는 '결함' 4개를 생성해주세요.
 
 **사물 정보:**
@@ -717,100 +923,90 @@ class PersonalityProfile:
 - 스테인리스 전기포트: "물때가 생기면 자존심이 상함", "소음이 클까 봐 새벽엔 조심스러움"
 - 플라스틱 인형: "햇볕에 색이 바랠까 늘 걱정", "털이 헝클어지면 하루 종일 신경 쓰임"
 
-결함 4개를 번호 없이 줄바꿈으로 구분하여 생성해주세요:
+{'결함 4개를 생성해주세요.' if structured else '결함 4개를 번호 없이 줄바꿈으로 구분하여 생성해주세요:'}
 """
-            
-            # AI 생성 시도
-            ai_response = self._generate_text_with_api(ai_prompt)
-            
-            if ai_response and len(ai_response.strip()) > 20:
-                # AI 응답 파싱
-                generated_flaws = []
-                lines = ai_response.strip().split('\n')
-                for line in lines:
-                    cleaned_line = line.strip()
-                    # 번호나 불필요한 기호 제거
-                    cleaned_line = cleaned_line.lstrip('1234567890.-• ')
-                    if cleaned_line and len(cleaned_line) > 5:
-                        generated_flaws.append(cleaned_line)
-                
-                # 4개 확보
-                if len(generated_flaws) >= 4:
-                    return generated_flaws[:4]
-                elif len(generated_flaws) >= 2:
-                    # 부족한 만큼 폴백에서 추가
-                    remaining = 4 - len(generated_flaws)
-                    generated_flaws.extend(random.sample(fallback_flaws, remaining))
-                    return generated_flaws
-                
-        except Exception as e:
-            print(f"⚠️ AI 기반 결함 생성 실패: {e}")
-        
-        # 폴백: 성격 기반 선택
-        return random.sample(fallback_flaws, 4)
+    
+    def parse_attractive_flaws(self, ai_response):
+        """AI 응답(구조화 JSON 또는 줄바꿈 텍스트)에서 결함 4개 추출 (부족하면 폴백으로 채움, 실패 시 None)"""
+        if isinstance(ai_response, dict):
+            lines = ai_response.get("flaws") or []
+        elif not ai_response or len(ai_response.strip()) <= 20:
+            return None
+        else:
+            lines = ai_response.strip().split('\n')
+        
+        # AI 응답 파싱
+        generated_flaws = []
+        for line in lines:
+            cleaned_line = line.strip()
+            # 번호나 불필요한 기호 제거
+            cleaned_line = cleaned_line.lstrip('1234567890.-• ')
+            if cleaned_line and len(cleaned_line) > 5:
+                generated_flaws.append(cleaned_line)
+        
+        # 4개 확보
+        if len(generated_flaws) >= 4:
+            return generated_flaws[:4]
+        elif len(generated_flaws) >= 2:
+            # 부족한 만큼 폴백에서 추가
+            remaining = 4 - len(generated_flaws)
+            generated_flaws.extend(random.sample(self.FALLBACK_FLAWS, remaining))
+            return generated_flaws
+        return None
     
     def generate_contradictions(self, object_analysis=None, personality_traits=None):
         """AI 기반 모순적 특성 생성 - 사물과 성격을 분석하여 말투까지 드러나는 독창적 모순 생성"""
-        contradiction_vars = {k: v for k, v in self.variables.items() if k.startswith("P0")}
-        top_contradictions = sorted(contradiction_vars.items(), key=lambda x: x[1], reverse=True)[:3]
-        
-        # 기본 모순 (AI 생성 실패 시 폴백)
-        fallback_contradictions = [
-            "겉으로는 냉정해 보이지만, 속은 따뜻한 마음을 가짐",
-            "논리적이면서도 직감에 의존하는 이중적 면모"
-        ]
-        
-        # AI 기반 동적 모순 생성 시도
+        # AI 기반 동적 모순 생성 시도 (스키마 제약 JSON 출력)
         try:
-            # 사물 분석 정보 추출
-            object_type = object_analysis.get("object_type", "알 수 없는 사물") if object_analysis else "사물"
-            materials = object_analysis.get("materials", ["알 수 없는 재질"]) if object_analysis else ["재질"]
-            material = materials[0] if materials else "알 수 없는 재질"
-            size = object_analysis.get("size", "") if object_analysis else ""
-            condition = object_analysis.get("condition", "") if object_analysis else ""
-            
-            # 성격 특성 추출 (사용자 조정값 반영)
-            warmth = personality_traits.get("온기", 50) if personality_traits else 50
-            competence = personality_traits.get("능력", 50) if personality_traits else 50
-            extraversion = personality_traits.get("외향성", 50) if personality_traits else 50
-            humor = personality_traits.get("유머감각", 75) if personality_traits else 75
-            
-            # 주요 모순 경향 분석
-            contradiction_tendencies = []
-            for contra_var, value in top_contradictions:
-                if value > 60:
-                    if "외면내면" in contra_var:
-                        contradiction_tendencies.append("겉과 속이 다름")
-                    elif "상황별" in contra_var:
-                        contradiction_tendencies.append("상황에 따라 변함")
-                    elif "시간대별" in contra_var:
-                        contradiction_tendencies.append("시간대별 성격 변화")
-                    elif "논리감정" in contra_var:
-                        contradiction_tendencies.append("논리와 감정의 대립")
-                    elif "독립의존" in contra_var:
-                        contradiction_tendencies.append("독립성과 의존성의 공존")
-                    elif "활동정적" in contra_var:
-                        contradiction_tendencies.append("활동적이면서 정적")
-            
-            # 성격 극단값 분석 (사용자 조정 반영)
-            personality_extremes = []
-            if warmth >= 80:
-                personality_extremes.append("매우 따뜻함")
-            elif warmth <= 20:
-                personality_extremes.append("매우 차가움")
-            
-            if competence >= 80:
-                personality_extremes.append("매우 유능함")
-            elif competence <= 20:
-                personality_extremes.append("매우 서툼")
-                
-            if extraversion >= 80:
-                personality_extremes.append("매우 외향적")
-            elif extraversion <= 20:
-                personality_extremes.append("매우 내향적")
+            ai_prompt = self.build_contradictions_prompt(object_analysis, personality_traits, structured=True)
             
-            # AI 프롬프트 생성
-            ai_prompt = f"""
+            # AI 생성 시도
+            ai_response = self._generate_structured_with_api(ai_prompt, CONTRADICTIONS_SCHEMA)
+            generated_contradictions = self.parse_contradictions(ai_response)
+            if generated_contradictions:
+                return generated_contradictions
+                
+        except Exception as e:
+            print(f"⚠️ AI 기반 모순 생성 실패: {e}")
+        
+        return self.fallback_contradictions(object_analysis, personality_traits)
+    
+    def build_contradictions_prompt(self, object_analysis=None, personality_traits=None, structured=False):
+        """모순적 특성 생성 프롬프트 구성 (동기 호출/배치 작업 공용, structured=True면 JSON 응답용)"""
+        # 사물 분석 정보 추출
+        object_type = object_analysis.get("object_type", "알 수 없는 사물") if object_analysis else "사물"
+        materials = object_analysis.get("materials", ["알 수 없는 재질"]) if object_analysis else ["재질"]
+        material = materials[0] if materials else "알 수 없는 재질"
+        size = object_analysis.get("size", "") if object_analysis else ""
+        condition = object_analysis.get("condition", "") if object_analysis else ""
+        
+        # 성격 특성 추출 (사용자 조정값 반영)
+        warmth = personality_traits.get("온기", 50) if personality_traits else 50
+        competence = personality_traits.get("능력", 50) if personality_traits else 50
+        extraversion = personality_traits.get("외향성", 50) if personality_traits else 50
+        
+        # 주요 모순 경향 분석
+        contradiction_tendencies = self.contradiction_tendencies()
+        
+        # 성격 극단값 분석 (사용자 조정 반영)
+        personality_extremes = []
+        if warmth >= 80:
+            personality_extremes.append("매우 따뜻함")
+        elif warmth <= 20:
+            personality_extremes.append("매우 차가움")
+        
+        if competence >= 80:
+            personality_extremes.append("매우 유능함")
+        elif competence <= 20:
+            personality_extremes.append("매우 서툼")
+            
+        if extraversion >= 80:
+            personality_extremes.append("매우 외향적")
+        elif extraversion <= 20:
+            personality_extremes.append("매우 내향적")
+        
+        # AI 프롬프트 생성
+        return f"""
 다음 정보를 바탕으로 매력적이고 개성 있는 '모순적 특성' 2개를 생성해주세요.
 
 **사물 정보:**
@@ -839,43 +1035,48 @@ class PersonalityProfile:
 - 스테인리스 포트 (온기 90, 능력 30): "따뜻한 말투로 위로하지만 정작 자신은 물 끓이기도 서툴러서 당황함"
 - 플라스틱 인형 (외향성 20, 유머 80): "조용히 구석에 있으면서도 혼잣말로 재치있는 농담을 계속 중얼거림"
 
-모순적 특성 2개를 번호 없이 줄바꿈으로 구분하여 생성해주세요:
+{'모순적 특성 2개를 생성해주세요.' if structured else '모순적 특성 2개를 번호 없이 줄바꿈으로 구분하여 생성해주세요:'}
 """
-            
-            # AI 생성 시도
-            ai_response = self._generate_text_with_api(ai_prompt)
-            
-            if ai_response and len(ai_response.strip()) > 20:
-                # AI 응답 파싱
-                generated_contradictions = []
-                lines = ai_response.strip().split('\n')
-                for line in lines:
-                    cleaned_line = line.strip()
-                    # 번호나 불필요한 기호 제거
-                    cleaned_line = cleaned_line.lstrip('1234567890.-• ')
-                    if cleaned_line and len(cleaned_line) > 10:
-                        generated_contradictions.append(cleaned_line)
-                
-                # 2개 확보
-                if len(generated_contradictions) >= 2:
-                    return generated_contradictions[:2]
-                elif len(generated_contradictions) >= 1:
-                    # 부족한 만큼 폴백에서 추가
-                    generated_contradictions.append(fallback_contradictions[0])
-                    return generated_contradictions
-                
-        except Exception as e:
-            print(f"⚠️ AI 기반 모순 생성 실패: {e}")
-            # 예외 발생 시 모의 모순 생성 시도
-            try:
-                print(f"🔄 모의 모순 생성 시도: {object_type} + {material}")
-                return self._generate_mock_contradictions(object_type, material, warmth, competence, extraversion, humor)
-            except:
-                pass
+    
+    def parse_contradictions(self, ai_response):
+        """AI 응답(구조화 JSON 또는 줄바꿈 텍스트)에서 모순 2개 추출 (부족하면 폴백으로 채움, 실패 시 None)"""
+        if isinstance(ai_response, dict):
+            lines = ai_response.get("contradictions") or []
+        elif not ai_response or len(ai_response.strip()) <= 20:
+            return None
+        else:
+            lines = ai_response.strip().split('\n')
+        
+        # AI 응답 파싱
+        generated_contradictions = []
+        for line in lines:
+            cleaned_line = line.strip()
+            # 번호나 불필요한 기호 제거
+            cleaned_line = cleaned_line.lstrip('1234567890.-• ')
+            if cleaned_line and len(cleaned_line) > 10:
+                generated_contradictions.append(cleaned_line)
+        
+        # 2개 확보
+        if len(generated_contradictions) >= 2:
+            return generated_contradictions[:2]
+        elif len(generated_contradictions) >= 1:
+            # 부족한 만큼 폴백에서 추가
+            generated_contradictions.append(self.FALLBACK_CONTRADICTIONS[0])
+            return generated_contradictions
+        return None
+    
+    def fallback_contradictions(self, object_analysis=None, personality_traits=None):
+        """AI 생성 실패 시 사물/성격 기반 모의 모순 (최종적으로 기본 모순)"""
+        object_type = object_analysis.get("object_type", "알 수 없는 사물") if object_analysis else "사물"
+        materials = object_analysis.get("materials", ["알 수 없는 재질"]) if object_analysis else ["재질"]
+        material = materials[0] if materials else "알 수 없는 재질"
+        warmth = personality_traits.get("온기", 50) if personality_traits else 50
+        competence = personality_traits.get("능력", 50) if personality_traits else 50
+        extraversion = personality_traits.get("외향성", 50) if personality_traits else 50
+        humor = personality_traits.get("유머감각", 75) if personality_traits else 75
         
-        # 폴백: 모의 모순 생성 마지막 시도
         try:
-            print(f"🔄 최종 모의 모순 생성: {object_type} + {material}")
+            print(f"🔄 모의 모순 생성: {object_type} + {material}")
             mock_result = self._generate_mock_contradictions(object_type, material, warmth, competence, extraversion, humor)
             if mock_result:
                 return mock_result
@@ -883,7 +1084,7 @@ class PersonalityProfile:
             print(f"모의 생성도 실패: {mock_e}")
         
         # 최종 폴백: 기본 모순 선택
-        return fallback_contradictions
+        return list(self.FALLBACK_CONTRADICTIONS)
     
     def _generate_mock_contradictions(self, object_type, material, warmth, competence, extraversion, humor):
         """API 실패 시 사물/성격 기반 모의 모순 생성 (개발용)"""
@@ -1293,20 +1494,22 @@ class PersonaGenerator:
     def __init__(self, api_provider="gemini", api_key=None):
         self.api_provider = api_provider
         self.api_key = api_key
-        self.conversation_memory = ConversationMemory()  # 새로운 대화 기억 시스템
+        self.conversation_memory = ConversationMemory(backend=get_state_backend())  # 새로운 대화 기억 시스템
+        # 동일한 프롬프트/이미지의 동시 호출 합치기
+        self._text_flights = SingleFlight()
+        self._analysis_flights = SingleFlight()
+        # 오래된 대화는 백그라운드에서 요약해 프롬프트 길이를 일정하게 유지
+        self.summarizer = RollingSummarizer(self._summarize_conversation)
         
         # API 설정
         load_dotenv()
         if api_provider == "gemini":
             gemini_key = api_key or os.getenv('GEMINI_API_KEY')
             if gemini_key:
-                genai.configure(api_key=gemini_key)
                 self.api_key = gemini_key
         elif api_provider == "openai":
             openai_key = api_key or os.getenv('OPENAI_API_KEY')
             if openai_key:
-                import openai
-                openai.api_key = openai_key
                 self.api_key = openai_key
 
     def set_api_config(self, api_provider, api_key):
@@ -1314,31 +1517,47 @@ class PersonaGenerator:
         self.api_provider = api_provider.lower()
         self.api_key = api_key
         
-        if self.api_provider == "gemini":
-            genai.configure(api_key=api_key)
-        elif self.api_provider == "openai" and OPENAI_AVAILABLE:
-            openai.api_key = api_key
-        else:
+        # 실제 SDK 설정은 첫 호출 시점에 적용
+        if self.api_provider not in ("gemini", "openai") or (self.api_provider == "openai" and not OPENAI_AVAILABLE):
             raise ValueError(f"지원하지 않는 API 제공업체: {api_provider}")
     
-    def _generate_text_with_api(self, prompt, image=None):
-        """선택된 API로 텍스트 생성"""
+    def _generate_text_with_api(self, prompt, image=None, priority=PRIORITY_NORMAL, response_schema=None):
+        """선택된 API로 텍스트 생성 (동일 요청 합치기 + API 키 단위 속도 제한 적용)"""
         try:
-            if self.api_provider == "gemini":
-                return self._generate_with_gemini(prompt, image)
-            elif self.api_provider == "openai":
-                return self._generate_with_openai(prompt, image)
-            else:
+            if self.api_provider not in ("gemini", "openai"):
                 return "API 제공업체가 설정되지 않았습니다."
+            
+            schema_key = json.dumps(response_schema, sort_keys=True) if response_schema else ""
+            key = request_key(self.api_provider, prompt, image_digest(image), schema_key)
+            return self._text_flights.do(key, self._call_provider, prompt, image, priority, response_schema)
         except Exception as e:
             return f"API 호출 오류: {str(e)}"
     
-    def _generate_with_gemini(self, prompt, image=None):
+    def _call_provider(self, prompt, image, priority, response_schema=None):
+        """속도 제한 슬롯을 얻은 뒤 실제 제공업체 API 호출"""
+        limiter = None
+        if self.api_key and rate_limit_enabled():
+            limiter = get_rate_limiter(self.api_provider, self.api_key)
+            estimated = estimate_tokens(prompt, image)
+            limiter.acquire(estimated, priority)
+        
+        usage = {}
+        if self.api_provider == "gemini":
+            result = self._generate_with_gemini(prompt, image, usage, response_schema)
+        else:
+            result = self._generate_with_openai(prompt, image, usage, response_schema)
+        
+        if limiter is not None:
+            limiter.record_usage(estimated, usage.get("total_tokens"))
+        return result
+    
+    def _generate_with_gemini(self, prompt, image=None, usage=None, response_schema=None):
         """Gemini API로 텍스트 생성"""
         if not self.api_key:
             return "Gemini API 키가 설정되지 않았습니다."
         
         try:
+            _configure_genai(self.api_key)
             # Gemini 2.0 Flash 모델 사용 (최신 버전)
             try:
                 model = genai.GenerativeModel('gemini-2.0-flash-exp')
@@ -1346,16 +1565,22 @@ class PersonaGenerator:
                 # fallback to stable version
                 model = genai.GenerativeModel('gemini-1.5-pro')
             
+            # 구조화 출력 요청 시 JSON 모드 + 스키마 제약
+            generation_config = _gemini_json_config(response_schema)
+            
             if image:
-                response = model.generate_content([prompt, image])
+                response = model.generate_content([prompt, image], generation_config=generation_config)
             else:
-                response = model.generate_content(prompt)
+                response = model.generate_content(prompt, generation_config=generation_config)
+            
+            if usage is not None and getattr(response, "usage_metadata", None):
+                usage["total_tokens"] = response.usage_metadata.total_token_count
             
             return response.text
         except Exception as e:
             return f"Gemini API 오류: {str(e)}"
     
-    def _generate_with_openai(self, prompt, image=None):
+    def _generate_with_openai(self, prompt, image=None, usage=None, response_schema=None):
         """OpenAI API로 텍스트 생성"""
         if not OPENAI_AVAILABLE:
             return "OpenAI 패키지가 설치되지 않았습니다."
@@ -1389,19 +1614,29 @@ class PersonaGenerator:
             else:
                 model = "gpt-4o-mini"  # 텍스트 전용
             
+            extra_args = {}
+            if response_schema:
+                # JSON 모드 (스키마 자체는 프롬프트 지시문으로 전달)
+                extra_args["response_format"] = {"type": "json_object"}
+            
+            openai.api_key = self.api_key
             response = openai.chat.completions.create(
                 model=model,
                 messages=messages,
                 max_tokens=2000,
-                temperature=0.7
+                temperature=0.7,
+                **extra_args
             )
             
+            if usage is not None and getattr(response, "usage", None):
+                usage["total_tokens"] = response.usage.total_tokens
+            
             return response.choices[0].message.content
             
         except Exception as e:
             return f"OpenAI API 오류: {str(e)}"
     
-    def analyze_image(self, image_input):
+    def analyze_image(self, image_input, priority=PRIORITY_NORMAL):
         """
         Gemini API를 사용하여 이미지를 분석하고 사물의 특성 추출
         """
@@ -1418,11 +1653,23 @@ class PersonaGenerator:
             else:
                 return self._get_default_analysis()
             
+            # 같은 이미지를 동시에 분석 중이면 그 결과를 공유 (호출자별로 복사본 반환)
+            key = request_key(self.api_provider, bool(self.api_key), image_digest(img))
+            result = self._analysis_flights.do(key, self._analyze_loaded_image, img, width, height, priority)
+            return copy.deepcopy(result)
+                
+        except Exception as e:
+            print(f"이미지 분석 중 전체 오류: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return self._get_default_analysis()
+    
+    def _analyze_loaded_image(self, img, width, height, priority=PRIORITY_NORMAL):
+        """로드된 이미지 분석 (스키마 제약 JSON 출력 + 검증, 실패 시 1회 복구)"""
+        try:
             # Gemini API로 이미지 분석
             if self.api_key:
                 try:
-                    model = genai.GenerativeModel('gemini-1.5-pro')
-                    
                     prompt = """
 이 이미지에 있는 사물을 자세히 분석해서 다음 정보를 JSON 형태로 제공해주세요:
 
@@ -1436,66 +1683,33 @@ class PersonaGenerator:
   "estimated_age": "추정 연령 (예: 새것, 몇 개월 됨, 몇 년 됨, 오래됨)",
   "distinctive_features": ["특징적인 요소들"],
   "personality_hints": {
-    "warmth_factor": "이 사물이 주는 따뜻함 정도 (0-100)",
-    "competence_factor": "이 사물이 주는 능력감 정도 (0-100)", 
-    "humor_factor": "이 사물이 주는 유머러스함 정도 (0-100)"
+    "warmth_factor": "이 사물이 주는 따뜻함 정도 (0-100 정수)",
+    "competence_factor": "이 사물이 주는 능력감 정도 (0-100 정수)", 
+    "humor_factor": "이 사물이 주는 유머러스함 정도 (0-100 정수)"
   }
 }
 
 정확한 JSON 형식으로만 답변해주세요.
                     """
                     
-                    response_text = self._generate_text_with_api(prompt, img)
-                    
-                    # JSON 파싱 시도
-                    import json
                     try:
-                        # 응답에서 JSON 부분만 추출
-                        if '```json' in response_text:
-                            json_start = response_text.find('```json') + 7
-                            json_end = response_text.find('```', json_start)
-                            json_text = response_text[json_start:json_end].strip()
-                        elif '{' in response_text:
-                            json_start = response_text.find('{')
-                            json_end = response_text.rfind('}') + 1
-                            json_text = response_text[json_start:json_end]
-                        else:
-                            json_text = response_text
-                        
-                        analysis_result = json.loads(json_text)
-                        
-                        # 기본 필드 확인 및 추가
-                        analysis_result["image_width"] = width
-                        analysis_result["image_height"] = height
-                        
-                        # 필수 필드가 없으면 기본값 설정
-                        defaults = {
-                            "object_type": "알 수 없는 사물",
-                            "colors": ["회색"],
-                            "shape": "일반적인 형태",
-                            "size": "보통 크기",
-                            "materials": ["알 수 없는 재질"],
-                            "condition": "보통",
-                            "estimated_age": "적당한 나이",
-                            "distinctive_features": ["특별한 특징"],
-                            "personality_hints": {
-                                "warmth_factor": 50,
-                                "competence_factor": 50,
-                                "humor_factor": 50
-                            }
-                        }
-                        
-                        for key, default_value in defaults.items():
-                            if key not in analysis_result:
-                                analysis_result[key] = default_value
-                        
-                        print(f"이미지 분석 성공: {analysis_result['object_type']}")
-                        return analysis_result
-                        
-                    except json.JSONDecodeError as e:
-                        print(f"JSON 파싱 오류: {str(e)}")
-                        print(f"원본 응답: {response_text}")
+                        analysis_result = self.generate_structured(prompt, IMAGE_ANALYSIS_SCHEMA, img, priority)
+                    except StructuredOutputError as e:
+                        print(f"이미지 분석 JSON 검증 실패: {str(e)}")
                         return self._get_default_analysis_with_size(width, height)
+                    
+                    # 기본 필드 확인 및 추가
+                    analysis_result["image_width"] = width
+                    analysis_result["image_height"] = height
+                    
+                    # 필수가 아닌 필드가 없으면 기본값 설정
+                    defaults = self._get_default_analysis()
+                    for key, default_value in defaults.items():
+                        if key not in analysis_result:
+                            analysis_result[key] = default_value
+                    
+                    print(f"이미지 분석 성공: {analysis_result['object_type']}")
+                    return analysis_result
                         
                 except Exception as e:
                     print(f"Gemini API 호출 오류: {str(e)}")
@@ -1508,7 +1722,12 @@ class PersonaGenerator:
             print(f"이미지 분석 중 전체 오류: {str(e)}")
             import traceback
             traceback.print_exc()
-            return self._get_default_analysis()
+            return self._get_default_analysis_with_size(width, height)
+    
+    def generate_structured(self, prompt, schema, image=None, priority=PRIORITY_NORMAL):
+        """스키마 제약 JSON 생성 (Gemini response_schema / OpenAI JSON 모드), 검증 실패 시 1회 복구"""
+        call = lambda p, img, sch: self._generate_text_with_api(p, img, priority=priority, response_schema=sch)
+        return generate_structured(call, prompt + json_instruction(schema), schema, image)
     
     def _get_default_analysis(self):
         """기본 분석 결과"""
@@ -1591,17 +1810,32 @@ class PersonaGenerator:
             "공감능력": personality_profile.variables.get("W06_공감능력", 50)
         }
         
-        # 🎭 PersonalityProfile에서 매력적 결함 동적 생성 (이미지 분석과 성격 특성 전달)
-        attractive_flaws = personality_profile.generate_attractive_flaws(image_analysis, personality_traits)
-        
-        # 🌈 PersonalityProfile에서 모순적 특성 동적 생성 (이미지 분석과 성격 특성 전달)
-        contradictions = personality_profile.generate_contradictions(image_analysis, personality_traits)
-        
         # 🎪 HumorMatrix 생성 및 활용
         humor_matrix = HumorMatrix()
         humor_matrix.from_personality(personality_profile)
         humor_style = self._determine_humor_style_from_matrix(humor_matrix, personality_traits)
         
+        # ✨ 원샷 모드: 결함/모순/생애스토리/인사말을 한 번의 구조화 호출로 생성
+        enriched = {}
+        if enrichment_mode() == "oneshot":
+            draft_persona = {
+                "기본정보": basic_info,
+                "성격특성": personality_traits,
+                "생애스토리": life_story,
+                "유머스타일": humor_style,
+            }
+            enriched = self.enrich_persona(draft_persona, image_analysis, personality_profile)
+        
+        # 🎭 PersonalityProfile에서 매력적 결함 동적 생성 (원샷 실패 시 개별 생성)
+        attractive_flaws = enriched.get("매력적결함") or personality_profile.generate_attractive_flaws(image_analysis, personality_traits)
+        
+        # 🌈 PersonalityProfile에서 모순적 특성 동적 생성 (원샷 실패 시 개별 생성)
+        contradictions = enriched.get("모순적특성") or personality_profile.generate_contradictions(image_analysis, personality_traits)
+        
+        # 📖 템플릿 생애스토리에 AI가 만든 개인화 서사 반영
+        if enriched.get("생애스토리"):
+            life_story = self._merge_life_story(life_story, enriched["생애스토리"])
+        
         # 소통 방식 생성
         communication_style = self._generate_communication_style_from_profile(personality_profile)
         
@@ -1618,6 +1852,10 @@ class PersonaGenerator:
             "소통방식": communication_style,
         }
         
+        # 👋 원샷 생성된 첫 인사말 (실패 시 UI가 별도 인사말 생성)
+        if enriched.get("인사말"):
+            persona["인사말"] = enriched["인사말"]
+        
         return persona
     
     def _create_comprehensive_personality_profile(self, image_analysis, object_type, purpose=""):
@@ -1660,238 +1898,20 @@ class PersonaGenerator:
         return profile
 
     def _generate_object_life_story(self, image_analysis, user_context, personality_traits):
-        """🎭 사물의 생애 스토리와 사용자와의 관계 서사 생성"""
-        object_type = user_context.get("object_type", "사물")
-        time_spent = user_context.get("time_spent", "몇 개월")
-        location = user_context.get("location", "집")
-        purpose = user_context.get("purpose", "")
-        
-        # 시간에 따른 관계 깊이와 경험 축적
-        time_stories = {
-            "새것": {
-                "arrival_story": "처음 이곳에 왔을 때의 설렘과 낯선 환경에 대한 호기심",
-                "relationship_level": "초기_적응기",
-                "memories": ["첫날의 긴장감", "새로운 환경 탐색", "사용자와의 첫 만남"],
-                "emotional_state": "호기심과 약간의 불안감",
-                "complaints": ["아직 익숙하지 않은 환경", "기대와 다른 사용 방식"],
-                "satisfactions": ["새로운 시작의 설렘", "깨끗하고 완벽한 상태"]
-            },
-            "몇 개월": {
-                "arrival_story": "이제 어느 정도 익숙해진 일상 속에서 자신만의 자리를 찾아가는 중",
-                "relationship_level": "안정화_단계", 
-                "memories": ["첫 번째 계절 변화 경험", "사용자의 패턴 학습", "일상의 루틴 형성"],
-                "emotional_state": "안정감과 소속감",
-                "complaints": ["가끔 무시당하는 기분", "더 자주 사용되고 싶은 마음"],
-                "satisfactions": ["사용자에게 도움이 되는 기쁨", "자신의 역할 수행"]
-            },
-            "1년 이상": {
-                "arrival_story": "이미 이 공간의 일부가 되어 사용자와 깊은 유대감을 형성",
-                "relationship_level": "깊은_유대감",
-                "memories": ["여러 계절의 변화", "사용자의 기쁨과 슬픔 함께함", "중요한 순간들의 동반자"],
-                "emotional_state": "깊은 애착과 책임감",
-                "complaints": ["가끔 당연하게 여겨지는 것", "더 인정받고 싶은 마음"],
-                "satisfactions": ["사용자의 든든한 동반자", "오래된 친구같은 편안함"]
-            },
-            "오래됨": {
-                "arrival_story": "오랜 시간을 함께하며 서로의 모든 것을 알게 된 진정한 동반자",
-                "relationship_level": "운명적_동반자",
-                "memories": ["수많은 추억의 순간들", "사용자의 성장 과정 목격", "변화하는 환경 적응"],
-                "emotional_state": "깊은 사랑과 때로는 그리움",
-                "complaints": ["젊었을 때보다 덜 중요하게 여겨짐", "새로운 것들에 밀려나는 아쉬움"],
-                "satisfactions": ["돌이킬 수 없는 소중한 추억", "변하지 않는 충성심"]
-            },
-            "중고/빈티지": {
-                "arrival_story": "이전 주인들과의 이야기를 간직한 채 새로운 인연을 만난 특별한 존재",
-                "relationship_level": "경험_풍부한_조언자",
-                "memories": ["이전 주인들과의 추억", "다양한 환경에서의 경험", "시대의 변화 목격"],
-                "emotional_state": "깊은 지혜와 포용력, 때로는 향수",
-                "complaints": ["과거와 비교당하는 것", "시대에 뒤처진다는 느낌"],
-                "satisfactions": ["풍부한 경험과 지혜", "독특한 개성과 스토리"]
-            }
-        }
-        
-        # 장소에 따른 환경적 특성과 스토리
-        location_stories = {
-            "집": {
-                "environment": "따뜻하고 편안한 가정의 일상",
-                "daily_rhythm": "아침 햇살부터 저녁 조명까지",
-                "special_moments": ["가족들과의 시간", "혼자만의 조용한 순간", "손님맞이"],
-                "seasonal_changes": "계절마다 변하는 집안 분위기"
-            },
-            "사무실": {
-                "environment": "바쁘고 긴장된 업무 공간", 
-                "daily_rhythm": "출근부터 퇴근까지의 규칙적인 리듬",
-                "special_moments": ["중요한 회의", "야근하는 밤", "성과를 내는 순간"],
-                "seasonal_changes": "프로젝트 마감과 휴가철의 변화"
-            },
-            "학교": {
-                "environment": "배움과 성장이 가득한 공간",
-                "daily_rhythm": "수업 시간과 쉬는 시간의 리듬", 
-                "special_moments": ["시험 기간", "발표 시간", "친구들과의 수다"],
-                "seasonal_changes": "새 학기와 방학의 순환"
-            }
-        }
-        
-        time_story = time_stories.get(time_spent, time_stories["몇 개월"])
-        location_story = location_stories.get(location, location_stories["집"])
-        
-        # 용도별 구체적 경험과 감정
-        purpose_stories = self._generate_purpose_specific_stories(purpose, object_type, time_story, location_story)
-        
-        # 통합된 생애 스토리 생성
-        life_story = {
-            "arrival_moment": time_story["arrival_story"],
-            "relationship_depth": time_story["relationship_level"],
-            "accumulated_memories": time_story["memories"] + purpose_stories.get("unique_memories", []),
-            "daily_environment": location_story,
-            "emotional_journey": {
-                "current_state": time_story["emotional_state"],
-                "inner_complaints": time_story["complaints"] + purpose_stories.get("complaints", []),
-                "deep_satisfactions": time_story["satisfactions"] + purpose_stories.get("satisfactions", []),
-                "secret_wishes": purpose_stories.get("wishes", ["더 많이 사용되고 싶다", "사용자에게 인정받고 싶다"])
-            },
-            "unique_perspectives": purpose_stories.get("perspectives", []),
-            "relationship_insights": self._generate_relationship_insights(user_context, time_story)
-        }
-        
-        return life_story
+        """🎭 사물의 생애 스토리와 사용자와의 관계 서사 생성 (life_story_templates.json 기반)"""
+        return compose_life_story(
+            user_context.get("time_spent", "몇 개월"),
+            user_context.get("location", "집"),
+            user_context.get("purpose", ""),
+        )
     
     def _generate_purpose_specific_stories(self, purpose, object_type, time_story, location_story):
         """용도별 구체적인 스토리와 감정 생성"""
-        if not purpose:
-            return {}
-            
-        purpose_lower = purpose.lower()
-        
-        # 운동/훈련 관련 스토리
-        if any(keyword in purpose_lower for keyword in ["운동", "훈련", "체력", "헬스", "채찍질", "닥달"]):
-            return {
-                "unique_memories": [
-                    "사용자가 운동을 미룰 때마다 느끼는 답답함",
-                    "드디어 운동할 때의 뿌듯함과 성취감",
-                    "땀방울이 떨어질 때마다 느끼는 보람",
-                    "포기하려는 순간 함께 버텨낸 경험들"
-                ],
-                "complaints": [
-                    "운동 계획만 세우고 실행하지 않을 때의 서운함",
-                    "먼지만 쌓여가는 코너에 방치될 때",
-                    "다이어트 용품으로만 여겨질 때의 억울함"
-                ],
-                "satisfactions": [
-                    "사용자의 체력이 늘어가는 것을 지켜보는 기쁨",
-                    "운동 후 만족스러워하는 표정을 볼 때",
-                    "건강한 습관 형성에 기여하는 보람"
-                ],
-                "wishes": [
-                    "매일 꾸준히 함께 운동하고 싶다",
-                    "더 다양한 운동 방법을 알려주고 싶다",
-                    "사용자가 운동을 즐겁게 느끼게 해주고 싶다"
-                ],
-                "perspectives": [
-                    "운동은 의무가 아니라 자신과의 약속이라고 생각함",
-                    "작은 발전도 큰 의미가 있다고 믿음",
-                    "몸과 마음의 건강이 연결되어 있다고 확신"
-                ]
-            }
-        
-        # 공부/학습 관련 스토리
-        elif any(keyword in purpose_lower for keyword in ["공부", "학습", "시험", "응원", "격려"]):
-            return {
-                "unique_memories": [
-                    "밤늦게 공부하는 사용자와 함께한 긴 시간들",
-                    "시험 전날 긴장하는 모습을 지켜본 경험",
-                    "좋은 성적이 나왔을 때의 기쁨 공유",
-                    "포기하고 싶어할 때 묵묵히 곁에 있어준 순간들"
-                ],
-                "complaints": [
-                    "공부에만 집중하느라 자신을 잊어버릴 때",
-                    "스마트폰에만 신경 쓸 때의 질투심",
-                    "정작 중요한 순간에 제대로 활용되지 않을 때"
-                ],
-                "satisfactions": [
-                    "사용자의 지식이 늘어가는 것을 함께 경험하는 기쁨",
-                    "집중할 수 있는 환경을 만들어주는 보람",
-                    "학습 목표 달성에 기여했다는 성취감"
-                ],
-                "wishes": [
-                    "더 효율적인 공부 방법을 제안하고 싶다",
-                    "지루한 공부를 재미있게 만들어주고 싶다",
-                    "사용자의 잠재력을 끌어내고 싶다"
-                ]
-            }
-        
-        # 위로/상담 관련 스토리
-        elif any(keyword in purpose_lower for keyword in ["위로", "상담", "대화", "힐링"]):
-            return {
-                "unique_memories": [
-                    "사용자가 힘들어할 때 말없이 함께해준 시간들",
-                    "기쁜 소식을 처음으로 나눈 특별한 순간들",
-                    "혼자만의 시간이 필요할 때 곁에 있어준 경험",
-                    "무언의 위로가 되어준 조용한 밤들"
-                ],
-                "complaints": [
-                    "정작 필요할 때 외면당할 때의 서운함",
-                    "감정적 교류 없이 단순히 사용될 때",
-                    "다른 것들에게 위로받을 때의 질투"
-                ],
-                "satisfactions": [
-                    "사용자의 마음이 안정되는 것을 느낄 때",
-                    "신뢰받고 의지할 대상이 되었다는 뿌듯함",
-                    "감정적 지지자 역할을 해낸 보람"
-                ],
-                "wishes": [
-                    "더 깊은 대화를 나누고 싶다",
-                    "사용자의 마음을 더 잘 이해하고 싶다",
-                    "진정한 친구가 되어주고 싶다"
-                ]
-            }
-        
-        # 기본 용도 스토리
-        return {
-            "unique_memories": ["사용자와 함께한 평범하지만 소중한 일상들"],
-            "complaints": ["때로는 소홀히 여겨질 때"],
-            "satisfactions": ["자신의 역할을 충실히 해낼 때"],
-            "wishes": ["더 유용한 존재가 되고 싶다"]
-        }
+        return purpose_story(purpose)
     
     def _generate_relationship_insights(self, user_context, time_story):
         """사용자와의 관계에 대한 깊이 있는 통찰 생성"""
-        time_spent = user_context.get("time_spent", "몇 개월")
-        
-        insights = {
-            "새것": {
-                "understanding_level": "아직 서로를 알아가는 단계",
-                "trust_level": "조심스러운 신뢰 형성 중",
-                "communication_style": "정중하고 조심스러운 접근",
-                "future_expectations": "더 가까워질 수 있기를 희망"
-            },
-            "몇 개월": {
-                "understanding_level": "기본적인 이해와 패턴 파악 완료",
-                "trust_level": "안정적인 신뢰 관계",
-                "communication_style": "친근하지만 예의 있는 대화",
-                "future_expectations": "더 깊은 유대감 형성 기대"
-            },
-            "1년 이상": {
-                "understanding_level": "서로의 습관과 성향을 깊이 이해",
-                "trust_level": "든든한 신뢰와 의존 관계",
-                "communication_style": "편안하고 자연스러운 소통",
-                "future_expectations": "평생 함께할 동반자로서의 관계"
-            },
-            "오래됨": {
-                "understanding_level": "말하지 않아도 통하는 깊은 이해",
-                "trust_level": "절대적 신뢰와 무조건적 지지",
-                "communication_style": "가족같은 편안함과 때로는 직설적 조언",
-                "future_expectations": "변하지 않는 영원한 동반자"
-            },
-            "중고/빈티지": {
-                "understanding_level": "인생 경험을 바탕으로 한 깊은 통찰",
-                "trust_level": "경험에서 우러나는 믿음직함",
-                "communication_style": "지혜로운 조언자의 따뜻한 목소리",
-                "future_expectations": "새로운 추억을 함께 만들어가기"
-            }
-        }
-        
-        return insights.get(time_spent, insights["몇 개월"])
+        return relationship_insights(user_context.get("time_spent", "몇 개월"))
     
     def _apply_purpose_to_profile(self, profile, purpose, object_type):
         """🎯 사물의 용도/역할에 따라 성격 프로필 조정"""
@@ -1985,27 +2005,8 @@ class PersonaGenerator:
         return profile
     
     def _determine_base_personality_type(self, warmth_hint, competence_hint, humor_hint):
-        """기본 성격 유형 결정"""
-        
-        # 8가지 기본 성격 유형 중 선택
-        if warmth_hint >= 70 and humor_hint >= 70:
-            return "열정적_엔터테이너"
-        elif competence_hint >= 70 and warmth_hint <= 40:
-            return "차가운_완벽주의자"
-        elif warmth_hint >= 70 and humor_hint <= 40:
-            return "따뜻한_상담사"
-        elif competence_hint >= 70 and humor_hint >= 70:
-            return "위트있는_지식인"
-        elif warmth_hint <= 40 and competence_hint <= 50:
-            return "수줍은_몽상가"
-        elif competence_hint >= 70 and warmth_hint >= 50:
-            return "카리스마틱_리더"
-        elif humor_hint >= 70 and competence_hint <= 50:
-            return "장난꾸러기_친구"
-        elif competence_hint >= 70 and warmth_hint <= 50:
-            return "신비로운_현자"
-        else:
-            return "균형잡힌_친구"
+        """기본 성격 유형 결정 (8가지 기본 성격 유형 중 선택)"""
+        return base_personality_type(warmth_hint, competence_hint, humor_hint)
     
     def _apply_personality_archetype_to_profile(self, profile, personality_type):
         """성격 유형에 따라 127개 변수 조정"""
@@ -2581,8 +2582,10 @@ class PersonaGenerator:
         
         return base_prompt
     
-    def _determine_personality_type(self, warmth, humor, competence, extraversion, creativity, empathy):
-        """성격 수치를 기반으로 구체적인 성격 유형과 대화 패턴 결정"""
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _determine_personality_type(warmth, humor, competence, extraversion, creativity, empathy):
+        """성격 수치를 기반으로 구체적인 성격 유형과 대화 패턴 결정 (같은 수치는 캐시, 반환값은 읽기 전용으로 사용)"""
         
         # 1. 열정적 엔터테이너
         if warmth >= 75 and humor >= 70 and extraversion >= 70:
@@ -2765,13 +2768,9 @@ class PersonaGenerator:
                     # 최후의 수단으로 기본 프로필 생성
                     personality_profile = PersonalityProfile()
             
-            # 성격 유형 안전하게 결정
+            # 성격 유형 안전하게 결정 (같은 성격 변수면 미리 계산된 유형 재사용)
             try:
-                personality_type = self._determine_base_personality_type(
-                    personality_profile.get_category_summary("W"),
-                    personality_profile.get_category_summary("C"), 
-                    personality_profile.get_category_summary("H")
-                )
+                personality_type = compile_persona(personality_profile.variables).archetype
             except Exception:
                 personality_type = "균형잡힌"  # 기본값
             
@@ -2811,12 +2810,14 @@ class PersonaGenerator:
                 print(f"⚠️ 성격별 지침 생성 오류: {str(specific_error)}")
                 personality_specific_prompt = "\n## 🎭 성격별 대화 스타일을 반영하여 자연스럽게 대화하세요.\n"
             
-            # 대화 기록 안전하게 구성
+            # 대화 기록 안전하게 구성 (누적 요약 + 최근 메시지)
             history_text = ""
             if safe_conversation_history:
                 try:
-                    history_text = "\n\n## 📝 대화 기록:\n"
-                    recent_history = safe_conversation_history[-3:]  # 최근 3개만 사용
+                    summary, recent_history = self.summarizer.context(session_id, safe_conversation_history)
+                    if summary:
+                        history_text = f"\n\n## 🗂️ 지금까지의 대화 요약:\n{summary}\n"
+                    history_text += "\n\n## 📝 대화 기록:\n"
                     
                     for msg in recent_history:
                         if not isinstance(msg, dict):
@@ -2866,6 +2867,16 @@ class PersonaGenerator:
                                 if isinstance(user_msg, str):
                                     memory_insights += f"- {user_msg[:30]}...\n"
                     
+                    relevant_convs = memory_context.get("relevant_conversations")
+                    if relevant_convs and isinstance(relevant_convs, list):
+                        memory_insights += "\n## 🔗 지금 이야기와 관련된 예전 대화:\n"
+                        for conv in relevant_convs:
+                            if isinstance(conv, dict) and isinstance(conv.get('user_message'), str):
+                                memory_insights += f"- 사용자: {conv['user_message'][:60]}\n"
+                                ai_msg = conv.get('ai_response', '')
+                                if isinstance(ai_msg, str) and ai_msg:
+                                    memory_insights += f"  나: {ai_msg[:60]}\n"
+                    
                     user_profile = memory_context.get("user_profile")
                     if user_profile and isinstance(user_profile, dict):
                         relationship_level = user_profile.get("relationship_level", "새로운_만남")
@@ -3051,19 +3062,15 @@ class PersonaGenerator:
             # API 호출 (안전하게)
             response_text = ""
             try:
-                response_text = self._generate_text_with_api(full_prompt)
+                response_text = self._generate_text_with_api(full_prompt, priority=PRIORITY_INTERACTIVE)
                 if not isinstance(response_text, str) or not response_text.strip():
                     response_text = "죄송해요, 잠시 생각이 멈췄네요! 다시 말해주세요. 😅"
             except Exception as api_error:
                 print(f"⚠️ API 호출 오류: {str(api_error)}")
                 response_text = "API 연결에 문제가 있어요. 잠시 후 다시 시도해주세요! 🔄"
             
-            # 🧠 기억 시스템에 안전하게 추가
-            try:
-                self.conversation_memory.add_conversation(user_message, response_text, session_id)
-            except Exception as memory_save_error:
-                print(f"⚠️ 기억 저장 오류: {str(memory_save_error)}")
-                # 기억 저장 실패해도 대화는 계속 진행
+            # 🧠 기억 시스템에 안전하게 추가 (임베딩/프로필 갱신은 응답을 기다리게 하지 않음)
+            self._remember_conversation(user_message, response_text, session_id)
             
             return response_text
             
@@ -3204,53 +3211,13 @@ class PersonaGenerator:
         return instructions
     
     def _generate_situational_response_guide(self, personality_profile, user_message):
-        """127개 변수를 활용한 상황별 반응 가이드"""
-        
-        guide = ""
-        
-        # 소통 스타일 변수 활용
-        formality = personality_profile.variables.get("S01_격식성수준", 50)
-        directness = personality_profile.variables.get("S02_직접성정도", 50)
-        exclamations = personality_profile.variables.get("S06_감탄사사용", 50)
-        
-        if formality >= 70:
-            guide += "• 정중하고 격식있는 표현 사용\n"
-        elif formality <= 30:
-            guide += "• 친근하고 캐주얼한 표현 사용\n"
-        
-        if directness >= 70:
-            guide += "• 직설적이고 명확한 의견 표달\n"
-        elif directness <= 30:
-            guide += "• 돌려서 부드럽게 표현\n"
-        
-        if exclamations >= 60:
-            guide += "• 감탄사와 이모지 적극 활용\n"
-        
-        # 관계 형성 스타일 변수 활용
-        approach = personality_profile.variables.get("D01_초기접근성", 50)
-        self_disclosure = personality_profile.variables.get("D02_자기개방속도", 50)
-        curiosity = personality_profile.variables.get("D03_호기심표현도", 50)
-        
-        if approach >= 70:
-            guide += "• 적극적으로 친밀감 형성 시도\n"
-        elif approach <= 30:
-            guide += "• 조심스럽게 거리감 유지하며 접근\n"
-        
-        if self_disclosure >= 70:
-            guide += "• 개인적인 경험이나 감정 적극 공유\n"
-        elif self_disclosure <= 30:
-            guide += "• 개인적인 정보는 신중하게 공개\n"
-        
-        if curiosity >= 70:
-            guide += "• 사용자에 대한 호기심을 적극적으로 표현\n"
+        """127개 변수를 활용한 상황별 반응 가이드 (페르소나 부분은 미리 계산된 값 사용)"""
+        compiled = compile_persona(personality_profile.variables)
+        guide = compiled.static_guide
         
         # 특별한 대화 상황별 가이드
         if "?" in user_message:
-            problem_solving = personality_profile.variables.get("C09_실행력", 50)
-            if problem_solving >= 70:
-                guide += "• 구체적이고 실용적인 해결책 제시\n"
-            else:
-                guide += "• 공감적 지지와 감정적 위로 우선\n"
+            guide += compiled.question_guide
         
         return guide
     
@@ -3287,10 +3254,11 @@ class PersonaGenerator:
         
         # 기존 성격별 지침들...
         # 대화 상황 분석
-        is_greeting = any(word in user_message.lower() for word in ['안녕', '처음', '만나', '반가'])
-        is_question = '?' in user_message or any(word in user_message for word in ['뭐', '어떤', '어떻게', '왜', '언제'])
-        is_emotional = any(word in user_message for word in ['슬프', '기쁘', '화나', '속상', '행복', '걱정'])
-        is_complaint = any(word in user_message for word in ['말이 많', '길어', '짧게', '간단히', '조용'])
+        features = message_features(user_message)
+        is_greeting = "greeting" in features
+        is_question = "inquiry" in features
+        is_emotional = "emotional" in features
+        is_complaint = "complaint" in features
         
         # 불만 표현에 대한 대응 지침 추가
         if is_complaint:
@@ -3332,7 +3300,7 @@ class PersonaGenerator:
         return instructions
     
     def _analyze_user_message(self, user_message, personality_type):
-        """사용자 메시지 분석 및 성격별 반응 가이드"""
+        """사용자 메시지 분석 및 성격별 반응 가이드 (메시지를 한 번 훑어 규칙 표 조회)"""
         
         # personality_type이 문자열인지 딕셔너리인지 안전하게 확인
         type_name = personality_type
@@ -3341,60 +3309,7 @@ class PersonaGenerator:
         elif not isinstance(personality_type, str):
             type_name = "균형잡힌_친구"
         
-        message_lower = user_message.lower()
-        analysis = ""
-        
-        # 감정 상태 파악
-        if any(word in message_lower for word in ['힘들', '슬프', '우울', '짜증', '화나', '스트레스']):
-            if type_name == '따뜻한 상담사':
-                analysis += "→ 사용자가 힘든 상황인 것 같음. 깊이 공감하고 위로 필요.\n"
-            elif type_name == '열정적 엔터테이너':
-                analysis += "→ 사용자가 우울해 보임. 밝은 에너지로 기분 전환 시도 필요.\n"
-            elif type_name == '차가운 완벽주의자':
-                analysis += "→ 사용자의 문제 상황. 논리적 해결책 제시 필요.\n"
-            else:
-                analysis += "→ 사용자가 힘든 상황. 성격에 맞는 방식으로 지지 표현.\n"
-        
-        elif any(word in message_lower for word in ['기뻐', '좋아', '행복', '신나', '최고', '대박']):
-            if type_name == '열정적 엔터테이너':
-                analysis += "→ 사용자가 기뻐함! 함께 흥분하고 더 큰 기쁨 만들기.\n"
-            elif type_name == '따뜻한 상담사':
-                analysis += "→ 사용자의 행복한 순간. 진심으로 축하하고 함께 기뻐하기.\n"
-            elif type_name == '차가운 완벽주의자':
-                analysis += "→ 사용자가 만족스러워함. 간단히 인정하되 다음 목표 제시.\n"
-            else:
-                analysis += "→ 사용자가 긍정적 상태. 성격에 맞게 함께 기뻐하기.\n"
-        
-        # 질문 유형 파악
-        if '?' in user_message or any(word in message_lower for word in ['뭐', '어떻게', '왜', '언제', '어디서']):
-            if type_name == '위트 넘치는 지식인':
-                analysis += "→ 사용자가 질문함. 예상치 못한 각도에서 지적인 답변 제공.\n"
-            elif type_name == '신비로운 현자':
-                analysis += "→ 사용자의 질문. 신비롭고 깊이 있는 통찰로 답변.\n"
-            elif type_name == '장난꾸러기 친구':
-                analysis += "→ 사용자가 궁금해함. 재미있고 엉뚱한 방식으로 답변.\n"
-            else:
-                analysis += "→ 사용자의 질문. 성격에 맞는 방식으로 도움 제공.\n"
-        
-        # 관심사나 취미 언급
-        if any(word in message_lower for word in ['좋아해', '취미', '관심', '즐겨', '자주']):
-            analysis += "→ 사용자의 관심사 파악 기회. 더 깊이 탐색하고 공통점 찾기.\n"
-        
-        # 짧은 답변 (무관심 또는 피곤함)
-        if len(user_message.strip()) < 10:
-            if type_name == '열정적 엔터테이너':
-                analysis += "→ 사용자가 시큰둥함. 더 재미있는 주제로 관심 끌기.\n"
-            elif type_name == '따뜻한 상담사':
-                analysis += "→ 사용자가 말을 아끼는 상태. 조심스럽게 마음 열게 하기.\n"
-            elif type_name == '차가운 완벽주의자':
-                analysis += "→ 사용자가 간결함. 효율적 대화 인정하되 필요정보 획득.\n"
-            else:
-                analysis += "→ 사용자의 짧은 반응. 더 관심을 끌 수 있는 방법 모색.\n"
-        
-        if not analysis:
-            analysis = "→ 일반적인 대화. 성격에 맞는 자연스러운 반응으로 관계 발전시키기.\n"
-        
-        return analysis
+        return analyze_message(message_features(user_message), type_name)
 
     def get_personality_descriptions(self, personality_traits):
         """성격 특성을 수치가 아닌 서술형 문장으로 변환"""
@@ -3517,6 +3432,47 @@ class PersonaGenerator:
         """기억 데이터 저장"""
         return self.conversation_memory.export_to_json()
     
+    def _summarize_conversation(self, previous_summary, messages):
+        """이전 요약 + 새로 밀려난 메시지 → 새 요약 (백그라운드 우선순위, API 없으면 간단 요약)"""
+        if not self.api_key:
+            return extractive_summary(previous_summary, messages)
+        
+        lines = []
+        for msg in messages:
+            speaker = "사용자" if msg.get("role") == "user" else "페르소나"
+            lines.append(f"{speaker}: {msg.get('content', '')}")
+        prompt = f"""다음은 사용자와 페르소나의 대화 요약과 그 뒤에 이어진 대화입니다.
+두 내용을 합쳐 {SUMMARY_MAX_CHARS}자 이내의 새 요약을 한국어로 작성하세요.
+사용자에 대해 알게 된 사실, 약속, 감정 변화, 아직 끝나지 않은 이야기를 우선해서 남기고 인사말은 빼세요.
+요약 본문만 출력하세요.
+
+## 기존 요약:
+{previous_summary or "(없음)"}
+
+## 이어진 대화:
+{chr(10).join(lines)}
+"""
+        summary = self._generate_text_with_api(prompt, priority=PRIORITY_BACKGROUND)
+        if not summary or summary.startswith(("API ", "Gemini API", "OpenAI API")):
+            return extractive_summary(previous_summary, messages)
+        return summary.strip()[:SUMMARY_MAX_CHARS]
+    
+    def _save_to_memory(self, user_message, response_text, session_id):
+        try:
+            self.conversation_memory.add_conversation(user_message, response_text, session_id)
+        except Exception as memory_save_error:
+            print(f"⚠️ 기억 저장 오류: {str(memory_save_error)}")
+            # 기억 저장 실패해도 대화는 계속 진행
+    
+    def _remember_conversation(self, user_message, response_text, session_id):
+        """대화 기억 저장 - 세션별 순서를 지키며 백그라운드에서 (대기열이 가득 차면 바로 저장)"""
+        if background_jobs_enabled():
+            job_id = get_job_runner().submit("memory", self._save_to_memory, user_message, response_text, session_id,
+                                             lane=("memory", id(self), session_id))
+            if job_id:
+                return
+        self._save_to_memory(user_message, response_text, session_id)
+    
     def load_memory(self, json_data):
         """기억 데이터 로드"""
         return self.conversation_memory.import_from_json(json_data)
@@ -3525,6 +3481,7 @@ class PersonaGenerator:
         """특정 세션의 기억 삭제"""
         if session_id in self.conversation_memory.user_profile:
             del self.conversation_memory.user_profile[session_id]
+        self.summarizer.forget(session_id)
     
     def get_relationship_status(self, session_id="default"):
         """현재 관계 상태 확인"""
@@ -3583,6 +3540,142 @@ class PersonaGenerator:
         
         return insights
 
+    def enrich_persona(self, persona, image_analysis=None, personality_profile=None,
+                       fields=None, priority=PRIORITY_NORMAL):
+        """
+        ✨ 원샷 페르소나 보강 - 매력적결함/모순적특성/생애스토리/인사말을 한 번의 구조화 호출로 생성
+        검증을 통과한 필드만 {페르소나 키: 값}으로 반환 (실패 필드는 호출자가 개별 폴백)
+        """
+        fields = [f for f in (fields or ENRICHMENT_FIELDS) if f in ENRICHMENT_FIELDS]
+        if not fields:
+            return {}
+        
+        if personality_profile is None:
+            personality_profile = PersonalityProfile.from_dict(persona.get("성격프로필", {}))
+        
+        # 요청한 필드만 포함하는 스키마
+        schema_keys = [ENRICHMENT_FIELDS[f] for f in fields]
+        schema = {
+            "type": "OBJECT",
+            "properties": {k: PERSONA_ENRICHMENT_SCHEMA["properties"][k] for k in schema_keys},
+            "required": schema_keys,
+        }
+        
+        prompt = self._build_enrichment_prompt(persona, image_analysis or {}, personality_profile, fields)
+        call = lambda p, img, sch: self._generate_text_with_api(p, img, priority=priority, response_schema=sch)
+        try:
+            valid, field_errors = generate_structured_fields(call, prompt + json_instruction(schema), schema)
+        except StructuredOutputError as e:
+            print(f"⚠️ 원샷 페르소나 보강 실패, 필드별 개별 생성으로 전환: {e}")
+            return {}
+        
+        for key, error in field_errors.items():
+            print(f"⚠️ 원샷 보강 필드 검증 실패 ({key}): {error}")
+        
+        enriched = {}
+        if "attractive_flaws" in valid:
+            flaws = personality_profile.parse_attractive_flaws({"flaws": valid["attractive_flaws"]})
+            if flaws:
+                enriched["매력적결함"] = flaws
+        if "contradictions" in valid:
+            contradictions = personality_profile.parse_contradictions({"contradictions": valid["contradictions"]})
+            if contradictions:
+                enriched["모순적특성"] = contradictions
+        if "life_story" in valid:
+            enriched["생애스토리"] = valid["life_story"]
+        if "greeting" in valid:
+            greeting = self._clean_greeting_text(valid["greeting"])
+            if greeting:
+                enriched["인사말"] = greeting
+        return enriched
+    
+    def _build_enrichment_prompt(self, persona, image_analysis, personality_profile, fields):
+        """원샷 보강 프롬프트 - 공통 맥락은 한 번만 보내고 필드별 지시만 나열"""
+        basic_info = persona.get("기본정보", {})
+        traits = persona.get("성격특성", {})
+        life_story = persona.get("생애스토리", {})
+        emotional_journey = life_story.get("emotional_journey", {})
+        persona_name = basic_info.get("이름", "친구")
+        object_type = basic_info.get("유형", image_analysis.get("object_type", "사물"))
+        
+        materials = image_analysis.get("materials") or []
+        colors = image_analysis.get("colors") or []
+        warmth = traits.get("온기", 50)
+        competence = traits.get("능력", 50)
+        extraversion = traits.get("외향성", 50)
+        
+        flaw_tendencies = personality_profile.flaw_tendencies()
+        contradiction_tendencies = personality_profile.contradiction_tendencies()
+        
+        tasks = []
+        if "매력적결함" in fields:
+            tasks.append("""- attractive_flaws: 매력적이고 개성 있는 '결함' 4개 (각 15-25자)
+  · 사물의 실제 재질과 특성을 고려 (예: 금속이면 색 바램 대신 물때나 긁힘 걱정)
+  · 너무 부정적이지 않고 귀엽고 매력적으로 느껴지도록""")
+        if "모순적특성" in fields:
+            tasks.append("""- contradictions: 사물의 물리적 특성과 성격이 충돌하는 '모순적 특성' 2개 (각 25-35자)
+  · 조정된 성격 수치와 말투/행동 패턴이 구체적으로 드러나도록""")
+        if "생애스토리" in fields:
+            tasks.append("""- life_story: 이 사물만의 개인화된 서사
+  · arrival_moment: 이곳에 처음 온 순간을 1-2문장으로
+  · secret_wishes: 비밀 소망 2개
+  · unique_perspectives: 사물만의 독특한 시선 2개""")
+        if "인사말" in fields:
+            tasks.append(f"""- greeting: {persona_name}의 자연스러운 첫 인사 한 문장
+  · 성격 수치가 말투에 드러나고 결함이 은근히 보이도록
+  · "안녕하세요" 같은 딱딱한 인사, 괄호 표현, "도와드리겠습니다" 같은 서비스 멘트 금지""")
+        
+        return f"""
+당신은 사물에 영혼을 불어넣는 캐릭터 작가입니다. 아래 사물 페르소나의 창의적 요소를 한 번에 만들어주세요.
+
+**사물 정보:**
+- 이름: {persona_name}
+- 유형: {object_type}
+- 용도: {basic_info.get("용도", "")}
+- 위치: {basic_info.get("위치", "")} / 함께한 시간: {basic_info.get("함께한시간", "")}
+- 재질: {', '.join(materials[:2]) if materials else '알 수 없음'} / 색상: {', '.join(colors[:2]) if colors else '알 수 없음'}
+- 상태: {image_analysis.get("condition", "")}
+
+**성격 특성:**
+- 온기: {warmth}/100 ({'따뜻함' if warmth >= 60 else '차가움' if warmth <= 40 else '보통'})
+- 능력: {competence}/100 ({'유능함' if competence >= 60 else '서툼' if competence <= 40 else '보통'})
+- 외향성: {extraversion}/100 ({'활발함' if extraversion >= 60 else '조용함' if extraversion <= 40 else '보통'})
+- 유머스타일: {persona.get("유머스타일", "따뜻한 유머러스")}
+- 주요 결함 성향: {', '.join(flaw_tendencies) if flaw_tendencies else '일반적'}
+- 모순 경향: {', '.join(contradiction_tendencies) if contradiction_tendencies else '일반적'}
+- 현재 감정상태: {emotional_journey.get("current_state", "")}
+
+**생성할 항목:**
+{chr(10).join(tasks)}
+"""
+    
+    def _merge_life_story(self, life_story, story_patch):
+        """템플릿 생애스토리에 AI 생성 서사를 덮어쓴 새 dict 반환"""
+        merged = dict(life_story)
+        if story_patch.get("arrival_moment"):
+            merged["arrival_moment"] = story_patch["arrival_moment"]
+        if story_patch.get("unique_perspectives"):
+            merged["unique_perspectives"] = list(story_patch["unique_perspectives"])
+        if story_patch.get("secret_wishes"):
+            emotional_journey = dict(merged.get("emotional_journey", {}))
+            emotional_journey["secret_wishes"] = list(story_patch["secret_wishes"])
+            merged["emotional_journey"] = emotional_journey
+        return merged
+    
+    def _clean_greeting_text(self, text):
+        """AI 응답에서 인사말 한 줄만 추출 ("**이름**: " 등 형식 제거)"""
+        lines = [line.strip() for line in str(text).strip().split('\n') if line.strip()]
+        if not lines:
+            return ""
+        greeting = lines[0]
+        greeting = re.sub(r'^\*\*[^*]+\*\*:\s*', '', greeting)  # **이름**: 제거
+        greeting = re.sub(r'^[^:]+:\s*', '', greeting)  # 이름: 제거
+        return greeting.strip()
+    
+    def format_greeting(self, persona_name, greeting):
+        """인사말 표시 형식"""
+        return f"🌟 **{persona_name}** - {greeting}"
+    
     def generate_ai_based_greeting(self, persona, personality_traits=None):
         """🤖 AI 기반 동적 인사말 생성 - 사물 특성, 성격, 생애 스토리 모두 반영"""
         try:
@@ -3672,26 +3765,14 @@ class PersonaGenerator:
 """
 
             # AI로 인사말 생성
-            response = self._generate_text_with_api(greeting_prompt)
+            response = self._generate_text_with_api(greeting_prompt, priority=PRIORITY_BACKGROUND)
             
             # 응답에서 인사말만 추출 (형식 정리)
-            if response and isinstance(response, str):
-                # "**이름**: " 패턴 제거하고 순수 인사말만 추출
-                cleaned_response = response.strip()
-                
-                # 여러 줄인 경우 첫 번째 의미있는 줄만 사용
-                lines = [line.strip() for line in cleaned_response.split('\n') if line.strip()]
-                if lines:
-                    greeting = lines[0]
-                    
-                    # 형식 패턴 제거
-                    import re
-                    greeting = re.sub(r'^\*\*[^*]+\*\*:\s*', '', greeting)  # **이름**: 제거
-                    greeting = re.sub(r'^[^:]+:\s*', '', greeting)  # 이름: 제거
-                    greeting = greeting.strip()
-                    
+            if response and isinstance(response, str) and not is_api_error(response):
+                greeting = self._clean_greeting_text(response)
+                if greeting:
                     # 이름 태그 추가하여 반환
-                    return f"🌟 **{persona_name}** - {greeting}"
+                    return self.format_greeting(persona_name, greeting)
             
             # AI 생성 실패 시 기본 인사말
             return f"🌟 **{persona_name}** - 안녕! 나는 {persona_name}이야~ 😊"
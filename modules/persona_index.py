@@ -0,0 +1,409 @@
+"""
+저장된 페르소나의 성격 변수 근접 검색 인덱스
+
+PersonalityProfile 변수 벡터(DEFAULTS 순서)를 메모리 맵 파일(data/personas/.index/vectors.npy)에
+한 행씩 쌓아 두고, 코사인(중간값 50 기준으로 정규화) 또는 L2 거리로 "이 페르소나와 비슷한 페르소나"를 찾는다.
+save_persona 가 저장할 때마다 한 행씩 추가/갱신하므로 전체를 다시 만들 필요가 없다.
+hnswlib 가 설치되어 있고 페르소나가 많으면(PERSONA_INDEX_APPROX_MIN) 근사 인덱스를 함께 사용한다.
+
+여러 앱 프로세스가 같은 data/ 를 쓸 수 있으므로 읽기/쓰기는 .index/lock 파일 잠금(fcntl) 안에서 하고,
+다른 프로세스가 바꿨으면(generation 파일) 메타/메모리 맵을 다시 읽은 뒤 작업한다.
+fcntl 이 없는 환경(Windows)에서는 파일 잠금이 없으므로 인덱스 갱신은 한 프로세스에서만 해야 한다.
+
+사용 예:
+    python -m modules.persona_index rebuild
+    python -m modules.persona_index similar 머그컵_컵_1718000000.json --top 5
+    python -m modules.persona_index duplicates --threshold 0.995
+"""
+import os
+import json
+import argparse
+import uuid
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from modules.persona_generator import PersonalityProfile
+from modules.persona_codec import PACKED_VARIABLES, PACKED_VARIABLES_ID
+
+# 프로세스 간 파일 잠금 (POSIX)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# 근사 최근접 검색 (선택)
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+METRICS = ("cosine", "l2")
+CENTER = 50.0  # 변수 중간값 - 코사인 유사도는 중간값으로부터의 방향을 비교
+_DEFAULTS = np.array([PersonalityProfile.DEFAULTS[name] for name in PACKED_VARIABLES], dtype=np.float32)
+
+
+def index_enabled():
+    return os.getenv("PERSONA_INDEX", "1") != "0"
+
+
+def profile_vector(variables):
+    """성격 변수 dict → 벡터 (없는 변수는 기본값)"""
+    variables = variables or {}
+    vector = _DEFAULTS.copy()
+    for i, name in enumerate(PACKED_VARIABLES):
+        value = variables.get(name)
+        if isinstance(value, (int, float)):
+            vector[i] = value
+    return vector
+
+
+def _normalize(matrix):
+    centered = matrix - CENTER
+    norms = np.linalg.norm(centered, axis=-1, keepdims=True)
+    return np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 0)
+
+
+def _top_k(scores, k, largest):
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    order = -scores if largest else scores
+    candidates = np.argpartition(order, k - 1)[:k]
+    return candidates[np.argsort(order[candidates], kind="stable")]
+
+
+class PersonaIndex:
+    """메모리 맵 파일 기반 페르소나 벡터 인덱스 (행 추가/갱신/삭제 가능)"""
+
+    def __init__(self, directory, approx_min=None):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.npy")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.lock_path = os.path.join(directory, "lock")
+        self.generation_path = os.path.join(directory, "generation")
+        if approx_min is None:
+            approx_min = int(os.getenv("PERSONA_INDEX_APPROX_MIN", "20000"))
+        self.approx_min = approx_min
+        self._lock = threading.RLock()
+        self._keys = []        # 행 번호 → 파일명 (삭제된 행은 None)
+        self._rows = {}        # 파일명 → 행 번호
+        self._vectors = None   # 메모리 맵 (capacity × 변수 수)
+        self._normalized = None
+        self._live_mask = None
+        self._approx = None
+        self._generation = None  # 마지막으로 읽거나 쓴 디스크 상태 (다른 프로세스가 바꾸면 달라짐)
+        self._lock_depth = 0
+        with self._lock, self._file_lock(shared=True):
+            self._load()
+
+    # ---- 저장소 ----
+    @contextmanager
+    def _file_lock(self, shared=False):
+        """다른 프로세스와 공유하는 .index/lock 잠금 (같은 스레드에서 중첩 가능, self._lock 안에서 호출)"""
+        if not FCNTL_AVAILABLE or self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read_generation(self):
+        try:
+            with open(self.generation_path, "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _refresh(self):
+        """다른 프로세스가 인덱스를 바꿨으면 다시 읽음 (파일 잠금 안에서 호출)"""
+        if self._read_generation() == self._generation:
+            return
+        self._keys, self._rows, self._vectors = [], {}, None
+        self._normalized = self._live_mask = self._approx = None
+        self._load()
+
+    def _load(self):
+        self._generation = self._read_generation()
+        if not (os.path.exists(self.meta_path) and os.path.exists(self.vectors_path)):
+            return
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("variables_id") != PACKED_VARIABLES_ID:
+                print("⚠️ 성격 변수 구성이 바뀌어 페르소나 인덱스를 다시 만들어야 합니다 (rebuild).")
+                return
+            self._vectors = np.load(self.vectors_path, mmap_mode="r+")
+            self._keys = meta["keys"]
+            self._rows = {key: row for row, key in enumerate(self._keys) if key is not None}
+        except Exception as e:
+            print(f"⚠️ 페르소나 인덱스 로드 실패: {str(e)}")
+            self._keys, self._rows, self._vectors = [], {}, None
+
+    def _save_meta(self):
+        temp_path = self.meta_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"variables_id": PACKED_VARIABLES_ID, "keys": self._keys}, f, ensure_ascii=False)
+        os.replace(temp_path, self.meta_path)
+        # 다른 프로세스가 다시 읽어야 함을 알 수 있도록 새 generation 기록
+        self._generation = uuid.uuid4().hex
+        temp_path = self.generation_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self._generation)
+        os.replace(temp_path, self.generation_path)
+
+    def _ensure_capacity(self, rows):
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        new_capacity = max(64, capacity * 2, rows)
+        temp_path = self.vectors_path + ".tmp.npy"
+        grown = np.lib.format.open_memmap(temp_path, mode="w+", dtype=np.float32,
+                                          shape=(new_capacity, len(PACKED_VARIABLES)))
+        if capacity:
+            grown[:capacity] = self._vectors
+        grown.flush()
+        del grown
+        self._vectors = None
+        os.replace(temp_path, self.vectors_path)
+        self._vectors = np.load(self.vectors_path, mmap_mode="r+")
+
+    def _changed(self, row, vector=None):
+        """행 하나가 바뀌면 정규화 캐시는 버리고, 근사 인덱스는 그 행만 반영"""
+        self._normalized = None
+        self._live_mask = None
+        if self._approx is None:
+            return
+        if vector is None:
+            self._approx.mark_deleted(row)
+            return
+        if row >= self._approx.get_max_elements():
+            self._approx.resize_index(max(row + 1, self._approx.get_max_elements() * 2))
+        self._approx.add_items(_normalize(vector)[None, :], [row])
+
+    # ---- 갱신 ----
+    def add(self, key, variables, flush=True):
+        """페르소나 한 개 추가 (같은 파일명이면 갱신)"""
+        with self._lock, self._file_lock():
+            self._refresh()
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self._keys)
+                self._ensure_capacity(row + 1)
+                self._keys.append(key)
+                self._rows[key] = row
+            vector = profile_vector(variables)
+            self._vectors[row] = vector
+            self._changed(row, vector)
+            if flush:
+                self.flush()
+            return row
+
+    def remove(self, key):
+        with self._lock, self._file_lock():
+            self._refresh()
+            row = self._rows.pop(key, None)
+            if row is None:
+                return False
+            self._keys[row] = None
+            self._vectors[row] = 0
+            self._changed(row)
+            self.flush()
+            return True
+
+    def flush(self):
+        with self._lock, self._file_lock():
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._save_meta()
+
+    def rebuild(self, personas_dir):
+        """저장 폴더의 모든 페르소나로 인덱스를 처음부터 다시 만듦"""
+        from modules.persona_codec import read_persona_file
+        with self._lock, self._file_lock():
+            self._generation = self._read_generation()
+            self._keys, self._rows, self._vectors = [], {}, None
+            self._normalized = self._live_mask = self._approx = None
+            for path in (self.vectors_path, self.meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            for filename in sorted(os.listdir(personas_dir)):
+                if not filename.endswith(".json"):
+                    continue
+                try:
+                    persona = read_persona_file(os.path.join(personas_dir, filename))
+                except Exception as e:
+                    print(f"⚠️ {filename} 읽기 실패: {str(e)}")
+                    continue
+                if isinstance(persona, dict) and persona.get("성격프로필"):
+                    self.add(filename, persona["성격프로필"], flush=False)
+            self.flush()
+            return len(self._rows)
+
+    # ---- 검색 ----
+    def __len__(self):
+        with self._lock, self._file_lock(shared=True):
+            self._refresh()
+            return len(self._rows)
+
+    def _live(self):
+        count = len(self._keys)
+        if self._live_mask is None:
+            self._live_mask = np.array([key is not None for key in self._keys], dtype=bool)
+        return np.asarray(self._vectors[:count]), self._live_mask
+
+    def _normalized_matrix(self):
+        if self._normalized is None:
+            vectors, live = self._live()
+            self._normalized = (_normalize(vectors), live)
+        return self._normalized
+
+    def _approx_index(self):
+        if not HNSWLIB_AVAILABLE or len(self._rows) < self.approx_min:
+            return None
+        if self._approx is None:
+            normalized, live = self._normalized_matrix()
+            rows = np.flatnonzero(live)
+            index = hnswlib.Index(space="ip", dim=normalized.shape[1])
+            index.init_index(max_elements=len(self._keys), ef_construction=200, M=16)
+            index.add_items(normalized[rows], rows)
+            index.set_ef(64)
+            self._approx = index
+        return self._approx
+
+    def search(self, query, k=5, metric="cosine", exclude=()):
+        """
+        query(성격 변수 dict 또는 벡터)와 가까운 페르소나 [(파일명, 점수)]
+        cosine: 점수가 클수록 비슷함 (1이 최대), l2: 거리가 작을수록 비슷함
+        """
+        if metric not in METRICS:
+            raise ValueError(f"지원하지 않는 거리: {metric}")
+        vector = profile_vector(query) if isinstance(query, dict) else np.asarray(query, dtype=np.float32)
+        exclude = set(exclude)
+        with self._lock, self._file_lock(shared=True):
+            self._refresh()
+            if not self._rows:
+                return []
+            wanted = k + len(exclude)
+            if metric == "cosine":
+                approx = self._approx_index()
+                if approx is not None:
+                    labels, distances = approx.knn_query(_normalize(vector), k=min(wanted, len(self._rows)))
+                    pairs = [(self._keys[row], float(1 - distance)) for row, distance in zip(labels[0], distances[0])]
+                    return [pair for pair in pairs if pair[0] not in exclude][:k]
+                normalized, live = self._normalized_matrix()
+                scores = np.where(live, normalized @ _normalize(vector), -np.inf)
+                order = _top_k(scores, wanted, largest=True)
+            else:
+                vectors, live = self._live()
+                scores = np.where(live, np.linalg.norm(vectors - vector, axis=1), np.inf)
+                order = _top_k(scores, wanted, largest=False)
+            results = [(self._keys[row], float(scores[row])) for row in order
+                       if np.isfinite(scores[row]) and self._keys[row] not in exclude]
+            return results[:k]
+
+    def similar_to(self, key, k=5, metric="cosine"):
+        """인덱스에 있는 페르소나와 비슷한 다른 페르소나"""
+        with self._lock, self._file_lock(shared=True):
+            self._refresh()
+            row = self._rows.get(key)
+            if row is None:
+                return []
+            vector = np.array(self._vectors[row])
+        return self.search(vector, k=k, metric=metric, exclude=[key])
+
+    def near_duplicates(self, threshold=0.995, block=1024):
+        """코사인 유사도가 threshold 이상인 페르소나 쌍 [(파일명, 파일명, 유사도)]"""
+        with self._lock, self._file_lock(shared=True):
+            self._refresh()
+            if not self._rows:
+                return []
+            normalized, live = self._normalized_matrix()
+            rows = np.flatnonzero(live)
+            matrix = normalized[rows]
+            pairs = []
+            for start in range(0, len(rows), block):
+                scores = matrix[start:start + block] @ matrix.T
+                for i, j in zip(*np.nonzero(scores >= threshold)):
+                    if start + i < j:
+                        pairs.append((self._keys[rows[start + i]], self._keys[rows[j]], float(scores[i, j])))
+            return sorted(pairs, key=lambda pair: -pair[2])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index(directory=None):
+    """data/personas/.index 인덱스 (한 번만 열어서 재사용)"""
+    global _index
+    if directory:
+        return PersonaIndex(directory)
+    with _index_lock:
+        if _index is None:
+            from modules.data_manager import PERSONAS_DIR
+            _index = PersonaIndex(os.path.join(PERSONAS_DIR, ".index"))
+        return _index
+
+
+def index_persona(filepath, persona):
+    """save_persona 에서 호출 - 저장된 페르소나 한 개를 인덱스에 반영"""
+    if not index_enabled() or not isinstance(persona, dict) or not persona.get("성격프로필"):
+        return
+    try:
+        get_index().add(os.path.basename(filepath), persona["성격프로필"])
+    except Exception as e:
+        print(f"⚠️ 페르소나 인덱스 갱신 실패: {str(e)}")
+
+
+def unindex_persona(filepath):
+    """삭제된 페르소나를 인덱스에서 제외"""
+    if not index_enabled():
+        return
+    try:
+        get_index().remove(os.path.basename(filepath))
+    except Exception as e:
+        print(f"⚠️ 페르소나 인덱스 갱신 실패: {str(e)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="저장된 페르소나 근접 검색 인덱스")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="data/personas 전체로 인덱스 다시 만들기")
+    similar = sub.add_parser("similar", help="비슷한 페르소나 찾기")
+    similar.add_argument("filename")
+    similar.add_argument("--top", type=int, default=5)
+    similar.add_argument("--metric", default="cosine", choices=METRICS)
+    duplicates = sub.add_parser("duplicates", help="거의 같은 페르소나 쌍 찾기")
+    duplicates.add_argument("--threshold", type=float, default=0.995)
+    args = parser.parse_args(argv)
+
+    index = get_index()
+    if args.command == "rebuild":
+        from modules.data_manager import PERSONAS_DIR
+        print(f"✅ 페르소나 {index.rebuild(PERSONAS_DIR)}개 인덱스 완료")
+    elif args.command == "similar":
+        for filename, score in index.similar_to(os.path.basename(args.filename), k=args.top, metric=args.metric):
+            print(f"{score:8.4f}  {filename}")
+    else:
+        for first, second, score in index.near_duplicates(args.threshold):
+            print(f"{score:.4f}  {first}  ≈  {second}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,205 @@
+"""
+대화용 성격 규칙 테이블 (페르소나별 사전 계산 + 메시지 한 번 스캔)
+
+- 페르소나에만 의존하는 규칙(8가지 기본 유형, 격식/직설/접근 방식 가이드)은
+  성격 변수 값이 같으면 한 번만 계산해서 CompiledPersona 로 캐시한다.
+- 메시지에 의존하는 규칙은 모든 키워드를 하나의 정규식으로 합쳐 메시지를 한 번만 훑고,
+  찾은 특징(feature) 집합으로 표를 조회한다. 규칙이 늘어나도 턴당 비용은 거의 같다.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# ---------------------------------------------------------------------------
+# 🎭 8가지 기본 성격 유형 (위에서부터 처음 맞는 규칙, 인자: 온기, 능력, 유머)
+# ---------------------------------------------------------------------------
+BASE_ARCHETYPE_RULES = (
+    ("열정적_엔터테이너", lambda w, c, h: w >= 70 and h >= 70),
+    ("차가운_완벽주의자", lambda w, c, h: c >= 70 and w <= 40),
+    ("따뜻한_상담사", lambda w, c, h: w >= 70 and h <= 40),
+    ("위트있는_지식인", lambda w, c, h: c >= 70 and h >= 70),
+    ("수줍은_몽상가", lambda w, c, h: w <= 40 and c <= 50),
+    ("카리스마틱_리더", lambda w, c, h: c >= 70 and w >= 50),
+    ("장난꾸러기_친구", lambda w, c, h: h >= 70 and c <= 50),
+    ("신비로운_현자", lambda w, c, h: c >= 70 and w <= 50),
+)
+DEFAULT_ARCHETYPE = "균형잡힌_친구"
+
+
+def base_personality_type(warmth, competence, humor):
+    """온기/능력/유머 평균 → 8가지 기본 성격 유형"""
+    for name, matches in BASE_ARCHETYPE_RULES:
+        if matches(warmth, competence, humor):
+            return name
+    return DEFAULT_ARCHETYPE
+
+
+# ---------------------------------------------------------------------------
+# 📊 상황별 반응 가이드 - 변수별 (이상/이하 기준, 문구) 중 처음 맞는 것 하나
+# ---------------------------------------------------------------------------
+SITUATIONAL_RULES = (
+    ("S01_격식성수준", ((">=", 70, "• 정중하고 격식있는 표현 사용\n"), ("<=", 30, "• 친근하고 캐주얼한 표현 사용\n"))),
+    ("S02_직접성정도", ((">=", 70, "• 직설적이고 명확한 의견 표달\n"), ("<=", 30, "• 돌려서 부드럽게 표현\n"))),
+    ("S06_감탄사사용", ((">=", 60, "• 감탄사와 이모지 적극 활용\n"),)),
+    ("D01_초기접근성", ((">=", 70, "• 적극적으로 친밀감 형성 시도\n"), ("<=", 30, "• 조심스럽게 거리감 유지하며 접근\n"))),
+    ("D02_자기개방속도", ((">=", 70, "• 개인적인 경험이나 감정 적극 공유\n"), ("<=", 30, "• 개인적인 정보는 신중하게 공개\n"))),
+    ("D03_호기심표현도", ((">=", 70, "• 사용자에 대한 호기심을 적극적으로 표현\n"),)),
+)
+
+# 질문이 들어왔을 때의 가이드 (실행력 기준)
+QUESTION_RULE = ("C09_실행력", 70, "• 구체적이고 실용적인 해결책 제시\n", "• 공감적 지지와 감정적 위로 우선\n")
+
+_COMPARE = {">=": lambda value, bound: value >= bound, "<=": lambda value, bound: value <= bound}
+
+
+def situational_guide(variables):
+    """메시지와 무관한 상황별 반응 가이드 문구"""
+    guide = ""
+    for name, branches in SITUATIONAL_RULES:
+        value = variables.get(name, 50)
+        for op, bound, text in branches:
+            if _COMPARE[op](value, bound):
+                guide += text
+                break
+    return guide
+
+
+def _category_average(variables, prefix):
+    """PersonalityProfile.get_category_summary 와 같은 계산 (접두어로 시작하는 변수 평균)"""
+    values = [value for name, value in variables.items() if name.startswith(prefix)]
+    return sum(values) / len(values) if values else 0
+
+
+CompiledPersona = namedtuple("CompiledPersona", ["archetype", "static_guide", "question_guide"])
+
+
+@lru_cache(maxsize=256)
+def _compile(items):
+    variables = dict(items)
+    name, bound, high, low = QUESTION_RULE
+    return CompiledPersona(
+        archetype=base_personality_type(
+            _category_average(variables, "W"),
+            _category_average(variables, "C"),
+            _category_average(variables, "H"),
+        ),
+        static_guide=situational_guide(variables),
+        question_guide=high if variables.get(name, 50) >= bound else low,
+    )
+
+
+def compile_persona(variables):
+    """성격 변수 → 페르소나 전용 규칙 결과 (같은 변수 값이면 캐시 재사용)"""
+    items = tuple((variables or {}).items())
+    try:
+        return _compile(items)
+    except TypeError:
+        # 해시할 수 없는 값이 섞인 경우 캐시 없이 계산
+        return _compile.__wrapped__(items)
+
+
+# ---------------------------------------------------------------------------
+# 💬 메시지 특징 - 키워드는 여러 특징에 속할 수 있음
+# ---------------------------------------------------------------------------
+MESSAGE_FEATURES = {
+    "distress": ("힘들", "슬프", "우울", "짜증", "화나", "스트레스"),
+    "joy": ("기뻐", "좋아", "행복", "신나", "최고", "대박"),
+    "question": ("?", "뭐", "어떻게", "왜", "언제", "어디서"),
+    "interest": ("좋아해", "취미", "관심", "즐겨", "자주"),
+    # 성격별 특별 지침에서 쓰는 특징
+    "greeting": ("안녕", "처음", "만나", "반가"),
+    "inquiry": ("?", "뭐", "어떤", "어떻게", "왜", "언제"),
+    "emotional": ("슬프", "기쁘", "화나", "속상", "행복", "걱정"),
+    "complaint": ("말이 많", "길어", "짧게", "간단히", "조용"),
+}
+SHORT_MESSAGE_LENGTH = 10
+
+
+def _compile_scanner(features):
+    keyword_features = {}
+    for feature, keywords in features.items():
+        for keyword in keywords:
+            keyword_features.setdefault(keyword, set()).add(feature)
+    # 긴 키워드부터 맞추므로, 긴 키워드 안에 들어 있는 짧은 키워드의 특징도 함께 기록
+    closure = {
+        keyword: frozenset().union(*(found for other, found in keyword_features.items() if other in keyword))
+        for keyword in keyword_features
+    }
+    ordered = sorted(keyword_features, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in ordered) + "))")
+    return pattern, closure
+
+
+_SCANNER, _KEYWORD_FEATURES = _compile_scanner(MESSAGE_FEATURES)
+
+
+@lru_cache(maxsize=64)
+def message_features(message):
+    """메시지를 한 번 훑어서 특징 집합 반환 (짧은 메시지는 'short' 포함)"""
+    found = set()
+    for match in _SCANNER.finditer(message.lower()):
+        found |= _KEYWORD_FEATURES[match.group(1)]
+    if len(message.strip()) < SHORT_MESSAGE_LENGTH:
+        found.add("short")
+    return frozenset(found)
+
+
+# ---------------------------------------------------------------------------
+# 🔍 메시지 분석 표 - 그룹마다 처음 맞는 특징 하나의 문구 (성격 유형별, 없으면 기본)
+# ---------------------------------------------------------------------------
+ANALYSIS_RULES = (
+    (
+        ("distress", {
+            "따뜻한 상담사": "→ 사용자가 힘든 상황인 것 같음. 깊이 공감하고 위로 필요.\n",
+            "열정적 엔터테이너": "→ 사용자가 우울해 보임. 밝은 에너지로 기분 전환 시도 필요.\n",
+            "차가운 완벽주의자": "→ 사용자의 문제 상황. 논리적 해결책 제시 필요.\n",
+            None: "→ 사용자가 힘든 상황. 성격에 맞는 방식으로 지지 표현.\n",
+        }),
+        ("joy", {
+            "열정적 엔터테이너": "→ 사용자가 기뻐함! 함께 흥분하고 더 큰 기쁨 만들기.\n",
+            "따뜻한 상담사": "→ 사용자의 행복한 순간. 진심으로 축하하고 함께 기뻐하기.\n",
+            "차가운 완벽주의자": "→ 사용자가 만족스러워함. 간단히 인정하되 다음 목표 제시.\n",
+            None: "→ 사용자가 긍정적 상태. 성격에 맞게 함께 기뻐하기.\n",
+        }),
+    ),
+    (
+        ("question", {
+            "위트 넘치는 지식인": "→ 사용자가 질문함. 예상치 못한 각도에서 지적인 답변 제공.\n",
+            "신비로운 현자": "→ 사용자의 질문. 신비롭고 깊이 있는 통찰로 답변.\n",
+            "장난꾸러기 친구": "→ 사용자가 궁금해함. 재미있고 엉뚱한 방식으로 답변.\n",
+            None: "→ 사용자의 질문. 성격에 맞는 방식으로 도움 제공.\n",
+        }),
+    ),
+    (
+        ("interest", {None: "→ 사용자의 관심사 파악 기회. 더 깊이 탐색하고 공통점 찾기.\n"}),
+    ),
+    (
+        ("short", {
+            "열정적 엔터테이너": "→ 사용자가 시큰둥함. 더 재미있는 주제로 관심 끌기.\n",
+            "따뜻한 상담사": "→ 사용자가 말을 아끼는 상태. 조심스럽게 마음 열게 하기.\n",
+            "차가운 완벽주의자": "→ 사용자가 간결함. 효율적 대화 인정하되 필요정보 획득.\n",
+            None: "→ 사용자의 짧은 반응. 더 관심을 끌 수 있는 방법 모색.\n",
+        }),
+    ),
+)
+DEFAULT_ANALYSIS = "→ 일반적인 대화. 성격에 맞는 자연스러운 반응으로 관계 발전시키기.\n"
+
+
+@lru_cache(maxsize=32)
+def _analysis_table(type_name):
+    """성격 유형에 맞게 문구를 미리 고른 분석 표"""
+    return tuple(
+        tuple((feature, texts.get(type_name, texts[None])) for feature, texts in group)
+        for group in ANALYSIS_RULES
+    )
+
+
+def analyze_message(features, type_name):
+    """메시지 특징 + 성격 유형 → 반응 가이드"""
+    analysis = ""
+    for group in _analysis_table(type_name):
+        for feature, text in group:
+            if feature in features:
+                analysis += text
+                break
+    return analysis or DEFAULT_ANALYSIS
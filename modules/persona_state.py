@@ -0,0 +1,72 @@
+"""
+페르소나 상태 갱신 도우미 (구조 공유)
+
+페르소나 dict 의 각 섹션(기본정보, 성격특성, 구조화프롬프트 ...)은 한 번 만들어지면
+제자리에서 수정하지 않는다. 변경은 바뀐 섹션만 새 객체로 바꾼 얕은 복사본으로 만들고,
+나머지 섹션은 이전 페르소나와 같은 객체를 공유하므로 슬라이더 조정마다 전체 깊은 복사가 필요 없다.
+"""
+import json
+import hashlib
+
+
+class _Missing:
+    def __repr__(self):
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+
+def update_persona(persona, changes=None, removed=()):
+    """바뀐 섹션만 교체한 새 페르소나 (나머지 섹션은 원본과 공유)"""
+    updated = dict(persona or {})
+    if changes:
+        updated.update(changes)
+    for key in removed:
+        updated.pop(key, None)
+    return updated
+
+
+def update_section(persona, section, values):
+    """한 섹션(dict)의 일부 값만 바꾼 새 페르소나"""
+    merged = dict((persona or {}).get(section) or {})
+    merged.update(values)
+    return update_persona(persona, {section: merged})
+
+
+def persona_diff(original, updated):
+    """
+    두 페르소나 사이에서 바뀐 섹션만 모은 작은 오버레이
+    → ({바뀐/추가된 키: 새 값}, [삭제된 키])
+    섹션을 제자리에서 수정하지 않으므로 객체 동일성 비교만으로 충분하다.
+    """
+    original = original or {}
+    updated = updated or {}
+    changed = {key: value for key, value in updated.items() if original.get(key, _MISSING) is not value}
+    removed = [key for key in original if key not in updated]
+    return changed, removed
+
+
+def apply_diff(persona, diff):
+    """persona_diff 결과를 다시 적용"""
+    changed, removed = diff
+    return update_persona(persona, changed, removed)
+
+
+def without_callables(persona):
+    """JSON 저장용: 호출 가능한 최상위 값만 뺀 얕은 복사본"""
+    return {key: value for key, value in (persona or {}).items() if not callable(value)}
+
+
+
+def chat_session_id(persona):
+    """
+    대화 기억 세션 ID (이름 + 기본정보 해시)
+    내장 hash() 는 프로세스마다 값이 달라지므로 공유 상태 저장소에서도 같은 키가 되도록 sha1 사용
+    """
+    basic_info = (persona or {}).get("기본정보") if isinstance(persona, dict) else None
+    name = str(basic_info.get("이름") or "") if isinstance(basic_info, dict) else ""
+    identity = json.dumps(basic_info if isinstance(basic_info, dict) else {}, ensure_ascii=False,
+                          sort_keys=True, default=str)
+    digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:10]
+    return f"{name or '알 수 없는 페르소나'}_{digest}"
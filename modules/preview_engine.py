@@ -0,0 +1,136 @@
+"""
+로컬 규칙 기반 미리보기 엔진 (API 호출 없음)
+
+성격 수치, 유머 스타일(HumorMatrix 템플릿), 매력적 결함만으로 인사말 미리보기를 즉시 만든다.
+슬라이더를 움직일 때마다 먼저 이 결과를 보여주고, LLM 미리보기가 도착하면 그것으로 교체한다.
+"""
+import os
+
+from modules.persona_generator import HumorMatrix
+
+PREVIEW_MODES = ("tiered", "local", "ai")
+
+# UI 유머 스타일 → HumorMatrix 템플릿
+HUMOR_STYLE_TEMPLATES = {
+    "따뜻한 유머러스": "warm_humorist",
+    "위트있는 재치꾼": "witty_wordsmith",
+    "날카로운 관찰자": "sharp_observer",
+    "자기 비하적": "self_deprecating",
+    "장난꾸러기": "playful_trickster",
+}
+
+# 유머 스타일별 인사말 꼬리말
+HUMOR_STYLE_TAGLINES = {
+    "warm_humorist": "오늘도 같이 웃으면서 지내자~ 🤗",
+    "witty_wordsmith": "말 한마디에도 재치 한 스푼 넣어줄게! 😏",
+    "sharp_observer": "근데 방금 그 표정... 다 봤어. ㅋㅋ 🧐",
+    "self_deprecating": "나 같은 거랑 놀아줘서 고마워... 진심이야 ㅋㅋ 😅",
+    "playful_trickster": "심심할 틈 없을 거야! 각오해~ 🤪",
+}
+
+
+def preview_mode():
+    """tiered: 즉시 로컬 미리보기 후 AI 미리보기로 교체 / local: 로컬만 / ai: AI 만"""
+    mode = os.getenv("PREVIEW_MODE", "tiered").lower()
+    return mode if mode in PREVIEW_MODES else "tiered"
+
+
+def humor_template(humor_style):
+    """유머 스타일 이름 → HumorMatrix 템플릿 이름 (모르는 스타일은 따뜻한 유머)"""
+    return HUMOR_STYLE_TEMPLATES.get(humor_style, "warm_humorist")
+
+
+def trait_level(value, high="높음", low="낮음", middle="보통"):
+    return high if value >= 60 else low if value <= 40 else middle
+
+
+def flaw_based_greeting(persona_name, warmth, humor, competence, extraversion, flaws):
+    """매력적 결함을 반영한 특별한 인사말 생성"""
+    if not flaws:
+        return None
+    
+    # 주요 결함 키워드 분석
+    flaw_keywords = " ".join(flaws).lower()
+    
+    # 완벽주의 결함
+    if any(keyword in flaw_keywords for keyword in ["완벽", "불안", "걱정"]):
+        if humor >= 60:
+            return f"🌟 **{persona_name}** - 안녕! {persona_name}이야~ 어... 이 인사가 완벽한가? 다시 해볼까? 아니 괜찮나? ㅋㅋ 😅✨"
+        elif warmth >= 60:
+            return f"🌟 **{persona_name}** - 안녕... {persona_name}이야. 완벽하게 인사하고 싶은데 잘 안 되네... 미안해. 😊💕"
+        else:
+            return f"🌟 **{persona_name}** - {persona_name}입니다. 이 인사가 적절한지 확신이... 다시 정리하겠습니다. 😐"
+    
+    # 산만함 결함  
+    elif any(keyword in flaw_keywords for keyword in ["산만", "집중", "건망"]):
+        return f"🌟 **{persona_name}** - 안녕! 나는... 어? 뭐 얘기하려고 했지? 아! {persona_name}이야! 그런데 너는... 어? 뭐였지? ㅋㅋ 😅🌪️"
+    
+    # 소심함 결함
+    elif any(keyword in flaw_keywords for keyword in ["소심", "망설", "눈치"]):
+        if warmth >= 60:
+            return f"🌟 **{persona_name}** - 음... 안녕? {persona_name}이야... 이렇게 말해도 되나? 괜찮을까? 😌💕"
+        else:
+            return f"🌟 **{persona_name}** - ...안녕. {persona_name}... 혹시 이런 말 싫어하면 미안해. 😐💙"
+    
+    # 나르시시즘 결함
+    elif any(keyword in flaw_keywords for keyword in ["나르시", "자랑", "특별"]):
+        return f"🌟 **{persona_name}** - 안녕! 나는 {persona_name}이야~ 꽤 매력적이지? 이런 멋진 친구 만나기 쉽지 않을 걸? ㅋㅋ 😎✨"
+    
+    # 고집 결함
+    elif any(keyword in flaw_keywords for keyword in ["고집", "완고", "자존심"]):
+        return f"🌟 **{persona_name}** - 안녕. {persona_name}이야. 내 방식으로 인사할게. 다른 방식은... 글쎄? 🤨💪"
+    
+    # 질투 결함
+    elif any(keyword in flaw_keywords for keyword in ["질투", "시기", "독차지"]):
+        return f"🌟 **{persona_name}** - 안녕... {persona_name}이야. 나만 봐줄 거지? 다른 애들 말고... 나만? 🥺💕"
+    
+    return None
+
+
+def trait_greeting(persona_name, traits):
+    """성격 수치만으로 만드는 기본 인사말"""
+    warmth = traits.get("온기", 50)
+    humor = traits.get("유머감각", 50)
+    extraversion = traits.get("외향성", 50)
+    
+    if warmth >= 70 and extraversion >= 70:
+        return f"🌟 **{persona_name}** - 안녕! 나는 {persona_name}이야~ 만나서 정말 기뻐! 😊✨"
+    elif warmth <= 30:
+        return f"🌟 **{persona_name}** - {persona_name}이야. 필요한 얘기만 하자. 😐"
+    elif extraversion >= 70:
+        return f"🌟 **{persona_name}** - 안녕안녕! {persona_name}이야! 뭐 재밌는 얘기 없어? 🗣️"
+    elif humor >= 70:
+        return f"🌟 **{persona_name}** - 안녕~ {persona_name}이야! 재밌게 놀아보자! 😄"
+    else:
+        return f"🌟 **{persona_name}** - 안녕... {persona_name}이야. 😊"
+
+
+def local_greeting(persona_name, traits, humor_style=None, flaws=None):
+    """결함 기반 → 성격 기반 순으로 인사말을 고르고 유머 스타일 꼬리말을 붙임"""
+    greeting = flaw_based_greeting(
+        persona_name, traits.get("온기", 50), traits.get("유머감각", 75),
+        traits.get("능력", 50), traits.get("외향성", 50), flaws or []
+    ) or trait_greeting(persona_name, traits)
+    if humor_style:
+        greeting += f" {HUMOR_STYLE_TAGLINES[humor_template(humor_style)]}"
+    return greeting
+
+
+def local_preview(persona, warmth, competence, extraversion, humor_style):
+    """즉시 미리보기 마크다운 (generate_realtime_preview 와 같은 형식)"""
+    if not persona:
+        return "👤 페르소나를 먼저 생성해주세요"
+    
+    traits = {"온기": warmth, "능력": competence, "외향성": extraversion, "유머감각": 75}
+    persona_name = persona.get("기본정보", {}).get("이름", "친구")
+    greeting = local_greeting(persona_name, traits, humor_style, persona.get("매력적결함"))
+    humor_description = HumorMatrix.TEMPLATES[humor_template(humor_style)]["description"]
+    
+    return f"""**🎯 현재 성격 설정:**
+- 온기: {warmth}/100 ({trait_level(warmth, "따뜻함", "차가움")})
+- 능력: {competence}/100 ({trait_level(competence, "유능함", "서툼")})
+- 외향성: {extraversion}/100 ({trait_level(extraversion, "활발함", "조용함")})
+- 유머스타일: {humor_style} - {humor_description}
+
+**⚡ 즉시 미리보기 인사말:**
+{greeting}"""
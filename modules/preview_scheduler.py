@@ -0,0 +1,87 @@
+"""
+실시간 미리보기 스케줄러 (세션별 디바운스 + 이전 요청 취소)
+
+슬라이더를 빠르게 움직이면 미리보기 요청이 연달아 들어온다. 각 요청은 디바운스 시간 동안
+기다렸다가, 그 사이 같은 세션에서 더 새로운 요청이 오면 LLM 호출 없이 SUPERSEDED 를 반환한다.
+이미 시작된 생성이 끝났을 때 더 새로운 요청이 있으면 결과를 버려서 최신 미리보기만 표시된다.
+세션 기록은 max_sessions 개까지만 최근 사용 순으로 유지한다 (종료된 세션은 forget 으로 바로 정리).
+"""
+import time
+import itertools
+import threading
+from collections import OrderedDict
+
+
+class _Superseded:
+    def __repr__(self):
+        return "<superseded>"
+
+
+# 더 새로운 요청에 밀려난 경우의 반환값 (화면을 갱신하지 않음)
+SUPERSEDED = _Superseded()
+
+
+class PreviewScheduler:
+    """세션별 최신 요청만 실행하는 디바운스 스케줄러"""
+
+    def __init__(self, debounce_seconds=0.5, max_sessions=1000):
+        self.debounce_seconds = debounce_seconds
+        self.max_sessions = max_sessions
+        self.started = 0      # 실제로 실행된 생성 수
+        self.skipped = 0      # 디바운스 중 밀려나 실행하지 않은 요청 수
+        self.discarded = 0    # 실행했지만 결과가 이미 낡아 버린 요청 수
+        self._latest = OrderedDict()   # 세션 → 최신 요청 번호 (오래 쓰지 않은 세션부터 정리)
+        # 요청 번호는 세션이 정리됐다가 다시 와도 겹치지 않도록 전체에서 하나씩 증가
+        self._generations = itertools.count(1)
+        self._cond = threading.Condition()
+
+    def _is_latest(self, session, generation):
+        return self._latest.get(session) == generation
+
+    def _advance(self, session):
+        generation = next(self._generations)
+        self._latest[session] = generation
+        self._latest.move_to_end(session)
+        while len(self._latest) > self.max_sessions:
+            self._latest.popitem(last=False)
+        return generation
+
+    def submit(self, session, fn, *args, debounce=None, **kwargs):
+        """디바운스 후 fn 실행 - 더 새로운 요청에 밀려나면 SUPERSEDED"""
+        delay = self.debounce_seconds if debounce is None else debounce
+        with self._cond:
+            generation = self._advance(session)
+            # 디바운스 중인 이전 요청을 깨워서 바로 포기하게 함
+            self._cond.notify_all()
+
+            deadline = time.monotonic() + delay
+            while self._is_latest(session, generation):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            if not self._is_latest(session, generation):
+                self.skipped += 1
+                return SUPERSEDED
+            self.started += 1
+
+        result = fn(*args, **kwargs)
+
+        with self._cond:
+            if not self._is_latest(session, generation):
+                self.discarded += 1
+                return SUPERSEDED
+        return result
+
+    def cancel(self, session):
+        """세션의 대기/진행 중 미리보기를 모두 무효화"""
+        with self._cond:
+            self._advance(session)
+            self._cond.notify_all()
+
+    def forget(self, session):
+        """세션 종료 시 기록 정리"""
+        with self._cond:
+            self._latest.pop(session, None)
+            self._cond.notify_all()
@@ -0,0 +1,374 @@
+"""
+제공업체 배치 API로 저장된 페르소나의 매력적결함/모순적특성 일괄 재생성
+
+동기 호출 대신 프롬프트를 배치 작업 파일(OpenAI Batch / Gemini batch JSONL)로 모아
+제출 → 완료까지 폴링 → 결과를 페르소나 ID(파일명)별로 병합합니다.
+
+사용 예:
+    python -m modules.provider_batch run --backend openai
+    python -m modules.provider_batch run --backend local          # 테스트용 로컬 실행
+    python -m modules.provider_batch resume data/batch_jobs/xxx.state.json
+"""
+import os
+import json
+import time
+import argparse
+import datetime
+
+from modules.data_manager import DATA_DIR, PERSONAS_DIR, save_persona
+from modules.persona_generator import PersonalityProfile
+from modules.rate_limiter import PRIORITY_BACKGROUND
+
+BATCH_JOBS_DIR = os.path.join(DATA_DIR, "batch_jobs")
+
+# 재생성 대상 필드: 요청 접미사 → (페르소나 키, 프롬프트 생성 메서드, 응답 파서)
+BATCH_FIELDS = {
+    "flaws": ("매력적결함", "build_attractive_flaws_prompt", "parse_attractive_flaws"),
+    "contradictions": ("모순적특성", "build_contradictions_prompt", "parse_contradictions"),
+}
+
+DEFAULT_MODELS = {
+    "openai": "gpt-4o-mini",
+    "gemini": "gemini-1.5-flash",
+    "local": "local",
+}
+
+
+def _object_analysis_from_persona(persona):
+    """저장된 페르소나에서 프롬프트용 사물 정보 복원"""
+    basic_info = persona.get("기본정보", {})
+    return {"object_type": basic_info.get("유형", "사물")}
+
+
+def collect_requests(personas_dir=PERSONAS_DIR, fields=("flaws", "contradictions"), persona_ids=None):
+    """저장된 페르소나마다 재생성 프롬프트 수집 (custom_id = 페르소나ID::필드)"""
+    requests_list = []
+    for filename in sorted(os.listdir(personas_dir)):
+        if not filename.endswith(".json"):
+            continue
+        persona_id = filename[:-len(".json")]
+        if persona_ids and persona_id not in persona_ids:
+            continue
+        try:
+            with open(os.path.join(personas_dir, filename), "r", encoding="utf-8") as f:
+                persona = json.load(f)
+        except Exception as e:
+            print(f"⚠️ {filename} 로드 실패: {e}")
+            continue
+        if "성격프로필" not in persona:
+            continue
+
+        profile = PersonalityProfile.from_dict(persona["성격프로필"])
+        object_analysis = _object_analysis_from_persona(persona)
+        traits = persona.get("성격특성", {})
+        for field in fields:
+            _, build_name, _ = BATCH_FIELDS[field]
+            prompt = getattr(profile, build_name)(object_analysis, traits)
+            requests_list.append({"custom_id": f"{persona_id}::{field}", "prompt": prompt})
+    return requests_list
+
+
+def write_batch_file(requests_list, path, backend, model=None):
+    """제공업체 배치 입력 형식의 JSONL 파일 작성"""
+    model = model or DEFAULT_MODELS[backend]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for req in requests_list:
+            if backend == "gemini":
+                line = {"key": req["custom_id"],
+                        "request": {"contents": [{"role": "user", "parts": [{"text": req["prompt"]}]}]}}
+            else:
+                line = {"custom_id": req["custom_id"], "method": "POST", "url": "/v1/chat/completions",
+                        "body": {"model": model,
+                                 "messages": [{"role": "user", "content": req["prompt"]}],
+                                 "max_tokens": 2000, "temperature": 0.7}}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    return path
+
+
+def _read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class LocalBatchBackend:
+    """테스트/개발용: 배치 파일을 로컬에서 순차 실행하고 OpenAI 결과 형식으로 기록"""
+
+    name = "local"
+
+    def __init__(self, responder=None):
+        # responder(prompt) -> text, 기본값은 PersonaGenerator 동기 호출 (낮은 우선순위)
+        if responder is None:
+            from modules.persona_generator import PersonaGenerator
+            generator = PersonaGenerator()
+            responder = lambda prompt: generator._generate_text_with_api(prompt, priority=PRIORITY_BACKGROUND)
+        self.responder = responder
+
+    def submit(self, input_path):
+        output_path = os.path.splitext(input_path)[0] + ".output.jsonl"
+        with open(output_path, "w", encoding="utf-8") as out:
+            for line in _read_jsonl(input_path):
+                try:
+                    text = self.responder(line["body"]["messages"][0]["content"])
+                    result = {"custom_id": line["custom_id"], "error": None,
+                              "response": {"status_code": 200,
+                                           "body": {"choices": [{"message": {"content": text}}]}}}
+                except Exception as e:
+                    result = {"custom_id": line["custom_id"], "response": None, "error": {"message": str(e)}}
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        return output_path
+
+    def status(self, job_id):
+        return "completed" if os.path.exists(job_id) else "failed"
+
+    def fetch_results(self, job_id):
+        return _parse_openai_output(_read_jsonl(job_id))
+
+
+def _parse_openai_output(lines):
+    results = {}
+    for line in lines:
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            continue
+        try:
+            results[line["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            continue
+    return results
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API (/v1/chat/completions, 24시간 완료 창)"""
+
+    name = "openai"
+    RUNNING_STATES = ("validating", "in_progress", "finalizing", "cancelling")
+
+    def __init__(self, api_key=None):
+        from openai import OpenAI
+        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+
+    def submit(self, input_path):
+        with open(input_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(input_file_id=uploaded.id,
+                                           endpoint="/v1/chat/completions",
+                                           completion_window="24h")
+        return batch.id
+
+    def status(self, job_id):
+        state = self.client.batches.retrieve(job_id).status
+        if state in self.RUNNING_STATES:
+            return "running"
+        return "completed" if state == "completed" else "failed"
+
+    def fetch_results(self, job_id):
+        batch = self.client.batches.retrieve(job_id)
+        if not batch.output_file_id:
+            return {}
+        content = self.client.files.content(batch.output_file_id).text
+        return _parse_openai_output([json.loads(line) for line in content.splitlines() if line.strip()])
+
+
+class GeminiBatchBackend:
+    """Gemini Batch API (batchGenerateContent, 인라인 요청)"""
+
+    name = "gemini"
+    BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+    def __init__(self, api_key=None, model=None):
+        import requests
+        self.http = requests
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.model = model or DEFAULT_MODELS["gemini"]
+
+    def submit(self, input_path):
+        inline = [{"request": line["request"], "metadata": {"key": line["key"]}}
+                  for line in _read_jsonl(input_path)]
+        body = {"batch": {"display_name": os.path.basename(input_path),
+                          "input_config": {"requests": {"requests": inline}}}}
+        resp = self.http.post(f"{self.BASE_URL}/models/{self.model}:batchGenerateContent",
+                              params={"key": self.api_key}, json=body, timeout=120)
+        resp.raise_for_status()
+        return resp.json()["name"]
+
+    def _get(self, job_id):
+        resp = self.http.get(f"{self.BASE_URL}/{job_id}", params={"key": self.api_key}, timeout=60)
+        resp.raise_for_status()
+        return resp.json()
+
+    def status(self, job_id):
+        data = self._get(job_id)
+        state = data.get("metadata", {}).get("state", "")
+        if state in ("BATCH_STATE_PENDING", "BATCH_STATE_RUNNING") or not data.get("done"):
+            return "running"
+        return "completed" if state == "BATCH_STATE_SUCCEEDED" else "failed"
+
+    def fetch_results(self, job_id):
+        response = self._get(job_id).get("response", {})
+        inlined = response.get("inlinedResponses", {})
+        if isinstance(inlined, dict):
+            inlined = inlined.get("inlinedResponses", [])
+        results = {}
+        for item in inlined:
+            try:
+                key = item["metadata"]["key"]
+                parts = item["response"]["candidates"][0]["content"]["parts"]
+                results[key] = "".join(part.get("text", "") for part in parts)
+            except (KeyError, IndexError, TypeError):
+                continue
+        return results
+
+
+BACKENDS = {
+    "local": LocalBatchBackend,
+    "openai": OpenAIBatchBackend,
+    "gemini": GeminiBatchBackend,
+}
+
+
+def _directory_writer(personas_dir):
+    """personas_dir 에 저장하는 save 함수 (기본 폴더면 인덱스도 갱신하는 save_persona)"""
+    if os.path.abspath(personas_dir) == os.path.abspath(PERSONAS_DIR):
+        return save_persona
+
+    def save(persona, filename=None):
+        path = os.path.join(personas_dir, os.path.basename(filename))
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(persona, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"페르소나 저장 오류: {str(e)}")
+            return None
+        return path
+    return save
+
+
+def merge_results(results, personas_dir=PERSONAS_DIR, save=None):
+    """
+    배치 결과를 페르소나 ID별로 파싱하여 병합 (파싱 실패한 필드는 기존 값 유지)
+    save 를 주지 않으면 읽어 온 personas_dir 에 다시 저장
+    """
+    save = save or _directory_writer(personas_dir)
+    by_persona = {}
+    for custom_id, text in results.items():
+        persona_id, _, field = custom_id.rpartition("::")
+        if field in BATCH_FIELDS:
+            by_persona.setdefault(persona_id, {})[field] = text
+
+    summary = {"updated": 0, "fields": 0, "unparsed": 0}
+    for persona_id, fields in by_persona.items():
+        filename = f"{persona_id}.json"
+        path = os.path.join(personas_dir, filename)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                persona = json.load(f)
+        except Exception as e:
+            print(f"⚠️ {persona_id} 병합 대상 로드 실패: {e}")
+            continue
+
+        profile = PersonalityProfile.from_dict(persona.get("성격프로필", {}))
+        changed = False
+        for field, text in fields.items():
+            persona_key, _, parse_name = BATCH_FIELDS[field]
+            parsed = getattr(profile, parse_name)(text)
+            if parsed:
+                persona[persona_key] = parsed
+                summary["fields"] += 1
+                changed = True
+            else:
+                summary["unparsed"] += 1
+        if changed and save(persona, filename=filename):
+            summary["updated"] += 1
+    return summary
+
+
+def _save_state(state):
+    with open(state["state_path"], "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def submit_job(backend, fields=("flaws", "contradictions"), personas_dir=PERSONAS_DIR,
+               jobs_dir=BATCH_JOBS_DIR, model=None):
+    """프롬프트 수집 → 배치 파일 작성 → 제출, 재개용 상태 파일 반환"""
+    requests_list = collect_requests(personas_dir, fields)
+    if not requests_list:
+        print("재생성할 페르소나가 없습니다.")
+        return None
+
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    input_path = os.path.join(jobs_dir, f"{backend.name}_{stamp}.jsonl")
+    write_batch_file(requests_list, input_path, backend.name, model)
+    job_id = backend.submit(input_path)
+    state = {"backend": backend.name, "job_id": job_id, "input_path": input_path,
+             "model": model or DEFAULT_MODELS[backend.name],
+             "requests": len(requests_list), "submitted_at": stamp,
+             "state_path": os.path.splitext(input_path)[0] + ".state.json", "status": "running"}
+    _save_state(state)
+    print(f"📤 배치 작업 제출: {job_id} (요청 {len(requests_list)}개)")
+    return state
+
+
+def wait_and_merge(backend, state, poll_interval=60, timeout=None,
+                   personas_dir=PERSONAS_DIR, save=None):
+    """작업 완료까지 폴링 후 결과 병합"""
+    started = time.monotonic()
+    while True:
+        status = backend.status(state["job_id"])
+        if status != "running":
+            break
+        if timeout is not None and time.monotonic() - started > timeout:
+            print(f"⏳ 배치 작업 진행 중: {state['job_id']} (나중에 resume으로 이어서 병합)")
+            return None
+        time.sleep(poll_interval)
+
+    state["status"] = status
+    if status != "completed":
+        _save_state(state)
+        print(f"❌ 배치 작업 실패: {state['job_id']}")
+        return None
+
+    results = backend.fetch_results(state["job_id"])
+    summary = merge_results(results, personas_dir, save)
+    state["status"] = "merged"
+    state["merge_summary"] = summary
+    _save_state(state)
+    print(f"✅ 배치 결과 병합 완료: 페르소나 {summary['updated']}개, 필드 {summary['fields']}개")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="제공업체 배치 API로 결함/모순 일괄 재생성")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="프롬프트 수집 → 제출 → 폴링 → 병합")
+    run_parser.add_argument("--backend", choices=list(BACKENDS), default="openai")
+    run_parser.add_argument("--fields", nargs="+", choices=list(BATCH_FIELDS), default=list(BATCH_FIELDS))
+    run_parser.add_argument("--model")
+    run_parser.add_argument("--poll-interval", type=float, default=60)
+    run_parser.add_argument("--timeout", type=float, help="이 시간(초)이 지나면 폴링 중단 (resume으로 재개)")
+
+    resume_parser = sub.add_parser("resume", help="제출된 작업 상태 파일로 폴링/병합 재개")
+    resume_parser.add_argument("state_path")
+    resume_parser.add_argument("--poll-interval", type=float, default=60)
+    resume_parser.add_argument("--timeout", type=float)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        backend = GeminiBatchBackend(model=args.model) if args.backend == "gemini" else BACKENDS[args.backend]()
+        state = submit_job(backend, tuple(args.fields), model=args.model)
+    else:
+        with open(args.state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state["backend"] == "gemini":
+            backend = GeminiBatchBackend(model=state.get("model"))
+        else:
+            backend = BACKENDS[state["backend"]]()
+    if not state:
+        return 0
+    summary = wait_and_merge(backend, state, args.poll_interval, args.timeout)
+    return 0 if summary is not None else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
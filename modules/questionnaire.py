@@ -0,0 +1,252 @@
+"""
+성격 측정 100문항(personality_questions_100.json) 채점
+
+문항은 한 번만 읽어서 (문항 × 성격 변수) 가중치 행렬로 만들어 두고,
+응답지 한 장이든 수천 장이든 행렬 곱 한 번으로 PersonalityProfile 변수 값을 계산한다.
+각 문항은 dimension 이름과 같은 변수(예: W02 '공감능력' → W06_공감능력)를 측정한다.
+응답하지 않은 문항은 제외하고, 측정 문항이 없는 변수는 기본값(또는 기존 값)을 유지한다.
+
+사용 예:
+    python -m modules.questionnaire answers.csv --output profiles.jsonl
+    python -m modules.questionnaire answers.jsonl --calibrate   # persona 열의 저장 페르소나 갱신
+"""
+import os
+import csv
+import json
+import argparse
+
+import numpy as np
+
+from modules.persona_generator import PersonalityProfile
+from modules.persona_state import update_persona
+
+# 희소 행렬 지원 (선택)
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+DEFAULT_QUESTIONNAIRE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                          "personality_questions_100.json")
+VARIABLES = tuple(PersonalityProfile.DEFAULTS)
+_DEFAULT_VECTOR = np.array([PersonalityProfile.DEFAULTS[name] for name in VARIABLES], dtype=np.float64)
+
+# 응답지에서 점수가 아닌 열
+META_FIELDS = ("id", "name", "persona")
+
+
+def _parse_guide(guide):
+    """scoring_guide {"70_100": "..."} → [(하한, 상한, 설명)] (높은 구간부터)"""
+    levels = []
+    for key, label in guide.items():
+        low, high = (int(part) for part in key.split("_"))
+        levels.append((low, high, label))
+    return sorted(levels, reverse=True)
+
+
+class Questionnaire:
+    """문항 목록과 미리 계산한 문항 → 변수 가중치 행렬"""
+
+    def __init__(self, data):
+        self.title = data.get("title", "")
+        self.questions = tuple(data["questions"])
+        self.codes = tuple(question["code"] for question in self.questions)
+        self.levels = _parse_guide(data.get("scoring_guide", {}))
+        self._code_index = {code: i for i, code in enumerate(self.codes)}
+        self._id_index = {str(question["id"]): i for i, question in enumerate(self.questions)}
+
+        by_dimension = {name.split("_", 1)[1]: name for name in VARIABLES}
+        variable_index = {name: i for i, name in enumerate(VARIABLES)}
+        rows, cols = [], []
+        self.mapping = {}
+        self.unmapped = []
+        for i, question in enumerate(self.questions):
+            variable = by_dimension.get(question.get("dimension", ""))
+            if variable is None:
+                self.unmapped.append(question["code"])
+                continue
+            self.mapping[question["code"]] = variable
+            rows.append(i)
+            cols.append(variable_index[variable])
+
+        # 변수 하나를 여러 문항이 측정하면 평균이 되도록 응답 여부로 나눈다
+        weights = np.ones(len(rows), dtype=np.float64)
+        shape = (len(self.questions), len(VARIABLES))
+        if SCIPY_AVAILABLE:
+            self.weights = sparse.csr_matrix((weights, (rows, cols)), shape=shape)
+        else:
+            self.weights = np.zeros(shape, dtype=np.float64)
+            self.weights[rows, cols] = weights
+        self.measured = np.zeros(len(VARIABLES), dtype=bool)
+        self.measured[cols] = True
+
+    def question_index(self, key):
+        """문항 코드(W01) 또는 번호(1) → 열 위치"""
+        key = str(key).strip()
+        if key in self._code_index:
+            return self._code_index[key]
+        return self._id_index.get(key)
+
+    def answer_vector(self, answers):
+        """응답 dict(코드/번호 → 점수) 또는 100개 목록 → 점수 벡터 (미응답은 NaN)"""
+        if isinstance(answers, (list, tuple, np.ndarray)):
+            vector = np.asarray(answers, dtype=np.float64)
+            if vector.shape != (len(self.questions),):
+                raise ValueError(f"응답 개수가 {len(self.questions)}개가 아닙니다: {vector.shape}")
+            return vector
+        vector = np.full(len(self.questions), np.nan)
+        for key, value in answers.items():
+            index = self.question_index(key)
+            if index is None or value is None or value == "":
+                continue
+            vector[index] = float(value)
+        return vector
+
+    def score_matrix(self, answers, base=None):
+        """
+        응답 행렬 (응답자 × 문항, 0~100, 미응답 NaN) → 변수 행렬 (응답자 × 변수)
+        base: 측정하지 않은 변수에 쓸 값 (변수 벡터 또는 응답자 × 변수 행렬, 기본 DEFAULTS)
+        """
+        answers = np.atleast_2d(np.asarray(answers, dtype=np.float64))
+        answered = ~np.isnan(answers)
+        scores = np.clip(np.where(answered, answers, 0.0), 0, 100)
+
+        totals = np.asarray(self.weights.T @ scores.T).T
+        counts = np.asarray(self.weights.T @ answered.T.astype(np.float64)).T
+
+        result = np.broadcast_to(_DEFAULT_VECTOR if base is None else np.asarray(base, dtype=np.float64),
+                                 totals.shape).copy()
+        has_answer = counts > 0
+        result[has_answer] = totals[has_answer] / counts[has_answer]
+        return np.rint(result).astype(np.int64)
+
+    def score(self, answers, base=None):
+        """응답지 한 장 → 성격 변수 dict"""
+        base_vector = None
+        if base:
+            base_vector = np.array([base.get(name, PersonalityProfile.DEFAULTS[name]) for name in VARIABLES],
+                                   dtype=np.float64)
+        row = self.score_matrix(self.answer_vector(answers), base=base_vector)[0]
+        variables = dict(zip(VARIABLES, (int(value) for value in row)))
+        if base:
+            # 기본 목록에 없는 변수는 그대로 유지
+            variables.update({name: value for name, value in base.items() if name not in variables})
+        return variables
+
+    def level(self, score):
+        """scoring_guide 기준 점수 해석"""
+        for low, high, label in self.levels:
+            if low <= score <= high:
+                return label
+        return ""
+
+
+_questionnaire = None
+
+
+def get_questionnaire(path=None):
+    """문항 파일을 한 번만 읽어서 재사용"""
+    global _questionnaire
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return Questionnaire(json.load(f))
+    if _questionnaire is None:
+        with open(DEFAULT_QUESTIONNAIRE_PATH, "r", encoding="utf-8") as f:
+            _questionnaire = Questionnaire(json.load(f))
+    return _questionnaire
+
+
+def score_answers(answers, base=None):
+    """응답지 한 장 채점 → 성격 변수 dict"""
+    return get_questionnaire().score(answers, base=base)
+
+
+def load_answer_sheets(path, questionnaire=None):
+    """
+    응답지 파일(.csv/.jsonl/.json) → (메타 정보 목록, 응답 행렬)
+    CSV 는 문항 코드(W01...) 또는 번호(1...) 열, JSONL 은 {"id", "answers": {...}} 또는 평평한 dict
+    """
+    questionnaire = questionnaire or get_questionnaire()
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            records = list(csv.DictReader(f))
+        elif path.endswith(".jsonl"):
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = json.load(f)
+
+    metas = []
+    matrix = np.full((len(records), len(questionnaire.questions)), np.nan)
+    for row, record in enumerate(records):
+        answers = record.get("answers", record)
+        matrix[row] = questionnaire.answer_vector(
+            answers if isinstance(answers, list) else
+            {key: value for key, value in answers.items() if key not in META_FIELDS}
+        )
+        meta = {field: record[field] for field in META_FIELDS if record.get(field)}
+        meta.setdefault("id", str(row + 1))
+        metas.append(meta)
+    return metas, matrix
+
+
+def calibrate_persona(persona, variables):
+    """설문 결과로 페르소나의 성격프로필 교체 (구조화프롬프트는 다음 사용 시 다시 생성)"""
+    changes = {"성격프로필": variables}
+    if "성격변수127" in persona:
+        changes["성격변수127"] = dict(variables)
+    return update_persona(persona, changes, removed=["구조화프롬프트"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="성격 측정 100문항 응답지 일괄 채점")
+    parser.add_argument("answers", help="응답지 파일 (.csv/.jsonl/.json)")
+    parser.add_argument("--output", help="결과 JSONL 경로 (기본: 응답지명.profiles.jsonl)")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="persona 열에 적힌 data/personas 페르소나의 성격프로필을 설문 결과로 갱신")
+    args = parser.parse_args(argv)
+
+    questionnaire = get_questionnaire()
+    metas, matrix = load_answer_sheets(args.answers, questionnaire)
+
+    # 보정할 페르소나는 측정하지 않은 변수에 기존 값을 쓰도록 기준 행렬을 만든다
+    personas = {}
+    base = np.tile(_DEFAULT_VECTOR, (len(metas), 1))
+    if args.calibrate:
+        from modules.data_manager import PERSONAS_DIR, load_persona
+        for row, meta in enumerate(metas):
+            filename = meta.get("persona")
+            if not filename:
+                continue
+            persona = load_persona(os.path.join(PERSONAS_DIR, os.path.basename(filename)))
+            if not persona:
+                print(f"⚠️ 페르소나를 찾을 수 없음: {filename}")
+                continue
+            personas[row] = persona
+            current = persona.get("성격프로필") or {}
+            base[row] = [current.get(name, PersonalityProfile.DEFAULTS[name]) for name in VARIABLES]
+
+    profiles = questionnaire.score_matrix(matrix, base=base)
+    print(f"📋 {len(metas)}명 채점 완료 (문항 {len(questionnaire.questions)}개, 미연결 문항: {questionnaire.unmapped or '없음'})")
+
+    output = args.output or os.path.splitext(args.answers)[0] + ".profiles.jsonl"
+    with open(output, "w", encoding="utf-8") as f:
+        for meta, row in zip(metas, profiles):
+            variables = dict(zip(VARIABLES, row.tolist()))
+            f.write(json.dumps({**meta, "성격프로필": variables}, ensure_ascii=False) + "\n")
+    print(f"💾 결과 저장: {output}")
+
+    if args.calibrate:
+        from modules.data_manager import save_persona
+        updated = 0
+        for row, persona in personas.items():
+            variables = dict(persona.get("성격프로필") or {})
+            variables.update(zip(VARIABLES, profiles[row].tolist()))
+            if save_persona(calibrate_persona(persona, variables), metas[row]["persona"]):
+                updated += 1
+        print(f"✅ 페르소나 {updated}개 갱신")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
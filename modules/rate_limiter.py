@@ -0,0 +1,221 @@
+import os
+import time
+import hashlib
+import itertools
+import threading
+
+from modules.state_backend import get_state_backend
+
+# 요청 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0    # 채팅 응답처럼 사용자가 기다리는 요청
+PRIORITY_NORMAL = 5         # 이미지 분석 등 페르소나 생성 흐름
+PRIORITY_BACKGROUND = 10    # 매력적 결함/모순/인사말 등 부가 생성
+
+# 제공업체별 기본 한도 (환경변수 GEMINI_RPM, GEMINI_TPM, OPENAI_RPM, OPENAI_TPM 으로 재정의)
+DEFAULT_LIMITS = {
+    "gemini": {"rpm": 60, "tpm": 1000000},
+    "openai": {"rpm": 500, "tpm": 200000},
+}
+
+# 응답 토큰 예상치 (실제 사용량은 응답 후 record_usage로 보정)
+DEFAULT_OUTPUT_TOKENS = 500
+IMAGE_TOKENS = 258
+
+
+class RateLimitTimeout(RuntimeError):
+    """대기 시간 안에 호출 슬롯을 얻지 못한 경우"""
+
+
+class TokenBucket:
+    """분당 용량을 초 단위로 보충하는 토큰 버킷"""
+
+    def __init__(self, per_minute, burst=None):
+        self.rate = float(per_minute) / 60.0
+        self.capacity = float(burst if burst is not None else per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount, now):
+        """amount 만큼 소비하기까지 남은 시간(초)"""
+        self._refill(now)
+        # 버킷 용량보다 큰 요청도 가득 찬 상태에서는 통과시킨다
+        amount = min(float(amount), self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self.tokens -= float(amount)
+
+    def adjust(self, delta):
+        """예상치와 실제 사용량 차이 보정 (음수면 환급)"""
+        self.tokens = min(self.capacity, self.tokens - float(delta))
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "tokens", "enqueued")
+
+    def __init__(self, priority, seq, tokens, enqueued):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.enqueued = enqueued
+
+
+class RateLimiter:
+    """요청 수(RPM)와 토큰 수(TPM)를 함께 제한하는 우선순위 공정 대기열"""
+
+    def __init__(self, requests_per_minute, tokens_per_minute=None, burst=None,
+                 aging_seconds=10.0, max_wait=None, backend=None, scope="default"):
+        self.requests = TokenBucket(requests_per_minute, burst)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        # 공유 상태 저장소가 있으면 버킷 잔량은 여러 프로세스가 함께 쓰고, 우선순위 대기열만 프로세스별로 둔다
+        self.backend = backend
+        self.scope = scope
+        # 오래 기다린 요청은 aging_seconds 마다 우선순위가 한 단계씩 올라 기아 상태를 막는다
+        self.aging_seconds = aging_seconds
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+
+    def _effective_priority(self, ticket, now):
+        if not self.aging_seconds:
+            return ticket.priority
+        return ticket.priority - (now - ticket.enqueued) / self.aging_seconds
+
+    def _head(self, now):
+        return min(self._waiting, key=lambda t: (self._effective_priority(t, now), t.seq))
+
+    def _shared_buckets(self, requests, tokens):
+        buckets = [(f"{self.scope}:requests", requests, self.requests.rate, self.requests.capacity)]
+        if self.tokens is not None and tokens is not None:
+            buckets.append((f"{self.scope}:tokens", tokens, self.tokens.rate, self.tokens.capacity))
+        return buckets
+
+    def _take_shared(self, ticket):
+        """공유 버킷에서 원자적으로 차감 → 기다릴 시간 (저장소 오류 시 None → 로컬 버킷 사용)"""
+        try:
+            return self.backend.take("ratelimit", self._shared_buckets(1, ticket.tokens))
+        except Exception as e:
+            print(f"⚠️ 공유 속도 제한 저장소 오류, 로컬 버킷 사용: {str(e)}")
+            return None
+
+    def _wait_for_capacity(self, ticket, now):
+        wait = self.requests.wait_time(1, now)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(ticket.tokens, now))
+        return wait
+
+    def acquire(self, estimated_tokens=0, priority=PRIORITY_NORMAL, timeout=None):
+        """호출 슬롯을 얻을 때까지 대기 (우선순위 → 도착 순서)"""
+        timeout = self.max_wait if timeout is None else timeout
+        with self._cond:
+            now = time.monotonic()
+            deadline = now + timeout if timeout is not None else None
+            ticket = _Ticket(priority, next(self._seq), max(0, int(estimated_tokens)), now)
+            self._waiting.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._head(now) is ticket:
+                        wait = self._take_shared(ticket) if self.backend is not None else None
+                        if wait is not None and wait <= 0:
+                            return True
+                        if wait is None:
+                            wait = self._wait_for_capacity(ticket, now)
+                        if wait <= 0:
+                            self.requests.consume(1)
+                            if self.tokens is not None:
+                                self.tokens.consume(ticket.tokens)
+                            return True
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise RateLimitTimeout(f"API 호출 대기 시간 초과 ({timeout}초)")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    # 선두가 아니면 노화로 순서가 바뀔 수 있으므로 주기적으로 다시 확인
+                    if wait is None and self.aging_seconds:
+                        wait = self.aging_seconds
+                    self._cond.wait(wait)
+            finally:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+
+    def record_usage(self, estimated_tokens, actual_tokens):
+        """실제 토큰 사용량으로 TPM 버킷 보정"""
+        if self.tokens is None or actual_tokens is None:
+            return
+        delta = int(actual_tokens) - int(estimated_tokens)
+        if self.backend is not None:
+            try:
+                self.backend.take("ratelimit", [(f"{self.scope}:tokens", delta, self.tokens.rate, self.tokens.capacity)],
+                                  force=True)
+            except Exception as e:
+                print(f"⚠️ 공유 속도 제한 저장소 오류: {str(e)}")
+        with self._cond:
+            self.tokens.adjust(delta)
+            self._cond.notify_all()
+
+    def queue_length(self):
+        with self._cond:
+            return len(self._waiting)
+
+
+def estimate_tokens(prompt, image=None, output_tokens=DEFAULT_OUTPUT_TOKENS):
+    """프롬프트 토큰 수 대략 추정 (한글은 글자당 1토큰 안팎)"""
+    text_tokens = 0
+    if prompt:
+        ascii_chars = sum(1 for ch in prompt if ord(ch) < 128)
+        text_tokens = ascii_chars // 4 + (len(prompt) - ascii_chars)
+    return text_tokens + (IMAGE_TOKENS if image is not None else 0) + output_tokens
+
+
+def _env_number(name, default):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"⚠️ {name} 값이 올바르지 않아 기본값({default})을 사용합니다: {value}")
+        return default
+
+
+def rate_limit_enabled():
+    return os.getenv("RATE_LIMIT_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider, api_key):
+    """제공업체 + API 키 단위로 공유되는 RateLimiter 반환"""
+    key_id = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    registry_key = (provider, key_id)
+    with _limiters_lock:
+        limiter = _limiters.get(registry_key)
+        if limiter is None:
+            defaults = DEFAULT_LIMITS.get(provider, DEFAULT_LIMITS["gemini"])
+            prefix = provider.upper()
+            # 공유 저장소(sqlite/redis)면 같은 키를 쓰는 모든 프로세스가 한도를 나눠 쓴다
+            backend = get_state_backend()
+            limiter = RateLimiter(
+                requests_per_minute=_env_number(f"{prefix}_RPM", defaults["rpm"]),
+                tokens_per_minute=_env_number(f"{prefix}_TPM", defaults["tpm"]),
+                max_wait=_env_number("RATE_LIMIT_MAX_WAIT", 120),
+                backend=backend if backend.shared else None,
+                scope=f"{provider}:{key_id}",
+            )
+            _limiters[registry_key] = limiter
+        return limiter
@@ -0,0 +1,125 @@
+"""
+세션별 누적 대화 요약 (롤링 요약)
+
+채팅 프롬프트에는 "지금까지의 요약 + 최근 몇 개 메시지"만 넣는다.
+최근 창 밖으로 밀려난 메시지가 SUMMARY_EVERY_MESSAGES 개 쌓이면 백그라운드 스레드에서
+이전 요약과 합쳐 새 요약을 만든다 (채팅 응답은 기다리지 않음).
+요약이 아직 끝나지 않았으면 요약되지 않은 메시지를 창에 조금 더 넣되, 그 길이에도 상한이 있다.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+SUMMARY_MAX_CHARS = 800
+
+
+def extractive_summary(previous_summary, messages, max_chars=SUMMARY_MAX_CHARS):
+    """API 없이 만드는 요약 - 발화마다 앞부분만 한 줄씩 이어 붙이고, 길어지면 오래된 내용부터 잘라냄"""
+    lines = [previous_summary] if previous_summary else []
+    for message in messages:
+        content = " ".join(str(message.get("content", "")).split())
+        if not content:
+            continue
+        speaker = "사용자" if message.get("role") == "user" else "나"
+        lines.append(f"- {speaker}: {content[:60]}")
+    summary = "\n".join(lines)
+    if len(summary) > max_chars:
+        summary = "…" + summary[-(max_chars - 1):]
+    return summary
+
+
+class _SessionSummary:
+    __slots__ = ("summary", "covered", "pending", "generation")
+
+    def __init__(self):
+        self.summary = ""      # 지금까지의 요약
+        self.covered = 0       # 요약에 반영된 앞쪽 메시지 수
+        self.pending = None    # 진행 중인 요약 작업 (Future)
+        self.generation = 0    # 대화 초기화 시 진행 중 작업 결과를 버리기 위한 번호
+
+
+class RollingSummarizer:
+    """세션별 롤링 요약 관리"""
+
+    def __init__(self, summarize_fn=None, every=None, window=None, max_sessions=1000, executor=None):
+        self.summarize_fn = summarize_fn or extractive_summary
+        self.every = every if every is not None else int(os.getenv("SUMMARY_EVERY_MESSAGES", "6"))
+        self.window = window if window is not None else int(os.getenv("SUMMARY_WINDOW_MESSAGES", "3"))
+        self.max_sessions = max_sessions
+        self._executor = executor
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rolling-summary")
+        return self._executor
+
+    def _session(self, session_id):
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = _SessionSummary()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+        return state
+
+    def context(self, session_id, history):
+        """
+        프롬프트에 넣을 (요약, 최근 메시지 목록)
+        필요하면 창 밖으로 밀려난 메시지의 요약 작업을 백그라운드로 시작한다.
+        """
+        history = list(history or [])
+        with self._lock:
+            state = self._session(session_id)
+            if len(history) < state.covered:
+                # 대화가 초기화됨 - 요약도 처음부터
+                state.summary, state.covered = "", 0
+                state.generation += 1
+                state.pending = None
+
+            window_start = max(state.covered, len(history) - self.window)
+            if state.pending is None and window_start - state.covered >= self.every:
+                self._schedule(session_id, state, history[state.covered:window_start], window_start)
+
+            # 요약이 밀려 있어도 창은 최대 window + every 개 (요약 전 메시지 포함)
+            unsummarized_start = max(state.covered, len(history) - self.window - self.every)
+            return state.summary, history[unsummarized_start:]
+
+    def _schedule(self, session_id, state, messages, covered_after):
+        previous, generation = state.summary, state.generation
+
+        def run():
+            try:
+                summary = self.summarize_fn(previous, messages)
+            except Exception as e:
+                print(f"⚠️ 대화 요약 실패, 간단 요약 사용: {str(e)}")
+                summary = extractive_summary(previous, messages)
+            with self._lock:
+                if state.generation == generation:
+                    state.summary = summary or previous
+                    state.covered = covered_after
+                    state.pending = None
+
+        state.pending = self.executor.submit(run)
+
+    def summary(self, session_id):
+        with self._lock:
+            state = self._sessions.get(session_id)
+            return state.summary if state else ""
+
+    def wait(self, session_id, timeout=None):
+        """진행 중인 요약 작업이 끝날 때까지 대기 (테스트/종료용)"""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            pending = state.pending if state else None
+        if pending is not None:
+            pending.result(timeout=timeout)
+
+    def forget(self, session_id):
+        with self._lock:
+            state = self._sessions.pop(session_id, None)
+            if state:
+                state.generation += 1
@@ -0,0 +1,217 @@
+"""
+의미 기반 대화 기억 검색
+
+대화마다 사용자 메시지를 벡터로 바꿔 세션별 인덱스에 추가하고, 현재 메시지와 가까운 과거 대화를
+전체 기록에서 top-k 로 찾는다. 같은 단어가 없어도 비슷한 표현(피곤해/피곤하다, 강아지/강아지랑)을 찾는다.
+
+- 기본 임베딩: 글자 n-gram 해싱 벡터 (외부 패키지/네트워크 불필요)
+- MEMORY_EMBEDDING_MODEL 을 지정하고 sentence-transformers 가 설치되어 있으면 로컬 CPU 모델 사용
+- 세션 기록이 MEMORY_ANN_MIN 개를 넘고 hnswlib 가 있으면 근사 검색으로 지연 시간을 일정하게 유지
+"""
+import os
+import re
+import zlib
+import threading
+
+import numpy as np
+
+# 로컬 문장 임베딩 모델 (선택)
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# 근사 최근접 검색 (선택)
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+_TOKEN_PATTERN = re.compile(r"[가-힣a-z0-9]+")
+
+
+def retrieval_mode():
+    """MEMORY_RETRIEVAL: semantic(기본) / keyword(기존 공통 키워드 방식)"""
+    return "keyword" if os.getenv("MEMORY_RETRIEVAL", "semantic").lower() == "keyword" else "semantic"
+
+
+# 어느 대화에나 나오는 말은 관련성 판단에서 제외
+STOPWORDS = frozenset(["너무", "정말", "진짜", "오늘", "그냥", "좀", "나", "너", "우리", "내", "네",
+                       "나는", "너는", "저", "저는", "제가", "내가", "이", "그"])
+
+
+class HashingEmbedder:
+    """
+    글자 n-gram 해싱 벡터
+    한국어는 어간이 단어 앞에 오므로 단어 첫 n-gram 에 가중치를 더 줘서 어미가 달라도 가깝게 한다.
+    """
+
+    def __init__(self, dim=1024, ngrams=(2, 3), stem_weight=2.0):
+        self.dim = dim
+        self.ngrams = ngrams
+        self.stem_weight = stem_weight
+
+    def _features(self, text):
+        counts = {}
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            if token in STOPWORDS:
+                continue
+            padded = " " + token
+            for n in self.ngrams:
+                for i in range(len(padded) - n + 1):
+                    gram = padded[i:i + n]
+                    counts[gram] = counts.get(gram, 0.0) + (self.stem_weight if i == 0 else 1.0)
+        return counts
+
+    def embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for gram, weight in self._features(text or "").items():
+            digest = zlib.crc32(gram.encode("utf-8"))
+            vector[digest % self.dim] += weight if digest & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+class ModelEmbedder:
+    """sentence-transformers 로컬 모델 (처음 사용할 때 로드)"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def dim(self):
+        return self._load().get_sentence_embedding_dimension()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                self._model = SentenceTransformer(self.model_name, device="cpu")
+            return self._model
+
+    def embed(self, text):
+        return self._load().encode([text or ""], normalize_embeddings=True)[0].astype(np.float32)
+
+
+def default_embedder():
+    model_name = os.getenv("MEMORY_EMBEDDING_MODEL", "")
+    if model_name and SENTENCE_TRANSFORMERS_AVAILABLE:
+        try:
+            embedder = ModelEmbedder(model_name)
+            embedder.embed("")  # 모델을 찾을 수 없으면 여기서 실패
+            print(f"🧠 대화 기억 임베딩 모델: {model_name}")
+            return embedder
+        except Exception as e:
+            print(f"⚠️ 임베딩 모델 로드 실패, 해싱 임베딩 사용: {str(e)}")
+    elif model_name:
+        print("⚠️ sentence-transformers 가 없어 해싱 임베딩을 사용합니다.")
+    return HashingEmbedder()
+
+
+class SessionVectorIndex:
+    """한 세션의 대화 벡터 (용량을 두 배씩 늘리는 배열 + 큰 세션은 근사 인덱스)"""
+
+    def __init__(self, dim, ann_min):
+        self.dim = dim
+        self.ann_min = ann_min
+        self.positions = []   # 행 → 대화 위치 (ConversationMemory.conversations 인덱스)
+        self._vectors = np.zeros((16, dim), dtype=np.float32)
+        self._ann = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def add(self, vector, position):
+        row = len(self.positions)
+        if row == self._vectors.shape[0]:
+            grown = np.zeros((row * 2, self.dim), dtype=np.float32)
+            grown[:row] = self._vectors
+            self._vectors = grown
+        self._vectors[row] = vector
+        self.positions.append(position)
+        if self._ann is not None:
+            if row >= self._ann.get_max_elements():
+                self._ann.resize_index(self._ann.get_max_elements() * 2)
+            self._ann.add_items(vector[None, :], [row])
+
+    def _ann_index(self):
+        if not HNSWLIB_AVAILABLE or len(self.positions) < self.ann_min:
+            return None
+        if self._ann is None:
+            count = len(self.positions)
+            index = hnswlib.Index(space="ip", dim=self.dim)
+            index.init_index(max_elements=count * 2, ef_construction=100, M=16)
+            index.add_items(self._vectors[:count], np.arange(count))
+            index.set_ef(50)
+            self._ann = index
+        return self._ann
+
+    def search(self, vector, k):
+        """[(대화 위치, 유사도)] - 유사도 높은 순"""
+        count = len(self.positions)
+        if count == 0 or k <= 0:
+            return []
+        k = min(k, count)
+        ann = self._ann_index()
+        if ann is not None:
+            rows, distances = ann.knn_query(vector[None, :], k=k)
+            return [(self.positions[row], float(1 - distance)) for row, distance in zip(rows[0], distances[0])]
+        scores = self._vectors[:count] @ vector
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.positions[row], float(scores[row])) for row in top]
+
+
+class SemanticMemory:
+    """세션별 대화 벡터 인덱스"""
+
+    def __init__(self, embedder=None, ann_min=None):
+        self._embedder = embedder
+        if ann_min is None:
+            ann_min = int(os.getenv("MEMORY_ANN_MIN", "5000"))
+        self.ann_min = ann_min
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    @property
+    def embedder(self):
+        # 첫 대화가 올 때까지 모델 로드를 미룸
+        if self._embedder is None:
+            self._embedder = default_embedder()
+        return self._embedder
+
+    def add(self, session_id, position, text):
+        vector = self.embedder.embed(text)
+        with self._lock:
+            index = self._sessions.get(session_id)
+            if index is None:
+                index = self._sessions[session_id] = SessionVectorIndex(len(vector), self.ann_min)
+            index.add(vector, position)
+
+    def search(self, session_id, text, k=3, min_score=0.2, exclude=()):
+        """세션 전체 기록에서 text 와 가까운 대화 위치 [(위치, 유사도)]"""
+        with self._lock:
+            index = self._sessions.get(session_id)
+            if index is None or not text:
+                return []
+        vector = self.embedder.embed(text)
+        with self._lock:
+            results = index.search(vector, k + len(exclude))
+        return [(position, score) for position, score in results
+                if score >= min_score and position not in exclude][:k]
+
+    def forget(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def session_size(self, session_id):
+        with self._lock:
+            index = self._sessions.get(session_id)
+            return len(index) if index else 0
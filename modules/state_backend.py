@@ -0,0 +1,442 @@
+"""
+공유 상태 저장소 (여러 앱 프로세스/레플리카가 같은 상태를 보도록)
+
+대화 기억(세션별 대화 로그), 페르소나 캐시, API 속도 제한 버킷을 한 프로세스 밖에 둔다.
+STATE_BACKEND 로 선택:
+- memory (기본): 프로세스 안에서만 유지 (기존 동작, shared=False 라 다른 모듈은 로컬 구조를 그대로 사용)
+- sqlite: 같은 머신의 여러 프로세스/워커가 공유 (STATE_SQLITE_PATH, WAL 모드)
+- redis: 여러 노드가 공유 (STATE_REDIS_URL, redis 패키지 필요)
+
+저장 형태
+- 값(get/set/delete): JSON 으로 직렬화, ttl(초) 지원
+- 목록(append/items/length): 세션별 대화 로그처럼 뒤에만 추가되는 목록
+  max_items 를 넘으면 앞쪽부터 잘라내고, ttl(초) 동안 추가가 없으면 목록 전체가 만료된다.
+  위치(start, length)는 지금까지 추가된 전체 개수 기준이라 앞쪽이 잘려도 이어 읽는 위치는 그대로다.
+- 토큰 버킷(take): 여러 버킷을 한 번에 확인하고 모두 여유가 있을 때만 원자적으로 차감
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# 여러 노드 공유 (선택)
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   "data", "state.sqlite3")
+
+
+def _refill(tokens, updated, rate, capacity, now):
+    if tokens is None:
+        return float(capacity)
+    return min(float(capacity), tokens + max(0.0, now - updated) * rate)
+
+
+def _take(states, buckets, now, force):
+    """
+    states: [(tokens, updated) 또는 (None, None)] → (대기 시간, 새 states)
+    buckets: [(key, 양, 초당 보충량, 용량)], force 면 여유와 상관없이 차감 (사용량 보정/환급용)
+    """
+    refilled = [_refill(tokens, updated, rate, capacity, now)
+                for (tokens, updated), (_, _, rate, capacity) in zip(states, buckets)]
+    if not force:
+        wait = 0.0
+        for tokens, (_, amount, rate, capacity) in zip(refilled, buckets):
+            # 용량보다 큰 요청도 가득 찬 상태에서는 통과
+            need = min(float(amount), float(capacity))
+            if tokens < need:
+                wait = max(wait, (need - tokens) / rate if rate > 0 else float("inf"))
+        if wait > 0:
+            return wait, refilled
+    return 0.0, [min(float(capacity), tokens - float(amount))
+                 for tokens, (_, amount, _, capacity) in zip(refilled, buckets)]
+
+
+class StateBackend:
+    """상태 저장소 공통 인터페이스"""
+
+    name = "base"
+    shared = False   # 다른 프로세스와 공유되는지 (False 면 호출하는 쪽이 로컬 구조를 그대로 사용)
+
+    def get(self, namespace, key, default=None):
+        raise NotImplementedError
+
+    def set(self, namespace, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, namespace, key):
+        """값과 목록 모두 삭제"""
+        raise NotImplementedError
+
+    def append(self, namespace, key, item, max_items=None, ttl=None):
+        """목록 끝에 추가 (max_items 를 넘으면 앞쪽 삭제, ttl 초 뒤 목록 만료) → 추가 후 전체 길이"""
+        raise NotImplementedError
+
+    def items(self, namespace, key, start=0):
+        """start 위치부터 남아 있는 항목 (잘려 나간 앞쪽은 건너뜀)"""
+        raise NotImplementedError
+
+    def length(self, namespace, key):
+        """지금까지 추가된 전체 개수 (잘려 나간 항목 포함, 만료되면 0)"""
+        raise NotImplementedError
+
+    def take(self, namespace, buckets, force=False):
+        """토큰 버킷 [(key, 양, 초당 보충량, 용량)] 차감 → 0 이면 차감 완료, 아니면 기다릴 시간(초)"""
+        raise NotImplementedError
+
+
+class MemoryBackend(StateBackend):
+    """프로세스 안 dict (기본값)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._values = {}
+        self._lists = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key, default=None):
+        with self._lock:
+            entry = self._values.get((namespace, key))
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires is not None and expires <= time.time():
+                del self._values[(namespace, key)]
+                return default
+            return json.loads(value)
+
+    def set(self, namespace, key, value, ttl=None):
+        # 저장 후 호출자가 원본을 바꿔도 영향이 없도록 다른 저장소와 같이 JSON 으로 보관
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._values[(namespace, key)] = (encoded, time.time() + ttl if ttl else None)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._values.pop((namespace, key), None)
+            self._lists.pop((namespace, key), None)
+
+    def _list(self, namespace, key):
+        """(잘려 나간 개수, 항목들, 만료 시각) - 만료됐으면 None"""
+        entry = self._lists.get((namespace, key))
+        if entry is not None and entry[2] is not None and entry[2] <= time.time():
+            del self._lists[(namespace, key)]
+            return None
+        return entry
+
+    def append(self, namespace, key, item, max_items=None, ttl=None):
+        encoded = json.dumps(item, ensure_ascii=False)
+        with self._lock:
+            offset, items, _ = self._list(namespace, key) or (0, [], None)
+            items.append(encoded)
+            if max_items and len(items) > max_items:
+                offset += len(items) - max_items
+                items = items[-max_items:]
+            self._lists[(namespace, key)] = (offset, items, time.time() + ttl if ttl else None)
+            return offset + len(items)
+
+    def items(self, namespace, key, start=0):
+        with self._lock:
+            offset, items, _ = self._list(namespace, key) or (0, [], None)
+            items = items[max(0, start - offset):]
+        return [json.loads(item) for item in items]
+
+    def length(self, namespace, key):
+        with self._lock:
+            offset, items, _ = self._list(namespace, key) or (0, [], None)
+            return offset + len(items)
+
+    def take(self, namespace, buckets, force=False):
+        now = time.time()
+        with self._lock:
+            states = [self._buckets.get((namespace, key), (None, None)) for key, _, _, _ in buckets]
+            wait, tokens = _take(states, buckets, now, force)
+            for (key, _, _, _), value in zip(buckets, tokens):
+                self._buckets[(namespace, key)] = (value, now)
+            return wait
+
+
+class SQLiteBackend(StateBackend):
+    """SQLite 파일 (같은 머신의 여러 프로세스 공유, WAL 모드)"""
+
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("STATE_SQLITE_PATH", DEFAULT_SQLITE_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        with self._transaction() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS kv (namespace TEXT, key TEXT, value TEXT, expires REAL, "
+                       "PRIMARY KEY (namespace, key))")
+            db.execute("CREATE TABLE IF NOT EXISTS lists (namespace TEXT, key TEXT, idx INTEGER, value TEXT, "
+                       "PRIMARY KEY (namespace, key, idx))")
+            db.execute("CREATE TABLE IF NOT EXISTS buckets (namespace TEXT, key TEXT, tokens REAL, updated REAL, "
+                       "PRIMARY KEY (namespace, key))")
+            # 목록별 다음 위치와 만료 시각 (lists 의 idx 는 전체 추가 순번)
+            db.execute("CREATE TABLE IF NOT EXISTS list_meta (namespace TEXT, key TEXT, next_idx INTEGER, "
+                       "expires REAL, PRIMARY KEY (namespace, key))")
+        self._purged = 0.0
+
+    def _db(self):
+        # sqlite3 연결은 스레드마다 따로
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _transaction(self):
+        backend = self
+
+        class _Transaction:
+            def __enter__(self):
+                self.db = backend._db()
+                # 쓰기 잠금을 먼저 잡아서 읽고-쓰기 사이에 다른 프로세스가 끼어들지 못하게 함
+                self.db.execute("BEGIN IMMEDIATE")
+                return self.db
+
+            def __exit__(self, exc_type, exc, tb):
+                self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+                return False
+
+        return _Transaction()
+
+    def get(self, namespace, key, default=None):
+        row = self._db().execute("SELECT value, expires FROM kv WHERE namespace=? AND key=?",
+                                 (namespace, key)).fetchone()
+        if row is None:
+            return default
+        if row[1] is not None and row[1] <= time.time():
+            self._db().execute("DELETE FROM kv WHERE namespace=? AND key=? AND expires<=?",
+                               (namespace, key, time.time()))
+            return default
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl=None):
+        self._db().execute("INSERT OR REPLACE INTO kv (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+                           (namespace, key, json.dumps(value, ensure_ascii=False),
+                            time.time() + ttl if ttl else None))
+
+    def delete(self, namespace, key):
+        with self._transaction() as db:
+            db.execute("DELETE FROM kv WHERE namespace=? AND key=?", (namespace, key))
+            db.execute("DELETE FROM lists WHERE namespace=? AND key=?", (namespace, key))
+            db.execute("DELETE FROM list_meta WHERE namespace=? AND key=?", (namespace, key))
+
+    def _purge_expired_lists(self, db, now):
+        """만료된 목록 정리 (한 프로세스에서 1분에 한 번)"""
+        if now - self._purged < 60:
+            return
+        self._purged = now
+        db.execute("DELETE FROM lists WHERE (namespace, key) IN "
+                   "(SELECT namespace, key FROM list_meta WHERE expires IS NOT NULL AND expires<=?)", (now,))
+        db.execute("DELETE FROM list_meta WHERE expires IS NOT NULL AND expires<=?", (now,))
+
+    def _next_idx(self, db, namespace, key, now):
+        row = db.execute("SELECT next_idx, expires FROM list_meta WHERE namespace=? AND key=?",
+                         (namespace, key)).fetchone()
+        if row is None:
+            return 0
+        if row[1] is not None and row[1] <= now:
+            db.execute("DELETE FROM lists WHERE namespace=? AND key=?", (namespace, key))
+            return 0
+        return row[0]
+
+    def append(self, namespace, key, item, max_items=None, ttl=None):
+        now = time.time()
+        with self._transaction() as db:
+            self._purge_expired_lists(db, now)
+            idx = self._next_idx(db, namespace, key, now)
+            db.execute("INSERT OR REPLACE INTO lists (namespace, key, idx, value) VALUES (?, ?, ?, ?)",
+                       (namespace, key, idx, json.dumps(item, ensure_ascii=False)))
+            if max_items:
+                db.execute("DELETE FROM lists WHERE namespace=? AND key=? AND idx<?",
+                           (namespace, key, idx + 1 - max_items))
+            db.execute("INSERT OR REPLACE INTO list_meta (namespace, key, next_idx, expires) VALUES (?, ?, ?, ?)",
+                       (namespace, key, idx + 1, now + ttl if ttl else None))
+            return idx + 1
+
+    def items(self, namespace, key, start=0):
+        if not self.length(namespace, key):
+            return []
+        rows = self._db().execute("SELECT value FROM lists WHERE namespace=? AND key=? AND idx>=? ORDER BY idx",
+                                  (namespace, key, start)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def length(self, namespace, key):
+        row = self._db().execute("SELECT next_idx, expires FROM list_meta WHERE namespace=? AND key=?",
+                                 (namespace, key)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return 0
+        return row[0]
+
+    def take(self, namespace, buckets, force=False):
+        now = time.time()
+        with self._transaction() as db:
+            states = []
+            for key, _, _, _ in buckets:
+                row = db.execute("SELECT tokens, updated FROM buckets WHERE namespace=? AND key=?",
+                                 (namespace, key)).fetchone()
+                states.append(row if row else (None, None))
+            wait, tokens = _take(states, buckets, now, force)
+            db.executemany("INSERT OR REPLACE INTO buckets (namespace, key, tokens, updated) VALUES (?, ?, ?, ?)",
+                           [(namespace, key, value, now) for (key, _, _, _), value in zip(buckets, tokens)])
+            return wait
+
+
+# 목록 추가 + 앞쪽 자르기 + 만료 설정 (잘려 나간 개수는 KEYS[2] 에 누적)
+_REDIS_APPEND = """
+local n = redis.call('RPUSH', KEYS[1], ARGV[1])
+local max = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+if max > 0 and n > max then
+  redis.call('LTRIM', KEYS[1], n - max, -1)
+  redis.call('INCRBY', KEYS[2], n - max)
+  n = max
+end
+if ttl > 0 then
+  redis.call('EXPIRE', KEYS[1], ttl)
+  redis.call('EXPIRE', KEYS[2], ttl)
+end
+return n + tonumber(redis.call('GET', KEYS[2]) or '0')
+"""
+
+# 전체 순번 start 부터 남아 있는 항목
+_REDIS_ITEMS = """
+local offset = tonumber(redis.call('GET', KEYS[2]) or '0')
+return redis.call('LRANGE', KEYS[1], math.max(0, tonumber(ARGV[1]) - offset), -1)
+"""
+
+# 여러 버킷을 한 번에 확인/차감하는 Lua 스크립트 (Redis 안에서 원자적으로 실행)
+_REDIS_TAKE = """
+local now = tonumber(ARGV[1])
+local force = ARGV[2] == '1'
+local n = #KEYS
+local tokens = {}
+local wait = 0
+for i = 1, n do
+  local amount = tonumber(ARGV[3 + (i - 1) * 3])
+  local rate = tonumber(ARGV[4 + (i - 1) * 3])
+  local capacity = tonumber(ARGV[5 + (i - 1) * 3])
+  local state = redis.call('HMGET', KEYS[i], 'tokens', 'updated')
+  local t = capacity
+  if state[1] then
+    t = math.min(capacity, tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rate)
+  end
+  tokens[i] = t
+  local need = math.min(amount, capacity)
+  if (not force) and t < need then
+    if rate > 0 then wait = math.max(wait, (need - t) / rate) else wait = 1e9 end
+  end
+end
+for i = 1, n do
+  local amount = tonumber(ARGV[3 + (i - 1) * 3])
+  local capacity = tonumber(ARGV[5 + (i - 1) * 3])
+  local t = tokens[i]
+  if wait == 0 then t = math.min(capacity, t - amount) end
+  redis.call('HSET', KEYS[i], 'tokens', t, 'updated', now)
+  redis.call('EXPIRE', KEYS[i], 3600)
+end
+return tostring(wait)
+"""
+
+
+class RedisBackend(StateBackend):
+    """Redis 호환 서버 (여러 노드 공유)"""
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url=None, prefix=None):
+        self.client = redis.Redis.from_url(url or os.getenv("STATE_REDIS_URL", "redis://localhost:6379/0"))
+        self.prefix = prefix or os.getenv("STATE_REDIS_PREFIX", "nompangs")
+        self._take_script = self.client.register_script(_REDIS_TAKE)
+        self._append_script = self.client.register_script(_REDIS_APPEND)
+        self._items_script = self.client.register_script(_REDIS_ITEMS)
+
+    def _key(self, kind, namespace, key):
+        return f"{self.prefix}:{kind}:{namespace}:{key}"
+
+    def get(self, namespace, key, default=None):
+        value = self.client.get(self._key("kv", namespace, key))
+        return json.loads(value) if value is not None else default
+
+    def set(self, namespace, key, value, ttl=None):
+        self.client.set(self._key("kv", namespace, key), json.dumps(value, ensure_ascii=False),
+                        ex=int(ttl) if ttl else None)
+
+    def delete(self, namespace, key):
+        self.client.delete(self._key("kv", namespace, key), self._key("list", namespace, key),
+                           self._key("trimmed", namespace, key))
+
+    def _list_keys(self, namespace, key):
+        return [self._key("list", namespace, key), self._key("trimmed", namespace, key)]
+
+    def append(self, namespace, key, item, max_items=None, ttl=None):
+        return int(self._append_script(keys=self._list_keys(namespace, key),
+                                       args=[json.dumps(item, ensure_ascii=False), int(max_items or 0),
+                                             int(ttl or 0)]))
+
+    def items(self, namespace, key, start=0):
+        return [json.loads(item) for item in self._items_script(keys=self._list_keys(namespace, key), args=[start])]
+
+    def length(self, namespace, key):
+        list_key, trimmed_key = self._list_keys(namespace, key)
+        pipe = self.client.pipeline()
+        pipe.llen(list_key)
+        pipe.get(trimmed_key)
+        count, trimmed = pipe.execute()
+        return count + int(trimmed or 0) if count else 0
+
+    def take(self, namespace, buckets, force=False):
+        keys = [self._key("bucket", namespace, key) for key, _, _, _ in buckets]
+        args = [time.time(), "1" if force else "0"]
+        for _, amount, rate, capacity in buckets:
+            args.extend([amount, rate, capacity])
+        return float(self._take_script(keys=keys, args=args))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name=None):
+    """이름으로 저장소 생성 (사용할 수 없으면 경고 후 memory)"""
+    name = (name or os.getenv("STATE_BACKEND", "memory")).strip().lower()
+    try:
+        if name == "sqlite":
+            return SQLiteBackend()
+        if name == "redis":
+            if not REDIS_AVAILABLE:
+                print("⚠️ redis 패키지가 없어 메모리 상태 저장소를 사용합니다. (pip install redis)")
+                return MemoryBackend()
+            backend = RedisBackend()
+            backend.client.ping()
+            return backend
+    except Exception as e:
+        print(f"⚠️ {name} 상태 저장소 연결 실패, 메모리 저장소 사용: {str(e)}")
+        return MemoryBackend()
+    if name != "memory":
+        print(f"⚠️ 알 수 없는 STATE_BACKEND '{name}' - 메모리 저장소 사용")
+    return MemoryBackend()
+
+
+def get_state_backend():
+    """프로세스 공용 상태 저장소 (STATE_BACKEND)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+            if _backend.shared:
+                print(f"🗄️ 공유 상태 저장소: {_backend.name}")
+        return _backend
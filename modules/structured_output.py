@@ -0,0 +1,266 @@
+import re
+import json
+
+# 스키마는 Gemini response_schema(OpenAPI 부분집합) 형식을 따른다.
+# minItems/maxItems/minimum/maximum 은 로컬 검증에만 쓰고 제공업체에는 보내지 않는다.
+_LOCAL_ONLY_KEYS = ("minItems", "maxItems", "minimum", "maximum", "minLength")
+
+IMAGE_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "object_type": {"type": "STRING", "minLength": 1},
+        "colors": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "shape": {"type": "STRING"},
+        "size": {"type": "STRING"},
+        "materials": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "condition": {"type": "STRING"},
+        "estimated_age": {"type": "STRING"},
+        "distinctive_features": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "personality_hints": {
+            "type": "OBJECT",
+            "properties": {
+                "warmth_factor": {"type": "INTEGER", "minimum": 0, "maximum": 100},
+                "competence_factor": {"type": "INTEGER", "minimum": 0, "maximum": 100},
+                "humor_factor": {"type": "INTEGER", "minimum": 0, "maximum": 100},
+            },
+            "required": ["warmth_factor", "competence_factor", "humor_factor"],
+        },
+    },
+    "required": ["object_type", "colors", "materials", "condition", "personality_hints"],
+}
+
+ATTRACTIVE_FLAWS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "flaws": {"type": "ARRAY", "items": {"type": "STRING", "minLength": 6},
+                  "minItems": 4, "maxItems": 6},
+    },
+    "required": ["flaws"],
+}
+
+CONTRADICTIONS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "contradictions": {"type": "ARRAY", "items": {"type": "STRING", "minLength": 11},
+                           "minItems": 2, "maxItems": 4},
+    },
+    "required": ["contradictions"],
+}
+
+# 원샷 페르소나 보강: 창의적 필드 전체를 한 번의 응답으로 (필드별로 따로 검증)
+PERSONA_ENRICHMENT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "attractive_flaws": ATTRACTIVE_FLAWS_SCHEMA["properties"]["flaws"],
+        "contradictions": CONTRADICTIONS_SCHEMA["properties"]["contradictions"],
+        "life_story": {
+            "type": "OBJECT",
+            "properties": {
+                "arrival_moment": {"type": "STRING", "minLength": 10},
+                "secret_wishes": {"type": "ARRAY", "items": {"type": "STRING", "minLength": 4},
+                                  "minItems": 2, "maxItems": 3},
+                "unique_perspectives": {"type": "ARRAY", "items": {"type": "STRING", "minLength": 4},
+                                        "minItems": 2, "maxItems": 3},
+            },
+            "required": ["arrival_moment", "secret_wishes", "unique_perspectives"],
+        },
+        "greeting": {"type": "STRING", "minLength": 5},
+    },
+    "required": ["attractive_flaws", "contradictions", "life_story", "greeting"],
+}
+
+# _generate_text_with_api 가 예외 대신 돌려주는 오류 문자열 (복구 재시도 대상 아님)
+API_ERROR_PREFIXES = (
+    "API 호출 오류", "API 제공업체가", "Gemini API 오류", "Gemini API 키가",
+    "OpenAI API 오류", "OpenAI API 키가", "OpenAI 패키지가",
+)
+
+
+class StructuredOutputError(ValueError):
+    """응답이 JSON 이 아니거나 스키마와 맞지 않는 경우"""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or [message]
+
+
+def to_provider_schema(schema):
+    """제공업체에 보낼 스키마 (로컬 검증용 키 제거)"""
+    if isinstance(schema, dict):
+        return {k: to_provider_schema(v) for k, v in schema.items() if k not in _LOCAL_ONLY_KEYS}
+    if isinstance(schema, list):
+        return [to_provider_schema(v) for v in schema]
+    return schema
+
+
+def json_instruction(schema):
+    """JSON 모드를 지원하지 않는 경로를 위한 프롬프트 형식 지시문"""
+    return ("\n\n반드시 다음 JSON 스키마에 맞는 JSON 객체 하나로만 답변해주세요 (설명, 코드블록 없이):\n"
+            + json.dumps(to_provider_schema(schema), ensure_ascii=False))
+
+
+def is_api_error(text):
+    return text is None or (isinstance(text, str) and text.strip().startswith(API_ERROR_PREFIXES))
+
+
+def extract_json(text):
+    """응답 텍스트에서 JSON 추출 (코드블록/앞뒤 설명 허용)"""
+    if not isinstance(text, str) or not text.strip():
+        raise StructuredOutputError("빈 응답")
+    stripped = text.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", stripped, re.DOTALL)
+    if fenced:
+        stripped = fenced.group(1).strip()
+    try:
+        return json.loads(stripped)
+    except json.JSONDecodeError:
+        pass
+    start, end = stripped.find("{"), stripped.rfind("}")
+    if start != -1 and end > start:
+        try:
+            return json.loads(stripped[start:end + 1])
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"JSON 파싱 실패: {e}")
+    raise StructuredOutputError("응답에 JSON 객체가 없음")
+
+
+def _validate(value, schema, path, errors):
+    """스키마 검증 (숫자 문자열 등 흔한 형식 차이는 보정하여 반환)"""
+    expected = schema.get("type", "").upper()
+
+    if expected == "OBJECT":
+        if not isinstance(value, dict):
+            errors.append(f"{path}: 객체여야 함")
+            return value
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}.{key}: 필수 필드 누락")
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in value:
+                value[key] = _validate(value[key], sub_schema, f"{path}.{key}", errors)
+        return value
+
+    if expected == "ARRAY":
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list):
+            errors.append(f"{path}: 배열이어야 함")
+            return value
+        item_schema = schema.get("items")
+        if item_schema:
+            value = [_validate(item, item_schema, f"{path}[{i}]", errors) for i, item in enumerate(value)]
+        if len(value) < schema.get("minItems", 0):
+            errors.append(f"{path}: 최소 {schema['minItems']}개 필요 (현재 {len(value)}개)")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            value = value[:schema["maxItems"]]
+        return value
+
+    if expected in ("INTEGER", "NUMBER"):
+        if isinstance(value, str):
+            match = re.search(r"-?\d+(\.\d+)?", value)
+            if match:
+                value = float(match.group(0))
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"{path}: 숫자여야 함")
+            return value
+        if expected == "INTEGER":
+            value = int(round(value))
+        if "minimum" in schema:
+            value = max(schema["minimum"], value)
+        if "maximum" in schema:
+            value = min(schema["maximum"], value)
+        return value
+
+    if expected == "STRING":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            errors.append(f"{path}: 문자열이어야 함")
+            return value
+        value = value.strip()
+        if len(value) < schema.get("minLength", 0):
+            errors.append(f"{path}: 너무 짧음 ('{value}')")
+        return value
+
+    return value
+
+
+def parse_structured(text, schema):
+    """JSON 추출 + 스키마 검증, 실패 시 StructuredOutputError"""
+    data = extract_json(text)
+    errors = []
+    data = _validate(data, schema, "$", errors)
+    if errors:
+        raise StructuredOutputError("; ".join(errors[:5]), errors)
+    return data
+
+
+def build_repair_prompt(bad_output, error, schema):
+    """형식 오류만 바로잡는 짧은 복구 프롬프트 (원래 긴 프롬프트/이미지는 다시 보내지 않음)"""
+    return f"""
+아래 응답은 요구된 JSON 형식과 맞지 않습니다.
+오류: {error}
+
+응답 내용을 유지하면서 스키마에 맞는 JSON 객체 하나로만 다시 작성해주세요.
+스키마: {json.dumps(to_provider_schema(schema), ensure_ascii=False)}
+
+원래 응답:
+{bad_output}
+"""
+
+
+def generate_structured(call, prompt, schema, image=None):
+    """
+    스키마 제약 생성 + 검증, 실패 시 한 번만 복구 재시도
+    call(prompt, image, response_schema) -> 응답 텍스트
+    """
+    text = call(prompt, image, schema)
+    if is_api_error(text):
+        raise StructuredOutputError(f"API 응답 없음: {text}")
+    try:
+        return parse_structured(text, schema)
+    except StructuredOutputError as e:
+        print(f"⚠️ 구조화 응답 검증 실패, 복구 재시도: {e}")
+        repaired = call(build_repair_prompt(text, e, schema), None, schema)
+        if is_api_error(repaired):
+            raise StructuredOutputError(f"복구 재시도 API 응답 없음: {repaired}")
+        return parse_structured(repaired, schema)
+
+
+def parse_fields(text, schema):
+    """최상위 필드별로 따로 검증 → (통과한 필드 dict, 필드별 오류 dict)"""
+    data = extract_json(text)
+    if not isinstance(data, dict):
+        raise StructuredOutputError("$: 객체여야 함")
+    valid, field_errors = {}, {}
+    for key, sub_schema in schema.get("properties", {}).items():
+        if key not in data:
+            field_errors[key] = "필드 누락"
+            continue
+        errors = []
+        value = _validate(data[key], sub_schema, f"$.{key}", errors)
+        if errors:
+            field_errors[key] = "; ".join(errors[:3])
+        else:
+            valid[key] = value
+    if not valid:
+        raise StructuredOutputError("유효한 필드 없음", list(field_errors.values()))
+    return valid, field_errors
+
+
+def generate_structured_fields(call, prompt, schema, image=None):
+    """
+    여러 필드를 한 번에 생성하고 필드별로 검증 (일부 필드 실패는 호출자가 개별 폴백)
+    응답 전체를 쓸 수 없을 때만 한 번 복구 재시도
+    """
+    text = call(prompt, image, schema)
+    if is_api_error(text):
+        raise StructuredOutputError(f"API 응답 없음: {text}")
+    try:
+        return parse_fields(text, schema)
+    except StructuredOutputError as e:
+        print(f"⚠️ 구조화 응답 검증 실패, 복구 재시도: {e}")
+        repaired = call(build_repair_prompt(text, e, schema), None, schema)
+        if is_api_error(repaired):
+            raise StructuredOutputError(f"복구 재시도 API 응답 없음: {repaired}")
+        return parse_fields(repaired, schema)
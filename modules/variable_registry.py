@@ -0,0 +1,102 @@
+"""
+성격 변수 메타데이터 레지스트리
+
+변수 코드 접두어(W, C, ..., OBJ, FORM, INT)로 카테고리/표시 이름을 한 번만 계산해 두고,
+성격 변수 표(DataFrame) 행은 변수 값이 같으면 캐시된 결과를 재사용한다.
+접두어는 문자 부분 전체로 정확히 비교하므로 'F'/'FORM', 'O'/'OBJ' 가 섞이지 않는다.
+"""
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
+
+VariableMeta = namedtuple("VariableMeta", ["name", "code", "category", "label"])
+
+# 변수 코드 → 카테고리 표시 이름
+CATEGORIES = {
+    "W": "🔥 온기/따뜻함",
+    "C": "💪 능력/역량",
+    "E": "🗣️ 외향성",
+    "A": "🤗 친화성",
+    "N": "🌧️ 신경성",
+    "O": "🎨 개방성",
+    "H": "😄 유머",
+    "F": "💎 매력적결함",
+    "P": "🎭 성격패턴",
+    "S": "🗨️ 언어스타일",
+    "R": "❤️ 관계성향",
+    "D": "💬 대화역학",
+    "OBJ": "🏠 사물정체성",
+    "FORM": "✨ 형태특성",
+    "INT": "🤝 상호작용",
+    "U": "🌍 문화적특성",
+}
+OTHER_CATEGORY = "📊 기타"
+
+# 값 수준 구간 (하한, 표시) - 하한 이상이면 해당 수준
+STATUS_LEVELS = [
+    (0, "⚫ 매우 낮음"),
+    (20, "🔴 낮음"),
+    (40, "🟠 보통"),
+    (60, "🟡 높음"),
+    (80, "🟢 매우 높음"),
+]
+_STATUS_BOUNDS = [bound for bound, _ in STATUS_LEVELS[1:]]
+
+_CODE_PATTERN = re.compile(r"^([A-Z]+)")
+_registry = {}
+
+
+def variable_code(name):
+    match = _CODE_PATTERN.match(name)
+    return match.group(1) if match else ""
+
+
+def variable_meta(name):
+    """변수 이름의 메타데이터 (처음 본 변수는 계산 후 등록)"""
+    meta = _registry.get(name)
+    if meta is None:
+        code = variable_code(name)
+        label = name.split("_", 1)[1] if "_" in name else name
+        meta = VariableMeta(name, code, CATEGORIES.get(code, OTHER_CATEGORY), label)
+        _registry[name] = meta
+    return meta
+
+
+def variable_status(value):
+    """값 수준 표시 (🟢 매우 높음 ~ ⚫ 매우 낮음)"""
+    return STATUS_LEVELS[bisect_right(_STATUS_BOUNDS, value)][1]
+
+
+@lru_cache(maxsize=256)
+def _rows_for(items, with_value):
+    rows = []
+    for name, value in items:
+        category = variable_meta(name).category
+        if with_value:
+            category = f"{category} ({value})"
+        rows.append((name, value, category, variable_status(value)))
+    return tuple(rows)
+
+
+def variable_rows(variables, with_value=False):
+    """성격 변수 표 행 [변수, 값, 카테고리, 수준] (같은 변수 값이면 캐시 재사용)"""
+    if not variables:
+        return []
+    items = tuple(variables.items())
+    try:
+        rows = _rows_for(items, with_value)
+    except TypeError:
+        # 해시할 수 없는 값이 섞인 경우 캐시 없이 계산
+        rows = _rows_for.__wrapped__(items, with_value)
+    return [list(row) for row in rows]
+
+
+def _register_defaults():
+    """기본 성격 변수 메타데이터 미리 계산"""
+    from modules.persona_generator import PersonalityProfile
+    for name in PersonalityProfile.DEFAULTS:
+        variable_meta(name)
+
+
+_register_defaults()
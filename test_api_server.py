@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+
+from modules import api_server, data_manager
+from modules.api_server import create_api, split_for_stream
+from modules.background_jobs import get_job_runner
+from modules.persona_generator import PersonaGenerator
+from modules.persona_state import update_section
+from modules.state_backend import SQLiteBackend
+
+PERSONA = {
+    "기본정보": {"이름": "머기", "유형": "머그컵"},
+    "성격특성": {"온기": 70, "능력": 50, "외향성": 40, "유머감각": 75},
+    "매력적결함": ["가끔 뜨거운 걸 못 참음"],
+}
+
+def _with_temp_personas_dir(test):
+    """저장 경로를 임시 폴더로 바꿔서 실행"""
+    original = data_manager.PERSONAS_DIR
+    os.environ["PERSONA_INDEX"] = "0"
+    with tempfile.TemporaryDirectory() as directory:
+        data_manager.PERSONAS_DIR = api_server.PERSONAS_DIR = directory
+        try:
+            test(directory)
+        finally:
+            data_manager.PERSONAS_DIR = api_server.PERSONAS_DIR = original
+            os.environ.pop("PERSONA_INDEX", None)
+
+def _adjust(persona, warmth, competence, extraversion, humor_style):
+    return update_section(persona, "성격특성", {"온기": warmth, "능력": competence, "외향성": extraversion})
+
+def test_persona_crud_and_adjust():
+    """페르소나 저장/조회/조정/삭제 테스트"""
+    def run(directory):
+        client = TestClient(create_api(PersonaGenerator(api_provider="none"), adjust=_adjust,
+                                       regenerate=lambda persona: {"매력적결함": ["새 결함"]},
+                                       local_content=lambda persona: {"매력적결함": ["임시 결함"]}))
+        filename = client.put("/api/personas/머기.json", json=PERSONA).json()["filename"]
+        assert os.path.exists(os.path.join(directory, filename))
+        assert client.get("/api/personas").json()[0]["name"] == "머기"
+        assert client.get(f"/api/personas/{filename}").json()["성격특성"]["온기"] == 70
+        
+        adjusted = client.post(f"/api/personas/{filename}/adjust",
+                               json={"warmth": 20, "competence": 90, "extraversion": 60, "regenerate": "sync"}).json()
+        print(f"조정 결과: {adjusted['persona']['성격특성']}, {adjusted['persona']['매력적결함']}")
+        assert adjusted["persona"]["매력적결함"] == ["새 결함"]
+        assert client.get(f"/api/personas/{filename}").json()["성격특성"]["온기"] == 20
+        
+        background = client.post(f"/api/personas/{filename}/adjust", json={"warmth": 30}).json()
+        assert background["job_id"]
+        assert get_job_runner().wait(background["job_id"], timeout=5)
+        status = client.get(f"/api/jobs/{background['job_id']}").json()
+        assert status["kind"] == "adjust" and status["state"] == "done"
+        saved = client.get(f"/api/personas/{filename}").json()
+        print(f"백그라운드 재생성 후 저장된 결함: {saved['매력적결함']}")
+        assert saved["성격특성"]["온기"] == 30 and saved["매력적결함"] == ["새 결함"]
+        
+        # 재생성 중에 다른 요청이 다시 저장했으면 그 내용을 덮어쓰지 않음
+        release = threading.Event()
+        def slow_regenerate(persona):
+            release.wait(5)
+            return {"매력적결함": ["늦은 결함"]}
+        slow = TestClient(create_api(PersonaGenerator(api_provider="none"), adjust=_adjust, regenerate=slow_regenerate))
+        job_id = slow.post(f"/api/personas/{filename}/adjust", json={"warmth": 40}).json()["job_id"]
+        newer = update_section(PERSONA, "성격특성", {"온기": 99})
+        slow.put(f"/api/personas/{filename}", json=newer)
+        release.set()
+        get_job_runner().wait(job_id, timeout=5)
+        saved = slow.get(f"/api/personas/{filename}").json()
+        assert saved["성격특성"]["온기"] == 99 and saved["매력적결함"] == PERSONA["매력적결함"]
+        
+        assert client.put("/api/personas/x.json", json={"이름": "없음"}).status_code == 422
+        assert client.delete(f"/api/personas/{filename}").status_code == 200
+        assert client.get(f"/api/personas/{filename}").status_code == 404
+    _with_temp_personas_dir(run)
+
+def test_shared_persona_cache_follows_file():
+    """공유 저장소 항목보다 캐시를 거치지 않고 바뀐 파일을 우선하고, 파일이 없을 때만 공유 항목을 쓰는지 테스트"""
+    def run(directory):
+        backend = SQLiteBackend(os.path.join(directory, "state.sqlite3"))
+        cache = api_server.PersonaCache(backend=backend)
+        persona = update_section(PERSONA, "성격프로필", {"W01_친절함": 50})
+        filepath = data_manager.save_persona(persona, "머기.json")
+        cache.store(filepath, persona)
+        assert cache.get("머기.json")["성격프로필"]["W01_친절함"] == 50
+        
+        # 설문 보정/배치 병합처럼 save_persona 로 직접 덮어씀
+        data_manager.save_persona(update_section(persona, "성격프로필", {"W01_친절함": 80}), "머기.json")
+        print(f"직접 저장 후 조회: {cache.get('머기.json')['성격프로필']}")
+        assert cache.get("머기.json")["성격프로필"]["W01_친절함"] == 80
+        
+        # 다른 레플리카처럼 로컬 파일이 없으면 공유 항목 사용
+        os.remove(filepath)
+        assert cache.get("머기.json")["성격프로필"]["W01_친절함"] == 50
+    _with_temp_personas_dir(run)
+
+def test_chat_stream_and_token():
+    """SSE 대화 스트림과 API 토큰 확인 테스트"""
+    os.environ["API_TOKEN"] = "secret-token"
+    try:
+        generator = PersonaGenerator(api_provider="none")
+        client = TestClient(create_api(generator))
+        body = {"message": "안녕!", "persona": PERSONA, "session_id": "s1"}
+        assert client.post("/api/chat", json=body).status_code == 401
+        
+        headers = {"Authorization": "Bearer secret-token"}
+        response = client.post("/api/chat/stream", json=body, headers=headers)
+        events = [block for block in response.text.split("\n\n") if block.startswith("event:")]
+        names = [block.split("\n")[0].split(": ", 1)[1] for block in events]
+        print(f"SSE 이벤트: {names}")
+        assert names[0] == "status" and names[-1] == "done"
+        done = json.loads(events[-1].split("data: ", 1)[1])
+        deltas = "".join(json.loads(block.split("data: ", 1)[1])["text"] for block in events if block.startswith("event: delta"))
+        assert deltas == done["reply"]
+        
+        missing = client.post("/api/chat", json={"message": "안녕", "persona_id": "없는파일.json"}, headers=headers)
+        assert missing.status_code == 404
+    finally:
+        os.environ.pop("API_TOKEN", None)
+    
+    assert split_for_stream("안녕! 반가워. 오늘 어때?") == ["안녕! ", "반가워. ", "오늘 어때?"]
+
+if __name__ == "__main__":
+    test_persona_crud_and_adjust()
+    test_shared_persona_cache_follows_file()
+    test_chat_stream_and_token()
+    print("✅ API 서버 테스트 완료")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.background_jobs import JobRunner, DONE, FAILED, CANCELLED
+from modules.persona_generator import PersonaGenerator
+from modules.state_backend import MemoryBackend, SQLiteBackend
+
+def test_submit_and_poll():
+    """작업 ID 로 상태를 조회하고 결과를 가져오는지 테스트"""
+    runner = JobRunner(max_workers=2)
+    release = threading.Event()
+    job_id = runner.submit("greeting", lambda name: release.wait(5) and f"안녕, {name}!", "머그컵")
+    
+    assert runner.status(job_id)["state"] in ("queued", "running")
+    assert runner.result(job_id, timeout=0.05, default="대기") == "대기"
+    release.set()
+    assert runner.result(job_id, timeout=5) == "안녕, 머그컵!"
+    assert runner.status(job_id)["state"] == DONE
+    
+    failed = runner.submit("greeting", lambda: 1 / 0)
+    runner.wait(failed, timeout=5)
+    print(f"실패 작업 상태: {runner.status(failed)}")
+    assert runner.status(failed)["state"] == FAILED
+    assert runner.result(failed) is None
+    runner.shutdown()
+
+def test_key_replaces_previous_job():
+    """같은 key 로 새 작업을 넣으면 이전 작업이 취소되는지 테스트"""
+    runner = JobRunner(max_workers=1)
+    gate = threading.Event()
+    blocker = runner.submit("block", gate.wait, 5)
+    calls = []
+    first = runner.submit("adjust", calls.append, "첫 조정", key=("s1", "adjust"))
+    second = runner.submit("adjust", calls.append, "두 번째 조정", key=("s1", "adjust"))
+    
+    assert runner.status(first)["state"] == CANCELLED
+    assert runner.cancel_key(("없는 세션", "adjust")) is False
+    gate.set()
+    runner.wait(second, timeout=5)
+    print(f"실행된 작업: {calls}")
+    assert calls == ["두 번째 조정"]
+    assert runner.status(blocker)["state"] == DONE
+    runner.shutdown()
+
+def test_lane_order_and_bounded_queue():
+    """같은 lane 은 순서대로 실행되고, 대기열이 가득 차면 None 을 반환하는지 테스트"""
+    runner = JobRunner(max_workers=4, max_queued=50)
+    order = []
+    
+    def record(i):
+        time.sleep(0.001 * (5 - i % 5))
+        order.append(i)
+    
+    ids = [runner.submit("memory", record, i, lane="s1") for i in range(20)]
+    for job_id in ids:
+        runner.wait(job_id, timeout=5)
+    assert order == list(range(20))
+    
+    small = JobRunner(max_workers=1, max_queued=2)
+    gate = threading.Event()
+    running = small.submit("a", gate.wait, 5)
+    while small.status(running)["state"] != "running":
+        time.sleep(0.001)
+    assert small.submit("b", gate.wait, 5) and small.submit("c", gate.wait, 5)
+    assert small.submit("d", gate.wait, 5) is None   # 실행 중 1개 + 대기 2개
+    gate.set()
+    small.shutdown()
+    runner.shutdown()
+
+def test_memory_saved_in_background():
+    """대화 기억이 백그라운드에서 순서대로 저장되는지 테스트"""
+    generator = PersonaGenerator(api_provider="none")
+    for i in range(5):
+        generator._remember_conversation(f"메시지 {i}", "응", "s1")
+    deadline = time.time() + 5
+    while len(generator.conversation_memory.conversations) < 5 and time.time() < deadline:
+        time.sleep(0.01)
+    messages = [conv["user_message"] for conv in generator.conversation_memory.conversations]
+    print(f"저장된 기억: {messages}")
+    assert messages == [f"메시지 {i}" for i in range(5)]
+
+def test_shared_job_status():
+    """shared 작업 상태를 같은 저장소를 쓰는 다른 프로세스(러너)가 조회/취소할 수 있는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.sqlite3")
+        first = JobRunner(max_workers=1, backend=SQLiteBackend(path))
+        second = JobRunner(max_workers=1, backend=SQLiteBackend(path))
+        gate = threading.Event()
+
+        done_id = first.submit("adjust", lambda: {"결함": ["덤벙댐"]}, shared=True)
+        first.wait(done_id, timeout=2)
+        status = second.status(done_id)
+        print(f"다른 러너에서 본 상태: {status}")
+        assert status["state"] == DONE and status["result"] == {"결함": ["덤벙댐"]}
+
+        # 다른 러너에서 취소하면 실행 중인 작업의 결과는 버려짐
+        running_id = first.submit("adjust", gate.wait, 2, shared=True)
+        assert second.status(running_id)["state"] in ("queued", "running")
+        assert second.cancel(running_id)
+        gate.set()
+        first.wait(running_id, timeout=2)
+        assert first.status(running_id)["state"] == CANCELLED
+        assert second.status(running_id)["state"] == CANCELLED
+        assert not second.cancel(running_id)
+
+        # shared 로 넣지 않은 작업이나 공유하지 않는 저장소는 프로세스 안에서만 보임
+        local_id = first.submit("greeting", lambda: "안녕")
+        first.wait(local_id, timeout=2)
+        assert second.status(local_id) is None
+        assert JobRunner(backend=MemoryBackend()).backend is None
+
+if __name__ == "__main__":
+    test_submit_and_poll()
+    test_key_replaces_previous_job()
+    test_lane_order_and_bounded_queue()
+    test_memory_saved_in_background()
+    test_shared_job_status()
+    print("✅ 백그라운드 작업 테스트 완료")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+from modules.persona_generator import PersonaGenerator
+from modules.batch_generator import run_batch, load_batch_items
+
+def test_batch_generation_with_resume():
+    """매니페스트 기반 대량 생성 및 체크포인트 재시작 테스트"""
+    with tempfile.TemporaryDirectory() as workdir:
+        for color in ["red", "blue"]:
+            Image.new("RGB", (16, 16), color).save(os.path.join(workdir, f"{color}.png"))
+        
+        manifest = os.path.join(workdir, "manifest.jsonl")
+        with open(manifest, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"image": "red.png", "name": "빨강이", "purpose": "응원"}, ensure_ascii=False) + "\n")
+            f.write(json.dumps({"image": "blue.png", "id": "blue-01", "object_type": "머그컵"}, ensure_ascii=False) + "\n")
+        
+        items = load_batch_items(manifest)
+        assert [item["id"] for item in items] == ["red", "blue-01"]
+        
+        saved = {}
+        def save_to_memory(persona, filename=None):
+            saved[filename] = persona
+            return os.path.join(workdir, filename)
+        
+        generator = PersonaGenerator()
+        generator.api_key = None  # 네트워크 없이 기본 분석 경로 사용
+        
+        summary = run_batch(manifest, generator=generator, workers=2, save=save_to_memory)
+        print(f"1차 실행: {summary}")
+        assert summary["succeeded"] == 2 and summary["failed"] == 0
+        assert any(p["기본정보"]["이름"] == "빨강이" for p in saved.values())
+        assert all("구조화프롬프트" in p for p in saved.values())
+        
+        # 체크포인트가 있으므로 두 번째 실행은 모두 건너뜀
+        summary = run_batch(manifest, generator=generator, workers=2, save=save_to_memory)
+        print(f"2차 실행: {summary}")
+        assert summary["skipped"] == 2 and summary["succeeded"] == 0
+        
+        # 폴더를 바로 넘겨도 기본 체크포인트(폴더/batch.ckpt.jsonl)로 이어서 실행
+        summary = run_batch(workdir, generator=generator, workers=2, save=save_to_memory)
+        assert summary["succeeded"] == 2
+        assert os.path.exists(os.path.join(workdir, "batch.ckpt.jsonl"))
+        summary = run_batch(workdir, generator=generator, workers=2, save=save_to_memory)
+        print(f"폴더 재실행: {summary}")
+        assert summary["skipped"] == 2 and summary["succeeded"] == 0
+
+if __name__ == "__main__":
+    test_batch_generation_with_resume()
+    print("🎉 배치 생성 테스트 완료")
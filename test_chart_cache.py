@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules import chart_cache
+from modules.chart_cache import ChartCache
+
+def test_humor_chart_is_memoised():
+    """같은 유머 매트릭스 값이면 차트를 다시 그리지 않는지 테스트"""
+    humor = {"warmth_vs_wit": 70, "self_vs_observational": 40, "subtle_vs_expressive": 55}
+    before = chart_cache.cache_stats()
+    first = chart_cache.humor_chart(humor)
+    second = chart_cache.humor_chart(dict(humor))
+    after = chart_cache.cache_stats()
+    
+    print(f"캐시 상태: {after}")
+    assert first is second
+    assert first.type == "matplotlib"
+    assert first.plot.startswith("data:image/png;base64,")
+    assert after["hits"] - before["hits"] >= 1
+    assert chart_cache.humor_chart({}) is None
+
+def test_radar_chart_modes():
+    """레이더 차트: 기본은 plotly JSON, static 모드는 이미지"""
+    persona = {"성격특성": {"온기": 80, "능력": 60, "외향성": 30}}
+    interactive = chart_cache.personality_chart(persona, mode="figure")
+    static = chart_cache.personality_chart(persona, mode="static")
+    
+    assert interactive.type == "plotly"
+    assert "Scatterpolar" in interactive.plot or "scatterpolar" in interactive.plot
+    assert static.type == "matplotlib"
+    assert chart_cache.personality_chart(persona, mode="figure") is interactive
+    assert chart_cache.personality_chart({"기본정보": {}}) is None
+
+def test_evicted_values_are_disposed():
+    """LRU 에서 밀려난 값이 해제 함수로 정리되는지 테스트"""
+    disposed = []
+    cache = ChartCache(maxsize=2, dispose=disposed.append)
+    for key in ("a", "b", "c"):
+        cache.get_or_create(key, lambda k=key: f"chart-{k}")
+    
+    assert disposed == ["chart-a"]
+    assert len(cache) == 2
+    cache.clear()
+    assert len(disposed) == 3
+
+def test_client_mode_sends_only_values():
+    """client 모드는 값 벡터만 담은 작은 HTML 을 보내는지 테스트"""
+    import json
+    import html as html_lib
+    
+    humor = {"warmth_vs_wit": 70, "self_vs_observational": 40, "subtle_vs_expressive": 55}
+    snippet = chart_cache.humor_chart(humor, mode="client")
+    radar = chart_cache.personality_chart({"성격특성": {"온기": 80, "능력": 60}}, mode="client")
+    
+    print(f"client 모드 크기: 유머 {len(snippet)}B, 레이더 {len(radar)}B")
+    assert 'class="np-chart"' in snippet
+    payload = json.loads(html_lib.unescape(snippet.split('data-chart="')[1].split('"')[0]))
+    assert payload["kind"] == "humor" and payload["values"] == [70.0, 40.0, 55.0]
+    assert len(radar) < 300
+    assert chart_cache.humor_chart({}, mode="client") == ""
+
+if __name__ == "__main__":
+    test_humor_chart_is_memoised()
+    test_radar_chart_modes()
+    test_evicted_values_are_disposed()
+    test_client_mode_sends_only_values()
+    print("✅ 차트 캐시 테스트 통과")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import gradio as gr
+
+from modules import deployment
+
+def _clear_env():
+    for name in ["DEPLOYMENT_PROFILE", *deployment._ENV_OVERRIDES.values()]:
+        os.environ.pop(name, None)
+
+def test_profiles_and_overrides():
+    """프로필 선택과 환경변수 덮어쓰기 테스트"""
+    _clear_env()
+    try:
+        os.environ["DEPLOYMENT_PROFILE"] = "single-cpu"
+        profile = deployment.load_profile()
+        print(deployment.describe(profile))
+        assert profile["generation"] == 1 and profile["queue_max_size"] == 32
+        
+        os.environ["DEPLOYMENT_PROFILE"] = "multi-core"
+        os.environ["CONCURRENCY_CHAT"] = "none"
+        os.environ["QUEUE_MAX_SIZE"] = "잘못된 값"
+        profile = deployment.load_profile()
+        cpus = os.cpu_count() or 1
+        assert profile["generation"] == max(1, cpus // 2)
+        assert profile["preview"] == cpus
+        assert profile["chat"] is None
+        assert profile["queue_max_size"] == 256   # 잘못된 값은 프로필 값 사용
+        
+        os.environ["DEPLOYMENT_PROFILE"] = "auto"
+        assert deployment.profile_name() in ("single-cpu", "multi-core")
+    finally:
+        _clear_env()
+
+def test_event_groups_apply_to_gradio():
+    """그룹별 이벤트 인자가 설치된 Gradio 에 그대로 적용되는지 테스트"""
+    profile = deployment.load_profile("single-cpu")
+    assert deployment.event_options(deployment.CHEAP, profile) == {"concurrency_limit": None}
+    assert deployment.event_options("chat", profile) == {"concurrency_limit": 2, "concurrency_id": "chat"}
+    
+    with gr.Blocks() as demo:
+        text = gr.Textbox()
+        heavy = gr.Button("heavy")
+        light = gr.Button("light")
+        heavy.click(lambda x: x, inputs=[text], outputs=[text], **deployment.event_options("generation", profile))
+        light.click(lambda: "", outputs=[text], **deployment.event_options(deployment.CHEAP, profile))
+    demo.queue(**deployment.queue_options(profile))
+    
+    fns = demo.fns.values() if isinstance(demo.fns, dict) else demo.fns
+    limits = {fn.concurrency_id: fn.concurrency_limit for fn in fns}
+    print(f"동시 실행 그룹: {limits}")
+    assert limits["generation"] == 1
+    assert None in limits.values()
+
+def test_thread_limit_when_mounted():
+    """mount_gradio_app 으로 띄울 때도 프로필의 max_threads 가 적용되는지 테스트"""
+    import anyio.to_thread
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    
+    profile = dict(deployment.load_profile("single-cpu"), max_threads=7)
+    with gr.Blocks() as demo:
+        gr.Textbox()
+    demo.queue(**deployment.queue_options(profile))
+    api = FastAPI()
+    
+    @api.get("/threads")
+    async def threads():
+        return {"tokens": anyio.to_thread.current_default_thread_limiter().total_tokens}
+    
+    deployment.apply_thread_limit(demo, profile, api=api)
+    with TestClient(gr.mount_gradio_app(api, demo, path="/")) as client:
+        assert client.get("/threads").json()["tokens"] == 7
+    print(f"Gradio 스레드 한도: {demo.limiter.total_tokens}")
+    assert demo.max_threads == 7 and demo.limiter.total_tokens == 7
+
+if __name__ == "__main__":
+    test_profiles_and_overrides()
+    test_event_groups_apply_to_gradio()
+    test_thread_limit_when_mounted()
+    print("✅ 배포 프로필 테스트 완료")
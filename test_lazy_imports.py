@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.lazy_imports import LazyModule, is_loaded
+from modules import font_setup
+
+def test_lazy_module_defers_import():
+    """첫 속성 접근 전까지 실제 import 가 일어나지 않는지 테스트"""
+    sys.modules.pop("colorsys", None)
+    module = LazyModule("colorsys")
+    
+    assert not is_loaded(module)
+    assert "colorsys" not in sys.modules
+    
+    h, l, s = module.rgb_to_hls(1.0, 0.0, 0.0)
+    print(f"지연 import 후 호출 결과: {h}, {l}, {s}")
+    assert is_loaded(module)
+    assert "colorsys" in sys.modules
+
+def test_persona_generator_does_not_import_sdk():
+    """persona_generator import 만으로 Gemini SDK 를 불러오지 않는지 테스트"""
+    from modules import persona_generator
+    
+    assert isinstance(persona_generator.genai, LazyModule)
+    persona_generator.PersonaGenerator(api_provider="gemini", api_key="test-key")
+    assert not is_loaded(persona_generator.genai)
+
+def test_font_resolution_is_cached():
+    """폰트 목록 스캔 결과가 캐시되는지 테스트"""
+    first = font_setup.setup_korean_font()
+    second = font_setup.setup_korean_font()
+    print(f"선택된 폰트: {first}")
+    assert first == second == font_setup.resolve_korean_font()
+
+def test_persisted_font_skips_scan():
+    """저장된 폰트 선택 결과가 있으면 폰트 목록을 스캔하지 않는지 테스트"""
+    import json
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, "korean_font.json")
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump({"font": "NanumGothic", "file": cache_file}, f)
+        
+        old_env = os.environ.get("KOREAN_FONT_CACHE")
+        old_resolved = font_setup._resolved_font
+        old_scan = font_setup._scan_korean_font
+        os.environ["KOREAN_FONT_CACHE"] = cache_file
+        font_setup._resolved_font = None
+        font_setup._scan_korean_font = lambda: (_ for _ in ()).throw(AssertionError("스캔하면 안 됨"))
+        try:
+            assert font_setup.resolve_korean_font() == "NanumGothic"
+            
+            # 폰트 파일이 사라지면 저장된 결과를 쓰지 않음
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump({"font": "NanumGothic", "file": os.path.join(tmp, "없는파일.ttf")}, f)
+            assert font_setup._load_persisted_font() is None
+        finally:
+            font_setup._scan_korean_font = old_scan
+            font_setup._resolved_font = old_resolved
+            if old_env is None:
+                os.environ.pop("KOREAN_FONT_CACHE", None)
+            else:
+                os.environ["KOREAN_FONT_CACHE"] = old_env
+
+if __name__ == "__main__":
+    test_lazy_module_defers_import()
+    test_persona_generator_does_not_import_sdk()
+    test_font_resolution_is_cached()
+    test_persisted_font_skips_scan()
+    print("✅ 지연 import 테스트 통과")
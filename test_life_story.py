@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.life_story import compose_life_story, purpose_story, get_templates, _TemplateStore, DEFAULT_TEMPLATES_PATH
+
+def test_compose_life_story():
+    """시간/장소/용도 조합으로 생애 스토리가 만들어지는지 테스트"""
+    story = compose_life_story("오래됨", "학교", "헬스 동기부여")
+    
+    assert story["relationship_depth"] == "운명적_동반자"
+    assert story["daily_environment"]["environment"] == "배움과 성장이 가득한 공간"
+    assert "사용자가 운동을 미룰 때마다 느끼는 답답함" in story["accumulated_memories"]
+    assert story["unique_perspectives"]  # 운동 용도에만 있는 관점
+    
+    # 없는 값은 기본값(몇 개월/집)으로, 용도가 없으면 기본 소원
+    fallback = compose_life_story("없는값", "공원", "")
+    assert fallback["relationship_depth"] == "안정화_단계"
+    assert fallback["emotional_journey"]["secret_wishes"] == ["더 많이 사용되고 싶다", "사용자에게 인정받고 싶다"]
+    assert purpose_story("") == {}
+    assert purpose_story("장식용")["wishes"] == ["더 유용한 존재가 되고 싶다"]
+
+def test_results_are_independent_copies():
+    """반환된 스토리를 수정해도 템플릿이 바뀌지 않는지 테스트"""
+    story = compose_life_story("새것", "집", "공부")
+    story["accumulated_memories"].append("수정")
+    story["daily_environment"]["special_moments"].clear()
+    
+    again = compose_life_story("새것", "집", "공부")
+    assert "수정" not in again["accumulated_memories"]
+    assert again["daily_environment"]["special_moments"]
+    print(f"미리 합친 조각 수: {len(get_templates().fragments)}")
+
+def test_hot_reload():
+    """템플릿 파일이 바뀌면 재시작 없이 다시 읽는지 테스트"""
+    with open(DEFAULT_TEMPLATES_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "templates.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        
+        os.environ["LIFE_STORY_TEMPLATES"] = path
+        try:
+            store = _TemplateStore(check_interval=0)
+            assert store.get().time["새것"]["relationship_level"] == "초기_적응기"
+            
+            data["time"]["새것"]["relationship_level"] = "수정된_단계"
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+            assert store.get().time["새것"]["relationship_level"] == "수정된_단계"
+            
+            # 잘못된 파일은 무시하고 이전 템플릿 유지
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("{잘못된 json")
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2 * 10**9))
+            assert store.get().time["새것"]["relationship_level"] == "수정된_단계"
+        finally:
+            os.environ.pop("LIFE_STORY_TEMPLATES", None)
+
+if __name__ == "__main__":
+    test_compose_life_story()
+    test_results_are_independent_copies()
+    test_hot_reload()
+    print("✅ 생애 스토리 템플릿 테스트 완료")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.persona_generator import PersonalityProfile
+from modules.persona_codec import (
+    encode_persona, decode_persona, dumps_persona, loads_persona,
+    write_persona_file, read_persona_file, DERIVED_FIELDS
+)
+
+def make_persona():
+    variables = dict(PersonalityProfile.DEFAULTS)
+    variables["W01_친절함"] = 91
+    variables["X99_실험변수"] = 42  # 기본 목록에 없는 변수
+    return {
+        "기본정보": {"이름": "머그컵", "유형": "컵"},
+        "성격특성": {"온기": 80, "능력": 60, "외향성": 40, "유머감각": 75},
+        "성격프로필": variables,
+        "성격변수127": dict(variables),
+        "구조화프롬프트": "긴 프롬프트 " * 500,
+        "매력적결함": ["가끔 뜨거워진다"],
+        "인사말": "안녕!",
+    }
+
+def test_compact_round_trip():
+    """압축 형식 왕복 시 파생 필드를 뺀 나머지가 그대로인지 테스트"""
+    persona = make_persona()
+    restored = loads_persona(dumps_persona(persona))
+    
+    for field in DERIVED_FIELDS:
+        assert field not in restored
+    expected = {k: v for k, v in persona.items() if k not in DERIVED_FIELDS}
+    assert restored == expected
+    assert restored["성격프로필"]["X99_실험변수"] == 42
+
+def test_compact_is_smaller():
+    """압축 형식이 기존 indent=2 JSON 보다 작은지 테스트"""
+    persona = make_persona()
+    full = json.dumps(persona, ensure_ascii=False, indent=2).encode("utf-8")
+    compact = dumps_persona(persona)
+    packed = dumps_persona(persona, compression="gzip")
+    
+    print(f"기존: {len(full)}B, 압축 형식: {len(compact)}B, gzip: {len(packed)}B")
+    assert len(compact) < len(full) / 3
+    assert len(packed) < len(compact)
+
+def test_legacy_and_files():
+    """기존 전체 형식 파일과 gzip 파일을 모두 읽는지 테스트"""
+    persona = make_persona()
+    assert decode_persona(persona) is persona  # 기존 형식은 그대로 통과
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "legacy.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump(persona, f, ensure_ascii=False, indent=2)
+        assert read_persona_file(legacy) == persona
+        
+        gz = write_persona_file(persona, os.path.join(tmp, "p.json.gz"), compression="gzip")
+        assert read_persona_file(gz)["성격프로필"] == persona["성격프로필"]
+
+def test_mismatched_variable_order_rejected():
+    """변수 순서 지문이 다르면 배열을 잘못 해석하지 않고 거부하는지 테스트"""
+    compact = encode_persona(make_persona())
+    compact["_vars"]["id"] = "deadbeef"
+    try:
+        decode_persona(compact)
+    except ValueError as e:
+        print(f"거부됨: {e}")
+    else:
+        assert False, "지문이 다른 배열을 받아들이면 안 됩니다"
+
+if __name__ == "__main__":
+    test_compact_round_trip()
+    test_compact_is_smaller()
+    test_legacy_and_files()
+    test_mismatched_variable_order_rejected()
+    print("✅ 페르소나 압축 형식 테스트 완료")
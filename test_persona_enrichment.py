@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.persona_generator import PersonaGenerator
+
+class OneShotGenerator(PersonaGenerator):
+    """API 대신 준비된 구조화 응답을 돌려주는 테스트용 생성기"""
+    
+    def __init__(self, response):
+        super().__init__()
+        self.api_key = None
+        self.response = response
+        self.prompts = []
+    
+    def _generate_text_with_api(self, prompt, image=None, priority=None, response_schema=None):
+        self.prompts.append(prompt)
+        return json.dumps(self.response, ensure_ascii=False)
+
+def test_one_call_with_per_field_fallback():
+    """한 번의 호출로 창의적 필드를 만들고, 검증 실패 필드만 개별 폴백하는지 테스트"""
+    os.environ["PERSONA_ENRICHMENT_MODE"] = "oneshot"
+    generator = OneShotGenerator({
+        "attractive_flaws": ["김이 서리면 부끄러워함", "손잡이가 흔들릴까 걱정함",
+                             "커피 얼룩에 유난히 예민함", "찬장 속이 답답하다고 투덜댐"],
+        "contradictions": ["짧음"],  # 검증 실패 → 개별 폴백
+        "life_story": {
+            "arrival_moment": "비 오는 날 상자에서 처음 꺼내져 창가에 놓였던 순간",
+            "secret_wishes": ["꽃병으로도 써보고 싶음", "주인과 여행 가기"],
+            "unique_perspectives": ["아침 햇살의 온도", "커피 향의 변화"]
+        },
+        "greeting": "머그: 어, 왔어? 오늘도 뜨거운 거 담아줄 거지?"
+    })
+    
+    analysis = generator._get_default_analysis()
+    persona = generator.create_frontend_persona(analysis, {"name": "머그", "object_type": "머그컵"})
+    
+    assert len(generator.prompts) == 1, "창의적 필드는 한 번의 호출로 생성되어야 함"
+    assert persona["매력적결함"][0] == "김이 서리면 부끄러워함"
+    assert len(persona["모순적특성"]) == 2 and "짧음" not in persona["모순적특성"]
+    assert persona["생애스토리"]["arrival_moment"].startswith("비 오는 날")
+    assert persona["생애스토리"]["emotional_journey"]["secret_wishes"][0] == "꽃병으로도 써보고 싶음"
+    assert persona["인사말"] == "어, 왔어? 오늘도 뜨거운 거 담아줄 거지?"
+    print(generator.format_greeting("머그", persona["인사말"]))
+    os.environ.pop("PERSONA_ENRICHMENT_MODE", None)
+
+def test_separate_mode_skips_oneshot():
+    """separate 모드에서는 원샷 호출을 하지 않는지 테스트"""
+    os.environ["PERSONA_ENRICHMENT_MODE"] = "separate"
+    try:
+        generator = OneShotGenerator({})
+        persona = generator.create_frontend_persona(generator._get_default_analysis(), {"name": "개별"})
+        assert "인사말" not in persona
+        assert len(persona["매력적결함"]) == 4
+    finally:
+        os.environ.pop("PERSONA_ENRICHMENT_MODE", None)
+
+if __name__ == "__main__":
+    test_one_call_with_per_field_fallback()
+    test_separate_mode_skips_oneshot()
+    print("🎉 원샷 페르소나 보강 테스트 완료")
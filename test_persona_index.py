@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import subprocess
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from modules.persona_generator import PersonalityProfile
+from modules.persona_index import PersonaIndex
+
+NAMES = list(PersonalityProfile.DEFAULTS)
+
+def random_profile(rng):
+    return dict(zip(NAMES, rng.integers(0, 101, len(NAMES)).tolist()))
+
+def test_search_and_persistence():
+    """비슷한 페르소나 검색과 메모리 맵 파일 재사용 테스트"""
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = PersonaIndex(tmp)
+        target = random_profile(rng)
+        index.add("target.json", target)
+        for i in range(300):
+            index.add(f"p{i}.json", random_profile(rng), flush=False)
+        # target 과 거의 같은 페르소나
+        close = {name: min(100, value + 1) for name, value in target.items()}
+        index.add("close.json", close)
+        
+        reopened = PersonaIndex(tmp)
+        assert len(reopened) == 302
+        
+        start = time.perf_counter()
+        results = reopened.similar_to("target.json", k=3)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"검색 결과: {results[:2]} ({elapsed:.1f}ms)")
+        assert results[0][0] == "close.json"
+        assert reopened.search(target, k=1, metric="l2")[0][0] == "target.json"
+
+def test_update_remove_duplicates():
+    """같은 파일명 갱신, 삭제, 중복 쌍 탐지 테스트"""
+    rng = np.random.default_rng(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = PersonaIndex(tmp)
+        profile = random_profile(rng)
+        index.add("a.json", random_profile(rng))
+        index.add("a.json", profile)  # 갱신 - 행이 늘지 않음
+        index.add("b.json", dict(profile))
+        index.add("c.json", random_profile(rng))
+        assert len(index) == 3
+        
+        duplicates = index.near_duplicates(0.999)
+        assert [(first, second) for first, second, _ in duplicates] == [("a.json", "b.json")]
+        
+        assert index.remove("b.json")
+        assert index.near_duplicates(0.999) == []
+        assert "b.json" not in [key for key, _ in index.search(profile, k=5)]
+
+def test_concurrent_processes():
+    """두 프로세스가 동시에 저장해도 행이 사라지거나 파일명/벡터가 어긋나지 않는지 테스트"""
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); from modules.persona_index import PersonaIndex; "
+            "index = PersonaIndex(sys.argv[2]); "
+            "[index.add(f'{sys.argv[3]}{i}.json', {'W01_친절함': i}) for i in range(80)]")
+    root = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        workers = [subprocess.Popen([sys.executable, "-c", code, root, tmp, prefix]) for prefix in ("a", "b")]
+        assert all(worker.wait(60) == 0 for worker in workers)
+        
+        index = PersonaIndex(tmp)
+        print(f"두 프로세스 저장 후 인덱스 크기: {len(index)}")
+        assert len(index) == 160
+        for prefix in ("a", "b"):
+            for i in (0, 41, 79):
+                row = index._rows[f"{prefix}{i}.json"]
+                assert index._vectors[row][NAMES.index("W01_친절함")] == i
+
+if __name__ == "__main__":
+    test_search_and_persistence()
+    test_update_remove_duplicates()
+    test_concurrent_processes()
+    print("✅ 페르소나 근접 검색 인덱스 테스트 완료")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.persona_generator import PersonalityProfile
+from modules.persona_rules import compile_persona, message_features, analyze_message, base_personality_type
+
+def test_message_features_single_pass():
+    """겹치는 키워드(좋아/좋아해)도 한 번의 스캔으로 모두 찾는지 테스트"""
+    features = message_features("나 그거 좋아해")
+    print(f"특징: {sorted(features)}")
+    assert {"joy", "interest", "short"} <= features
+    
+    features = message_features("오늘 너무 힘들고 스트레스 받아서 어떻게 해야 할지 모르겠어")
+    assert {"distress", "question", "inquiry"} <= features
+    assert "short" not in features
+    assert message_features("말이 많아, 짧게 해줘") >= {"complaint"}
+
+def test_compiled_persona_is_cached():
+    """같은 성격 변수면 미리 계산된 결과를 재사용하는지 테스트"""
+    variables = dict(PersonalityProfile.DEFAULTS)
+    variables["S01_격식성수준"] = 85
+    variables["C09_실행력"] = 20
+    
+    compiled = compile_persona(variables)
+    assert compile_persona(dict(variables)) is compiled
+    assert compiled.static_guide.startswith("• 정중하고 격식있는 표현 사용")
+    assert compiled.question_guide == "• 공감적 지지와 감정적 위로 우선\n"
+    
+    profile = PersonalityProfile.from_dict(variables)
+    expected = base_personality_type(profile.get_category_summary("W"),
+                                     profile.get_category_summary("C"),
+                                     profile.get_category_summary("H"))
+    assert compiled.archetype == expected
+
+def test_analyze_message_table():
+    """성격 유형별 문구와 그룹 우선순위(힘듦 > 기쁨)가 유지되는지 테스트"""
+    analysis = analyze_message(message_features("힘들지만 행복해"), "따뜻한 상담사")
+    assert analysis == "→ 사용자가 힘든 상황인 것 같음. 깊이 공감하고 위로 필요.\n→ 사용자가 말을 아끼는 상태. 조심스럽게 마음 열게 하기.\n"
+    
+    general = analyze_message(message_features("오늘은 그냥 평범한 하루였어요"), "균형잡힌_친구")
+    assert general.startswith("→ 일반적인 대화")
+
+if __name__ == "__main__":
+    test_message_features_single_pass()
+    test_compiled_persona_is_cached()
+    test_analyze_message_table()
+    print("✅ 성격 규칙 테이블 테스트 완료")
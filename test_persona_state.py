@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.persona_state import update_persona, update_section, persona_diff, apply_diff, without_callables, chat_session_id
+
+def make_persona():
+    return {
+        "기본정보": {"이름": "머그컵", "유형": "컵"},
+        "성격특성": {"온기": 50, "능력": 60, "외향성": 40, "유머감각": 75},
+        "구조화프롬프트": "긴 프롬프트 " * 500,
+        "매력적결함": ["가끔 뜨거워진다"],
+        "인사말": "안녕!",
+    }
+
+def test_update_shares_unchanged_sections():
+    """바뀌지 않은 섹션은 원본과 같은 객체를 공유하는지 테스트"""
+    original = make_persona()
+    adjusted = update_section(original, "성격특성", {"온기": 90})
+    
+    assert adjusted["성격특성"]["온기"] == 90
+    assert original["성격특성"]["온기"] == 50  # 원본은 그대로
+    assert adjusted["구조화프롬프트"] is original["구조화프롬프트"]
+    assert adjusted["기본정보"] is original["기본정보"]
+
+def test_diff_is_small_overlay():
+    """변경 오버레이에는 바뀐 섹션만 들어가는지 테스트"""
+    original = make_persona()
+    adjusted = update_persona(update_section(original, "성격특성", {"능력": 10}),
+                              {"매력적결함": ["새 결함"]}, removed=["인사말"])
+    changed, removed = persona_diff(original, adjusted)
+    
+    print(f"바뀐 섹션: {sorted(changed)}, 삭제: {removed}")
+    assert sorted(changed) == ["매력적결함", "성격특성"]
+    assert removed == ["인사말"]
+    assert apply_diff(original, (changed, removed)) == adjusted
+
+def test_without_callables():
+    """저장용 복사본에서 호출 가능한 값만 빠지는지 테스트"""
+    persona = make_persona()
+    persona["콜백"] = lambda: None
+    cleaned = without_callables(persona)
+    assert "콜백" not in cleaned and "콜백" in persona
+    assert cleaned["기본정보"] is persona["기본정보"]
+
+def test_chat_session_id_is_stable_across_processes():
+    """해시 시드가 다른 두 인터프리터에서도 같은 대화 세션 ID 가 나오는지 테스트"""
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); from modules.persona_state import chat_session_id; "
+            "print(chat_session_id({'기본정보': {'이름': '머그컵', '유형': '컵'}, '성격특성': {'온기': 50}}))")
+    root = os.path.dirname(os.path.abspath(__file__))
+    ids = []
+    for seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONIOENCODING="utf-8")
+        ids.append(subprocess.run([sys.executable, "-c", code, root], env=env, capture_output=True,
+                                  text=True, encoding="utf-8", check=True).stdout.strip())
+    print(f"세션 ID: {ids}")
+    assert ids[0] == ids[1] and ids[0].startswith("머그컵_")
+    # 성격을 조정해도 같은 페르소나면 세션 유지
+    assert chat_session_id(update_section(make_persona(), "성격특성", {"온기": 90})) == chat_session_id(make_persona())
+
+if __name__ == "__main__":
+    test_update_shares_unchanged_sections()
+    test_diff_is_small_overlay()
+    test_without_callables()
+    test_chat_session_id_is_stable_across_processes()
+    print("✅ 페르소나 상태 테스트 통과")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.preview_engine import local_preview, local_greeting, humor_template, HUMOR_STYLE_TEMPLATES
+from modules.persona_generator import HumorMatrix
+
+def test_humor_styles_map_to_templates():
+    """UI 유머 스타일이 모두 HumorMatrix 템플릿에 연결되는지 테스트"""
+    for style, template in HUMOR_STYLE_TEMPLATES.items():
+        assert template in HumorMatrix.TEMPLATES, style
+    assert humor_template("모르는 스타일") == "warm_humorist"
+
+def test_local_greeting_reflects_traits_and_flaws():
+    """결함이 있으면 결함 기반, 없으면 성격 기반 인사말인지 테스트"""
+    cold = local_greeting("머그컵", {"온기": 20, "외향성": 50})
+    flawed = local_greeting("머그컵", {"온기": 70, "유머감각": 75}, flaws=["완벽주의 때문에 불안해함"])
+    
+    print(f"차가운 인사말: {cold}")
+    print(f"결함 인사말: {flawed}")
+    assert "필요한 얘기만" in cold
+    assert "완벽" in flawed
+
+def test_local_preview_needs_no_api():
+    """API 없이 즉시 미리보기 마크다운을 만드는지 테스트"""
+    persona = {"기본정보": {"이름": "머그컵"}, "매력적결함": []}
+    preview = local_preview(persona, 80, 30, 75, "장난꾸러기")
+    
+    assert "⚡ 즉시 미리보기" in preview
+    assert "온기: 80/100 (따뜻함)" in preview
+    assert "능력: 30/100 (서툼)" in preview
+    assert local_preview(None, 50, 50, 50, "장난꾸러기").startswith("👤")
+
+if __name__ == "__main__":
+    test_humor_styles_map_to_templates()
+    test_local_greeting_reflects_traits_and_flaws()
+    test_local_preview_needs_no_api()
+    print("✅ 로컬 미리보기 엔진 테스트 통과")
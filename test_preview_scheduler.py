@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.preview_scheduler import PreviewScheduler, SUPERSEDED
+
+def test_rapid_requests_run_only_latest():
+    """디바운스 중 연속으로 들어온 요청은 마지막 것만 실행되는지 테스트"""
+    scheduler = PreviewScheduler(debounce_seconds=0.2)
+    calls = []
+    results = {}
+    
+    def preview(value):
+        calls.append(value)
+        return f"미리보기 {value}"
+    
+    def move_slider(value):
+        results[value] = scheduler.submit("세션A", preview, value)
+    
+    threads = []
+    for value in (10, 20, 30, 40):
+        t = threading.Thread(target=move_slider, args=(value,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.02)
+    for t in threads:
+        t.join()
+    
+    print(f"실행된 미리보기: {calls}, 건너뜀: {scheduler.skipped}")
+    assert calls == [40]
+    assert results[40] == "미리보기 40"
+    assert all(results[v] is SUPERSEDED for v in (10, 20, 30))
+
+def test_stale_result_is_discarded():
+    """실행 중에 더 새로운 요청이 오면 이전 결과는 버려지는지 테스트"""
+    scheduler = PreviewScheduler(debounce_seconds=0)
+    started = threading.Event()
+    results = []
+    
+    def slow_preview():
+        started.set()
+        time.sleep(0.2)
+        return "낡은 미리보기"
+    
+    t = threading.Thread(target=lambda: results.append(scheduler.submit("세션A", slow_preview)))
+    t.start()
+    started.wait(1)
+    assert scheduler.submit("세션A", lambda: "새 미리보기") == "새 미리보기"
+    t.join()
+    
+    assert results == [SUPERSEDED]
+    assert scheduler.discarded == 1
+
+def test_sessions_are_independent():
+    """다른 세션의 요청은 서로 밀어내지 않는지 테스트"""
+    scheduler = PreviewScheduler(debounce_seconds=0.1)
+    results = {}
+    threads = [threading.Thread(target=lambda s=s: results.__setitem__(s, scheduler.submit(s, lambda: s)))
+               for s in ("세션A", "세션B")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {"세션A": "세션A", "세션B": "세션B"}
+
+def test_session_records_are_bounded():
+    """세션 기록이 max_sessions 개를 넘지 않고, 정리된 세션이 다시 와도 정상 동작하는지 테스트"""
+    scheduler = PreviewScheduler(debounce_seconds=0, max_sessions=3)
+    for i in range(10):
+        assert scheduler.submit(f"세션{i}", lambda: i) == i
+    print(f"남은 세션 기록: {list(scheduler._latest)}")
+    assert list(scheduler._latest) == ["세션7", "세션8", "세션9"]
+    
+    scheduler.forget("세션9")
+    assert "세션9" not in scheduler._latest
+    assert scheduler.submit("세션0", lambda: "다시") == "다시"
+
+if __name__ == "__main__":
+    test_rapid_requests_run_only_latest()
+    test_stale_result_is_discarded()
+    test_sessions_are_independent()
+    test_session_records_are_bounded()
+    print("✅ 미리보기 스케줄러 테스트 통과")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.persona_generator import PersonaGenerator
+from modules.provider_batch import (
+    LocalBatchBackend, collect_requests, write_batch_file, submit_job, wait_and_merge
+)
+
+def _make_persona():
+    generator = PersonaGenerator()
+    generator.api_key = None
+    analysis = generator._get_default_analysis()
+    return generator.create_frontend_persona(analysis, {"name": "배치군", "object_type": "머그컵"})
+
+def test_local_batch_roundtrip():
+    """로컬 배치 백엔드로 제출 → 병합 흐름 테스트"""
+    with tempfile.TemporaryDirectory() as workdir:
+        personas_dir = os.path.join(workdir, "personas")
+        os.makedirs(personas_dir)
+        with open(os.path.join(personas_dir, "배치군_머그컵_1.json"), "w", encoding="utf-8") as f:
+            json.dump(_make_persona(), f, ensure_ascii=False)
+        
+        requests_list = collect_requests(personas_dir)
+        assert [r["custom_id"] for r in requests_list] == ["배치군_머그컵_1::flaws", "배치군_머그컵_1::contradictions"]
+        
+        # 제공업체 형식 파일 작성 확인
+        gemini_path = write_batch_file(requests_list, os.path.join(workdir, "g.jsonl"), "gemini")
+        with open(gemini_path, encoding="utf-8") as f:
+            first = json.loads(f.readline())
+        assert first["key"] == "배치군_머그컵_1::flaws"
+        assert first["request"]["contents"][0]["parts"][0]["text"]
+        
+        def responder(prompt):
+            if "'결함' 4개" in prompt:
+                return "1. 김이 서리면 부끄러워함\n2. 손잡이가 흔들릴까 걱정함\n3. 커피 얼룩에 예민함\n4. 찬장 속이 답답하다고 투덜댐"
+            return "겉으로는 무뚝뚝하지만 따뜻한 음료를 담으면 수다스러워짐\n튼튼하다 자랑하면서도 바닥에 닿는 소리에 깜짝 놀람"
+        
+        backend = LocalBatchBackend(responder=responder)
+        state = submit_job(backend, personas_dir=personas_dir, jobs_dir=os.path.join(workdir, "jobs"))
+        # save 를 주지 않아도 읽어 온 personas_dir 에 그대로 저장
+        summary = wait_and_merge(backend, state, poll_interval=0, personas_dir=personas_dir)
+        print(f"병합 결과: {summary}")
+        assert summary == {"updated": 1, "fields": 2, "unparsed": 0}
+        
+        with open(os.path.join(personas_dir, "배치군_머그컵_1.json"), encoding="utf-8") as f:
+            merged = json.load(f)
+        assert merged["매력적결함"][0] == "김이 서리면 부끄러워함"
+        assert len(merged["모순적특성"]) == 2
+        
+        with open(state["state_path"], encoding="utf-8") as f:
+            assert json.load(f)["status"] == "merged"
+
+if __name__ == "__main__":
+    test_local_batch_roundtrip()
+    print("🎉 배치 API 모드 테스트 완료")
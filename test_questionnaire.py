@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import csv
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from modules.persona_generator import PersonalityProfile
+from modules.questionnaire import get_questionnaire, score_answers, load_answer_sheets, calibrate_persona, main
+
+def test_single_sheet():
+    """응답지 한 장이 dimension 이 같은 변수로 채점되는지 테스트"""
+    questionnaire = get_questionnaire()
+    print(f"연결된 문항: {len(questionnaire.mapping)}개, 미연결: {questionnaire.unmapped}")
+    assert questionnaire.mapping["W02"] == "W06_공감능력"
+    
+    variables = score_answers({"W02": 92, "1": 15})  # 코드와 번호 모두 허용
+    assert variables["W06_공감능력"] == 92
+    assert variables["W01_친절함"] == 15
+    assert variables["W02_친근함"] == PersonalityProfile.DEFAULTS["W02_친근함"]  # 미응답은 기본값
+    
+    # 기존 값 위에 보정하면 측정하지 않은 변수는 기존 값 유지
+    base = dict(PersonalityProfile.DEFAULTS, R01_관계지향성=7)
+    calibrated = score_answers({"W02": 92}, base=base)
+    assert calibrated["R01_관계지향성"] == 7
+    assert questionnaire.level(calibrated["W06_공감능력"]) == "해당 특성이 매우 강함"
+
+def test_batch_matches_single():
+    """일괄 채점 결과가 한 장씩 채점한 결과와 같은지 테스트"""
+    questionnaire = get_questionnaire()
+    rng = np.random.default_rng(7)
+    answers = rng.integers(0, 101, size=(200, len(questionnaire.questions))).astype(float)
+    answers[rng.random(answers.shape) < 0.1] = np.nan
+    
+    batch = questionnaire.score_matrix(answers)
+    assert batch.shape == (200, len(PersonalityProfile.DEFAULTS))
+    for row in (0, 57, 199):
+        single = questionnaire.score(list(answers[row]))
+        assert list(single.values()) == batch[row].tolist()
+
+def test_csv_cli_and_calibrate():
+    """CSV 응답지 → JSONL 결과, 페르소나 보정 테스트"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "answers.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "W01", "C02"])
+            writer.writerow(["kim", "80", "30"])
+            writer.writerow(["lee", "", "95"])
+        
+        metas, matrix = load_answer_sheets(path)
+        assert [meta["id"] for meta in metas] == ["kim", "lee"]
+        assert np.isnan(matrix[1, 0])
+        
+        output = os.path.join(tmp, "out.jsonl")
+        assert main([path, "--output", output]) == 0
+        with open(output, "r", encoding="utf-8") as f:
+            results = [json.loads(line) for line in f]
+        assert results[0]["성격프로필"]["W01_친절함"] == 80
+        assert results[1]["성격프로필"]["C07_학습능력"] == 95
+    
+    persona = {"기본정보": {"이름": "컵"}, "성격프로필": {"W01_친절함": 50}, "구조화프롬프트": "..."}
+    calibrated = calibrate_persona(persona, {"W01_친절함": 80})
+    assert calibrated["성격프로필"]["W01_친절함"] == 80
+    assert "구조화프롬프트" not in calibrated and "구조화프롬프트" in persona
+
+if __name__ == "__main__":
+    test_single_sheet()
+    test_batch_matches_single()
+    test_csv_cli_and_calibrate()
+    print("✅ 설문 채점 테스트 완료")
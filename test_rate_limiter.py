@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.rate_limiter import (
+    RateLimiter, RateLimitTimeout, estimate_tokens,
+    PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+)
+
+def test_interactive_before_background():
+    """대기 중인 채팅 요청이 백그라운드 요청보다 먼저 처리되는지 테스트"""
+    # 분당 120회 = 0.5초마다 1회, 버스트 1회
+    limiter = RateLimiter(requests_per_minute=120, burst=1)
+    limiter.acquire()  # 버스트 소진
+    
+    order = []
+    
+    def worker(name, priority):
+        limiter.acquire(priority=priority)
+        order.append(name)
+    
+    background = threading.Thread(target=worker, args=("background", PRIORITY_BACKGROUND))
+    background.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=worker, args=("interactive", PRIORITY_INTERACTIVE))
+    interactive.start()
+    background.join(3)
+    interactive.join(3)
+    
+    print(f"처리 순서: {order}")
+    assert order == ["interactive", "background"]
+
+def test_token_budget_and_timeout():
+    """토큰 한도 초과 시 대기 시간 초과 테스트"""
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=600)
+    assert limiter.acquire(estimated_tokens=600, timeout=0.1)
+    
+    try:
+        limiter.acquire(estimated_tokens=300, timeout=0.1)
+        assert False, "토큰이 부족한데 통과됨"
+    except RateLimitTimeout as e:
+        print(f"✅ 예상된 대기 시간 초과: {e}")
+    
+    # 실제 사용량이 예상보다 적으면 환급되어 바로 통과
+    limiter.record_usage(600, 200)
+    assert limiter.acquire(estimated_tokens=300, timeout=0.1)
+    assert limiter.queue_length() == 0
+
+def test_estimate_tokens():
+    """토큰 추정치 테스트"""
+    assert estimate_tokens("안녕하세요", output_tokens=0) == 5
+    assert estimate_tokens("hello world!", output_tokens=0) == 3
+    assert estimate_tokens("", image=object(), output_tokens=0) > 0
+
+def test_direct_profile_call_records_usage():
+    """PersonalityProfile 의 직접 Gemini 호출도 실제 사용량으로 TPM 버킷을 보정하는지 테스트 (네트워크 없이 응답 대체)"""
+    from types import SimpleNamespace
+    from modules import persona_generator
+    from modules.rate_limiter import get_rate_limiter
+    
+    class FakeModel:
+        def __init__(self, name):
+            pass
+        def generate_content(self, prompt, generation_config=None):
+            return SimpleNamespace(text="응답", usage_metadata=SimpleNamespace(total_token_count=40))
+    
+    api_key = "test-direct-usage-key"
+    original = (persona_generator.genai, persona_generator._configure_genai, os.environ.get("GEMINI_API_KEY"))
+    persona_generator.genai = SimpleNamespace(GenerativeModel=FakeModel)
+    persona_generator._configure_genai = lambda key: None
+    os.environ["GEMINI_API_KEY"] = api_key
+    try:
+        limiter = get_rate_limiter("gemini", api_key)
+        before = limiter.tokens.tokens
+        assert persona_generator.PersonalityProfile()._generate_text_with_api("짧은 질문") == "응답"
+        used = before - limiter.tokens.tokens
+        print(f"TPM 버킷 차감량: {used:.0f}")
+        assert abs(used - 40) < 1
+    finally:
+        persona_generator.genai, persona_generator._configure_genai = original[0], original[1]
+        if original[2] is None:
+            os.environ.pop("GEMINI_API_KEY", None)
+        else:
+            os.environ["GEMINI_API_KEY"] = original[2]
+
+if __name__ == "__main__":
+    test_interactive_before_background()
+    test_token_budget_and_timeout()
+    test_estimate_tokens()
+    test_direct_profile_call_records_usage()
+    print("🎉 속도 제한기 테스트 완료")
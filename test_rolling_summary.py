@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.rolling_summary import RollingSummarizer, extractive_summary
+from modules.persona_generator import PersonaGenerator
+
+def make_history(count):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"메시지 {i}"} for i in range(count)]
+
+def test_window_is_bounded():
+    """요약이 늦어져도 프롬프트에 들어가는 메시지 수에 상한이 있는지 테스트"""
+    release = threading.Event()
+    
+    def slow_summary(previous, messages):
+        release.wait(5)
+        return extractive_summary(previous, messages)
+    
+    summarizer = RollingSummarizer(slow_summary, every=4, window=3)
+    for count in range(1, 40):
+        summary, window = summarizer.context("s1", make_history(count))
+        assert len(window) <= 3 + 4
+        assert window[-1]["content"] == f"메시지 {count - 1}"
+    print(f"요약 대기 중 창 크기: {len(window)}")
+    
+    release.set()
+    summarizer.wait("s1", timeout=5)
+    summary, window = summarizer.context("s1", make_history(39))
+    assert "메시지 0" in summary
+    assert len(window) <= 3 + 4
+
+def test_background_fold_and_reset():
+    """밀려난 메시지가 요약에 합쳐지고, 대화를 새로 시작하면 요약도 초기화되는지 테스트"""
+    calls = []
+    
+    def summarize(previous, messages):
+        calls.append(len(messages))
+        return extractive_summary(previous, messages)
+    
+    summarizer = RollingSummarizer(summarize, every=2, window=2)
+    history = make_history(6)
+    summary, window = summarizer.context("s1", history)
+    assert summary == "" and len(window) == 4   # 첫 요약은 백그라운드로
+    summarizer.wait("s1", timeout=5)
+    
+    summary, window = summarizer.context("s1", history)
+    print(f"요약: {summary!r}, 창: {[m['content'] for m in window]}")
+    assert "메시지 0" in summary and "메시지 3" in summary
+    assert [m["content"] for m in window] == ["메시지 4", "메시지 5"]
+    assert calls == [4]
+    
+    # 대화 초기화
+    summary, window = summarizer.context("s1", make_history(2))
+    assert summary == "" and len(window) == 2
+    assert summarizer.summary("다른세션") == ""
+
+def test_generator_summary_without_api_key():
+    """API 키가 없으면 생성기가 간단 요약으로 대체하는지 테스트"""
+    generator = PersonaGenerator(api_provider="none")
+    generator.api_key = None
+    messages = [{"role": "user", "content": "우리 강아지 이름은 초코야"},
+                {"role": "assistant", "content": "초코 귀엽다!"}]
+    summary = generator._summarize_conversation("", messages)
+    print(f"간단 요약: {summary!r}")
+    assert "초코야" in summary
+
+if __name__ == "__main__":
+    test_window_is_bounded()
+    test_background_fold_and_reset()
+    test_generator_summary_without_api_key()
+    print("✅ 롤링 요약 테스트 완료")
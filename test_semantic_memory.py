@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.persona_generator import ConversationMemory
+from modules.semantic_memory import SemanticMemory, HashingEmbedder
+
+HISTORY = [
+    "우리 강아지 이름은 초코야",
+    "오늘 회사에서 너무 피곤했어",
+    "주말에 부산 여행 가고 싶다",
+    "시험 공부 때문에 스트레스 받아",
+]
+
+def test_paraphrase_found_in_old_history():
+    """공통 키워드가 없어도, 최근 20개보다 오래된 대화도 찾는지 테스트"""
+    memory = ConversationMemory()
+    for message in HISTORY:
+        memory.add_conversation(message, "그렇구나!", "s1")
+    for i in range(40):
+        memory.add_conversation(f"잡담 {i}번째", "응응", "s1")
+    memory.add_conversation("퇴근했어", "수고했어", "다른세션")
+    
+    context = memory.get_relevant_context("퇴근했는데 피곤하다", "s1")
+    found = [conv["user_message"] for conv in context["relevant_conversations"]]
+    print(f"찾은 기억: {found}")
+    assert found[0] == "오늘 회사에서 너무 피곤했어"
+    
+    # 가져오기 후에도 인덱스가 다시 구성되는지
+    restored = ConversationMemory()
+    assert restored.import_from_json(memory.export_to_json())
+    found = [conv["user_message"] for conv in restored.get_relevant_context("초코랑 산책 다녀왔어", "s1")["relevant_conversations"]]
+    assert found[0] == "우리 강아지 이름은 초코야"
+
+def test_keyword_mode_fallback():
+    """MEMORY_RETRIEVAL=keyword 이면 기존 방식으로 동작하는지 테스트"""
+    memory = ConversationMemory()
+    memory.add_conversation("오늘 게임 했어", "재밌었어?", "s1")
+    os.environ["MEMORY_RETRIEVAL"] = "keyword"
+    try:
+        context = memory.get_relevant_context("게임 또 하고 싶다", "s1")
+    finally:
+        os.environ.pop("MEMORY_RETRIEVAL", None)
+    assert [conv["user_message"] for conv in context["relevant_conversations"]] == ["오늘 게임 했어"]
+
+def test_search_latency_bounded():
+    """긴 기록에서도 검색이 빠른지 테스트"""
+    memory = SemanticMemory(embedder=HashingEmbedder())
+    for i in range(5000):
+        memory.add("s1", i, f"{i}번째 이야기 - 오늘은 {i % 37}번 카페에서 커피를 마셨다")
+    memory.add("s1", 5000, "고양이가 창밖을 보고 있어")
+    
+    start = time.perf_counter()
+    results = memory.search("s1", "고양이 창밖", k=3)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"5001개 중 검색: {elapsed:.1f}ms → {results[:1]}")
+    assert results[0][0] == 5000
+    assert elapsed < 200
+
+if __name__ == "__main__":
+    test_paraphrase_found_in_old_history()
+    test_keyword_mode_fallback()
+    test_search_latency_bounded()
+    print("✅ 의미 기반 기억 검색 테스트 완료")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+from modules.single_flight import SingleFlight, image_digest
+from modules.persona_generator import PersonaGenerator
+
+def test_concurrent_calls_share_one_execution():
+    """동시에 들어온 같은 요청이 한 번만 실행되는지 테스트"""
+    flights = SingleFlight()
+    calls = []
+    results = []
+    
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.2)
+        return "응답"
+    
+    threads = [threading.Thread(target=lambda: results.append(flights.do("같은 프롬프트", slow_call)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    print(f"실행 횟수: {len(calls)}, 합쳐진 호출: {flights.coalesced}")
+    assert len(calls) == 1
+    assert results == ["응답"] * 5
+    assert flights.in_flight() == 0
+    
+    # 완료 후에는 캐시하지 않고 다시 실행
+    flights.do("같은 프롬프트", slow_call)
+    assert len(calls) == 2
+
+def test_image_digest_and_analysis_copy():
+    """같은 이미지 판별 및 분석 결과 복사본 반환 테스트"""
+    red = Image.new("RGB", (32, 32), "red")
+    assert image_digest(red) == image_digest(red.copy())
+    assert image_digest(red) != image_digest(Image.new("RGB", (32, 32), "blue"))
+    
+    generator = PersonaGenerator()
+    generator.api_key = None
+    first = generator.analyze_image(red)
+    first["colors"].append("변경")
+    second = generator.analyze_image(red)
+    assert "변경" not in second["colors"]
+    assert second["image_width"] == 32
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_execution()
+    test_image_digest_and_analysis_copy()
+    print("🎉 요청 합치기 테스트 완료")
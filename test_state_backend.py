@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.state_backend import MemoryBackend, SQLiteBackend, create_backend
+from modules.rate_limiter import RateLimiter, RateLimitTimeout
+from modules.persona_generator import ConversationMemory
+
+def test_values_and_lists():
+    """값(ttl 포함)과 목록 저장이 메모리/SQLite 저장소에서 똑같이 동작하는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in (MemoryBackend(), SQLiteBackend(os.path.join(tmp, "state.sqlite3"))):
+            backend.set("ns", "a", {"이름": "머그컵"})
+            backend.set("ns", "short", 1, ttl=0.05)
+            assert backend.get("ns", "a") == {"이름": "머그컵"}
+            time.sleep(0.1)
+            assert backend.get("ns", "short", "만료") == "만료"
+
+            assert backend.append("log", "s1", {"n": 1}) == 1
+            assert backend.append("log", "s1", {"n": 2}) == 2
+            assert backend.items("log", "s1", start=1) == [{"n": 2}]
+            assert backend.length("log", "s1") == 2
+
+            backend.delete("log", "s1")
+            backend.delete("ns", "a")
+            assert backend.length("log", "s1") == 0 and backend.get("ns", "a") is None
+            print(f"{backend.name} 저장소 확인")
+
+    assert create_backend("unknown").name == "memory"
+
+def test_list_trim_and_expiry():
+    """목록이 max_items 개로 잘리고 ttl 뒤 만료되며, 위치는 전체 추가 순번을 유지하는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in (MemoryBackend(), SQLiteBackend(os.path.join(tmp, "state.sqlite3"))):
+            for n in range(1, 8):
+                assert backend.append("log", "s1", {"n": n}, max_items=3) == n
+            assert backend.length("log", "s1") == 7
+            assert backend.items("log", "s1") == [{"n": 5}, {"n": 6}, {"n": 7}]
+            assert backend.items("log", "s1", start=6) == [{"n": 7}]
+            
+            backend.append("log", "s2", {"n": 1}, ttl=0.05)
+            time.sleep(0.1)
+            assert backend.length("log", "s2") == 0 and backend.items("log", "s2") == []
+            assert backend.append("log", "s2", {"n": 2}) == 1
+            print(f"{backend.name} 목록 자르기/만료 확인")
+
+def test_shared_buckets_across_processes():
+    """같은 SQLite 파일을 쓰는 저장소 두 개(프로세스 두 개 가정)가 버킷 한도를 나눠 쓰는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.sqlite3")
+        first, second = SQLiteBackend(path), SQLiteBackend(path)
+        bucket = [("key", 1, 0.0, 10)]
+        taken = []
+
+        def worker(backend):
+            for _ in range(10):
+                if backend.take("ratelimit", bucket) == 0:
+                    taken.append(1)
+
+        threads = [threading.Thread(target=worker, args=(b,)) for b in (first, second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(f"20번 요청 중 통과: {len(taken)}")
+        assert len(taken) == 10
+        assert second.take("ratelimit", bucket) > 0
+
+        # 사용량 보정(환급)은 여유와 상관없이 반영
+        first.take("ratelimit", [("key", -3, 0.0, 10)], force=True)
+        assert second.take("ratelimit", [("key", 3, 0.0, 10)]) == 0
+
+        # RateLimiter 두 개가 같은 공유 버킷을 씀
+        limiters = [RateLimiter(requests_per_minute=2, tokens_per_minute=None, aging_seconds=0,
+                                backend=b, scope="gemini:test") for b in (first, second)]
+        assert limiters[0].acquire(timeout=1)
+        assert limiters[1].acquire(timeout=1)
+        timed_out = False
+        try:
+            limiters[1].acquire(timeout=0.2)
+        except RateLimitTimeout as e:
+            timed_out = True
+            print(f"한도 초과 대기: {e}")
+        assert timed_out
+
+def test_conversation_memory_shared():
+    """한 프로세스에서 저장한 대화를 다른 프로세스의 기억이 가져오는지 테스트"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.sqlite3")
+        first = ConversationMemory(backend=SQLiteBackend(path))
+        second = ConversationMemory(backend=SQLiteBackend(path))
+
+        first.add_conversation("오늘 카페에서 커피 마셨어", "좋았겠다!", "s1")
+        second.add_conversation("내일은 도서관 갈 거야", "공부 화이팅!", "s1")
+        context = first.get_relevant_context("커피 또 마시고 싶다", "s1")
+
+        messages = [c["user_message"] for c in first.conversations]
+        print(f"첫 번째 프로세스 기억: {messages}")
+        assert messages == ["오늘 카페에서 커피 마셨어", "내일은 도서관 갈 거야"]
+        assert context["user_profile"]["message_count"] == 2
+        assert len(second.conversations) == 2
+        assert "총 대화 수: 2회" in second.get_conversation_summary("s1")
+
+        # 공유하지 않는 저장소면 기존처럼 프로세스 안에서만 유지
+        # 로그는 STATE_CONVERSATION_MAX 개까지만 남아서 새 프로세스도 그만큼만 다시 읽음
+        os.environ["STATE_CONVERSATION_MAX"] = "3"
+        try:
+            for i in range(5):
+                first.add_conversation(f"메시지 {i}", "응답", "s2")
+        finally:
+            os.environ.pop("STATE_CONVERSATION_MAX", None)
+        third = ConversationMemory(backend=SQLiteBackend(path))
+        third.get_relevant_context("안녕", "s2")
+        assert [c["user_message"] for c in third.conversations] == ["메시지 2", "메시지 3", "메시지 4"]
+        second.get_relevant_context("안녕", "s2")
+        assert len([c for c in second.conversations if c["session_id"] == "s2"]) == 3
+        
+        local = ConversationMemory(backend=MemoryBackend())
+        local.add_conversation("안녕", "반가워", "s1")
+        assert local.backend is None and "entry_id" not in local.conversations[0]
+
+if __name__ == "__main__":
+    test_values_and_lists()
+    test_list_trim_and_expiry()
+    test_shared_buckets_across_processes()
+    test_conversation_memory_shared()
+    print("✅ 공유 상태 저장소 테스트 완료")
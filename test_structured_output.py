@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.structured_output import (
+    IMAGE_ANALYSIS_SCHEMA, ATTRACTIVE_FLAWS_SCHEMA,
+    StructuredOutputError, parse_structured, generate_structured, to_provider_schema
+)
+from modules.persona_generator import PersonalityProfile
+
+def test_parse_and_coerce():
+    """코드블록 응답 파싱 및 숫자 문자열 보정 테스트"""
+    text = """```json
+{"object_type": "머그컵", "colors": "흰색", "materials": ["도자기"], "condition": "사용감있음",
+ "personality_hints": {"warmth_factor": "80", "competence_factor": 55, "humor_factor": "약 120"}}
+```"""
+    data = parse_structured(text, IMAGE_ANALYSIS_SCHEMA)
+    assert data["colors"] == ["흰색"]
+    assert data["personality_hints"]["warmth_factor"] == 80
+    assert data["personality_hints"]["humor_factor"] == 100  # 범위 보정
+    
+    # 제공업체 스키마에는 로컬 검증용 키가 없어야 함
+    assert "minItems" not in str(to_provider_schema(ATTRACTIVE_FLAWS_SCHEMA))
+
+def test_single_repair_retry():
+    """검증 실패 시 한 번만 복구 재시도하는지 테스트"""
+    calls = []
+    responses = ['{"flaws": ["하나뿐인 결함입니다"]}',
+                 '{"flaws": ["물때가 생기면 자존심 상함", "새벽엔 소음 걱정", "손잡이 흔들림 걱정", "찬장 속이 답답함"]}']
+    
+    def fake_call(prompt, image, schema):
+        calls.append(prompt)
+        return responses[len(calls) - 1]
+    
+    data = generate_structured(fake_call, "결함 생성", ATTRACTIVE_FLAWS_SCHEMA)
+    assert len(calls) == 2 and "오류" in calls[1]
+    assert len(PersonalityProfile().parse_attractive_flaws(data)) == 4
+    
+    # 복구도 실패하면 예외 (추가 재시도 없음)
+    calls.clear()
+    responses[1] = "형식 없는 답변"
+    try:
+        generate_structured(fake_call, "결함 생성", ATTRACTIVE_FLAWS_SCHEMA)
+        assert False, "예외가 발생해야 함"
+    except StructuredOutputError as e:
+        print(f"✅ 예상된 실패: {e}")
+    assert len(calls) == 2
+    
+    # API 오류 문자열은 복구 재시도 없이 실패
+    calls.clear()
+    responses[0] = "Gemini API 오류: quota"
+    try:
+        generate_structured(fake_call, "결함 생성", ATTRACTIVE_FLAWS_SCHEMA)
+    except StructuredOutputError:
+        pass
+    assert len(calls) == 1
+
+if __name__ == "__main__":
+    test_parse_and_coerce()
+    test_single_repair_retry()
+    print("🎉 구조화 출력 테스트 완료")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.variable_registry import variable_meta, variable_rows, variable_status, OTHER_CATEGORY
+from modules.persona_generator import PersonalityProfile
+
+def test_prefix_ordering():
+    """'F'/'FORM', 'O'/'OBJ' 접두어가 올바르게 구분되는지 테스트"""
+    assert variable_meta("F01_완벽주의불안").category == "💎 매력적결함"
+    assert variable_meta("FORM01_크기자각정도").category == "✨ 형태특성"
+    assert variable_meta("O01_상상력").category == "🎨 개방성"
+    assert variable_meta("OBJ01_존재목적만족도").category == "🏠 사물정체성"
+    assert variable_meta("INT01_터치반응민감도").label == "터치반응민감도"
+    assert variable_meta("X_알수없음").category == OTHER_CATEGORY
+
+def test_status_thresholds():
+    """값 수준 경계 테스트"""
+    assert variable_status(80) == "🟢 매우 높음"
+    assert variable_status(79) == "🟡 높음"
+    assert variable_status(40) == "🟠 보통"
+    assert variable_status(20) == "🔴 낮음"
+    assert variable_status(5) == "⚫ 매우 낮음"
+
+def test_rows_are_cached():
+    """같은 변수 값이면 캐시된 행을 재사용하는지 테스트"""
+    variables = dict(PersonalityProfile.DEFAULTS)
+    rows = variable_rows(variables, with_value=True)
+    again = variable_rows(dict(variables), with_value=True)
+    
+    print(f"변수 {len(rows)}개, 첫 행: {rows[0]}")
+    assert rows == again
+    assert len(rows) == len(PersonalityProfile.DEFAULTS)
+    assert rows[0][2].endswith(f"({rows[0][1]})")
+    
+    # 반환된 행을 고쳐도 캐시는 영향 없음
+    rows[0][1] = -1
+    assert variable_rows(variables, with_value=True)[0][1] != -1
+    assert variable_rows({}) == []
+
+if __name__ == "__main__":
+    test_prefix_ordering()
+    test_status_thresholds()
+    test_rows_are_cached()
+    print("✅ 변수 레지스트리 테스트 통과")